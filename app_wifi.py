@@ -1,13 +1,14 @@
 # 라즈베리파이 제로 2에 AP 연결시 나오는 개인 전용 웹 사이트
 # 사용자가 연결할 와이파이, 비밀번호를 입력하면 와이파이 정보를 wpa_supplicant.conf에 저장하고 재설정
-# 로봇 이름은 랜덤 ID를 부여하고 robot_config.py에 저장(단, 이름 중복 문제가 있음. 나중에 개선 필요)
+# 로봇 이름은 랜덤 ID를 부여하고 설정 저장소(settings.py, network 섹션)에 저장(단, 이름 중복 문제가 있음. 나중에 개선 필요)
 # 이후 로봇 클라이언트가 이 파일을 읽어서 와이파이 정보와 로봇 이름을 사용
 # 클라이언트 모드로 변경
-from pathlib import Path
 from flask import Flask, render_template, request, jsonify, redirect, url_for
 import subprocess
 import platform
 import time
+import settings
+import robot_config
 
 def get_default_robot_name():
     # /etc/pf_default_robot_name에서 로봇 이름 읽기
@@ -89,11 +90,10 @@ def connect():
                     ]
                 subprocess.run(add_command, check=True, text=True, capture_output=True, timeout=15)
 
-                # 로봇 설정 업데이트
-                ScriptDir = Path(__file__).parent.absolute() # 현재 파일의 디렉토리
-                robot_id = get_robot_id()
-                subprocess.run(f"sed -i 's/ROBOT_ID = .*/ROBOT_ID = \"{robot_id}\"/' {ScriptDir}/robot_config.py", shell=True, check=True)
-                subprocess.run(f"sed -i 's/ROBOT_NAME = .*/ROBOT_NAME = \"{get_default_robot_name()}\"/' {ScriptDir}/robot_config.py", shell=True, check=True)
+                # 로봇 설정 업데이트 (임시 파일에 쓴 뒤 원자적 교체)
+                if not settings.store.update(settings.NetworkIdentity, robot_id=get_robot_id(),
+                                             robot_name=get_default_robot_name()):
+                    raise RuntimeError("로봇 설정 저장 실패")
 
                 # /etc/pf_env 파일 수정
                 subprocess.run("echo 'MODE=CLIENT' | sudo tee /etc/pf_env", shell=True, check=True)
@@ -117,6 +117,9 @@ def connect():
 
 
 if __name__ == '__main__':
+    # root로 실행되어도 robot_client.py와 같은 설정 파일 (settings.py), 이전 robot_config.py의 ID는 여기서 옮김
+    robot_config.load_identity()
+    print(f"설정 파일: {settings.store.path}")
     app.run(host='0.0.0.0', port=5000, debug=False)
 
 
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+# 카메라 광류로 모터 자동 캘리브레이션 (Findee.auto_calibrate_motors)
+# - 속도별로 직진하면서 전방 카메라 영상의 수평 이동(= 제자리 회전, yaw)을 측정
+#   축소한 흑백 프레임에서 goodFeaturesToTrack + calcOpticalFlowPyrLK (희소 광류)
+#   특징점 수평 이동의 중앙값 사용 (전진에 의한 확대는 좌우가 상쇄되어 중앙값에 거의 영향 없음)
+#   단위: 화면 폭 비율/초 (해상도와 무관)
+# - 드리프트는 비율(오른쪽/왼쪽 출력)에 대해 거의 선형이므로 할선법으로 드리프트 0인 비율을 찾음
+#   (현재 비율 → 반대 방향 탐색 → 보간 → 확인, 속도/방향당 최대 MAX_TRIALS회 주행)
+# - 전진/후진을 번갈아 주행해서 제자리 근처 유지
+# 결과: 주행 방향별 ((속도, 비율), ...) 곡선 (settings.MotorCalibration.forward_curve/backward_curve)
+
+import time
+
+import startup
+
+cv2 = startup.LazyModule('cv2')
+np = startup.LazyModule('numpy')
+
+DEFAULT_SPEEDS = (40, 60, 80, 100)
+TRIAL_DURATION = 1.2     # 주행 1회 측정 시간 (초)
+SETTLE_TIME = 0.3        # 출발 직후 가속 구간 (측정 제외)
+PAUSE_TIME = 0.4         # 주행 사이 정지 시간
+PROBE_STEP = 0.1         # 첫 탐색 때 비율 변경량
+TOLERANCE = 0.01         # 드리프트가 이보다 작으면 완료 (화면 폭 비율/초)
+MAX_TRIALS = 4
+RATIO_RANGE = (0.3, 3.0)
+
+#region 곡선
+def interpolate_curve(curve: tuple, speed: float) -> float:
+    """((속도, 비율), ...) 곡선에서 speed의 비율 (구간 선형 보간, 범위 밖은 양 끝 값)"""
+    if speed <= curve[0][0]:
+        return curve[0][1]
+    for (s0, r0), (s1, r1) in zip(curve, curve[1:]):
+        if speed <= s1:
+            return r0 + (r1 - r0) * (speed - s0) / (s1 - s0)
+    return curve[-1][1]
+
+def wheel_outputs(speed: float, ratio: float) -> tuple[float, float]:
+    """비율(오른쪽/왼쪽)을 적용한 (left, right), 빠른 쪽만 줄임"""
+    if ratio <= 1.0:
+        return speed, speed * ratio
+    return speed / ratio, speed
+#endregion
+
+#region 회전 측정
+class YawEstimator:
+    """연속 프레임의 희소 광류로 수평 이동량 측정"""
+    def __init__(self, width: int = 160, max_corners: int = 80, min_points: int = 12):
+        self.width = width
+        self.max_corners = max_corners
+        self.min_points = min_points
+        self._previous = None
+        self._points = None
+        self.tracked: int = 0   # 마지막 프레임에서 추적된 점 수
+
+    def reset(self):
+        self._previous = None
+        self._points = None
+
+    def _prepare(self, image):
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        height, width = image.shape
+        if width > self.width:
+            size = (self.width, max(1, height * self.width // width))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        return image
+
+    def update(self, image) -> float | None:
+        """이전 프레임 대비 수평 이동 (화면 폭 비율, 장면이 오른쪽으로 가면 양수), 측정 불가면 None"""
+        gray = self._prepare(image)
+        previous, points = self._previous, self._points
+        self._previous = gray
+        if previous is None or previous.shape != gray.shape:
+            self._points = self._detect(gray)
+            return None
+        if points is None or len(points) < self.min_points:
+            points = self._detect(previous)
+            if points is None:
+                self._points = self._detect(gray)
+                return None
+
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(previous, gray, points, None, winSize=(15, 15), maxLevel=2)
+        good = status.reshape(-1) == 1
+        self.tracked = int(good.sum())
+        if self.tracked < self.min_points:
+            self._points = self._detect(gray)
+            return None
+        dx = moved[good, 0, 0] - points[good, 0, 0]
+        self._points = moved[good].reshape(-1, 1, 2)
+        return float(np.median(dx)) / gray.shape[1]
+
+    def _detect(self, gray):
+        points = cv2.goodFeaturesToTrack(gray, self.max_corners, 0.01, 6)
+        if points is None or len(points) < self.min_points:
+            return None
+        return points.astype(np.float32)
+#endregion
+
+#region 비율 탐색
+class RatioSearch:
+    """속도/방향 하나의 비율 탐색 (드리프트 = 오른쪽 바퀴가 빠른 정도, 양수면 비율을 줄여야 함)"""
+    def __init__(self, start: float, probe_step: float = PROBE_STEP, tolerance: float = TOLERANCE,
+                 max_trials: int = MAX_TRIALS):
+        self.ratio: float = start
+        self.probe_step = probe_step
+        self.tolerance = tolerance
+        self.max_trials = max_trials
+        self.trials: list[tuple[float, float]] = []   # (비율, 드리프트)
+        self.done: bool = False
+
+    def record(self, ratio: float, drift: float | None):
+        if drift is None:
+            self.done = True  # 특징점 부족 등: 이 속도는 건너뜀
+            return
+        self.trials.append((ratio, drift))
+        if abs(drift) <= self.tolerance or len(self.trials) >= self.max_trials:
+            self.done = True
+            return
+        self.ratio = self._next()
+
+    def _next(self) -> float:
+        ratio, drift = self.trials[-1]
+        step = -self.probe_step if drift > 0 else self.probe_step
+        if len(self.trials) >= 2:
+            # 가장 작은 드리프트 두 점으로 보간 (기울기 부호가 맞지 않으면 잡음: 고정 간격 탐색)
+            (r0, d0), (r1, d1) = sorted(self.trials, key=lambda trial: abs(trial[1]))[:2]
+            if r1 != r0 and (d1 - d0) / (r1 - r0) > 0:
+                return max(RATIO_RANGE[0], min(RATIO_RANGE[1], r0 - d0 * (r1 - r0) / (d1 - d0)))
+        return max(RATIO_RANGE[0], min(RATIO_RANGE[1], ratio + step))
+
+    @property
+    def result(self) -> float | None:
+        """드리프트가 가장 작았던 비율 (측정값이 없으면 None)"""
+        if not self.trials:
+            return None
+        return min(self.trials, key=lambda trial: abs(trial[1]))[0]
+#endregion
+
+class AutoCalibrator:
+    """Findee로 속도별 주행 → 방향별 비율 곡선"""
+    def __init__(self, robot, speeds=DEFAULT_SPEEDS, duration: float = TRIAL_DURATION,
+                 settle: float = SETTLE_TIME, pause: float = PAUSE_TIME, estimator: YawEstimator | None = None):
+        self.robot = robot
+        self.speeds = tuple(sorted({float(speed) for speed in speeds}))
+        self.duration = duration
+        self.settle = settle
+        self.pause = pause
+        self.estimator = estimator or YawEstimator()
+        self.log: list[dict] = []   # 주행 기록 (speed, direction, ratio, drift, frames, points)
+
+    def measure(self, speed: float, ratio: float, backward: bool) -> float | None:
+        """한 번 주행하며 드리프트 측정 (화면 폭 비율/초, 오른쪽 바퀴가 빠르면 양수)"""
+        left, right = wheel_outputs(speed, ratio)
+        sign = -1.0 if backward else 1.0
+        estimator = self.estimator
+        estimator.reset()
+        shift, frames, seen, points = 0.0, 0, 0, []
+        start = time.monotonic()
+        measure_from = None
+        try:
+            self.robot.control_motors(sign * left, sign * right)
+            while True:
+                frame = self.robot.get_frame_info()
+                now = time.monotonic()
+                if now - start < self.settle:
+                    estimator.update(frame.image)  # 가속 구간: 추적만 유지
+                    continue
+                if measure_from is None:
+                    measure_from = now
+                if now - measure_from >= self.duration:
+                    break
+                seen += 1
+                dx = estimator.update(frame.image)
+                if dx is not None:
+                    shift += dx
+                    frames += 1
+                    points.append(estimator.tracked)
+        finally:
+            self.robot.stop()
+        elapsed = time.monotonic() - (measure_from or start)
+        # 추적 실패한 프레임은 평균 이동량으로 채움 (전체 프레임 수 기준 속도)
+        # 전진 중 오른쪽이 빠르면 왼쪽으로 돌고 장면은 오른쪽으로 이동, 후진은 반대
+        drift = sign * (shift / frames) * seen / elapsed if frames >= 3 and elapsed > 0 else None
+        self.log.append({'speed': speed, 'direction': 'backward' if backward else 'forward',
+                         'ratio': round(ratio, 4), 'drift': round(drift, 4) if drift is not None else None,
+                         'frames': frames, 'points': int(np.median(points)) if points else 0})
+        time.sleep(self.pause)
+        return drift
+
+    def run(self, start_curves: dict | None = None) -> dict[str, tuple]:
+        """{'forward': ((속도, 비율), ...), 'backward': ...} (측정 실패한 속도는 빠짐)
+        Args:
+            start_curves: 방향별 시작 곡선 (이전 결과, 없으면 비율 1.0에서 시작)
+        """
+        start_curves = start_curves or {}
+        curves: dict[str, list] = {'forward': [], 'backward': []}
+        for speed in self.speeds:
+            searches = {}
+            for direction in curves:
+                start = start_curves.get(direction)
+                searches[direction] = RatioSearch(interpolate_curve(start, speed) if start else 1.0)
+            # 전진/후진 번갈아 주행
+            while not all(search.done for search in searches.values()):
+                for direction, search in searches.items():
+                    if not search.done:
+                        ratio = search.ratio
+                        search.record(ratio, self.measure(speed, ratio, direction == 'backward'))
+            for direction, search in searches.items():
+                if search.result is not None:
+                    curves[direction].append((speed, round(search.result, 4)))
+                    print(f"  {direction} 속도 {speed:g}: 비율 {search.result:.3f} "
+                          f"(드리프트 {min(abs(d) for _, d in search.trials):.4f}, 주행 {len(search.trials)}회)")
+                else:
+                    print(f"  {direction} 속도 {speed:g}: 측정 실패 (특징점 부족)")
+        return {direction: tuple(points) for direction, points in curves.items()}
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+# 색 덩어리 추적 벤치마크: 기존 방식 (매 프레임 전체 화면 HSV 변환 → inRange → findContours → 가장 큰 윤곽 moments)
+# vs BlobTracker (칼만 예측 창 + 놓쳤을 때만 전체 검색)
+# 합성 장면: 잡음 섞인 배경 위에서 주황색 공이 움직이고 (잠깐 화면 밖으로 나감) 같은 색 작은 잡음 점이 깜빡임, 30fps 시각
+# - 프레임당 처리 시간 (median, p95), 처리한 픽셀 비율
+# - 재현율, 위치 오차 (px), 떨림 (프레임 간 이동량 오차 p95, px)
+# 실행: python -m benchmarks.bench_blobs --frames 600 --json blobs.json
+
+import sys
+import time
+
+from benchmarks.harness import BenchmarkSuite, argument_parser, finish, summarize
+
+import cv2
+import numpy as np
+import control_loop
+import blob_tracker
+
+WIDTH, HEIGHT = 640, 480
+FRAME_NS = 33_333_333
+BOUNDS = [5, 25, 120, 255, 120, 255]   # 주황색
+COLOR = (0, 140, 255)                   # BGR
+
+def render(count: int, seed: int = 1) -> list[tuple]:
+    """[(이미지, 시각 ns, 정답 중심 또는 None)]"""
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(rng.integers(40, 160, (HEIGHT, WIDTH, 3), dtype=np.uint8), (7, 7), 0)
+    frames = []
+    for frame in range(count):
+        image = background.copy()
+        t = frame / 30
+        x = WIDTH / 2 + 380 * np.sin(0.9 * t)            # 좌우 끝에서 화면 밖으로 나감
+        y = HEIGHT / 2 + 150 * np.sin(1.7 * t + 0.5)
+        radius = int(28 + 8 * np.sin(0.5 * t))
+        center = (int(round(x)), int(round(y)))
+        cv2.circle(image, center, radius, COLOR, -1, lineType=cv2.LINE_AA)
+        for _ in range(15):                              # 같은 색 잡음 점 (min_area보다 작음)
+            cv2.circle(image, (int(rng.integers(0, WIDTH)), int(rng.integers(0, HEIGHT))), 3, COLOR, -1)
+        noise = rng.normal(0, 6, image.shape)
+        image = np.clip(image + noise, 0, 255).astype(np.uint8)
+        visible = radius <= x < WIDTH - radius and radius <= y < HEIGHT - radius
+        frames.append((image, frame * FRAME_NS, (x, y) if visible else None))
+    return frames
+
+def baseline(bounds, min_area: float):
+    """기존 사용자 코드 방식: 전체 화면을 매번 처리"""
+    lower = np.array([bounds[0], bounds[2], bounds[4]])
+    upper = np.array([bounds[1], bounds[3], bounds[5]])
+
+    def step(image, timestamp_ns):
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(hsv, lower, upper)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return None
+        largest = max(contours, key=cv2.contourArea)
+        moments = cv2.moments(largest)
+        if moments['m00'] < min_area:
+            return None
+        return moments['m10'] / moments['m00'], moments['m01'] / moments['m00']
+    return step
+
+def run(step, frames: list) -> dict:
+    durations, errors, jitter = [], [], []
+    found = expected = 0
+    previous = None
+    for image, timestamp_ns, truth in frames:
+        t0 = time.perf_counter()
+        position = step(image, timestamp_ns)
+        durations.append(time.perf_counter() - t0)
+        if truth is None:
+            previous = None
+            continue
+        expected += 1
+        if position is None:
+            previous = None
+            continue
+        found += 1
+        errors.append(float(np.hypot(position[0] - truth[0], position[1] - truth[1])))
+        if previous is not None:
+            moved = np.subtract(position, previous[0])
+            true_moved = np.subtract(truth, previous[1])
+            jitter.append(float(np.hypot(*(moved - true_moved))))
+        previous = (position, truth)
+    return {
+        'timing': summarize(durations),
+        'recall': round(found / expected, 4) if expected else None,
+        'error_px': control_loop.summarize(errors),
+        'jitter_px': control_loop.summarize(jitter)
+    }
+
+def main(argv=None) -> int:
+    parser = argument_parser('색 덩어리 추적 벤치마크 (전체 화면 vs 칼만 예측 창)')
+    parser.add_argument('--frames', type=int, default=600, help='합성 프레임 수 (30fps)')
+    parser.add_argument('--min-area', type=float, default=blob_tracker.MIN_AREA, help='덩어리 최소 면적 (px)')
+    args = parser.parse_args(argv)
+
+    cv2.setNumThreads(1)
+    frames = render(args.frames)
+    suite = BenchmarkSuite('blobs')
+    extra = {}
+
+    result = run(baseline(BOUNDS, args.min_area), frames)
+    suite.results['update[full frame]'] = result.pop('timing')
+    extra['full frame'] = result
+
+    tracker = blob_tracker.BlobTracker(BOUNDS, min_area=args.min_area)
+
+    def tracked(image, timestamp_ns):
+        blob = tracker.update(image, timestamp_ns=timestamp_ns)
+        return (blob.x, blob.y) if blob is not None and blob.found else None
+    result = run(tracked, frames)
+    suite.results['update[tracker]'] = result.pop('timing')
+    result['tracker'] = tracker.stats()
+    extra['tracker'] = result
+
+    for name in ('full frame', 'tracker'):
+        timing, result = suite.results[f'update[{name}]'], extra[name]
+        print(f"{name:<11} {timing['median_us'] / 1000:>6.2f} ms (p95 {timing['p95_us'] / 1000:.2f})  재현율 {result['recall']}  "
+              f"오차 p95 {result['error_px']['p95']}px  떨림 p95 {result['jitter_px']['p95']}px")
+    stats = extra['tracker']['tracker']
+    full, tracked_timing = suite.results['update[full frame]'], suite.results['update[tracker]']
+    extra['speedup'] = round(full['median_us'] / tracked_timing['median_us'], 2) if tracked_timing['median_us'] else None
+    print(f"처리 시간 x{extra['speedup']}, 픽셀 {stats['pixel_fraction']}, 전체 검색 {stats['full_searches']}/{stats['frames']}, "
+          f"창 적중률 {stats['window_hit_rate']}")
+    return finish(suite, args, extra)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+# 로봇 클라이언트 핫패스 벤치마크
+# 실행: python -m benchmarks.bench_hotpaths --json bench.json [--baseline base.json]
+
+import sys
+import json
+
+from benchmarks.harness import BenchmarkSuite, use_sim_backend, run_sync, argument_parser, finish
+
+use_sim_backend()
+
+import cv2
+import findee_hw
+import robot_client
+import webrtc_sdp
+from media_hub import MediaHub, Subscriber
+from stream_control import AdaptiveStreamController
+import auto_calibration
+from findee import Findee
+
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720)]
+QUALITIES = [40, 60, 70, 90]
+
+CANDIDATES = [
+    'candidate:842163049 1 udp 1677729535 203.0.113.7 54321 typ srflx raddr 192.168.0.12 rport 54321 generation 0 ufrag abcd network-cost 999',
+    'candidate:1 1 UDP 2130706431 192.168.0.12 50000 typ host',
+    'candidate:3 1 tcp 1518280447 192.168.0.12 9 typ host tcptype active generation 0',
+]
+
+ANSWER_SDP = '\r\n'.join([
+    'v=0', 'o=- 3912345678 3912345678 IN IP4 0.0.0.0', 's=-', 't=0 0',
+    'a=group:BUNDLE 0', 'a=msid-semantic:WMS *',
+    'm=application 54321 DTLS/SCTP 5000', 'c=IN IP4 192.168.0.12', 'a=mid:0', 'a=sctpmap:5000 webrtc-datachannel 65535',
+    'a=max-message-size:65536',
+    *[f'a=candidate:{i} 1 udp {2130706431 - i} 192.168.0.{10 + i} {50000 + i} typ host' for i in range(4)],
+    'a=candidate:9 1 udp 1694498815 203.0.113.7 54321 typ srflx raddr 192.168.0.12 rport 54321',
+    'a=end-of-candidates', 'a=ice-ufrag:abcd', 'a=ice-pwd:0123456789abcdef0123456789abcdef',
+    'a=fingerprint:sha-256 ' + ':'.join(['AB'] * 32), 'a=setup:active', ''
+])
+
+class StubDataChannel:
+    readyState = 'open'
+    bufferedAmount = 0
+
+    def __init__(self):
+        self.sent_bytes = 0
+
+    def send(self, data):
+        self.sent_bytes += len(data)
+
+class ImmediateLoop:
+    """call_soon_threadsafe를 즉시 실행하는 이벤트 루프 대체"""
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
+
+def synthetic_frame(size: tuple[int, int], sequence: int = 1):
+    camera = findee_hw.SimCamera()
+    return camera._render(size, sequence)
+
+def build_suite() -> BenchmarkSuite:
+    suite = BenchmarkSuite('hotpaths')
+    findee = Findee()
+
+    # 1) JPEG 인코딩 (emit_image 경로)
+    for size in RESOLUTIONS:
+        frame = synthetic_frame(size)
+        for quality in QUALITIES:
+            suite.add(f"encode_image[{size[0]}x{size[1]} q{quality}]",
+                      lambda frame=frame, quality=quality: robot_client.encode_image(frame, quality),
+                      bytes=len(robot_client.encode_image(frame, quality)))
+
+    # mjpeg_gen: 캡처 + 인코딩 + multipart 프레이밍 (q70)
+    gen = findee.mjpeg_gen()
+    for size in RESOLUTIONS:
+        suite.add(f"mjpeg_gen[{size[0]}x{size[1]}]", lambda: next(gen),
+                  setup=lambda size=size: findee.set_resolution(size))
+
+    # 2) send_image_via_webrtc 프레이밍 (스텁 데이터 채널)
+    session_id = 'bench-session'
+    session = robot_client.sessions.get_or_create(session_id)
+    session.data_channel = StubDataChannel()
+    for size in RESOLUTIONS:
+        jpeg = robot_client.encode_image(synthetic_frame(size), 60)
+        suite.add(f"send_image_via_webrtc[{size[0]}x{size[1]}]",
+                  lambda jpeg=jpeg: run_sync(robot_client.send_image_via_webrtc(session_id, jpeg, 'camera_widget')),
+                  bytes=len(jpeg))
+
+    # 이미지 허브 팬아웃: 시청자 수가 늘어도 인코딩은 품질 단계별 1회
+    frame = synthetic_frame((640, 480))
+    for viewers in (1, 4, 16):
+        hub = MediaHub(ImmediateLoop(), robot_client.encode_image)
+        for i in range(viewers):
+            hub.subscribe('cam', Subscriber(f'viewer-{i}', StubDataChannel().send))
+        suite.add(f"media_hub.publish[640x480 viewers={viewers}]", lambda hub=hub: hub.publish('cam', frame))
+
+    # 자동 조정으로 축소된 단계 (축소 + 인코딩 비용, fps 제한은 끔)
+    for level in (3, 6):
+        controller = AdaptiveStreamController(bounds={'max_fps': 10 ** 6, 'min_fps': 10 ** 6})
+        controller.level = level
+        controller.update = lambda *args, **kwargs: False
+        quality, scale, _ = controller.ladder[level]
+        scaled_hub = MediaHub(ImmediateLoop(), robot_client.encode_image)
+        scaled_hub.subscribe('cam', Subscriber('viewer', StubDataChannel().send, controller=controller))
+        suite.add(f"media_hub.publish[640x480 adaptive q{quality} x{scale}]",
+                  lambda hub=scaled_hub: hub.publish('cam', frame))
+
+    # delta 모드: 정지 화면(변경 없음), 이진 마스크, 일부 변경(움직이는 막대)
+    static_hub = MediaHub(ImmediateLoop(), robot_client.encode_image)
+    static_hub.subscribe('cam', Subscriber('viewer', StubDataChannel().send))
+    suite.add("media_hub.publish[640x480 delta static]", lambda: static_hub.publish('cam', frame, mode='delta'))
+    mask = cv2.inRange(cv2.cvtColor(frame, cv2.COLOR_BGR2HSV), (40, 50, 50), (80, 255, 255))
+    mask_hub = MediaHub(ImmediateLoop(), robot_client.encode_image)
+    mask_hub.subscribe('mask', Subscriber('viewer', StubDataChannel().send))
+    suite.add("media_hub.publish[640x480 delta mask]", lambda: mask_hub.publish('mask', mask, mode='delta'))
+    suite.add("media_hub.publish[640x480 jpeg mask]", lambda: mask_hub.publish('mask', mask))
+    moving = [synthetic_frame((640, 480), sequence=i) for i in range(1, 31)]
+    moving_hub = MediaHub(ImmediateLoop(), robot_client.encode_image)
+    moving_hub.subscribe('cam', Subscriber('viewer', StubDataChannel().send))
+    counter = iter(range(10 ** 9))
+    suite.add("media_hub.publish[640x480 delta moving bar]",
+              lambda: moving_hub.publish('cam', moving[next(counter) % len(moving)], mode='delta'))
+
+    # 3) ICE candidate 파싱
+    for i, candidate in enumerate(CANDIDATES):
+        suite.add(f"create_ice_candidate[{i}]",
+                  lambda candidate=candidate: robot_client.create_ice_candidate(candidate, sdp_mid='0', sdp_m_line_index=0))
+
+    suite.add("extract_candidates[answer sdp]", lambda: webrtc_sdp.extract_candidates(ANSWER_SDP))
+
+    # 4) 데이터 채널 명령 디코딩
+    command = bytes([0x10, 0xF0])
+    pid = json.dumps({'type': 'pid_update', 'widget_id': 'pid1', 'p': 1.0, 'i': 0.1, 'd': 0.01})
+    slider = json.dumps({'type': 'slider_update', 'widget_id': 'slider1', 'values': [0, 180, 50, 255, 50, 255]})
+    suite.add("on_message[command 2B]", lambda: robot_client.handle_datachannel_message(session, command))
+    suite.add("on_message[pid_update]", lambda: robot_client.handle_datachannel_message(session, pid))
+    suite.add("on_message[slider_update]", lambda: robot_client.handle_datachannel_message(session, slider))
+
+    # 5) 모터 보정 + 제어 (시뮬레이션 GPIO, 같은 방향 반복 명령이므로 출발 펄스는 방향 전환 때만)
+    findee.motor_kick = 'on_change'
+    findee.motor_calibration = {'dir': 1, 'low_speed_ratio': 0.88, 'high_speed_ratio': 0.58}
+    suite.add("_apply_calibration", lambda: findee._apply_calibration(75.0, 75.0))
+    curve = {'forward_curve': [[40, 0.95], [60, 0.9], [80, 0.86], [100, 0.82]], 'backward_curve': [[40, 1.02], [100, 1.05]]}
+    manual = findee.motor_calibration
+    suite.add("_apply_calibration[curve]", lambda: findee._apply_calibration(75.0, 75.0),
+              setup=lambda: setattr(findee, 'motor_calibration', curve))
+    suite.add("control_motors[stop]", lambda: findee.control_motors(0.0, 0.0),
+              setup=lambda: setattr(findee, 'motor_calibration', manual))
+    suite.add("control_motors[drive]", lambda: findee.control_motors(*findee._apply_calibration(75.0, 75.0)))
+    # 시간 지정 동작 제출 (진행 중인 동작 대체, 첫 단계는 호출한 스레드에서 적용)
+    suite.add("motion.submit[supersede]", lambda: findee.motion.submit(((75.0, 75.0, 10.0),)))
+    suite.add("motion.emergency_stop", findee.motion.emergency_stop)
+
+    # 자동 캘리브레이션 광류 (프레임 하나, 축소 + LK)
+    estimator = auto_calibration.YawEstimator()
+    frames = [synthetic_frame((640, 480), sequence) for sequence in range(1, 3)]
+    estimator.update(frames[0])
+    flow_state = {'i': 0}
+    def flow_step():
+        flow_state['i'] ^= 1
+        estimator.update(frames[flow_state['i']])
+    suite.add("auto_calibration.yaw_update[640x480]", flow_step)
+
+    # 6) 신호등 인식 (합성 프레임)
+    for size in RESOLUTIONS:
+        hsv = cv2.cvtColor(synthetic_frame(size, sequence=61), cv2.COLOR_BGR2HSV)
+        suite.add(f"detect_traffic_light[{size[0]}x{size[1]}]", lambda hsv=hsv: findee.detect_traffic_light(hsv))
+
+    return suite
+
+def main(argv=None) -> int:
+    args = argument_parser('로봇 클라이언트 핫패스 벤치마크').parse_args(argv)
+    suite = build_suite()
+    suite.run(args.filter, min_time=args.min_time)
+    return finish(suite, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
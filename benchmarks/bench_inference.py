@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+# 추론 서비스 벤치마크: 모델을 사용자 루프 안에서 실행 (inline) vs Findee.start_inference (작업 스레드)
+# 루프: 프레임 → 거리 → 추론 결과 사용 → 모터, --duration초 동안 측정
+# - 루프 주기 (Hz), 루프 1회 시간
+# - 추론 fps, 캡처 → 결과 지연, 건너뛴 프레임, 결과를 읽을 때의 나이 (장면이 얼마나 오래되었는지)
+# 기본 모델은 cv2 연산으로 만든 합성 모델 (--model-ms만큼 CPU 사용, GIL 해제)
+# 실제 모델: --model detect.tflite 또는 --model model.onnx --input-size 300
+# 실행: python -m benchmarks.bench_inference --duration 5 --json inference.json
+
+import sys
+import time
+
+from benchmarks.harness import BenchmarkSuite, use_sim_backend, argument_parser, finish, summarize
+
+use_sim_backend(fps=30)
+
+import cv2
+import numpy as np
+import findee
+import inference
+import control_loop
+from findee import Findee
+
+def synthetic_model(target_ms: float):
+    """target_ms 정도 걸리는 합성 모델 (필터 반복, 결과는 밝기 평균)"""
+    kernel = np.ones((9, 9), np.float32) / 81
+    probe = np.zeros((240, 320, 3), np.uint8)
+    start, repeats = time.perf_counter(), 0
+    while time.perf_counter() - start < 0.2:
+        cv2.filter2D(probe, -1, kernel)
+        repeats += 1
+    per_call_ms = (time.perf_counter() - start) * 1000 / repeats
+    count = max(1, round(target_ms / per_call_ms))
+
+    def model(image):
+        for _ in range(count):
+            image = cv2.filter2D(image, -1, kernel)
+        return float(image.mean())
+    model.__name__ = f'synthetic_{target_ms:g}ms'
+    return model
+
+def run_loop(robot: Findee, duration: float, step) -> tuple[list[float], list[float]]:
+    """(루프 1회 시간, 루프 시작 간격) 초"""
+    durations, starts = [], []
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        t0 = time.perf_counter()
+        starts.append(t0)
+        frame = robot.get_frame_info()
+        distance = robot.get_distance()
+        value = step(frame)
+        speed = 0.0 if 0 < distance < 15 else 40.0 + (value or 0.0) % 20
+        robot.control_motors(speed, speed)
+        durations.append(time.perf_counter() - t0)
+    return durations, [b - a for a, b in zip(starts, starts[1:])]
+
+def main(argv=None) -> int:
+    parser = argument_parser('추론 서비스 벤치마크 (inline vs 작업 스레드)')
+    parser.add_argument('--duration', type=float, default=5.0, help='모드별 측정 시간 (초)')
+    parser.add_argument('--model', help='모델 파일 (.tflite, .onnx 등), 없으면 합성 모델')
+    parser.add_argument('--model-ms', type=float, default=40.0, help='합성 모델 실행 시간 (ms)')
+    parser.add_argument('--input-size', type=int, help='cv2.dnn 모델 입력 크기 (정사각형)')
+    parser.add_argument('--threads', type=int, help='모델 실행 스레드 수')
+    args = parser.parse_args(argv)
+
+    findee.USE_DEBUG = False
+    robot = Findee()
+    robot.wait_ready()
+    options = {'input_size': (args.input_size, args.input_size)} if args.input_size else {}
+    model = inference.load_model(args.model or synthetic_model(args.model_ms), threads=args.threads, **options)
+    size = inference.DEFAULT_SIZE
+    suite = BenchmarkSuite('inference')
+    extra = {'model': getattr(model, 'name', str(args.model))}
+
+    # 1) inline: 루프에서 직접 추론
+    def inline(frame):
+        image = cv2.resize(frame.image, size, interpolation=cv2.INTER_AREA)
+        return model.run(image)
+    durations, intervals = run_loop(robot, args.duration, inline)
+    suite.results['loop[inline]'] = summarize(durations)
+    extra['inline_hz'] = round(len(intervals) / sum(intervals), 2) if intervals else None
+
+    # 2) 작업 스레드: 루프는 마지막 결과만 읽음
+    service = robot.start_inference(model, size=size)
+    ages = []
+
+    def latest(frame):
+        result = robot.get_inference()
+        if result is None:
+            return None
+        ages.append(result.age_ms(findee._now_ns()))
+        return result.value if isinstance(result.value, float) else None
+    service.wait_newer(0, timeout=5.0)
+    durations, intervals = run_loop(robot, args.duration, latest)
+    stats = service.stats()
+    robot.stop_inference()
+    suite.results['loop[service]'] = summarize(durations)
+    extra['service_hz'] = round(len(intervals) / sum(intervals), 2) if intervals else None
+    extra['service'] = stats
+    extra['result_age_ms'] = control_loop.summarize(ages)
+
+    for name, result in suite.results.items():
+        print(f"{name:<40} {result['median_us'] / 1000:>8.2f} ms  (p95 {result['p95_us'] / 1000:.2f})")
+    print(f"루프 주기: inline {extra['inline_hz']}Hz, service {extra['service_hz']}Hz")
+    times = stats['times_ms']
+    print(f"추론: {stats['fps']}fps, 추론 {times['inference']['p50']}ms, 캡처→결과 {times['latency']['p50']}ms (p95 {times['latency']['p95']}), "
+          f"공유 {stats['offered']} / 건너뜀 {stats['skipped']} / 직접 캡처 {stats['captured']}")
+    if ages:
+        print(f"결과 나이: p50 {extra['result_age_ms']['p50']}ms, p95 {extra['result_age_ms']['p95']}ms")
+    robot.cleanup()
+    return finish(suite, args, extra)
+
+if __name__ == "__main__":
+    sys.exit(main())
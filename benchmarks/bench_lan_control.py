@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+# LAN 조종 벤치마크: 클라우드 경로 (로컬 시그널링 서버 중계, --cloud-delay로 인터넷 구간 지연 추가) vs LAN 직접 경로
+# 로봇 클라이언트는 별도 프로세스 (시뮬레이션 백엔드, lan.enabled/lan.control을 켠 임시 설정 파일)
+# 경로마다
+# - latency_probe → latency_echo 왕복 시간
+# - execute_code → 첫 robot_stdout 시간 (코드 실행 시작까지 포함)
+# 실제 클라우드 서버 왕복은 --cloud-delay에 인터넷 RTT의 절반을 넣어 근사 (기본 0: 중계 한 단계의 비용만)
+# 실행: python -m benchmarks.bench_lan_control --probes 50 --cloud-delay 20 --json lan_control.json
+
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import asyncio
+import tempfile
+import subprocess
+import urllib.request
+
+import socketio
+
+from benchmarks.harness import BenchmarkSuite, summarize, argument_parser, finish
+from benchmarks.bench_webrtc_loopback import FakeSignalingServer, start_robot
+
+class DelayedSignalingServer(FakeSignalingServer):
+    """중계할 때마다 delay초 지연 (인터넷 구간 근사)"""
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+
+    async def _on_event(self, event, sid, data=None):
+        if self.delay and event != 'robot_connected':
+            await asyncio.sleep(self.delay)
+        await super()._on_event(event, sid, data)
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+class PathClient:
+    """한 경로(클라우드/LAN)로 연결한 학생 브라우저 역할"""
+    def __init__(self, name: str, url: str, token: str | None = None):
+        self.name = name
+        self.url = url
+        self.token = token
+        self.session_id = f"bench-{name}-{uuid.uuid4().hex[:6]}" if token is None else None   # LAN: 연결마다 lan-<sid>
+        self.sio = socketio.AsyncClient()
+        self._waiting: dict = {}
+        self.sio.on('latency_echo', self._on_echo)
+        self.sio.on('robot_stdout', self._on_stdout)
+
+    async def _on_echo(self, data):
+        future = self._waiting.pop(('echo', data.get('seq')), None)
+        if future is not None and not future.done():
+            future.set_result(time.perf_counter())
+
+    async def _on_stdout(self, data):
+        future = self._waiting.pop(('stdout', data.get('output')), None)
+        if future is not None and not future.done():
+            future.set_result(time.perf_counter())
+
+    async def _round_trip(self, key, event: str, data: dict, timeout: float = 10.0) -> float:
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[key] = future
+        t0 = time.perf_counter()
+        if self.session_id is not None:
+            data = {'session_id': self.session_id, **data}
+        await self.sio.emit(event, data)
+        return await asyncio.wait_for(future, timeout) - t0
+
+    async def probe(self, seq: int) -> float:
+        return await self._round_trip(('echo', seq), 'latency_probe', {'seq': seq})
+
+    async def run_code(self, marker: str) -> float:
+        return await self._round_trip(('stdout', marker), 'execute_code', {'code': f"print({marker!r})"})
+
+async def measure(client: PathClient, probes: int, runs: int) -> dict:
+    await client.sio.connect(client.url, auth={'token': client.token} if client.token else None, wait_timeout=10)
+    probe_times, code_times = [], []
+    for seq in range(probes):
+        probe_times.append(await client.probe(seq))
+        await asyncio.sleep(0.02)
+    for run in range(runs):
+        code_times.append(await client.run_code(f"{client.name}-{run}"))
+        await asyncio.sleep(0.2)
+    await client.sio.disconnect()
+    return {'probe': probe_times, 'execute_code': code_times}
+
+def wait_http(url: str, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                return response.status == 200
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+async def run(args) -> tuple[dict, dict]:
+    port = free_port()
+    token = uuid.uuid4().hex
+    settings_path = os.path.join(tempfile.mkdtemp(prefix='findee-lan-'), 'settings.json')
+    with open(settings_path, 'w') as f:
+        json.dump({'schema': 1, 'lan': {'enabled': True, 'control': True, 'mdns': False, 'host': '127.0.0.1',
+                                        'port': port, 'token': token}}, f)
+    os.environ['FINDEE_SETTINGS'] = settings_path
+    server = DelayedSignalingServer(args.cloud_delay / 1000)
+    url = await server.start()
+    robot = start_robot(url)
+    samples = {}
+    try:
+        await asyncio.wait_for(server.robot_registered.wait(), timeout=60)
+        lan_url = f"http://127.0.0.1:{port}"
+        if not await asyncio.to_thread(wait_http, f"{lan_url}/stats?token={token}", 60):
+            raise RuntimeError('LAN 서버가 시작되지 않았습니다')
+        samples['cloud'] = await measure(PathClient('cloud', url), args.probes, args.runs)
+        samples['lan'] = await measure(PathClient('lan', lan_url, token), args.probes, args.runs)
+        with urllib.request.urlopen(f"{lan_url}/control/stats?token={token}", timeout=2) as response:
+            stats = json.loads(response.read())
+    finally:
+        robot.terminate()
+        try:
+            robot.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            robot.kill()
+        await server.stop()
+    return samples, stats
+
+def main(argv=None) -> int:
+    parser = argument_parser('LAN 조종 벤치마크 (클라우드 중계 vs LAN 직접)')
+    parser.add_argument('--probes', type=int, default=50, help='경로별 latency_probe 횟수')
+    parser.add_argument('--runs', type=int, default=5, help='경로별 execute_code 횟수')
+    parser.add_argument('--cloud-delay', type=float, default=0.0, help='클라우드 중계 한 번에 더할 지연 (ms, 인터넷 RTT의 절반)')
+    args = parser.parse_args(argv)
+
+    samples, stats = asyncio.run(run(args))
+    suite = BenchmarkSuite('lan_control')
+    for path, values in samples.items():
+        for name, times in values.items():
+            suite.results[f"{name}[{path}]"] = summarize(times)
+    for name, result in suite.results.items():
+        print(f"{name:<24} {result['median_us'] / 1000:>8.2f} ms  (p95 {result['p95_us'] / 1000:.2f}, n={result['runs']})")
+    return finish(suite, args, {'cloud_delay_ms': args.cloud_delay, 'lan_control': stats})
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+# LAN MJPEG 서버 벤치마크 (시뮬레이션 카메라, 임시 포트)
+# 빠른 클라이언트 --clients개 (그중 하나는 ?fps=5) + 느린 클라이언트 --slow개 (소켓 수신 버퍼를 작게 하고 천천히 읽음)
+# + 멈춘 클라이언트 --stalled개 (1초 뒤 읽기를 멈춤, 서버가 끊어야 함)
+# - 클라이언트별 수신 fps, 수신 프레임/바이트
+# - 인코딩 횟수 대비 전송 프레임 수 (공유 인코딩)
+# - 느린 클라이언트가 끊기는지, 그동안 빠른 클라이언트 fps가 유지되는지
+# - /snapshot.jpg 응답 시간
+# 실행: python -m benchmarks.bench_lan_stream --clients 3 --slow 1 --duration 8 --json lan.json
+
+import sys
+import time
+import socket
+import asyncio
+import secrets
+
+from benchmarks.harness import BenchmarkSuite, HIGHER, use_sim_backend, argument_parser, finish, summarize
+
+use_sim_backend(fps=30)
+TOKEN = secrets.token_urlsafe(16)   # 서버 토큰 (설정 저장소에 쓰지 않도록 직접 지정)
+
+import findee
+from findee import Findee
+
+async def read_stream(port: int, query: str, duration: float, slow: bool, stall: bool = False) -> dict:
+    """/stream.mjpg를 읽고 받은 JPEG 수를 셈 (slow면 2KB씩 0.05초 간격으로 읽음, stall이면 1초 뒤 읽기 중단)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if slow or stall:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.setblocking(False)
+    loop = asyncio.get_running_loop()
+    await loop.sock_connect(sock, ('127.0.0.1', port))
+    await loop.sock_sendall(sock, f"GET /stream.mjpg{query} HTTP/1.1\r\nHost: localhost\r\nAuthorization: Bearer {TOKEN}\r\n\r\n".encode())
+    frames, received, times = 0, 0, []
+    buffer = b''
+    end = time.monotonic() + duration
+    closed_after = None
+    started = time.monotonic()
+    try:
+        while time.monotonic() < end:
+            try:
+                chunk = await asyncio.wait_for(loop.sock_recv(sock, 2048 if slow else 65536), end - time.monotonic())
+            except asyncio.TimeoutError:
+                break
+            if not chunk:
+                closed_after = round(time.monotonic() - started, 2)
+                break
+            received += len(chunk)
+            buffer += chunk
+            count = buffer.count(b'--frame\r\n')
+            if count:
+                frames += count
+                times.extend([time.monotonic()] * count)
+                buffer = buffer[buffer.rfind(b'--frame\r\n') + 9:]
+            if slow:
+                await asyncio.sleep(0.05)
+            if stall and time.monotonic() - started > 1.0:
+                # 읽지 않고 기다리다가 서버가 끊었는지 확인
+                await asyncio.sleep(max(0.0, end - time.monotonic() - 1.0))
+
+                async def drain():
+                    while await loop.sock_recv(sock, 65536):
+                        pass
+                try:
+                    await asyncio.wait_for(drain(), 1.0)   # 버퍼에 남은 데이터 뒤에 EOF가 오면 서버가 끊은 것
+                    closed_after = 'by server'
+                except ConnectionError:
+                    closed_after = 'by server'
+                except asyncio.TimeoutError:
+                    pass
+                break
+    except ConnectionError:
+        closed_after = round(time.monotonic() - started, 2)
+    finally:
+        sock.close()
+    window = [t for t in times if t > started + 1.0]   # 처음 1초 제외
+    fps = round((len(window) - 1) / (window[-1] - window[0]), 2) if len(window) > 1 and window[-1] > window[0] else None
+    kind = 'stalled' if stall else 'slow' if slow else 'fast'
+    return {'query': query, 'kind': kind, 'frames': frames, 'bytes': received, 'fps': fps, 'closed_after_s': closed_after}
+
+async def snapshot(port: int) -> float:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    t0 = time.perf_counter()
+    writer.write(f"GET /snapshot.jpg HTTP/1.1\r\nHost: localhost\r\nAuthorization: Bearer {TOKEN}\r\n"
+                 "Connection: close\r\n\r\n".encode())
+    await writer.drain()
+    await reader.read()
+    writer.close()
+    return time.perf_counter() - t0
+
+async def run(port: int, clients: int, slow: int, stalled: int, duration: float) -> tuple[list[dict], list[float]]:
+    tasks = [read_stream(port, '?fps=5' if i == clients - 1 and clients > 1 else '', duration, False) for i in range(clients)]
+    tasks += [read_stream(port, '', duration, True) for _ in range(slow)]
+    tasks += [read_stream(port, '', duration, False, stall=True) for _ in range(stalled)]
+    snapshots = []
+
+    async def poll_snapshots():
+        await asyncio.sleep(1.0)
+        while len(snapshots) < 10:
+            snapshots.append(await snapshot(port))
+            await asyncio.sleep(0.3)
+    results = await asyncio.gather(*tasks, poll_snapshots())
+    return list(results[:-1]), snapshots
+
+def main(argv=None) -> int:
+    parser = argument_parser('LAN MJPEG 서버 벤치마크')
+    parser.add_argument('--clients', type=int, default=3, help='빠른 클라이언트 수 (마지막 하나는 ?fps=5)')
+    parser.add_argument('--slow', type=int, default=1, help='느린 클라이언트 수')
+    parser.add_argument('--stalled', type=int, default=1, help='멈춘 클라이언트 수')
+    parser.add_argument('--duration', type=float, default=8.0, help='측정 시간 (초)')
+    parser.add_argument('--fps', type=float, default=15.0, help='서버 최대 fps')
+    args = parser.parse_args(argv)
+
+    findee.USE_DEBUG = False
+    robot = Findee()
+    robot.wait_ready()
+    server = robot.start_lan_server(port=0, fps=args.fps, host='127.0.0.1', token=TOKEN)
+    clients, snapshots = asyncio.run(run(server.port, args.clients, args.slow, args.stalled, args.duration))
+    stats = server.stats()
+    robot.cleanup()
+
+    suite = BenchmarkSuite('lan_stream')
+    suite.results['snapshot'] = summarize(snapshots)
+    sent = sum(client['frames'] for client in clients)
+    fast = [client['fps'] for client in clients if client['kind'] == 'fast' and not client['query'] and client['fps']]
+    if fast:
+        # 느린/멈춘 클라이언트가 있어도 빠른 클라이언트가 받는 fps
+        suite.results['fast_client_fps'] = {'fps': round(sum(fast) / len(fast), 2), 'metric': 'fps', 'direction': HIGHER}
+    if stats['encodes']:
+        suite.results['frames_per_encode'] = {'frames_per_encode': round(sent / stats['encodes'], 2),
+                                              'metric': 'frames_per_encode', 'direction': HIGHER}
+    extra = {'clients': clients, 'server': {key: stats[key] for key in ('encodes', 'captured', 'offered', 'encode_ms')},
+             'closed_clients': stats['closed_clients'], 'frames_per_encode': round(sent / stats['encodes'], 2) if stats['encodes'] else None}
+    for client in clients:
+        kind = {'fast': '빠름', 'slow': '느림', 'stalled': '멈춤'}[client['kind']]
+        closed = f", 끊김 ({client['closed_after_s']})" if client['closed_after_s'] else ''
+        print(f"{kind} {client['query'] or '(기본)':<8} {client['fps']}fps  {client['frames']}프레임  {client['bytes'] / 1e6:.1f}MB{closed}")
+    print(f"인코딩 {stats['encodes']}회, 전송 {sent}프레임 (인코딩당 {extra['frames_per_encode']}), "
+          f"인코딩 {stats['encode_ms']['p50']}ms, 스냅샷 {suite.results['snapshot']['median_us'] / 1000:.1f}ms")
+    for closed in stats['closed_clients']:
+        print(f"끊긴 클라이언트 {closed['id']}: {closed['reason']}, 건너뜀 {closed['dropped']}")
+    return finish(suite, args, extra)
+
+if __name__ == "__main__":
+    sys.exit(main())
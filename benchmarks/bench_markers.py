@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+# 마커 추적 벤치마크: 매 프레임 전체 화면 검출 vs MarkerTracker (주기적 전체 검색 + 예측 ROI)
+# 합성 장면: 배경 잡음 위에서 ArUco 마커 여러 개가 움직이고 (화면 밖으로 나갔다 들어오기 포함)
+# 원근 변형으로 크기가 바뀜, 정답 코너/자세를 알고 있으므로
+# - 프레임당 처리 시간 (median, p95), 처리한 픽셀 비율
+# - 재현율 (정답 마커 중 찾은 비율), 코너 오차 (px)
+# - 자세 거리 오차 (합성 카메라 행렬 사용)
+# 실행: python -m benchmarks.bench_markers --frames 300 --markers 3 --json markers.json
+
+import sys
+import time
+
+from benchmarks.harness import BenchmarkSuite, argument_parser, finish, summarize
+
+import cv2
+import numpy as np
+import control_loop
+import marker_tracker
+
+WIDTH, HEIGHT = 640, 480
+FOCAL = 500.0
+MARKER_LENGTH = 0.05   # m
+
+def camera_matrix() -> np.ndarray:
+    return np.array([[FOCAL, 0, WIDTH / 2], [0, FOCAL, HEIGHT / 2], [0, 0, 1]], dtype=np.float64)
+
+class Scene:
+    """움직이는 마커 장면 (마커 중심은 3차원 위치, 카메라 행렬로 투영)"""
+
+    def __init__(self, dictionary: str, count: int, seed: int = 1):
+        aruco = cv2.aruco
+        dictionary = aruco.getPredefinedDictionary(getattr(aruco, dictionary))
+        self.rng = np.random.default_rng(seed)
+        self.ids = list(range(count))
+        # 흰 테두리 포함 (검출에 필요한 quiet zone)
+        self.images = [cv2.copyMakeBorder(aruco.generateImageMarker(dictionary, marker_id, 120), 30, 30, 30, 30,
+                                          cv2.BORDER_CONSTANT, value=255) for marker_id in self.ids]
+        self.background = self.rng.integers(60, 140, (HEIGHT, WIDTH), dtype=np.uint8)
+        self.background = cv2.GaussianBlur(self.background, (5, 5), 0)
+        self.phase = self.rng.uniform(0, 2 * np.pi, (count, 3))
+        self.speed = self.rng.uniform(0.01, 0.03, (count, 3))
+        self.matrix = camera_matrix()
+
+    def _pose(self, index: int, frame: int) -> np.ndarray:
+        phase, speed = self.phase[index], self.speed[index]
+        x = 0.20 * np.sin(phase[0] + speed[0] * frame)        # 좌우 (화면 밖까지)
+        y = 0.08 * np.sin(phase[1] + speed[1] * frame)
+        z = 0.45 + 0.20 * np.sin(phase[2] + speed[2] * frame)  # 거리 0.25 ~ 0.65 m
+        return np.array([x, y, z])
+
+    def render(self, frame: int) -> tuple[np.ndarray, dict]:
+        """(BGR 이미지, {id: (코너 (4, 2), 거리)}) - 화면 안에 완전히 들어온 마커만 정답"""
+        canvas = self.background.copy()
+        truth = {}
+        half = MARKER_LENGTH / 2
+        border = MARKER_LENGTH * 30 / 120   # 흰 테두리 (m)
+        for index, marker_id in enumerate(self.ids):
+            center = self._pose(index, frame)
+            tilt = 0.3 * np.sin(frame * 0.02 + index)
+            rotation = cv2.Rodrigues(np.array([0.0, tilt, 0.0]))[0]
+
+            def project(extent: float) -> np.ndarray:
+                local = np.array([[-extent, -extent, 0], [extent, -extent, 0], [extent, extent, 0], [-extent, extent, 0]])
+                points = (rotation @ local.T).T + center
+                projected = (self.matrix @ points.T).T
+                return (projected[:, :2] / projected[:, 2:]).astype(np.float32)
+            corners, outer = project(half), project(half + border)
+            size = self.images[index].shape[0]
+            source = np.array([[0, 0], [size, 0], [size, size], [0, size]], dtype=np.float32)
+            warp = cv2.getPerspectiveTransform(source, outer)
+            warped = cv2.warpPerspective(self.images[index], warp, (WIDTH, HEIGHT), flags=cv2.INTER_LINEAR,
+                                         borderValue=0)
+            mask = cv2.warpPerspective(np.full((size, size), 255, np.uint8), warp, (WIDTH, HEIGHT))
+            canvas[mask > 0] = warped[mask > 0]
+            if (corners >= 0).all() and (corners[:, 0] < WIDTH).all() and (corners[:, 1] < HEIGHT).all():
+                truth[marker_id] = (corners, float(np.linalg.norm(center)))
+        noise = self.rng.normal(0, 4, canvas.shape)
+        canvas = np.clip(canvas + noise, 0, 255).astype(np.uint8)
+        return cv2.cvtColor(canvas, cv2.COLOR_GRAY2BGR), truth
+
+def evaluate(markers, truth: dict, corner_errors: list, distance_errors: list) -> int:
+    found = 0
+    for marker in markers:
+        expected = truth.get(marker.id)
+        if expected is None:
+            continue
+        found += 1
+        corner_errors.append(float(np.abs(marker.corners - expected[0]).max()))
+        if marker.distance is not None:
+            distance_errors.append(abs(marker.distance - expected[1]) * 1000)
+    return found
+
+def run(tracker: marker_tracker.MarkerTracker, frames: list) -> dict:
+    durations, corner_errors, distance_errors = [], [], []
+    found = expected = 0
+    for image, truth in frames:
+        t0 = time.perf_counter()
+        markers = tracker.update(image)
+        durations.append(time.perf_counter() - t0)
+        found += evaluate(markers, truth, corner_errors, distance_errors)
+        expected += len(truth)
+    stats = tracker.stats()
+    return {
+        'timing': summarize(durations),
+        'recall': round(found / expected, 4) if expected else None,
+        'corner_error_px': control_loop.summarize(corner_errors),
+        'distance_error_mm': control_loop.summarize(distance_errors),
+        'tracker': stats
+    }
+
+def main(argv=None) -> int:
+    parser = argument_parser('마커 추적 벤치마크 (매 프레임 전체 검출 vs 예측 ROI)')
+    parser.add_argument('--frames', type=int, default=300, help='합성 프레임 수')
+    parser.add_argument('--markers', type=int, default=3, help='마커 수')
+    parser.add_argument('--dictionary', default=marker_tracker.DEFAULT_DICTIONARY, help='cv2.aruco 사전 이름')
+    parser.add_argument('--search-interval', type=int, default=marker_tracker.SEARCH_INTERVAL, help='전체 검색 주기')
+    args = parser.parse_args(argv)
+
+    cv2.setNumThreads(1)
+    scene = Scene(args.dictionary, args.markers)
+    frames = [scene.render(frame) for frame in range(args.frames)]
+    intrinsics = marker_tracker.CameraIntrinsics(camera_matrix(), np.zeros(5), (WIDTH, HEIGHT))
+    suite = BenchmarkSuite('markers')
+    extra = {}
+    modes = {'full': 1, 'tracker': args.search_interval}
+    for name, interval in modes.items():
+        tracker = marker_tracker.MarkerTracker(args.dictionary, marker_length=MARKER_LENGTH, intrinsics=intrinsics,
+                                               search_interval=interval)
+        result = run(tracker, frames)
+        suite.results[f'update[{name}]'] = result.pop('timing')
+        extra[name] = result
+
+    for name in modes:
+        timing, result = suite.results[f'update[{name}]'], extra[name]
+        print(f"{name:<8} {timing['median_us'] / 1000:>7.2f} ms (p95 {timing['p95_us'] / 1000:.2f})  "
+              f"재현율 {result['recall']}  코너 오차 p95 {result['corner_error_px']['p95']}px  "
+              f"거리 오차 p95 {result['distance_error_mm']['p95']}mm  "
+              f"픽셀 {result['tracker']['pixel_fraction']}  전체 검색 {result['tracker']['searches']}")
+    full, tracked = suite.results['update[full]'], suite.results['update[tracker]']
+    extra['speedup'] = round(full['median_us'] / tracked['median_us'], 2) if tracked['median_us'] else None
+    print(f"처리 시간 x{extra['speedup']}")
+    return finish(suite, args, extra)
+
+if __name__ == "__main__":
+    sys.exit(main())
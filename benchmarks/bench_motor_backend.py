@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+# 모터 백엔드 벤치마크 (rpi: RPi.GPIO 소프트웨어 PWM, lgpio: 하드웨어 PWM + 그룹 쓰기, sim)
+# 백엔드마다 별도 프로세스에서 측정 (카메라 없이 GPIO/PWM만 초기화)
+# - 명령 지연: control_motors (같은 방향 속도 변경 = 제어 루프의 일반적인 명령), 방향 핀 쓰기, duty 변경
+# - CPU: 두 PWM을 50%로 켜 둔 채 대기할 때 / 100Hz로 명령을 보낼 때 프로세스 CPU 사용률
+#   (소프트웨어 PWM은 1kHz 토글 스레드가 CPU를 씀)
+# 실행: python -m benchmarks.bench_motor_backend --backends rpi,lgpio --json motor.json
+#       (라즈베리파이가 아닌 환경에서는 sim만 측정 가능)
+
+import os
+import sys
+import json
+import time
+import threading
+import argparse
+import subprocess
+
+from benchmarks.harness import BenchmarkSuite, REPO_ROOT, argument_parser, finish
+
+DEFAULT_BACKENDS = 'rpi,lgpio,sim'
+
+class MotorRig:
+    """Findee의 모터 부분만 (카메라/초음파 스레드 없이 같은 control_motors 코드 측정)"""
+    def __init__(self, backend: str):
+        import findee_hw
+        from findee import Findee, LatencyTracker
+        self.IN1, self.IN2, self.ENA = 23, 24, 12
+        self.IN3, self.IN4, self.ENB = 22, 27, 13
+        self.latency = LatencyTracker()
+        self._motor_lock = threading.Lock()
+        self._motor_dirs = [0, 0]
+        self._motor_seq = 0
+        self.motor_kick = 'on_change'   # 같은 방향 명령 측정 (기본 'always'는 매 명령 20ms 펄스)
+        gpio = findee_hw.create_gpio(backend)
+        gpio.setup_outputs((self.IN1, self.IN2, self.ENA, self.IN3, self.IN4, self.ENB))
+        gpio.setup_group((self.IN1, self.IN2, self.IN3, self.IN4))
+        self.rightPWM = gpio.PWM(self.ENA, 1000)
+        self.rightPWM.start(0)
+        self.leftPWM = gpio.PWM(self.ENB, 1000)
+        self.leftPWM.start(0)
+        self.gpio = gpio
+        self.constrain = Findee.constrain
+        self._control_motors = Findee.control_motors
+
+    def control_motors(self, left: float, right: float):
+        return self._control_motors(self, left, right)
+
+    def close(self):
+        self.control_motors(0.0, 0.0)
+        self.gpio.cleanup()
+
+def cpu_percent(func, duration: float) -> float:
+    """duration 동안 func() 실행 (None이면 대기) 중 프로세스 CPU 사용률"""
+    cpu0, t0 = time.process_time(), time.monotonic()
+    if func is None:
+        time.sleep(duration)
+    else:
+        func(duration)
+    return round(100.0 * (time.process_time() - cpu0) / (time.monotonic() - t0), 2)
+
+def worker(backend: str, min_time: float, cpu_duration: float) -> dict:
+    rig = MotorRig(backend)
+    try:
+        suite = BenchmarkSuite(f'motor_backend[{backend}]')
+        rig.control_motors(60.0, 60.0)   # 출발 펄스(20ms)는 측정에서 제외
+        speeds = {'i': 0}
+
+        def steady():
+            speeds['i'] ^= 1
+            rig.control_motors(60.0 + speeds['i'] * 10, 60.0 + speeds['i'] * 10)
+
+        suite.add('control_motors[same direction]', steady)
+        pins = (rig.IN1, rig.IN2, rig.IN4, rig.IN3)
+        suite.add('gpio.output[4 direction pins]', lambda: rig.gpio.output(pins, (1, 0, 1, 0)))
+        duty = {'i': 0}
+
+        def change_duty():
+            duty['i'] ^= 1
+            rig.rightPWM.ChangeDutyCycle(40.0 + duty['i'] * 20)
+
+        suite.add('pwm.ChangeDutyCycle', change_duty)
+        suite.run(min_time=min_time, verbose=False)
+
+        # CPU: PWM 50% 유지 (대기) / 100Hz 명령
+        rig.control_motors(50.0, 50.0)
+        idle = cpu_percent(None, cpu_duration)
+
+        def command_loop(duration: float):
+            period, next_at, end = 0.01, time.monotonic(), time.monotonic() + duration
+            i = 0
+            while next_at < end:
+                i ^= 1
+                rig.control_motors(50.0 + i * 10, 50.0 + i * 10)
+                next_at += period
+                time.sleep(max(0.0, next_at - time.monotonic()))
+
+        loop = cpu_percent(command_loop, cpu_duration)
+        return {'backend': backend, 'pwm': type(rig.rightPWM).__name__, 'results': suite.results,
+                'cpu_idle_pwm_percent': idle, 'cpu_100hz_commands_percent': loop}
+    finally:
+        rig.close()
+
+def run_backend(backend: str, args) -> dict | None:
+    command = [sys.executable, '-m', 'benchmarks.bench_motor_backend', '--worker', backend,
+               '--min-time', str(args.min_time), '--cpu-duration', str(args.cpu_duration)]
+    env = dict(os.environ, FINDEE_BACKEND=backend)
+    proc = subprocess.run(command, cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+    if proc.returncode != 0 or not lines:
+        error = (proc.stderr.strip().splitlines() or ['?'])[-1]
+        print(f"{backend:<8} 측정 불가: {error}")
+        return None
+    return json.loads(lines[-1])
+
+def main(argv=None) -> int:
+    parser = argument_parser('모터 백엔드 벤치마크 (명령 지연, CPU)')
+    parser.add_argument('--backends', default=DEFAULT_BACKENDS, help=f'측정할 백엔드 (기본 {DEFAULT_BACKENDS})')
+    parser.add_argument('--cpu-duration', type=float, default=3.0, help='CPU 측정 시간 (초)')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)  # 내부용: 한 백엔드만 측정하고 JSON 출력
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.min_time, args.cpu_duration)))
+        return 0
+
+    suite = BenchmarkSuite('motor_backend')
+    backends = {}
+    for backend in args.backends.split(','):
+        report = run_backend(backend.strip(), args)
+        if report is None:
+            continue
+        backends[report['backend']] = {key: value for key, value in report.items() if key != 'results'}
+        print(f"{report['backend']:<8} PWM {report['pwm']:<14} CPU 대기 {report['cpu_idle_pwm_percent']:>5.1f}%  "
+              f"100Hz 명령 {report['cpu_100hz_commands_percent']:>5.1f}%")
+        for name, result in report['results'].items():
+            key = f"{name}[{report['backend']}]"
+            suite.results[key] = result
+            print(f"  {key:<58} {result['median_us']:>8.1f} us  (p95 {result['p95_us']:.1f})")
+    return finish(suite, args, {'backends': backends})
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+# 세션 기록 / 재생 벤치마크
+# 1) 기록: 시뮬레이션 백엔드에서 제어 루프(프레임 → 거리 → 신호등 인식 → 모터)를 --rate Hz로 돌리며
+#    기록 없이 / 기록하면서 API 호출 시간을 비교 (기록이 루프를 멈추지 않는지, 버린 레코드 수)
+# 2) 재생: 같은 루프 또는 --script의 사용자 코드를 기록으로 최대 속도 재생 (기록 대비 배속, 프레임 디코딩 시간,
+#    모터 출력이 기록과 같은지)
+# 실행: python -m benchmarks.bench_replay --seconds 5 --frames jpeg --json replay.json
+#       python -m benchmarks.bench_replay --recording ~/findee_recordings/20260101-120000 --script my_code.py
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import BenchmarkSuite, use_sim_backend, argument_parser, finish, summarize
+
+use_sim_backend()
+
+import cv2
+import findee
+import session_recorder
+from findee import Findee
+
+def drive_step(robot: Findee) -> float:
+    """제어 루프 한 번 (API 호출 시간 반환): 프레임 → 거리 → 신호등 → 모터"""
+    t0 = time.perf_counter()
+    frame = robot.get_frame_info()
+    distance = robot.get_distance()
+    api = time.perf_counter() - t0
+    hsv = cv2.cvtColor(frame.image, cv2.COLOR_BGR2HSV)
+    light = robot.detect_traffic_light(hsv)
+    speed = 0.0 if light == 'red' or 0 < distance < 15 else 60.0
+    turn = (float(hsv[:, :, 2].mean()) - 128.0) / 8.0
+    t0 = time.perf_counter()
+    robot.control_motors(speed + turn, speed - turn)
+    return api + time.perf_counter() - t0
+
+def run_loop(robot: Findee, seconds: float, rate: float) -> list[float]:
+    samples, period = [], 1.0 / rate
+    next_at = end = time.monotonic()
+    end += seconds
+    while next_at < end:
+        samples.append(drive_step(robot))
+        next_at += period
+        time.sleep(max(0.0, next_at - time.monotonic()))
+    return samples
+
+def replay_script(robot: Findee, path: str, script: str | None) -> tuple[dict, list[float]]:
+    """기록을 최대 속도로 재생하며 루프/스크립트 실행"""
+    samples = []
+    with robot.replay(path) as player:
+        try:
+            if script:
+                namespace = {'Findee': Findee, 'emit_image': lambda *a, **k: None, 'emit_text': lambda *a, **k: None,
+                             'get_pid': lambda widget_id: (None, None, None), 'get_slider': lambda widget_id: [],
+                             'get_command': player.command}
+                exec(compile(Path(script).read_text(), script, 'exec'), namespace)
+            else:
+                while True:
+                    t0 = time.perf_counter()
+                    drive_step(robot)
+                    samples.append(time.perf_counter() - t0)
+        except session_recorder.ReplayFinished:
+            pass
+        return player.stats(), samples
+
+def main(argv=None) -> int:
+    parser = argument_parser('세션 기록/재생 벤치마크')
+    parser.add_argument('--recording', help='재생할 기록 디렉터리 (없으면 시뮬레이션으로 새로 기록)')
+    parser.add_argument('--script', help='재생할 사용자 코드 (없으면 내장 제어 루프)')
+    parser.add_argument('--seconds', type=float, default=5.0, help='기록 시간 (초)')
+    parser.add_argument('--rate', type=float, default=30.0, help='기록 중 제어 루프 주기 (Hz)')
+    parser.add_argument('--frames', default='jpeg', choices=('jpeg', 'raw', 'none'), help='프레임 기록 형식')
+    args = parser.parse_args(argv)
+
+    findee.USE_DEBUG = False
+    robot = Findee()
+    robot.wait_ready()
+    suite = BenchmarkSuite('replay')
+    extra = {}
+    path = args.recording
+    if path is None:
+        path = str(Path(tempfile.mkdtemp(prefix='findee-rec-')) / 'session')
+        baseline = run_loop(robot, args.seconds, args.rate)
+        suite.results['loop_api[no recording]'] = summarize(baseline)
+        robot.start_recording(path, frames=args.frames)
+        recorded = run_loop(robot, args.seconds, args.rate)
+        stats = robot.stop_recording()
+        suite.results[f'loop_api[recording {args.frames}]'] = summarize(recorded)
+        extra['recording'] = stats
+        print(f"기록: {stats['path']}  {stats['counts']}  버림 {stats['dropped']}  "
+              f"{stats['bytes'] / 1e6:.1f}MB  최대 버퍼 {stats['max_pending_bytes'] / 1e6:.1f}MB  쓰기 p95 {stats['write_ms_p95']}ms")
+
+    replay, samples = replay_script(robot, path, args.script)
+    extra['replay'] = replay
+    if samples:
+        suite.results['replay_step[max speed]'] = summarize(samples)
+    for name, result in suite.results.items():
+        print(f"{name:<60} {result['median_us']:>10.1f} us  (p95 {result['p95_us']:.1f}, n={result['runs']})")
+    print(f"재생: 기록 {replay['recorded_s']}s → {replay['wall_s']}s (x{replay['speedup']}), "
+          f"디코딩 {replay['decode_ms_per_frame']}ms/프레임, 모터 {replay['motors']}")
+    robot.cleanup()
+    return finish(suite, args, extra)
+
+if __name__ == "__main__":
+    sys.exit(main())
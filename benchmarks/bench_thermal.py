@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+# 온도 조절 벤치마크: 긴 스트리밍 세션을 열 모델로 시뮬레이션 (시뮬레이션 시각, 실제로 기다리지 않음)
+# 열 모델: 1차 RC (T' = (주변 온도 + 발열(fps, 품질) - T) / TAU), 판독값은 0.5°C 단위 + 잡음
+# 펌웨어 모델: THROTTLE_AT°C 이상이면 클럭 제한 (처리 가능 fps가 THROTTLE_CAPACITY배, 매 초 흔들림), 플래그 0x4/0x8
+# 비교: 조절 없음 (30fps, 품질 80, 텔레메트리 1초) vs ThermalGovernor (같은 시작값, 측정 주기 2초)
+# - 스로틀 시간, 최고 온도, 전달 fps (평균, p5, 초당 변동), 텔레메트리 메시지 수, 단계 변경 수
+# - update() 한 번의 비용 (이 기기의 실제 sysfs 판독)
+# 실행: python -m benchmarks.bench_thermal --minutes 30 --json thermal.json
+
+import sys
+import time
+
+from benchmarks.harness import BenchmarkSuite, argument_parser, finish, summarize
+
+import numpy as np
+import control_loop
+import thermal_governor
+
+AMBIENT = 25.0
+TAU = 180.0                # 열 시정수 (초, 방열판 없는 Pi Zero 2 수준)
+THROTTLE_AT = 80.0
+THROTTLE_CAPACITY = 0.6    # 스로틀 중 처리 가능한 fps 비율
+START_FPS, START_QUALITY = 30, 80
+
+def heat(fps: float, quality: int) -> float:
+    """정상 상태 온도 상승분 (°C): 기본 부하 + 인코딩 (fps와 품질에 비례)"""
+    return 35.0 + 0.9 * fps * (0.6 + quality / 200)
+
+class ThermalModel:
+    def __init__(self, seed: int):
+        self.rng = np.random.default_rng(seed)
+        self.temp = 45.0
+        self.target_fps, self.quality = START_FPS, START_QUALITY
+        self.delivered = float(START_FPS)
+
+    @property
+    def throttled(self) -> bool:
+        return self.temp >= THROTTLE_AT
+
+    def step(self, dt: float):
+        capacity = self.target_fps * (THROTTLE_CAPACITY * self.rng.uniform(0.8, 1.1) if self.throttled else 1.0)
+        self.delivered = min(self.target_fps, capacity)
+        self.temp += (AMBIENT + heat(self.delivered, self.quality) - self.temp) / TAU * dt
+
+    def read(self) -> dict:
+        """ThermalReader와 같은 형식"""
+        reading = round((self.temp + self.rng.normal(0, 0.3)) / 0.5) * 0.5
+        flags = (thermal_governor.THROTTLED | thermal_governor.SOFT_TEMP_LIMIT) if self.throttled else 0
+        return {'temp': reading, 'throttled': flags, 'freq_ratio': THROTTLE_CAPACITY if self.throttled else 1.0}
+
+class ModelCpu:
+    def __init__(self, model: ThermalModel):
+        self.model = model
+
+    def sample(self) -> float:
+        return 100.0 if self.model.throttled else 40.0 + 1.5 * self.model.delivered
+
+def simulate(seconds: int, governed: bool, seed: int = 1) -> dict:
+    model = ThermalModel(seed)
+    now = [0.0]
+    telemetry_interval = [1.0]
+    governor = None
+    if governed:
+        governor = thermal_governor.ThermalGovernor(reader=model, cpu=ModelCpu(model), clock=lambda: now[0])
+
+        def apply(policy):
+            model.target_fps = min(START_FPS, policy['camera_fps'] or START_FPS)
+            model.quality = min(START_QUALITY, policy['quality'] or START_QUALITY)
+            telemetry_interval[0] = policy['telemetry_interval']
+        governor.add_listener(apply)
+
+    temps, delivered = [], []
+    throttled = telemetry = 0
+    next_update = next_telemetry = 0.0
+    for second in range(seconds):
+        now[0] = float(second)
+        if governor is not None and now[0] >= next_update:
+            governor.update()
+            next_update += governor.interval
+        if now[0] >= next_telemetry:
+            telemetry += 1
+            next_telemetry += telemetry_interval[0]
+        model.step(1.0)
+        temps.append(model.temp)
+        delivered.append(model.delivered)
+        throttled += model.throttled
+
+    changes = np.abs(np.diff(delivered))
+    result = {
+        'throttled_s': throttled,
+        'max_temp': round(max(temps), 1),
+        'final_temp': round(temps[-1], 1),
+        'fps_mean': round(float(np.mean(delivered)), 1),
+        'fps_p5': round(float(np.percentile(delivered, 5)), 1),
+        'fps_jitter': round(float(np.mean(changes)), 2),   # 초당 전달 fps 변화량 평균 (예측 불가능성)
+        'telemetry_messages': telemetry
+    }
+    if governor is not None:
+        stats = governor.stats()
+        result['policy_changes'] = len(governor.decisions)
+        result['time_in_s'] = stats['time_in_s']
+        result['decisions'] = stats['decisions'][:6]
+    return result
+
+def main(argv=None) -> int:
+    parser = argument_parser('온도 조절 벤치마크 (열 모델 시뮬레이션)')
+    parser.add_argument('--minutes', type=float, default=30.0, help='시뮬레이션 세션 길이 (분)')
+    parser.add_argument('--updates', type=int, default=200, help='update() 비용 측정 횟수 (실제 판독)')
+    args = parser.parse_args(argv)
+
+    seconds = int(args.minutes * 60)
+    extra = {'baseline': simulate(seconds, governed=False), 'governor': simulate(seconds, governed=True)}
+    for name in ('baseline', 'governor'):
+        result = extra[name]
+        print(f"{name:<9} 스로틀 {result['throttled_s']:>5}s  최고 {result['max_temp']}°C  fps 평균 {result['fps_mean']} "
+              f"p5 {result['fps_p5']} 변동 {result['fps_jitter']}  텔레메트리 {result['telemetry_messages']}")
+    print(f"단계 시간: {extra['governor']['time_in_s']}")
+
+    # 실제 판독 비용 (이 기기에 없는 값은 None)
+    governor = thermal_governor.ThermalGovernor()
+    durations = []
+    for _ in range(args.updates):
+        t0 = time.perf_counter()
+        governor.update()
+        durations.append(time.perf_counter() - t0)
+    suite = BenchmarkSuite('thermal')
+    suite.results['update'] = summarize(durations)
+    extra['reading'] = governor.reading
+    extra['cpu_percent'] = control_loop.summarize([governor.cpu_percent]) if governor.cpu_percent is not None else None
+    print(f"update() {suite.results['update']['median_us']:.0f} us (p95 {suite.results['update']['p95_us']:.0f}), 판독 {governor.reading}")
+    return finish(suite, args, extra)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+# WebRTC 루프백 부하 벤치마크
+# - 로컬 python-socketio 시그널링 서버 (운영 서버 대체)
+# - 로봇 클라이언트는 별도 프로세스 (시뮬레이션 백엔드)
+# - aiortc "브라우저" 피어 1..N개가 offer → answer → 데이터 채널 연결 후
+#   2바이트 명령을 보내고 이미지/텍스트를 수신
+# 측정: 연결 설정 시간, 세션별 이미지 FPS, 명령 왕복 지연(명령 → get_command → emit_text 에코), 로봇 CPU,
+#       로봇 기동 단계 시각 (system_info의 startup: 등록, 첫 프레임 등)
+# --fanout: 한 세션의 이미지를 나머지 세션이 구독 (시청자 수에 따른 로봇 CPU 확인)
+# --channels single,split: 단일 reliable 채널 (이전 브라우저) vs 트래픽 종류별 채널 (cmd/img unordered maxRetransmits=0, cfg reliable)
+# --loss 0.02: 측정 중 브라우저 쪽에서 SCTP 패킷을 양방향으로 무작위 손실 (이미지 부하 중 명령 지연 비교)
+# 실행: python -m benchmarks.bench_webrtc_loopback --sessions 1,2,4 --duration 10 --json loopback.json
+#       python -m benchmarks.bench_webrtc_loopback --sessions 1 --channels single,split --loss 0.02
+
+import os
+import sys
+import time
+import json
+import uuid
+import random
+import struct
+import asyncio
+import subprocess
+
+import psutil
+import socketio
+from aiohttp import web
+from aiortc import RTCPeerConnection, RTCSessionDescription
+
+import webrtc_compat
+from session import CHANNEL_CLASSES
+
+from benchmarks.harness import BenchmarkSuite, REPO_ROOT, HIGHER, summarize, argument_parser, finish
+
+webrtc_compat.apply()  # 브라우저 피어도 같은 SCTP 보정 (실제 브라우저의 SCTP 구현처럼 동작)
+
+# 로봇에서 실행할 사용자 코드: 명령이 바뀌면 받은 시각(perf_counter, 같은 기기라 브라우저와 비교 가능)과 함께 에코,
+# 매 루프마다 카메라 프레임 전송
+ROBOT_CODE = '''
+import time
+findee = Findee()
+last = None
+while True:
+    command = get_command()
+    if command != last:
+        emit_text(f"{command[0]},{command[1]},{time.perf_counter()}", 'cmd')
+        last = command
+    emit_image(findee.get_frame(), 'cam')
+'''
+
+# 로봇 → 브라우저로 전달할 이벤트 (data['session_id']로 라우팅)
+ROBOT_TO_BROWSER_EVENTS = {
+    'webrtc_answer', 'webrtc_ice_candidate', 'robot_stdout', 'robot_stderr',
+    'robot_finished', 'robot_emit_image', 'robot_emit_text', 'latency_echo'
+}
+
+#region 시그널링 서버
+class FakeSignalingServer:
+    """운영 서버 대신 로봇과 브라우저 피어 사이에서 이벤트를 중계하는 최소 서버"""
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.host, self.port = host, port
+        self.sio = socketio.AsyncServer(async_mode='aiohttp', max_http_buffer_size=16 * 1024 * 1024)
+        self.app = web.Application()
+        self.sio.attach(self.app)
+        self.runner: web.AppRunner | None = None
+        self.robot_sid: str | None = None
+        self.robot_registered = asyncio.Event()
+        self.browsers: dict[str, str] = {}  # session_id -> browser sid
+        self.sio.on('*', self._on_event)
+
+    async def _on_event(self, event, sid, data=None):
+        if event == 'robot_connected':
+            self.robot_sid = sid
+            await self.sio.emit('robot_registered', {'success': True, 'message': 'loopback'}, to=sid)
+            self.robot_registered.set()
+            return
+        session_id = data.get('session_id') if isinstance(data, dict) else None
+        if sid == self.robot_sid:
+            if event in ROBOT_TO_BROWSER_EVENTS or event.startswith('webrtc_'):
+                browser_sid = self.browsers.get(session_id)
+                if browser_sid:
+                    await self.sio.emit(event, data, to=browser_sid)
+        elif session_id and self.robot_sid:
+            self.browsers[session_id] = sid
+            await self.sio.emit(event, data, to=self.robot_sid)
+
+    async def start(self) -> str:
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return f"http://{self.host}:{self.port}"
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+#endregion
+
+#region 브라우저 피어
+class BrowserPeer:
+    def __init__(self, url: str, command_interval: float, channels: str = 'single'):
+        self.url = url
+        self.session_id = f"bench-{uuid.uuid4().hex[:8]}"
+        self.command_interval = command_interval
+        self.sio = socketio.AsyncClient()
+        self.pc = RTCPeerConnection()
+        if channels == 'split':
+            # 명령/이미지는 순서 없이 재전송 없음, 위젯 설정은 reliable
+            self.channels = {label: self.pc.createDataChannel(label, ordered=label == 'cfg',
+                                                              maxRetransmits=None if label == 'cfg' else 0)
+                             for label in CHANNEL_CLASSES}
+        else:
+            self.channels = {'data': self.pc.createDataChannel('data')}
+        self.channel = self.channels.get('cfg') or self.channels['data']
+        self.command_channel = self.channels.get('cmd') or self.channel
+        self._opening = [asyncio.Event() for _ in self.channels]
+        self.setup_s: float | None = None
+        self.recording = False
+        self.image_times: list[float] = []
+        self.image_bytes = 0
+        self.command_latencies: list[float] = []
+        self.command_uplink: list[float] = []   # 명령 → 로봇 get_command (에코 경로 제외)
+        self.system_info: dict | None = None   # 로봇이 보낸 최신 system_info (기동 시간 포함)
+        self._sent: dict[int, float] = {}
+        self._next_x = 1
+        self._seq = 0
+
+        self.sio.on('webrtc_answer', self._on_answer)
+        for channel, opened in zip(self.channels.values(), self._opening):
+            channel.on('open', opened.set)
+            channel.on('message', self._on_message)
+
+    def inject_loss(self, rate: float, seed: int = 1):
+        """측정 중(recording) SCTP 패킷을 rate 확률로 버림 (보내는 쪽: 명령, 받는 쪽: 이미지/에코/SACK)"""
+        rng = random.Random(seed)
+        transport = self.pc.sctp.transport
+        send, receiver = transport._send_data, transport._data_receiver
+        handle = receiver._handle_data
+
+        async def lossy_send(data):
+            if not (self.recording and rng.random() < rate):
+                await send(data)
+
+        async def lossy_handle(data):
+            if not (self.recording and rng.random() < rate):
+                await handle(data)
+        transport._send_data = lossy_send
+        receiver._handle_data = lossy_handle
+
+    async def _on_answer(self, data):
+        answer = data['answer']
+        await self.pc.setRemoteDescription(RTCSessionDescription(sdp=answer['sdp'], type=answer['type']))
+
+    def _on_message(self, message):
+        if isinstance(message, str):
+            try:
+                data = json.loads(message)
+            except ValueError:
+                return
+            if data.get('type') == 'system_info':
+                self.system_info = data
+            return
+        if len(message) < 2:
+            return
+        now = time.perf_counter()
+        packet_type, id_len = message[0], message[1]
+        if packet_type in (0x01, 0x03, 0x04):  # 전체 이미지, 마스크, 부분 타일 (delta 모드)
+            if self.recording:
+                self.image_times.append(now)
+                self.image_bytes += len(message)
+        elif packet_type == 0x02 and message[2:2 + id_len] == b'cmd':
+            fields = message[2 + id_len:].decode().split(',')
+            sent = self._sent.pop(int(fields[0]), None)
+            if sent is not None and self.recording:
+                self.command_latencies.append(now - sent)
+                if len(fields) > 2:
+                    self.command_uplink.append(float(fields[2]) - sent)
+
+    async def connect(self):
+        t0 = time.perf_counter()
+        await self.sio.connect(self.url)
+        offer = await self.pc.createOffer()
+        await self.pc.setLocalDescription(offer)
+        await self.sio.emit('webrtc_offer', {
+            'session_id': self.session_id,
+            'offer': {'type': self.pc.localDescription.type, 'sdp': self.pc.localDescription.sdp}
+        })
+        await asyncio.wait_for(asyncio.gather(*(opened.wait() for opened in self._opening)), timeout=30)
+        self.setup_s = time.perf_counter() - t0
+
+    async def subscribe(self, widget_id: str):
+        self.channel.send(json.dumps({'type': 'subscribe', 'widget_id': widget_id}))
+
+    async def run_code(self, code: str):
+        await self.sio.emit('execute_code', {'session_id': self.session_id, 'code': code})
+
+    async def send_commands(self, duration: float):
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            x = self._next_x
+            self._next_x = self._next_x % 127 + 1
+            self._sent[x] = time.perf_counter()
+            self._seq = (self._seq + 1) % 65536
+            self.command_channel.send(struct.pack('<bbH', x, 0, self._seq))
+            await asyncio.sleep(self.command_interval)
+
+    async def close(self):
+        try:
+            await self.sio.emit('stop_execution', {'session_id': self.session_id})
+        except Exception:
+            pass
+        await self.pc.close()
+        await self.sio.disconnect()
+
+    def image_fps(self, duration: float) -> float:
+        return len(self.image_times) / duration if duration > 0 else 0.0
+#endregion
+
+def start_robot(url: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.setdefault('FINDEE_BACKEND', 'sim')
+    return subprocess.Popen(
+        [sys.executable, '-c', 'import sys, robot_client; robot_client.main(sys.argv[1])', url],
+        cwd=str(REPO_ROOT), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+async def run_scenario(url: str, robot: psutil.Process, sessions: int, duration: float,
+                       warmup: float, command_interval: float, fanout: bool = False,
+                       channels: str = 'single', loss: float = 0.0) -> dict:
+    peers = [BrowserPeer(url, command_interval, channels) for _ in range(sessions)]
+    await asyncio.gather(*(peer.connect() for peer in peers))
+    if loss:
+        for index, peer in enumerate(peers):
+            peer.inject_loss(loss, seed=index + 1)
+    if fanout:
+        # 첫 세션만 코드를 실행하고 나머지는 같은 'cam' 위젯을 구독 (교사 1명 + 학생 시청)
+        for peer in peers[1:]:
+            await peer.subscribe('cam')
+        await peers[0].run_code(ROBOT_CODE)
+    else:
+        for peer in peers:
+            await peer.run_code(ROBOT_CODE)
+    await asyncio.sleep(warmup)
+
+    robot.cpu_percent(None)
+    for peer in peers:
+        peer.recording = True
+    t0 = time.perf_counter()
+    await asyncio.gather(*(peer.send_commands(duration) for peer in peers))
+    elapsed = time.perf_counter() - t0
+    cpu = robot.cpu_percent(None)
+    for peer in peers:
+        peer.recording = False
+
+    intervals = [b - a for peer in peers for a, b in zip(peer.image_times, peer.image_times[1:])]
+    latencies = [lat for peer in peers for lat in peer.command_latencies]
+    uplink = [lat for peer in peers for lat in peer.command_uplink]
+    fps = [peer.image_fps(elapsed) for peer in peers]
+    # 기본 (단일 채널, 손실 없음)은 이전 결과와 같은 키
+    tag = f"n={sessions}" + (f",{channels}" if channels != 'single' else '') + (f",loss={loss}" if loss else '')
+    result = {
+        f"webrtc_setup[{tag}]": summarize([peer.setup_s for peer in peers]),
+        f"robot_cpu[{tag}]": {'cpu_percent': round(cpu, 1), 'metric': 'cpu_percent'},
+        f"image_fps[{tag}]": {
+            'per_session_fps': [round(f, 1) for f in fps],
+            'total_fps': round(sum(fps), 1),
+            'mbit_per_s': round(sum(peer.image_bytes for peer in peers) * 8 / elapsed / 1e6, 2),
+            'metric': 'total_fps', 'direction': HIGHER
+        }
+    }
+    # 로봇이 보낸/혼잡으로 건너뛴 이미지 (세션별 마지막 system_info)
+    media = [((peer.system_info or {}).get('session') or {}).get('media') or {} for peer in peers]
+    sent, dropped = sum(m.get('sent', 0) for m in media), sum(m.get('dropped', 0) for m in media)
+    if sent + dropped:
+        result[f"image_delivery[{tag}]"] = {'sent': sent, 'dropped': dropped,
+                                           'delivered_ratio': round(sent / (sent + dropped), 3),
+                                           'metric': 'delivered_ratio', 'direction': HIGHER}
+    if intervals:
+        result[f"image_frame_interval[{tag}]"] = summarize(intervals)
+    if latencies:
+        result[f"command_latency[{tag}]"] = summarize(latencies)
+    if uplink:
+        result[f"command_uplink[{tag}]"] = summarize(uplink)
+    info = next((peer.system_info for peer in peers if peer.system_info), None)
+    stream = ((info or {}).get('session') or {}).get('media') or {}
+    if stream.get('stream'):
+        result[f"stream_settings[{tag}]"] = stream['stream']  # 자동 조정 결과 (품질/배율/fps)
+    if info and channels == 'split':
+        session_info = info.get('session') or {}
+        result[f"channels[{tag}]"] = {'channels': session_info.get('channels'),
+                                     'stale_commands': session_info.get('stale_commands')}
+    if info and info.get('startup'):
+        # 로봇 프로세스 시작 기준: 서버 등록, 모듈 로드, 하드웨어 준비, 첫 프레임 시각
+        result['robot_startup'] = info['startup']
+
+    await asyncio.gather(*(peer.close() for peer in peers), return_exceptions=True)
+    await asyncio.sleep(1.0)  # 로봇 쪽 세션 정리 대기
+    return result
+
+async def run(args) -> dict:
+    server = FakeSignalingServer()
+    url = await server.start()
+    robot_process = start_robot(url)
+    results = {}
+    try:
+        t0 = time.perf_counter()
+        await asyncio.wait_for(server.robot_registered.wait(), timeout=60)
+        results['robot_registration'] = {'seconds': round(time.perf_counter() - t0, 3)}
+        robot = psutil.Process(robot_process.pid)
+        for sessions, channels in [(n, mode) for n in args.sessions for mode in args.channels]:
+            scenario = await run_scenario(url, robot, sessions, args.duration, args.warmup,
+                                          args.command_interval, args.fanout, channels, args.loss)
+            if 'robot_startup' not in results and 'robot_startup' in scenario:
+                results['robot_startup'] = scenario.pop('robot_startup')
+                print(json.dumps(results['robot_startup'], indent=2))
+            scenario.pop('robot_startup', None)
+            results.update(scenario)
+            print(json.dumps(scenario, indent=2))
+    finally:
+        robot_process.terminate()
+        try:
+            robot_process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            robot_process.kill()
+        await server.stop()
+    return results
+
+def main(argv=None) -> int:
+    parser = argument_parser('WebRTC 루프백 부하 벤치마크')
+    parser.add_argument('--sessions', type=lambda v: [int(n) for n in v.split(',')], default=[1, 2, 4],
+                        help='동시 세션 수 목록 (예: 1,2,4)')
+    parser.add_argument('--duration', type=float, default=10.0, help='시나리오별 측정 시간 (초)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='코드 실행 후 측정 전 대기 (초)')
+    parser.add_argument('--command-interval', type=float, default=0.05, help='명령 전송 간격 (초)')
+    parser.add_argument('--fanout', action='store_true', help='첫 세션만 코드 실행, 나머지는 같은 위젯 구독 (다중 시청)')
+    parser.add_argument('--channels', type=lambda v: v.split(','), default=['single'],
+                        help='데이터 채널 구성 목록: single (채널 하나), split (cmd/img/cfg)')
+    parser.add_argument('--loss', type=float, default=0.0, help='측정 중 SCTP 패킷 손실률 (0..1, 브라우저 쪽에서 양방향)')
+    args = parser.parse_args(argv)
+
+    suite = BenchmarkSuite('webrtc_loopback')
+    suite.results = asyncio.run(run(args))
+    return finish(suite, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
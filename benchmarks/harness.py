@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+# 벤치마크 공통 하네스
+# - 시뮬레이션 백엔드(FINDEE_BACKEND=sim)로 라즈베리파이 없이 측정
+# - 결과는 JSON으로 저장, --baseline으로 이전 결과와 비교 (회귀 시 종료 코드 1)
+#   기본은 시간(median_us, 낮을수록 좋음). 다른 지표는 결과에 'metric'(키 이름)과 'direction'을 넣음
+#   예: {'total_fps': 28.1, 'metric': 'total_fps', 'direction': HIGHER}
+
+import os
+import sys
+import time
+import json
+import platform
+import argparse
+from pathlib import Path
+
+# 저장소 루트를 import 경로에 추가 (python benchmarks/xxx.py 직접 실행 지원)
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+LOWER = 'lower'     # 낮을수록 좋음 (시간, CPU)
+HIGHER = 'higher'   # 높을수록 좋음 (fps, 전달 비율)
+
+def use_sim_backend(fps: int = 1000):
+    """findee import 전에 호출: 시뮬레이션 백엔드 + 프레임 대기 없는 높은 FPS"""
+    os.environ.setdefault('FINDEE_BACKEND', 'sim')
+    os.environ.setdefault('FINDEE_SIM_FPS', str(fps))
+
+def run_sync(coro):
+    """await 지점이 없는 코루틴을 이벤트 루프 없이 실행"""
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+    raise RuntimeError("코루틴이 대기 상태가 되었습니다 (이벤트 루프 필요)")
+
+def summarize(samples_s: list[float]) -> dict:
+    data = sorted(samples_s)
+    n = len(data)
+    return {
+        'runs': n,
+        'mean_us': round(sum(data) / n * 1e6, 3),
+        'median_us': round(data[n // 2] * 1e6, 3),
+        'p95_us': round(data[min(n - 1, int(n * 0.95))] * 1e6, 3),
+        'min_us': round(data[0] * 1e6, 3),
+        'max_us': round(data[-1] * 1e6, 3),
+        'ops_per_s': round(n / sum(data), 1) if sum(data) > 0 else None
+    }
+
+class BenchmarkSuite:
+    def __init__(self, name: str):
+        self.name = name
+        self.cases: list[tuple[str, callable, callable, dict]] = []
+        self.results: dict[str, dict] = {}
+
+    def add(self, name: str, func, setup=None, **extra):
+        """func: 인자 없는 호출 1회 = 측정 1회, setup: 측정 직전 1회 호출"""
+        self.cases.append((name, func, setup, extra))
+
+    def case(self, name: str, setup=None, **extra):
+        def decorator(func):
+            self.add(name, func, setup, **extra)
+            return func
+        return decorator
+
+    @staticmethod
+    def measure(func, min_time: float = 0.5, min_runs: int = 5, max_runs: int = 100000, warmup: int = 3) -> list[float]:
+        for _ in range(warmup):
+            func()
+        samples = []
+        clock = time.perf_counter
+        deadline = clock() + min_time
+        while len(samples) < max_runs and (len(samples) < min_runs or clock() < deadline):
+            t0 = clock()
+            func()
+            samples.append(clock() - t0)
+        return samples
+
+    def run(self, pattern: str | None = None, min_time: float = 0.5, verbose: bool = True) -> dict:
+        for name, func, setup, extra in self.cases:
+            if pattern and pattern not in name:
+                continue
+            if setup is not None:
+                setup()
+            result = summarize(self.measure(func, min_time=min_time))
+            result.update(extra)
+            self.results[name] = result
+            if verbose:
+                print(f"{name:<60} {result['median_us']:>12.1f} us  (p95 {result['p95_us']:.1f}, n={result['runs']})")
+        return self.results
+
+def environment_info() -> dict:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'backend': os.environ.get('FINDEE_BACKEND'),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+def write_json(path: str, suite: str, results: dict, extra: dict | None = None):
+    report = {'suite': suite, 'environment': environment_info(), 'results': results}
+    if extra:
+        report.update(extra)
+    Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+def compare(baseline_path: str, results: dict, threshold: float = 0.15, metric: str = 'median_us') -> list[tuple[str, float, float]]:
+    """기준 결과 대비 threshold 이상 나빠진 항목 목록 반환 (이름, 기준, 현재)
+    결과에 'metric'이 있으면 그 키를, 'direction'이 HIGHER면 줄어든 것을 회귀로 판정
+    """
+    baseline = json.loads(Path(baseline_path).read_text()).get('results', {})
+    regressions = []
+    print(f"\n{'benchmark':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in results.items():
+        if not isinstance(result, dict):
+            continue
+        key = result.get('metric', metric)
+        base = baseline.get(name, {}).get(key)
+        current = result.get(key)
+        if not isinstance(base, (int, float)) or not isinstance(current, (int, float)) or not base:
+            continue
+        change = (current - base) / base
+        worse = -change if result.get('direction') == HIGHER else change
+        flag = '  REGRESSION' if worse > threshold else ''
+        digits = 1 if key == metric else 3
+        print(f"{name:<60} {base:>12.{digits}f} {current:>12.{digits}f} {change:>+7.1%}{flag}")
+        if worse > threshold:
+            regressions.append((name, base, current))
+    return regressions
+
+def argument_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--json', help='결과 JSON 저장 경로')
+    parser.add_argument('--baseline', help='비교할 기준 결과 JSON')
+    parser.add_argument('--threshold', type=float, default=0.15, help='회귀 판정 비율 (기본 0.15 = 15%%)')
+    parser.add_argument('--filter', help='이름에 이 문자열이 포함된 벤치마크만 실행')
+    parser.add_argument('--min-time', type=float, default=0.5, help='벤치마크별 최소 측정 시간 (초)')
+    return parser
+
+def finish(suite: BenchmarkSuite, args, extra: dict | None = None) -> int:
+    """JSON 저장 + 기준 비교, 회귀가 있으면 1 반환"""
+    if args.json:
+        write_json(args.json, suite.name, suite.results, extra)
+        print(f"\n결과 저장: {args.json}")
+    if args.baseline:
+        regressions = compare(args.baseline, suite.results, args.threshold)
+        if regressions:
+            print(f"\n회귀 {len(regressions)}건 (기준 대비 {args.threshold:.0%} 이상 나빠짐)")
+            return 1
+    return 0
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+# 색 덩어리(blob) 추적 (Findee.create_blob_tracker)
+# 기존 물체 따라가기 코드: 매 프레임 전체 화면 HSV 변환 → mask_image → findContours → moments
+# - 칼만 필터(등속 모델)로 다음 위치를 예측하고 예측 위치 주변 창(window)만 HSV 변환/마스크/윤곽 검출
+# - 창에서 못 찾았을 때만 같은 프레임을 전체 화면에서 다시 검색 (시야에서 사라졌다가 돌아온 경우)
+# - 측정값을 필터로 다듬어 잡음에 의한 떨림을 줄이고, 위치/속도(px/s)/크기를 반환
+# - 잠깐 가려지면 max_lost 프레임까지 예측 위치를 반환 (found=False)
+# HSV 범위는 mask_image와 같은 6개 값 [h_min, h_max, s_min, s_max, v_min, v_max] (get_slider 값 그대로 사용)
+# h_min > h_max면 색상환을 넘어가는 범위 (예: 빨간색 [170, 10, ...])
+
+import time
+from collections import deque
+
+import startup
+import control_loop
+
+cv2 = startup.LazyModule('cv2')
+np = startup.LazyModule('numpy')
+
+MIN_AREA = 100            # 이보다 작은 덩어리는 잡음으로 무시 (px, 원본 해상도)
+WINDOW_SCALE = 3.0        # 창 크기 = 덩어리 크기 x WINDOW_SCALE (+ 예측 불확실성)
+MIN_WINDOW = 48           # 창 한 변 최소값 (px)
+MAX_LOST = 5              # 이만큼 연속으로 못 찾으면 추적 해제 (예측 위치도 반환하지 않음)
+PROCESS_NOISE = 2000.0    # 가속도 잡음 (px/s^2), 클수록 빠른 방향 전환을 따라감
+MEASUREMENT_NOISE = 3.0   # 측정 잡음 (px), 클수록 부드럽지만 늦게 따라감
+
+def parse_bounds(values) -> list[tuple]:
+    """6개 값 → cv2.inRange용 (lower, upper) 목록 (색상환을 넘어가면 2개)"""
+    if values is None or len(values) != 6:
+        raise ValueError("HSV 범위 배열은 6개의 요소를 가져야 합니다.")
+    h_min, h_max, s_min, s_max, v_min, v_max = (int(v) for v in values)
+    if h_min <= h_max:
+        return [(np.array([h_min, s_min, v_min], np.uint8), np.array([h_max, s_max, v_max], np.uint8))]
+    return [(np.array([h_min, s_min, v_min], np.uint8), np.array([179, s_max, v_max], np.uint8)),
+            (np.array([0, s_min, v_min], np.uint8), np.array([h_max, s_max, v_max], np.uint8))]
+
+class Blob:
+    """추적 결과 하나"""
+    __slots__ = ('x', 'y', 'vx', 'vy', 'width', 'height', 'area', 'found', 'source', 'lost')
+
+    def __init__(self, x: float, y: float, vx: float, vy: float, width: float, height: float, area: float,
+                 found: bool, source: str, lost: int):
+        self.x, self.y = x, y           # 필터로 다듬은 중심 (px)
+        self.vx, self.vy = vx, vy       # 속도 (px/s)
+        self.width, self.height = width, height
+        self.area = area                # 윤곽 면적 (px)
+        self.found = found              # 이번 프레임에서 측정했는지 (False면 예측 위치)
+        self.source = source            # 'window', 'full', 'predicted'
+        self.lost = lost                # 연속으로 못 찾은 프레임 수
+
+    @property
+    def center(self) -> tuple[int, int]:
+        return int(round(self.x)), int(round(self.y))
+
+    def __repr__(self):
+        return (f"Blob(x={self.x:.0f}, y={self.y:.0f}, v=({self.vx:.0f}, {self.vy:.0f})px/s, "
+                f"size={self.width:.0f}x{self.height:.0f}, {self.source})")
+
+class _Kalman:
+    """등속 모델 칼만 필터 (상태 x, y, vx, vy / 측정 x, y)"""
+
+    def __init__(self, x: float, y: float, process_noise: float, measurement_noise: float):
+        self.state = np.array([x, y, 0.0, 0.0])
+        self.covariance = np.diag([measurement_noise ** 2] * 2 + [500.0 ** 2] * 2)
+        self.process_noise = process_noise
+        self.measurement = np.eye(2) * measurement_noise ** 2
+
+    def predict(self, dt: float):
+        transition = np.eye(4)
+        transition[0, 2] = transition[1, 3] = dt
+        # 가속도 백색 잡음
+        q = self.process_noise ** 2
+        dt2, dt3, dt4 = dt * dt, dt ** 3 / 2, dt ** 4 / 4
+        noise = np.array([[dt4, 0, dt3, 0], [0, dt4, 0, dt3], [dt3, 0, dt2, 0], [0, dt3, 0, dt2]]) * q
+        self.state = transition @ self.state
+        self.covariance = transition @ self.covariance @ transition.T + noise
+
+    def correct(self, x: float, y: float):
+        innovation = np.array([x, y]) - self.state[:2]
+        gain = self.covariance[:, :2] @ np.linalg.inv(self.covariance[:2, :2] + self.measurement)
+        self.state = self.state + gain @ innovation
+        self.covariance = self.covariance - gain @ self.covariance[:2, :]
+
+    @property
+    def uncertainty(self) -> float:
+        """위치 표준편차 (px, 두 축 중 큰 값)"""
+        return float(np.sqrt(max(self.covariance[0, 0], self.covariance[1, 1])))
+
+class BlobTracker:
+    def __init__(self, bounds, min_area: float = MIN_AREA, window_scale: float = WINDOW_SCALE,
+                 max_lost: int = MAX_LOST, process_noise: float = PROCESS_NOISE,
+                 measurement_noise: float = MEASUREMENT_NOISE, capture=None, window: int = 120):
+        """
+        Args:
+            bounds: HSV 범위 [h_min, h_max, s_min, s_max, v_min, v_max] (get_slider 값)
+            min_area: 덩어리 최소 면적 (px)
+            window_scale: 창 크기 (덩어리 크기 대비)
+            max_lost: 연속으로 못 찾아도 예측 위치를 반환할 프레임 수
+            process_noise, measurement_noise: 칼만 필터 잡음 (px/s^2, px)
+            capture: update()에 이미지를 주지 않을 때 호출 (Findee.get_frame_info)
+        """
+        self._bounds = parse_bounds(bounds)
+        self.min_area = min_area
+        self.window_scale = window_scale
+        self.max_lost = max_lost
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self._capture = capture
+
+        self._filter: _Kalman | None = None
+        self._size = (0.0, 0.0)
+        self._area = 0.0
+        self._lost = 0
+        self._last_ns: int | None = None
+
+        self.frames: int = 0
+        self.full_searches: int = 0
+        self.window_searches: int = 0
+        self.window_hits: int = 0
+        self._times = {name: deque(maxlen=window) for name in ('total', 'window', 'full')}
+        self._pixels: deque = deque(maxlen=window)   # 처리한 픽셀 / 전체 픽셀
+
+    def set_bounds(self, bounds):
+        """HSV 범위 변경 (슬라이더를 움직이는 동안 매 프레임 호출해도 됨, 추적은 유지)"""
+        if bounds is not None and len(bounds) == 6:
+            self._bounds = parse_bounds(bounds)
+
+    def reset(self):
+        self._filter = None
+        self._lost = 0
+
+    def update(self, image=None, hsv: bool = False, timestamp_ns: int | None = None) -> Blob | None:
+        """
+        프레임 하나 처리
+
+        Args:
+            image: BGR 이미지, FrameInfo, None이면 capture로 캡처
+            hsv: image가 이미 HSV면 True (변환 생략)
+            timestamp_ns: 캡처 시각 (None이면 FrameInfo의 시각 또는 현재 시각), 속도 계산에 사용
+
+        Returns:
+            Blob (못 찾았지만 예측 중이면 found=False), 추적 중인 덩어리가 없으면 None
+        """
+        if image is None:
+            image = self._capture()
+        if timestamp_ns is None:
+            timestamp_ns = getattr(image, 'timestamp_ns', None) or time.monotonic_ns()
+        image = getattr(image, 'image', image)
+        t0 = time.perf_counter()
+        height, width = image.shape[:2]
+        self.frames += 1
+        dt = (timestamp_ns - self._last_ns) / 1e9 if self._last_ns is not None else 0.0
+        self._last_ns = timestamp_ns
+        if self._filter is not None and dt > 0:
+            self._filter.predict(min(dt, 1.0))
+
+        found, source, pixels = None, 'predicted', 0.0
+        if self._filter is not None:
+            self.window_searches += 1
+            x0, y0, x1, y1 = self._window(width, height)
+            found = self._search(image[y0:y1, x0:x1], hsv, (x0, y0))
+            pixels = (x1 - x0) * (y1 - y0) / (width * height)
+            self._times['window'].append((time.perf_counter() - t0) * 1000)
+            if found is not None:
+                source = 'window'
+                self.window_hits += 1
+        if found is None:
+            t1 = time.perf_counter()
+            self.full_searches += 1
+            found = self._search(image, hsv, (0, 0))
+            pixels += 1.0
+            self._times['full'].append((time.perf_counter() - t1) * 1000)
+            if found is not None:
+                source = 'full'
+        self._pixels.append(pixels)
+        result = self._apply(found, source)
+        self._times['total'].append((time.perf_counter() - t0) * 1000)
+        return result
+
+    def _window(self, width: int, height: int) -> tuple[int, int, int, int]:
+        x, y = self._filter.state[:2]
+        # 덩어리 크기 + 예측 불확실성 (3 시그마)
+        half_w = max(MIN_WINDOW, self._size[0] * self.window_scale) / 2 + 3 * self._filter.uncertainty
+        half_h = max(MIN_WINDOW, self._size[1] * self.window_scale) / 2 + 3 * self._filter.uncertainty
+        return (max(0, int(x - half_w)), max(0, int(y - half_h)),
+                min(width, int(x + half_w) + 1), min(height, int(y + half_h) + 1))
+
+    def _search(self, region, hsv: bool, offset: tuple[int, int]):
+        """영역에서 가장 알맞은 덩어리 (cx, cy, w, h, area) 또는 None"""
+        if region.shape[0] < 2 or region.shape[1] < 2:
+            return None
+        if not hsv:
+            region = cv2.cvtColor(region, cv2.COLOR_BGR2HSV)
+        mask = None
+        for lower, upper in self._bounds:
+            part = cv2.inRange(region, lower, upper)
+            mask = part if mask is None else cv2.bitwise_or(mask, part)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        best, best_score = None, None
+        for contour in contours:
+            moments = cv2.moments(contour)
+            area = moments['m00']
+            if area < self.min_area:
+                continue
+            cx, cy = moments['m10'] / area + offset[0], moments['m01'] / area + offset[1]
+            # 추적 중이면 예측 위치에 가까운 덩어리, 아니면 가장 큰 덩어리
+            if self._filter is not None:
+                px, py = self._filter.state[:2]
+                score = -((cx - px) ** 2 + (cy - py) ** 2) / area
+            else:
+                score = area
+            if best_score is None or score > best_score:
+                _, _, w, h = cv2.boundingRect(contour)
+                best, best_score = (cx, cy, float(w), float(h), float(area)), score
+        return best
+
+    def _apply(self, found, source: str) -> Blob | None:
+        if found is not None:
+            cx, cy, w, h, area = found
+            if self._filter is None:
+                self._filter = _Kalman(cx, cy, self.process_noise, self.measurement_noise)
+            else:
+                self._filter.correct(cx, cy)
+            self._size, self._area, self._lost = (w, h), area, 0
+        elif self._filter is not None:
+            self._lost += 1
+            if self._lost > self.max_lost:
+                self.reset()
+                return None
+        else:
+            return None
+        x, y, vx, vy = (float(v) for v in self._filter.state)
+        return Blob(x, y, vx, vy, self._size[0], self._size[1], self._area, found is not None, source, self._lost)
+
+    @property
+    def tracking(self) -> bool:
+        return self._filter is not None
+
+    def stats(self) -> dict:
+        pixels = list(self._pixels)
+        return {
+            'frames': self.frames,
+            'full_searches': self.full_searches,
+            'window_hit_rate': round(self.window_hits / self.window_searches, 3) if self.window_searches else None,
+            'tracking': self.tracking,
+            'pixel_fraction': round(sum(pixels) / len(pixels), 3) if pixels else None,
+            'times_ms': {name: control_loop.summarize(list(samples)) for name, samples in self._times.items()}
+        }
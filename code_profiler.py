@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+# 사용자 코드 프로파일링 (세션별 선택, exec_code)
+# - 스택 샘플링: 별도 스레드가 INTERVAL마다 실행 스레드의 파이썬 스택을 읽음 (sys._current_frames)
+#   함수별 self/누적 비율, flame graph용 접힌 스택 ("a;b;c" -> 샘플 수)
+#   실행 스레드에 훅을 걸지 않으므로 사용자 코드 속도에 거의 영향 없음
+# - API 시간 측정: Findee 메서드(카메라, 초음파, 모터, 영상 처리), emit_image, time.sleep을 감싸서 호출 수/시간 기록
+#   중첩 API 호출은 안쪽 분류로, API 안에서 부른 time.sleep은 그 API 시간 (카메라 대기, 모터 duration)
+#   나머지는 사용자 코드 시간
+#   감싼 함수는 프로파일 중인 스레드에서만 측정 (다른 스레드는 원래 함수 호출)
+# 결과는 실행이 끝나면 robot_stdout 요약 + 데이터 채널 {'type': 'profile', ...} JSON
+
+import sys
+import json
+import time
+import threading
+from collections import Counter
+
+import sleep_hooks
+
+INTERVAL = 0.005          # 샘플링 주기 (초)
+MAX_DEPTH = 48            # 스택 깊이 제한 (깊은 재귀)
+MAX_STACKS = 2000         # 서로 다른 접힌 스택 수 제한 (넘으면 '(other)')
+TOP_FUNCTIONS = 8
+MAX_MESSAGE = 60000       # 데이터 채널 메시지 크기 제한 (bytes)
+
+CAMERA = 'camera'
+DISTANCE = 'distance'
+MOTORS = 'motors'
+VISION = 'vision'
+ENCODE = 'encode'
+SLEEP = 'sleep'
+USER = 'user'
+
+CATEGORY_NAMES = {
+    CAMERA: '카메라', DISTANCE: '초음파', MOTORS: '모터', VISION: '영상 처리',
+    ENCODE: '이미지 전송', SLEEP: '대기', USER: '사용자 코드'
+}
+
+# Findee 메서드 -> 분류
+FINDEE_API = {
+    'get_frame': CAMERA, 'get_frame_info': CAMERA,
+    'get_distance': DISTANCE,
+    'control_motors': MOTORS, 'stop': MOTORS,
+    'move_forward': MOTORS, 'move_backward': MOTORS,
+    'turn_left': MOTORS, 'turn_right': MOTORS,
+    'curve_left': MOTORS, 'curve_right': MOTORS,
+    'move_sequence': MOTORS, 'emergency_stop': MOTORS,
+    'mask_image': VISION, 'detect_traffic_light': VISION
+}
+
+_local = threading.local()   # 현재 스레드의 프로파일러
+
+#region API 시간 측정 설치
+_install_lock = threading.Lock()
+_install_count = 0
+_originals: dict = {}        # (Findee, 이름) -> 원래 값
+
+def timed(category: str, name: str, func):
+    """프로파일 중인 스레드에서 호출되면 시간 측정"""
+    def wrapper(*args, **kwargs):
+        profiler = getattr(_local, 'profiler', None)
+        if profiler is None:
+            return func(*args, **kwargs)
+        return profiler.call(category, name, func, args, kwargs)
+    wrapper.__name__ = getattr(func, '__name__', name)
+    wrapper.__wrapped__ = func
+    return wrapper
+
+def _sleep_hook(seconds, sleep):
+    """time.sleep 훅 (sleep_hooks): 프로파일 중인 스레드의 대기 시간 측정"""
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is None:
+        return sleep(seconds)
+    return profiler.call(SLEEP, 'time.sleep', sleep, (seconds,), {})
+
+def _install(findee):
+    """Findee 인스턴스 메서드와 time.sleep 감싸기 (여러 세션이 동시에 프로파일해도 한 번만)"""
+    global _install_count
+    with _install_lock:
+        _install_count += 1
+        if _install_count > 1:
+            return
+        sleep_hooks.add(_sleep_hook)
+        if findee is not None:
+            for name, category in FINDEE_API.items():
+                method = getattr(findee, name, None)
+                if method is not None:
+                    _originals[(findee, name)] = None  # 인스턴스 속성 (클래스 메서드를 가림)
+                    findee.__dict__[name] = timed(category, f'Findee.{name}', method)
+
+def _uninstall():
+    global _install_count
+    with _install_lock:
+        _install_count = max(0, _install_count - 1)
+        if _install_count:
+            return
+        sleep_hooks.remove(_sleep_hook)
+        for target, name in _originals:
+            target.__dict__.pop(name, None)
+        _originals.clear()
+#endregion
+
+class CodeProfiler:
+    def __init__(self, interval: float = INTERVAL):
+        self.interval = interval
+        self._ident: int | None = None
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._findee = None
+        self._labels: dict = {}                 # code 객체 -> 표시 이름
+        self._stack: list[list] = []            # 진행 중인 API 호출 [분류, 안쪽 호출 시간]
+        self.samples: int = 0
+        self.self_counts: Counter = Counter()     # 함수 -> 맨 위(self)였던 샘플 수
+        self.total_counts: Counter = Counter()    # 함수 -> 스택에 있었던 샘플 수
+        self.stacks: Counter = Counter()          # 접힌 스택 -> 샘플 수
+        self.category_time: Counter = Counter()   # 분류 -> 초 (안쪽 API 호출 제외)
+        self.calls: Counter = Counter()           # API 이름 -> 호출 수
+        self.call_time: Counter = Counter()       # API 이름 -> 초 (안쪽 호출 포함)
+        self.wall_time: float = 0.0
+        self.cpu_time: float = 0.0
+        self._started_at: float = 0.0
+        self._cpu_start: float = 0.0
+
+    #region 시작/종료 (실행 스레드에서 호출)
+    def start(self, findee=None):
+        self._ident = threading.get_ident()
+        self._findee = findee
+        _install(findee)
+        _local.profiler = self
+        self._started_at = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._run, name='code-profiler', daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        if self._ident != threading.get_ident() or self._sampler is None:
+            return
+        self.wall_time = time.perf_counter() - self._started_at
+        self.cpu_time = time.thread_time() - self._cpu_start
+        _local.profiler = None
+        self._stop.set()
+        self._sampler.join(1.0)
+        self._sampler = None
+        _uninstall()
+    #endregion
+
+    #region API 시간 측정
+    def call(self, category: str, name: str, func, args, kwargs):
+        if category == SLEEP and self._stack:
+            return func(*args, **kwargs)   # API 내부 대기는 해당 API 시간
+        frame = [category, 0.0]
+        self._stack.append(frame)
+        t0 = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - t0
+            self._stack.pop()
+            self.category_time[category] += elapsed - frame[1]
+            self.calls[name] += 1
+            self.call_time[name] += elapsed
+            if self._stack:
+                self._stack[-1][1] += elapsed
+    #endregion
+
+    #region 스택 샘플링
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if filename == '<string>':
+                filename = '<code>'   # 사용자 코드 (exec)
+            else:
+                filename = filename.rsplit('/', 1)[-1]
+            label = self._labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+        return label
+
+    def _run(self):
+        ident = self._ident
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(ident)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_DEPTH:
+                code = frame.f_code
+                if code.co_filename != __file__:   # 측정용 감싼 함수는 제외
+                    labels.append(self._label(code))
+                    if code.co_filename == '<string>' and code.co_name == '<module>':
+                        break   # 사용자 코드 최상위 (그 위 exec_code/threading은 제외)
+                frame = frame.f_back
+            del frame
+            if not labels:
+                continue
+            labels.reverse()   # 바깥 → 안쪽
+            self.samples += 1
+            self.self_counts[labels[-1]] += 1
+            for label in set(labels):
+                self.total_counts[label] += 1
+            key = ';'.join(labels)
+            if key in self.stacks or len(self.stacks) < MAX_STACKS:
+                self.stacks[key] += 1
+            else:
+                self.stacks['(other)'] += 1
+    #endregion
+
+    #region 결과
+    def breakdown(self) -> dict:
+        """분류 -> 초 (사용자 코드 = 전체 - API 시간)"""
+        times = {category: self.category_time.get(category, 0.0) for category in CATEGORY_NAMES if category != USER}
+        times[USER] = max(0.0, self.wall_time - sum(times.values()))
+        return times
+
+    def report(self, max_stacks: int | None = None) -> dict:
+        samples = self.samples or 1
+        stacks = self.stacks.most_common(max_stacks)
+        return {
+            'wall_s': round(self.wall_time, 3),
+            'cpu_s': round(self.cpu_time, 3),
+            'interval_ms': self.interval * 1000,
+            'samples': self.samples,
+            'breakdown_s': {category: round(seconds, 4) for category, seconds in self.breakdown().items()},
+            'api': {name: {'calls': self.calls[name], 'total_ms': round(self.call_time[name] * 1000, 2),
+                           'mean_ms': round(self.call_time[name] * 1000 / self.calls[name], 3)}
+                    for name in sorted(self.calls, key=self.call_time.get, reverse=True)},
+            'top_self': [[label, round(count / samples, 3)] for label, count in self.self_counts.most_common(TOP_FUNCTIONS)],
+            'top_total': [[label, round(count / samples, 3)] for label, count in self.total_counts.most_common(TOP_FUNCTIONS)],
+            'stacks': [[key, count] for key, count in stacks]   # flame graph (접힌 스택)
+        }
+
+    def summary_lines(self) -> list[str]:
+        wall = self.wall_time or 1e-9
+        lines = [f"[프로파일] 실행 {self.wall_time:.2f}s (CPU {self.cpu_time:.2f}s), 샘플 {self.samples}개 ({self.interval * 1000:g}ms 간격)"]
+        parts = []
+        for category, seconds in sorted(self.breakdown().items(), key=lambda item: item[1], reverse=True):
+            if seconds >= 0.0005 or category == USER:
+                parts.append(f"{CATEGORY_NAMES[category]} {seconds:.2f}s ({seconds / wall:.0%})")
+        lines.append("[프로파일] " + ' | '.join(parts))
+        for name in sorted(self.calls, key=self.call_time.get, reverse=True)[:TOP_FUNCTIONS]:
+            calls, total = self.calls[name], self.call_time[name]
+            lines.append(f"[프로파일]   {name}: {calls}회, 평균 {total * 1000 / calls:.2f}ms, 합계 {total:.2f}s")
+        if self.samples:
+            lines.append("[프로파일] 시간을 많이 쓴 함수 (샘플 비율):")
+            for label, count in self.self_counts.most_common(TOP_FUNCTIONS):
+                lines.append(f"[프로파일]   {count / self.samples:5.1%}  {label}")
+        return lines
+
+    def message(self, max_size: int = MAX_MESSAGE) -> dict:
+        """데이터 채널 JSON (접힌 스택은 크기 제한 안에서 많은 순으로)"""
+        max_stacks = 500
+        while True:
+            payload = {'type': 'profile', 'profile': self.report(max_stacks)}
+            if max_stacks == 0 or len(json.dumps(payload)) <= max_size:
+                return payload
+            max_stacks //= 2
+    #endregion
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+# 고정 주기 제어 루프 (Findee.control_loop)
+# - 초음파(최대 130ms 블로킹)와 카메라 캡처는 각자 백그라운드 스레드에서 계속 측정하고 최신 값만 보관
+#   (루프를 사용하는 동안만 동작)
+# - 루프는 절대 시각 기준 주기(시작 + n * period)로 깨어나 최신 거리/프레임/조종 명령을 묶어서 콜백에 전달
+#   콜백 안에서 센서를 기다리지 않으므로 50~100Hz를 일정하게 유지
+# - 콜백이 주기를 넘기면 밀린 틱을 몰아서 실행하지 않고 다음 주기로 건너뜀 (deadline miss)
+# - 통계: 지터 (예정 시각 대비 실제 시작 지연), 단계별 소요 시간 (입력 준비, 콜백별, 전체), 실제 주기
+#
+# 사용 예 (robot_client에서 실행하는 코드)
+#   robot = Findee()
+#   loop = robot.control_loop(rate=50)
+#
+#   @loop.add
+#   def drive(s):
+#       if s.distance is not None and 0 < s.distance < 20:
+#           robot.stop()
+#       else:
+#           x, y = s.command
+#           ...
+#
+#   loop.run()   # 정지 버튼 또는 콜백이 False를 반환할 때까지
+
+import time
+import threading
+from collections import deque
+
+MIN_RATE = 1.0
+MAX_RATE = 500.0
+
+# robot_client.exec_code가 실행 스레드에 설정 (세션의 get_command, 없으면 명령 (0, 0))
+local = threading.local()
+
+# 실행 중인 루프 (코드 실행이 끝나면 그 실행 스레드가 만든 루프만 stop_all(owner=...)로 정지)
+_active: set = set()
+_active_lock = threading.Lock()
+
+def summarize(samples) -> dict:
+    if not samples:
+        return {'mean': None, 'p50': None, 'p95': None, 'max': None}
+    data = sorted(samples)
+    n = len(data)
+    return {
+        'mean': round(sum(data) / n, 2),
+        'p50': round(data[n // 2], 2),
+        'p95': round(data[min(n - 1, int(n * 0.95))], 2),
+        'max': round(data[-1], 2)
+    }
+
+#region 센서 최신 값
+class LatestSampler:
+    """백그라운드 스레드에서 read()를 반복 호출하고 최신 값만 보관 (acquire한 루프가 없으면 정지)"""
+    def __init__(self, name: str, read, interval: float = 0.0):
+        self.name = name
+        self._read = read
+        self.interval = interval          # 측정 시작 간격 최소값 (초)
+        self._lock = threading.Lock()
+        self._users: int = 0
+        self._stop: threading.Event | None = None
+        self.value = None
+        self.timestamp: float | None = None   # 마지막 측정 완료 시각 (monotonic)
+        self.samples: int = 0
+        self.errors: int = 0
+        self.read_time: deque = deque(maxlen=100)   # read() 소요 시간 (ms)
+        self._times: deque = deque(maxlen=64)
+
+    def acquire(self):
+        with self._lock:
+            self._users += 1
+            if self._stop is None:
+                self._stop = threading.Event()
+                threading.Thread(target=self._run, args=(self._stop,), name=f'sampler-{self.name}', daemon=True).start()
+
+    def release(self):
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users == 0 and self._stop is not None:
+                self._stop.set()
+                self._stop = None
+
+    def _run(self, stop: threading.Event):
+        while not stop.is_set():
+            started = time.monotonic()
+            try:
+                value = self._read()
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"센서 읽기 오류 ({self.name}): {e}")
+                stop.wait(max(self.interval, 0.1))
+                continue
+            now = time.monotonic()
+            self.value, self.timestamp = value, now
+            self.samples += 1
+            self.read_time.append((now - started) * 1000)
+            self._times.append(now)
+            remaining = self.interval - (now - started)
+            if remaining > 0:
+                stop.wait(remaining)
+
+    def latest(self) -> tuple:
+        """(값, 경과 시간 ms), 아직 측정 전이면 (None, None)"""
+        timestamp = self.timestamp
+        if timestamp is None:
+            return None, None
+        return self.value, (time.monotonic() - timestamp) * 1000
+
+    def stats(self) -> dict:
+        times = list(self._times)
+        rate = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 and times[-1] > times[0] else None
+        return {'samples': self.samples, 'errors': self.errors,
+                'rate_hz': round(rate, 1) if rate else None,
+                'read_ms': summarize(self.read_time)}
+#endregion
+
+class ControlInput:
+    """틱마다 콜백에 전달되는 입력 (센서 값은 이미 준비된 최신 값)"""
+    __slots__ = ('tick', 'time', 'dt', 'distance', 'distance_age_ms', 'frame', 'new_frame', 'command')
+
+    def __init__(self, tick: int, now: float, dt: float, distance, distance_age_ms, frame, new_frame: bool, command):
+        self.tick: int = tick                 # 0부터
+        self.time: float = now                # 루프 시작 후 초
+        self.dt: float = dt                   # 이전 틱 이후 초 (첫 틱은 주기)
+        self.distance = distance              # 최근 초음파 거리 cm (get_distance와 같은 값, 측정 전이면 None)
+        self.distance_age_ms = distance_age_ms
+        self.frame = frame                    # 최근 FrameInfo (복사하지 않음, 측정 전이면 None)
+        self.new_frame: bool = new_frame      # 이전 틱 이후 새 프레임인지
+        self.command: tuple = command         # get_command() (x, y)
+
+    @property
+    def image(self):
+        return self.frame.image if self.frame is not None else None
+
+    def __repr__(self):
+        return (f"ControlInput(tick={self.tick}, dt={self.dt * 1000:.1f}ms, distance={self.distance}, "
+                f"frame={getattr(self.frame, 'sequence', None)}, command={self.command})")
+
+class ControlLoop:
+    def __init__(self, rate: float = 50.0, ultrasonic: LatestSampler | None = None,
+                 camera: LatestSampler | None = None, command=None, window: int = 300):
+        """
+        Args:
+            rate: 목표 주기 (Hz, 1~500)
+            ultrasonic/camera: 센서 샘플러 (None이면 해당 입력 없음)
+            command: 조종 명령 함수 () -> (x, y) (None이면 실행 중인 세션의 get_command)
+        """
+        if not MIN_RATE <= rate <= MAX_RATE:
+            raise ValueError(f"rate는 {MIN_RATE:g}~{MAX_RATE:g}Hz여야 합니다")
+        self.rate = float(rate)
+        self.period = 1.0 / self.rate
+        self._ultrasonic = ultrasonic
+        self._camera = camera
+        self._command = command if command is not None else getattr(local, 'command', None)
+        self.owner = threading.current_thread()   # 만든 스레드 (코드 실행 스레드가 끝나면 함께 정지)
+        self.callbacks: list[tuple[str, object]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.running: bool = False
+
+        self.ticks: int = 0
+        self.deadline_misses: int = 0
+        self.skipped_ticks: int = 0     # 주기를 넘겨서 건너뛴 틱
+        self.callback_errors: int = 0
+        self.jitter: deque = deque(maxlen=window)        # ms
+        self.intervals: deque = deque(maxlen=window)     # 실제 틱 간격 ms
+        self.stages: dict[str, deque] = {}               # 단계 -> 소요 시간 ms
+        self._window = window
+
+    #region 콜백
+    def add(self, callback, name: str | None = None):
+        """콜백 등록 (등록 순서대로 실행, 데코레이터로 사용 가능), callback(inputs)가 False를 반환하면 루프 종료"""
+        self.callbacks.append((name or getattr(callback, '__name__', 'callback'), callback))
+        return callback
+
+    def remove(self, callback):
+        self.callbacks = [(name, func) for name, func in self.callbacks if func is not callback]
+    #endregion
+
+    #region 실행
+    def run(self, duration: float | None = None, ticks: int | None = None) -> dict:
+        """현재 스레드에서 실행 (stop(), 콜백의 False, duration/ticks 도달 시 종료), 통계 반환"""
+        if self.running:
+            raise RuntimeError("제어 루프가 이미 실행 중입니다")
+        self.running = True
+        self._stop.clear()
+        samplers = [sampler for sampler in (self._ultrasonic, self._camera) if sampler is not None]
+        for sampler in samplers:
+            sampler.acquire()
+        with _active_lock:
+            _active.add(self)
+        try:
+            self._loop(duration, ticks)
+        finally:
+            with _active_lock:
+                _active.discard(self)
+            for sampler in samplers:
+                sampler.release()
+            self.running = False
+        return self.stats()
+
+    def start(self, duration: float | None = None, ticks: int | None = None) -> threading.Thread:
+        """백그라운드 스레드에서 실행"""
+        self._thread = threading.Thread(target=self.run, args=(duration, ticks), name='control-loop', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float | None = 1.0):
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _loop(self, duration: float | None, ticks: int | None):
+        period = self.period
+        stop = self._stop
+        start = time.monotonic()
+        next_at = start
+        last_started = None
+        last_sequence = None
+        tick = 0
+        while not stop.is_set():
+            now = time.monotonic()
+            if now < next_at:
+                # Event.wait: stop()에 바로 반응 (주기 정확도는 time.sleep과 같음)
+                if stop.wait(next_at - now):
+                    break
+            started = time.monotonic()
+            if (duration is not None and started - start >= duration) or (ticks is not None and tick >= ticks):
+                break
+            self.jitter.append((started - next_at) * 1000)
+            if last_started is not None:
+                self.intervals.append((started - last_started) * 1000)
+
+            # 입력 준비 (최신 값만 읽음, 기다리지 않음)
+            distance, distance_age = self._ultrasonic.latest() if self._ultrasonic is not None else (None, None)
+            frame = self._camera.latest()[0] if self._camera is not None else None
+            sequence = getattr(frame, 'sequence', None)
+            new_frame = frame is not None and sequence != last_sequence
+            last_sequence = sequence
+            command = self._command() if self._command is not None else (0, 0)
+            inputs = ControlInput(tick, started - start, started - last_started if last_started is not None else period,
+                                  distance, distance_age, frame, new_frame, command)
+            t = time.monotonic()
+            self._record('prepare', t - started)
+
+            for name, callback in self.callbacks:
+                try:
+                    result = callback(inputs)
+                except Exception:
+                    self.callback_errors += 1
+                    raise
+                finally:
+                    t_end = time.monotonic()
+                    self._record(name, t_end - t)
+                    t = t_end
+                if result is False:
+                    stop.set()
+            self._record('total', t - started)
+
+            tick += 1
+            self.ticks = tick
+            last_started = started
+            next_at += period
+            late = time.monotonic() - next_at
+            if late > 0:
+                # 다음 주기 시작 시각을 넘김: 밀린 틱은 건너뛰고 주기 위상 유지
+                missed = int(late // period) + 1
+                self.deadline_misses += 1
+                self.skipped_ticks += missed
+                next_at += missed * period
+
+    def _record(self, stage: str, seconds: float):
+        samples = self.stages.get(stage)
+        if samples is None:
+            samples = self.stages[stage] = deque(maxlen=self._window)
+        samples.append(seconds * 1000)
+    #endregion
+
+    def stats(self) -> dict:
+        intervals = list(self.intervals)
+        actual = 1000.0 / (sum(intervals) / len(intervals)) if intervals else None
+        sensors = {sampler.name: sampler.stats() for sampler in (self._ultrasonic, self._camera) if sampler is not None}
+        return {
+            'rate_hz': self.rate,
+            'actual_hz': round(actual, 1) if actual else None,
+            'ticks': self.ticks,
+            'deadline_misses': self.deadline_misses,
+            'skipped_ticks': self.skipped_ticks,
+            'miss_ratio': round(self.deadline_misses / self.ticks, 3) if self.ticks else 0.0,
+            'callback_errors': self.callback_errors,
+            'jitter_ms': summarize(self.jitter),
+            'interval_ms': summarize(intervals),
+            'stages_ms': {stage: summarize(samples) for stage, samples in list(self.stages.items())},
+            'sensors': sensors
+        }
+
+    def report(self) -> str:
+        stats = self.stats()
+        jitter = stats['jitter_ms']
+        total = stats['stages_ms'].get('total', {})
+        return (f"제어 루프: {stats['actual_hz']}Hz/{self.rate:g}Hz, 틱 {self.ticks}, "
+                f"주기 초과 {self.deadline_misses}회, 지터 p95 {jitter['p95']}ms, 처리 p95 {total.get('p95')}ms")
+
+def stop_all(timeout: float = 1.0, owner: threading.Thread | None = None):
+    """실행 중인 제어 루프 정지 (owner를 주면 그 스레드가 만든 루프만: 다른 세션의 코드 실행은 유지)"""
+    with _active_lock:
+        loops = [loop for loop in _active if owner is None or loop.owner is owner]
+    for loop in loops:
+        loop.stop(timeout)
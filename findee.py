@@ -9,20 +9,38 @@ import os
 import time
 import atexit
 import json
-import cv2
-from pathlib import Path
+import threading
+from collections import deque
 
 import logging
 logging.getLogger('werkzeug').setLevel(logging.ERROR) # Werkzeug 로거 비활성화
 logging.getLogger('picamera2').setLevel(logging.ERROR) # Picamera2 로거 비활성화
 os.environ['LIBCAMERA_LOG_FILE'] = '/dev/null' # disable logging
 
-import RPi.GPIO as GPIO
-from picamera2 import Picamera2
-import numpy as np
+import findee_hw
+from findee_hw import HIGH, LOW
+import startup
+import settings
+import auto_calibration
+import control_loop
+import motion_scheduler
+import session_recorder
+import inference
+import marker_tracker
+import blob_tracker
+import lan_server
+import stream_control
+import thermal_governor
+from settings import MotorCalibration, CameraSettings, EncoderSettings, LanSettings, ThermalSettings
 # from picamera2.encoders import JpegEncoder
 
+# 무거운 모듈은 처음 사용할 때 import (서비스 기동 시 서버 등록을 먼저)
+cv2 = startup.LazyModule('cv2')
+np = startup.LazyModule('numpy')
 USE_DEBUG = True
+# control_motors 출발 토크 펄스 (Findee.motor_kick)
+MOTOR_KICK_ALWAYS = 'always'        # 0이 아닌 명령마다 100%/20ms (기본)
+MOTOR_KICK_ON_CHANGE = 'on_change'  # 정지에서 출발하거나 방향이 바뀔 때만 (제어 루프처럼 자주 명령할 때)
 
 
 
@@ -37,6 +55,85 @@ def debug_decorator(func):
         return ret
     return wrapper
 
+def _now_ns() -> int:
+    """SensorTimestamp와 같은 기준 시계(부팅 이후 ns)"""
+    if hasattr(time, 'CLOCK_BOOTTIME'):
+        return time.clock_gettime_ns(time.CLOCK_BOOTTIME)
+    return time.monotonic_ns()
+
+#region: Frame metadata
+class FrameInfo:
+    """캡처된 프레임과 Picamera2 메타데이터를 담는 가벼운 구조체"""
+    __slots__ = ('image', 'timestamp_ns', 'frame_duration_us', 'exposure_us', 'sequence', 'delivered_ns', 'lores')
+
+    def __init__(self, image, timestamp_ns: int, frame_duration_us: int | None = None,
+                 exposure_us: int | None = None, sequence: int = 0, lores=None):
+        self.image = image                          # numpy 배열 (get_frame()과 동일)
+        self.lores = lores                          # lores 스트림 (추론 서비스 사용 중일 때만, YUV420)
+        self.timestamp_ns: int = timestamp_ns       # SensorTimestamp (부팅 이후 ns)
+        self.frame_duration_us = frame_duration_us  # FrameDuration (us)
+        self.exposure_us = exposure_us              # ExposureTime (us)
+        self.sequence: int = sequence               # 프레임 번호
+        self.delivered_ns: int = _now_ns()          # 사용자 코드에 전달된 시각
+
+    @property
+    def age_ms(self) -> float:
+        """캡처 이후 현재까지 경과 시간 (ms)"""
+        return (_now_ns() - self.timestamp_ns) / 1e6
+
+    def __repr__(self):
+        return (f"FrameInfo(seq={self.sequence}, shape={getattr(self.image, 'shape', None)}, "
+                f"age={self.age_ms:.1f}ms)")
+
+class LatencyTracker:
+    """캡처 → 사용자 코드 → 모터 명령까지의 지연 시간 측정"""
+    def __init__(self, window: int = 300):
+        self._lock = threading.Lock()
+        self._frame: FrameInfo | None = None   # 아직 모터 명령으로 이어지지 않은 최신 프레임
+        self.capture_to_user: deque = deque(maxlen=window)
+        self.user_to_motor: deque = deque(maxlen=window)
+        self.capture_to_motor: deque = deque(maxlen=window)
+
+    def mark_frame(self, frame: FrameInfo):
+        with self._lock:
+            self._frame = frame
+            self.capture_to_user.append((frame.delivered_ns - frame.timestamp_ns) / 1e6)
+
+    def mark_command(self):
+        # 프레임 하나당 첫 번째 모터 명령만 기록 (같은 프레임으로 내린 후속 명령은 제외)
+        now = _now_ns()
+        with self._lock:
+            frame, self._frame = self._frame, None
+            if frame is None:
+                return
+            self.user_to_motor.append((now - frame.delivered_ns) / 1e6)
+            self.capture_to_motor.append((now - frame.timestamp_ns) / 1e6)
+
+    def reset(self):
+        with self._lock:
+            self._frame = None
+            self.capture_to_user.clear()
+            self.user_to_motor.clear()
+            self.capture_to_motor.clear()
+
+    _summary = staticmethod(control_loop.summarize)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'samples': len(self.capture_to_motor),
+                'capture_to_user_ms': self._summary(self.capture_to_user),
+                'user_to_motor_ms': self._summary(self.user_to_motor),
+                'capture_to_motor_ms': self._summary(self.capture_to_motor)
+            }
+#endregion
+
+# gpio_init/camera_init이 만드는 속성 (초기화 전에 접근하면 완료될 때까지 대기)
+_HARDWARE_ATTRS = {
+    'gpio': 'gpio', 'rightPWM': 'gpio', 'leftPWM': 'gpio',
+    'camera': 'camera', 'config': 'camera'
+}
+
 class Findee:
     default_speed: float = 80.0
     _instance = None
@@ -47,25 +144,17 @@ class Findee:
             cls._instance = super(Findee, cls).__new__(cls, *args, **kwargs)
         return cls._instance
 
-    def __init__(self, safe_mode: bool = False):
+    def __init__(self, safe_mode: bool = False, backend: str | None = None):
         if self._initialized: return
         self._initialized = True
 
-        # self.thread_lock = threading.Lock()
-
-        self.gpio_init()
-        self.camera_init()
+        # 하드웨어 백엔드 (rpi/sim), None이면 FINDEE_BACKEND 환경 변수 사용
+        self.backend: str = findee_hw.backend_name(backend)
 
-        # 캘리브레이션 자동 로드
-        self._load_calibration()
+        # self.thread_lock = threading.Lock()
 
-        atexit.register(self.cleanup)
-
-#region: init
-    @debug_decorator
-    def gpio_init(self):
-        GPIO.setwarnings(False)
-        GPIO.setmode(GPIO.BCM)
+        self.latency = LatencyTracker()
+        self._frame_sequence: int = 0
 
         # Pin Number
         self.IN1: int = 23 # Right Motor Direction 1
@@ -77,27 +166,107 @@ class Findee:
         self.TRIG: int = 5 # Ultrasonic Sensor Trigger
         self.ECHO: int = 6 # Ultrasonic Sensor Echo
 
+        # 모터별 마지막 방향 (-1/0/1), 명령 순번 (MotionScheduler/제어 루프/사용자 스레드가 함께 씀)
+        self._motor_lock = threading.Lock()
+        self._motor_dirs: list[int] = [0, 0]
+        self._motor_seq: int = 0
+        # 출발 토크 펄스: 'always'(0이 아닌 명령마다 100%/20ms), 'on_change'(출발/방향 전환 때만)
+        self.motor_kick: str = MOTOR_KICK_ALWAYS
+        # 초음파 핑이 겹치지 않도록 (get_distance와 제어 루프 샘플러)
+        self._ultrasonic_lock = threading.Lock()
+        self._samplers: dict[str, control_loop.LatestSampler] = {}
+        # 시간 지정 동작 (duration, move_sequence): 타이머 스레드가 정지/다음 단계 적용
+        self.motion = motion_scheduler.MotionScheduler(self.control_motors)
+        # 추론 서비스 (start_inference): get_frame_info가 최신 프레임을 공유
+        self._inference: inference.InferenceService | None = None
+        self._inference_owner: threading.Thread | None = None   # start_inference를 호출한 스레드 (코드 실행 종료 시 정리)
+        # 온도 조절 (start_thermal_governor): 카메라 fps 상한, set_fps로 요청한 값은 camera_fps에 유지
+        self.camera_fps: int = settings.store.get(CameraSettings).fps
+        self._fps_cap: int | None = None
+        self._applied_fps: int | None = None
+        # 캡처(get_frame_info)와 재설정(set_fps, set_resolution, lores)이 겹치지 않도록 (멈춘 카메라에서 캡처 방지)
+        self._camera_lock = threading.RLock()
+
+        # 캘리브레이션: 설정 저장소 값 사용 (calibrate_motors(save_to_file=False)면 메모리 값 우선)
+        self._calibration_override: MotorCalibration | None = None
+        self._load_calibration()
+
+        atexit.register(self.cleanup)
+
+        # GPIO/카메라 초기화는 백그라운드에서 병렬로 (처음 사용할 때 끝나지 않았으면 대기)
+        # 초기화 스레드가 위의 상태를 읽으므로 반드시 마지막에 시작
+        self._hardware_ready = {'gpio': threading.Event(), 'camera': threading.Event()}
+        for name, init in (('gpio', self.gpio_init), ('camera', self.camera_init)):
+            threading.Thread(target=self._init_hardware, args=(name, init),
+                             name=f'findee-{name}-init', daemon=True).start()
+
+    def __getattr__(self, name):
+        # 인스턴스에 아직 없는 하드웨어 속성만 여기로 옴 (초기화가 끝난 뒤에는 호출되지 않음)
+        part = _HARDWARE_ATTRS.get(name)
+        ready = self.__dict__.get('_hardware_ready')
+        if part is None or ready is None:
+            raise AttributeError(name)
+        ready[part].wait()
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            raise AttributeError(name) from None  # 초기화 실패
+
+    def _init_hardware(self, name: str, init):
+        try:
+            init()
+        finally:
+            self._hardware_ready[name].set()
+            if all(event.is_set() for event in self._hardware_ready.values()):
+                startup.profile.mark('hardware_ready')
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """GPIO/카메라 초기화 완료 대기 (성공 여부와 관계없이 끝났으면 True)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for event in self._hardware_ready.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not event.wait(remaining):
+                return False
+        return True
+
+#region: init
+    @debug_decorator
+    def gpio_init(self):
+        gpio = findee_hw.create_gpio(self.backend)
+
         # GPIO Pin Setting
-        GPIO.setup((self.IN1, self.IN2, self.ENA,
-                    self.IN3, self.IN4, self.ENB,
-                    self.TRIG), GPIO.OUT, initial=GPIO.LOW)
-        GPIO.setup(self.ECHO, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
-        self.rightPWM = GPIO.PWM(self.ENA, 1000)
+        gpio.setup_outputs((self.IN1, self.IN2, self.ENA,
+                                 self.IN3, self.IN4, self.ENB,
+                                 self.TRIG))
+        gpio.setup_group((self.IN1, self.IN2, self.IN3, self.IN4))  # 방향 핀 (control_motors에서 한 번에 씀)
+        gpio.setup_input(self.ECHO)
+        gpio.attach_ultrasonic(self.TRIG, self.ECHO)
+        self.rightPWM = gpio.PWM(self.ENA, 1000)
         self.rightPWM.start(0)
-        self.leftPWM = GPIO.PWM(self.ENB, 1000)
+        self.leftPWM = gpio.PWM(self.ENB, 1000)
         self.leftPWM.start(0)
+        with self._motor_lock:
+            self._motor_dirs = [0, 0]  # 새로 설정한 방향 핀은 첫 명령에서 씀
+        self.gpio = gpio  # 마지막에 공개 (다른 스레드는 설정이 끝난 gpio만 봄)
 
     @debug_decorator
     def camera_init(self):
-        # Camera Init
-        self.camera = Picamera2()
-        self.config = self.camera.create_video_configuration(
-            main={"size": (640, 480), "format": "RGB888"},
-            controls={"FrameDurationLimits": (33333, 33333)},
-            queue=False, buffer_count=2
-        )
-        self.camera.configure(self.config)
-        self.camera.start()
+        # Camera Init (기본 해상도/fps는 설정 저장소)
+        defaults = settings.store.get(CameraSettings)
+        camera = findee_hw.create_camera(self.backend)
+        # 온도 조절 상한이 먼저 정해졌으면 처음부터 적용 (_apply_thermal_policy와 같은 잠금)
+        with self._camera_lock:
+            fps = max(1, self._target_fps())
+            frame_duration = 1000000 // fps
+            self.config = camera.create_video_configuration(
+                main={"size": (defaults.width, defaults.height), "format": "RGB888"},
+                controls={"FrameDurationLimits": (frame_duration, frame_duration)},
+                queue=False, buffer_count=2
+            )
+            camera.configure(self.config)
+            camera.start()
+            self._applied_fps = fps
+            self.camera = camera  # 마지막에 공개 (시작된 카메라만 보이도록)
 #endregion
 
 #region: Motor
@@ -109,6 +278,9 @@ class Findee:
         self.IN4 = IN4 if IN4 is not None else self.IN4
         self.ENA = ENA if ENA is not None else self.ENA
         self.ENB = ENB if ENB is not None else self.ENB
+        # 새 방향 핀은 아직 쓰인 적이 없으므로 다음 명령에서 반드시 쓰도록
+        with self._motor_lock:
+            self._motor_dirs = [0, 0]
 
     @staticmethod
     def constrain(value, min_value, max_value):
@@ -125,16 +297,17 @@ class Findee:
             high_speed_ratio: 속도 100에서의 비율 (기본 0.58)
             save_to_file: 파일에 저장할지 여부 (기본 True)
         """
-        self.motor_calibration = {
-            'dir': dir,
-            'low_speed_ratio': low_speed_ratio,
-            'high_speed_ratio': high_speed_ratio
-        }
+        previous = self.motor_calibration
+        calibration = MotorCalibration(dir=dir, low_speed_ratio=low_speed_ratio,
+                                       high_speed_ratio=high_speed_ratio)
 
         if save_to_file:
-            self._save_calibration()
+            self._calibration_override = None
+            settings.store.set(calibration)
             # 저장 후 파일에서 다시 로드하여 검증
             self._load_calibration()
+        else:
+            self._calibration_override = calibration
 
         dir_name = "왼쪽" if dir == 0 else "오른쪽"
         print(f"모터 캘리브레이션 설정 완료:")
@@ -142,41 +315,75 @@ class Findee:
         print(f"  속도 30: 비율 {low_speed_ratio}")
         print(f"  속도 100: 비율 {high_speed_ratio}")
         print(f"  (중간 속도는 선형 보간으로 자동 계산됩니다)")
+        if previous.forward_curve or previous.backward_curve:
+            print(f"  (자동 캘리브레이션 곡선은 지워졌습니다)")
 
-    def _save_calibration(self):
-        """캘리브레이션 값을 파일에 저장 (~/.config/findee/motor_calibration.json)"""
-        try:
-            cal_dir = Path.home() / '.config' / 'findee'
-            cal_dir.mkdir(parents=True, exist_ok=True)
-            cal_file = cal_dir / 'motor_calibration.json'
+    def auto_calibrate_motors(self, speeds=auto_calibration.DEFAULT_SPEEDS,
+                              duration: float = auto_calibration.TRIAL_DURATION,
+                              save_to_file: bool = True) -> MotorCalibration | None:
+        """
+        카메라 광류로 속도별 좌우 바퀴 비율을 측정해서 방향별 보정 곡선 설정
+        로봇 앞에 1~2m 공간과 무늬가 있는 배경(벽, 가구 등)이 필요 (전진/후진을 번갈아 주행)
 
-            with open(cal_file, 'w') as f:
-                json.dump(self.motor_calibration, f, indent=2)
-            print(f"캘리브레이션 저장 완료: {cal_file}")
-        except Exception as e:
-            print(f"캘리브레이션 저장 실패: {e}")
+        Args:
+            speeds: 측정할 속도 목록 (사이 속도는 선형 보간)
+            duration: 주행 1회 측정 시간 (초), 속도/방향당 최대 4회 주행
+            save_to_file: 파일에 저장할지 여부 (기본 True)
+
+        Returns:
+            새 보정 값 (측정에 모두 실패하면 None)
+        """
+        current = self.motor_calibration
+        calibrator = auto_calibration.AutoCalibrator(self, speeds=speeds, duration=duration)
+        print(f"자동 캘리브레이션 시작: 속도 {', '.join(f'{speed:g}' for speed in calibrator.speeds)}")
+        # 이전 자동 보정 결과에서 시작하면 주행 횟수가 줄어듦
+        curves = calibrator.run({'forward': current.forward_curve, 'backward': current.backward_curve})
+        if not curves['forward'] and not curves['backward']:
+            print("자동 캘리브레이션 실패: 영상에서 움직임을 측정하지 못했습니다 (카메라 앞에 무늬가 있는 배경 필요)")
+            return None
+
+        calibration = current.replace(forward_curve=curves['forward'] or current.forward_curve,
+                                      backward_curve=curves['backward'] or current.backward_curve)
+        if save_to_file:
+            self._calibration_override = None
+            settings.store.set(calibration)
+            self._load_calibration()
+        else:
+            self._calibration_override = calibration
+        print(f"자동 캘리브레이션 완료 (주행 {len(calibrator.log)}회)")
+        return calibration
+
+    @property
+    def motor_calibration(self) -> MotorCalibration:
+        """현재 모터 보정 값 (저장소 메모리 캐시, 디스크 접근 없음)"""
+        override = self._calibration_override
+        return override if override is not None else settings.store.get(MotorCalibration)
+
+    @motor_calibration.setter
+    def motor_calibration(self, value):
+        # 저장하지 않고 이 실행에만 적용 (dict도 허용)
+        self._calibration_override = value if isinstance(value, MotorCalibration) else MotorCalibration.from_dict(value)
+
+    def _save_calibration(self):
+        """캘리브레이션 값을 설정 저장소에 저장 (임시 파일에 쓴 뒤 원자적 교체)"""
+        if settings.store.set(self.motor_calibration):
+            print(f"캘리브레이션 저장 완료: {settings.store.path}")
+        else:
+            print(f"캘리브레이션 저장 실패: {settings.store.path}")
 
     def _load_calibration(self):
-        """파일에서 캘리브레이션 값 로드"""
-        try:
-            cal_file = Path.home() / '.config' / 'findee' / 'motor_calibration.json'
-            if cal_file.exists():
-                with open(cal_file, 'r') as f:
-                    self.motor_calibration = json.load(f)
-                print(f"캘리브레이션 로드 완료: {cal_file}")
-                return True
-        except Exception as e:
-            print(f"캘리브레이션 로드 실패: {e}")
+        """설정 저장소에서 캘리브레이션 값 다시 읽기 (저장된 값이 있으면 True)"""
+        settings.store.refresh(force=True)
+        if settings.store.has(MotorCalibration):
+            print(f"캘리브레이션 로드 완료: {settings.store.path}")
+            return True
         return False
 
     def _get_motor_ratio(self, speed: float) -> float:
         """속도에 따른 동적 보정 비율 계산 (선형 보간, 30-100 고정)"""
-        if not hasattr(self, 'motor_calibration'):
-            return 1.0  # 캘리브레이션 없으면 보정 안 함
-
         cal = self.motor_calibration
-        low_ratio = cal['low_speed_ratio']
-        high_ratio = cal['high_speed_ratio']
+        low_ratio = cal.low_speed_ratio
+        high_ratio = cal.high_speed_ratio
 
         abs_speed = abs(speed)
 
@@ -196,11 +403,16 @@ class Findee:
 
     def _apply_calibration(self, left: float, right: float) -> tuple[float, float]:
         """캘리브레이션 보정을 적용하여 left, right 값을 반환"""
-        if not hasattr(self, 'motor_calibration'):
-            return left, right
-
         cal = self.motor_calibration
-        dir = cal.get('dir', 1)  # 기본값: 오른쪽이 빠름
+        # 자동 캘리브레이션 곡선 (주행 방향별 오른쪽/왼쪽 비율, 제자리 회전은 전진 곡선)
+        curve = cal.backward_curve if left + right < 0 else cal.forward_curve
+        if curve:
+            ratio = auto_calibration.interpolate_curve(curve, (abs(left) + abs(right)) * 0.5)
+            if ratio <= 1.0:
+                return left, right * ratio
+            return left / ratio, right
+
+        dir = cal.dir  # 기본값: 오른쪽이 빠름 (보정 값이 없으면 비율 1.0)
 
         if dir == 1:
             # 오른쪽이 빠름: 왼쪽(느린 쪽) 값을 그대로, 오른쪽에 왼쪽 값에 맞는 비율 적용
@@ -215,6 +427,11 @@ class Findee:
 
     def control_motors(self, left : float, right : float) -> bool:
         #TODO: time.sleep이 모터 제어에 영향을 주는지 확인해야 함.
+        self.latency.mark_command()
+        if session_recorder.active_recorder is not None:
+            session_recorder.active_recorder.motors(left, right)
+        if session_recorder.active_player is not None:
+            return session_recorder.active_player.motors(left, right)  # 재생: 모터 대신 출력 기록
 
         # 속도 값 정규화 (동시에 처리하기 위해 미리 계산)
         if right == 0.0:
@@ -227,91 +444,152 @@ class Findee:
         else:
             left_normalized = (1 if left >= 0 else -1) * self.constrain(abs(left), 20, 100)
 
-        # 오른쪽 모터 제어
-        if right_normalized == 0.0:
-            self.rightPWM.ChangeDutyCycle(0.0)
-            GPIO.output((self.IN1, self.IN2), GPIO.LOW)
-        else:
-            # 100%로 먼저 설정 (강한 토크)
-            self.rightPWM.ChangeDutyCycle(100.0)
-            # OUT1(HIGH) -> OUT2(LOW) : Forward
-            GPIO.output(self.IN1, GPIO.HIGH if right_normalized > 0 else GPIO.LOW)
-            GPIO.output(self.IN2, GPIO.LOW if right_normalized > 0 else GPIO.HIGH)
-
-        # 왼쪽 모터 제어
-        if left_normalized == 0.0:
-            self.leftPWM.ChangeDutyCycle(0.0)
-            GPIO.output((self.IN3, self.IN4), GPIO.LOW)
-        else:
-            # 100%로 먼저 설정 (강한 토크)
-            self.leftPWM.ChangeDutyCycle(100.0)
-            # OUT4(HIGH) -> OUT3(LOW) : Forward
-            GPIO.output(self.IN4, GPIO.HIGH if left_normalized > 0 else GPIO.LOW)
-            GPIO.output(self.IN3, GPIO.LOW if left_normalized > 0 else GPIO.HIGH)
-
-        # 두 모터 모두 100%로 설정된 후 동시에 대기
-        if right_normalized != 0.0 or left_normalized != 0.0:
-            time.sleep(0.02)
-
-        # 두 모터 모두 실제 속도로 동시에 변경
-        if right_normalized != 0.0:
-            self.rightPWM.ChangeDutyCycle(abs(right_normalized))
-        if left_normalized != 0.0:
-            self.leftPWM.ChangeDutyCycle(abs(left_normalized))
+        # 0이 아닌 바퀴는 100%로 먼저 설정 (강한 토크, 20ms 대기)
+        # motor_kick == 'on_change'이면 정지 상태에서 출발하거나 방향이 바뀌는 바퀴만 (제어 루프 등)
+        right_dir = (right_normalized > 0) - (right_normalized < 0)
+        left_dir = (left_normalized > 0) - (left_normalized < 0)
+        kick_always = self.motor_kick != MOTOR_KICK_ON_CHANGE
+        with self._motor_lock:
+            previous_right, previous_left = self._motor_dirs
+            right_kick = right_dir != 0 and (kick_always or right_dir != previous_right)
+            left_kick = left_dir != 0 and (kick_always or left_dir != previous_left)
+            self._motor_dirs = [right_dir, left_dir]
+            self._motor_seq += 1
+            seq = self._motor_seq
+
+            # duty 먼저 (펄스는 100%로 강한 토크, 정지는 0)
+            self.rightPWM.ChangeDutyCycle(100.0 if right_kick else abs(right_normalized))
+            self.leftPWM.ChangeDutyCycle(100.0 if left_kick else abs(left_normalized))
+
+            # 방향이 바뀐 바퀴의 방향 핀을 한 번에 씀 (lgpio 백엔드는 시스템 콜 한 번)
+            # 오른쪽 OUT1(HIGH) -> OUT2(LOW) : Forward, 왼쪽 OUT4(HIGH) -> OUT3(LOW) : Forward
+            pins, levels = [], []
+            if right_dir != previous_right:
+                pins += (self.IN1, self.IN2)
+                levels += (HIGH if right_dir > 0 else LOW, HIGH if right_dir < 0 else LOW)
+            if left_dir != previous_left:
+                pins += (self.IN4, self.IN3)
+                levels += (HIGH if left_dir > 0 else LOW, HIGH if left_dir < 0 else LOW)
+            if pins:
+                self.gpio.output(pins, levels)
+
+        if not (right_kick or left_kick):
+            return
+
+        # 펄스를 준 모터 모두 100%로 설정된 후 동시에 대기
+        time.sleep(0.02)
+
+        # 실제 속도로 동시에 변경 (대기 중에 다른 스레드의 새 명령이 적용됐으면 덮어쓰지 않음)
+        with self._motor_lock:
+            if self._motor_seq != seq:
+                return
+            if right_kick:
+                self.rightPWM.ChangeDutyCycle(abs(right_normalized))
+            if left_kick:
+                self.leftPWM.ChangeDutyCycle(abs(left_normalized))
+
+    # 동작 이름 -> (left, right) (move_sequence 단계)
+    MOTIONS = {
+        'stop': lambda: (0.0, 0.0),
+        'move_forward': lambda speed: (speed, speed),
+        'move_backward': lambda speed: (-speed, -speed),
+        'turn_left': lambda speed: (-speed, speed),
+        'turn_right': lambda speed: (speed, -speed),
+        'curve_left': lambda speed, ratio=0.5: (speed * ratio, speed),
+        'curve_right': lambda speed, ratio=0.5: (speed, speed * ratio)
+    }
 
     # Stop
     @debug_decorator
     def stop(self):
-        self.control_motors(0.0, 0.0)
+        # 진행 중인 시간 지정 동작도 취소
+        self.motion.set(0.0, 0.0)
+
+    def emergency_stop(self) -> int:
+        """비상 정지: 제어 루프와 모든 시간 지정 동작을 취소하고 즉시 정지 (취소한 동작 수)"""
+        count = self.motion.emergency_stop()
+        control_loop.stop_all(timeout=0.2)
+        self.motion.set(0.0, 0.0)  # 루프가 멈추는 동안 콜백이 다시 보낸 명령 무효화
+        return count
 
     # Straight, Backward
     @debug_decorator
-    def move_forward(self, speed : float = default_speed, duration : float = 0.0):
+    def move_forward(self, speed : float = default_speed, duration : float = 0.0, wait : bool = True):
         left, right = self._apply_calibration(speed, speed)
-        self.control_motors(left, right)
-        self.__duration_check(duration)
+        return self._run_motion(left, right, duration, wait)
 
     @debug_decorator
-    def move_backward(self, speed : float = default_speed, duration : float = 0.0):
+    def move_backward(self, speed : float = default_speed, duration : float = 0.0, wait : bool = True):
         left, right = self._apply_calibration(-speed, -speed)
-        self.control_motors(left, right)
-        self.__duration_check(duration)
+        return self._run_motion(left, right, duration, wait)
 
     # Rotation
     @debug_decorator
-    def turn_left(self, speed : float = default_speed, duration : float = 0.0):
+    def turn_left(self, speed : float = default_speed, duration : float = 0.0, wait : bool = True):
         # 회전 시에도 캘리브레이션 적용 (양쪽 방향 회전 속도 일관성 유지)
         left, right = self._apply_calibration(-speed, speed)
-        self.control_motors(left, right)
-        self.__duration_check(duration)
+        return self._run_motion(left, right, duration, wait)
 
     @debug_decorator
-    def turn_right(self, speed : float = default_speed, duration : float = 0.0):
+    def turn_right(self, speed : float = default_speed, duration : float = 0.0, wait : bool = True):
         # 회전 시에도 캘리브레이션 적용 (양쪽 방향 회전 속도 일관성 유지)
         left, right = self._apply_calibration(speed, -speed)
-        self.control_motors(left, right)
-        self.__duration_check(duration)
+        return self._run_motion(left, right, duration, wait)
 
     # Curvilinear Rotation
     @debug_decorator
-    def curve_left(self, speed : float = default_speed, ratio : float = 0.5, duration : float = 0.0):
+    def curve_left(self, speed : float = default_speed, ratio : float = 0.5, duration : float = 0.0, wait : bool = True):
         left, right = self._apply_calibration(speed * ratio, speed)
-        self.control_motors(left, right)
-        self.__duration_check(duration)
+        return self._run_motion(left, right, duration, wait)
 
     @debug_decorator
-    def curve_right(self, speed : float = default_speed, ratio : float = 0.5, duration : float = 0.0):
+    def curve_right(self, speed : float = default_speed, ratio : float = 0.5, duration : float = 0.0, wait : bool = True):
         left, right = self._apply_calibration(speed, speed * ratio)
-        self.control_motors(left, right)
-        self.__duration_check(duration)
+        return self._run_motion(left, right, duration, wait)
 
-    def __duration_check(self, duration: float):
+    @debug_decorator
+    def move_sequence(self, steps, wait : bool = True, queue : bool = False):
+        """
+        여러 동작을 순서대로 실행 (타이머 스레드가 단계 전환, 마지막에 정지)
+
+        Args:
+            steps: [(동작 이름, 인자..., duration), ...]
+                   예: [('move_forward', 60, 1.0), ('turn_left', 50, 0.4), ('curve_right', 70, 0.5, 1.2), ('stop', 0.3)]
+            wait: True면 끝날 때까지 대기, False면 바로 반환 (다른 작업을 하면서 handle.wait()/cancel())
+            queue: True면 진행 중인 동작 뒤에 이어서 실행 (False면 대체)
+
+        Returns:
+            MotionHandle
+        """
+        planned = []
+        for name, *args in steps:
+            if name not in self.MOTIONS or not args:
+                raise ValueError(f"Invalid motion step: {(name, *args)}")
+            left, right = self.MOTIONS[name](*args[:-1])
+            if name != 'stop':
+                left, right = self._apply_calibration(left, right)
+            planned.append((left, right, args[-1]))
+        return self._wait_motion(self.motion.submit(planned, queue=queue), wait)
+
+    def _run_motion(self, left: float, right: float, duration: float, wait: bool):
+        """duration이 0이면 계속 주행 (진행 중인 동작 대체), 아니면 타이머 스레드가 duration 후 정지"""
         if duration < 0.0:
             raise ValueError("Duration must be greater or equal to 0.0")
-        elif duration > 0.0:
-            time.sleep(duration); self.stop()
-        else:
-            return
+        if duration == 0.0:
+            self.motion.set(left, right)
+            return None
+        return self._wait_motion(self.motion.submit(((left, right, duration),)), wait)
+
+    @staticmethod
+    def _wait_motion(handle: motion_scheduler.MotionHandle, wait: bool) -> motion_scheduler.MotionHandle:
+        if not wait:
+            return handle
+        try:
+            handle.wait()  # 짧은 간격으로 깨어나므로 코드 중지가 바로 전달됨
+        except BaseException:
+            handle.cancel()  # 중지(SystemExit) 등: 동작 취소 후 정지
+            raise
+        return handle
 #endregion
 
 #region: Ultrasonic Sensor
@@ -320,20 +598,23 @@ class Findee:
         # Return
         # -1 : Trig Timeout
         # -2 : Echo Timeout
+        return self._sample_distance()
+
+    def _measure_distance(self):
         # Trigger
-        GPIO.output(self.TRIG, GPIO.HIGH)
+        self.gpio.output(self.TRIG, HIGH)
         time.sleep(0.00001)
-        GPIO.output(self.TRIG, GPIO.LOW)
+        self.gpio.output(self.TRIG, LOW)
 
         # Measure Distance
         t1 = time.time()
-        while GPIO.input(self.ECHO) is not GPIO.HIGH:
+        while self.gpio.input(self.ECHO) != HIGH:
             if time.time() - t1 > 0.1: # 100ms
                 return -1
 
         t1 = time.time()
 
-        while GPIO.input(self.ECHO) is not GPIO.LOW:
+        while self.gpio.input(self.ECHO) != LOW:
             if time.time() - t1 > 0.03: # 30ms
                 return -2
 
@@ -342,26 +623,285 @@ class Findee:
         # Measure Success
         distance = ((t2 - t1) * 34300) / 2
         return round(distance, 1)
+
+    def _sample_distance(self):
+        if session_recorder.active_player is not None:
+            return session_recorder.active_player.distance()
+        with self._ultrasonic_lock:
+            distance = self._measure_distance()
+        if session_recorder.active_recorder is not None:
+            session_recorder.active_recorder.distance(distance)
+        return distance
+#endregion
+
+#region: Control Loop
+    ULTRASONIC_INTERVAL: float = 0.06  # 핑 간격 (이전 에코의 잔향과 겹치지 않도록 60ms 이상)
+
+    def _sampler(self, name: str) -> control_loop.LatestSampler:
+        sampler = self._samplers.get(name)
+        if sampler is None:
+            if name == 'ultrasonic':
+                sampler = control_loop.LatestSampler(name, self._sample_distance, interval=self.ULTRASONIC_INTERVAL)
+            else:
+                sampler = control_loop.LatestSampler(name, self.get_frame_info)
+            sampler = self._samplers.setdefault(name, sampler)
+        return sampler
+
+    def control_loop(self, rate: float = 50.0, ultrasonic: bool = True, camera: bool = True,
+                     command=None) -> control_loop.ControlLoop:
+        """
+        고정 주기 제어 루프 생성 (초음파/카메라는 백그라운드에서 측정, 콜백은 최신 값을 바로 받음)
+
+        Args:
+            rate: 목표 주기 (Hz, 기본 50)
+            ultrasonic: 초음파 거리 측정 여부
+            camera: 카메라 프레임 캡처 여부
+            command: 조종 명령 함수 () -> (x, y) (None이면 get_command)
+
+        Returns:
+            ControlLoop (add로 콜백 등록 후 run/start, stats로 주기 초과/지터/단계별 시간 확인)
+        """
+        return control_loop.ControlLoop(rate,
+                                        ultrasonic=self._sampler('ultrasonic') if ultrasonic else None,
+                                        camera=self._sampler('camera') if camera else None,
+                                        command=command)
+#endregion
+
+#region: Recording
+    def start_recording(self, path=None, frames: str = 'jpeg', max_fps: float | None = None,
+                        quality: int = session_recorder.RECORD_QUALITY) -> session_recorder.Recorder:
+        """
+        카메라 프레임, get_command, get_distance, control_motors 기록 시작 (쓰기는 백그라운드 스레드)
+
+        Args:
+            path: 기록 디렉터리 (None이면 ~/findee_recordings/<시각>)
+            frames: 'jpeg', 'raw' (원본), 'none' (센서/명령만)
+                    replay()로 같은 결과를 재현하려면 'raw' ('jpeg'는 손실 압축이라 색 임계값/검출 결과가 달라질 수 있음)
+            max_fps: 프레임 기록 최대 fps (None이면 모든 프레임)
+            quality: JPEG 품질
+
+        Returns:
+            Recorder (stop_recording()으로 종료)
+        """
+        return session_recorder.Recorder(path, frames=frames, quality=quality, max_fps=max_fps,
+                                         clock=_now_ns).start()
+
+    def stop_recording(self) -> dict | None:
+        """기록 종료 (버퍼에 남은 레코드를 모두 쓴 뒤 반환), 기록 중이 아니면 None"""
+        recorder = session_recorder.active_recorder
+        return recorder.stop() if recorder is not None else None
+
+    def replay(self, path, speed: float | None = None) -> session_recorder.Player:
+        """
+        기록 재생: get_frame/get_frame_info/get_distance/get_command가 기록된 값을 반환하고
+        control_motors는 모터 대신 출력만 모음 (라즈베리파이 없이 sim 백엔드에서도 사용 가능)
+
+        프레임은 기록 형식 그대로 반환: start_recording(frames='raw')로 기록해야 카메라가 준 배열과 같음
+        ('jpeg' 기록은 디코딩한 근사값)
+
+        Args:
+            path: 기록 디렉터리
+            speed: None이면 대기 없이 최대 속도 (time.sleep도 가상 시계), 1.0이면 기록 속도
+
+        Returns:
+            Player (close()로 종료, stats()로 재생 속도와 모터 출력 비교)
+        """
+        return session_recorder.Player(path, speed=speed).attach()
+#endregion
+
+#region: Inference
+    def start_inference(self, model, size: tuple[int, int] = inference.DEFAULT_SIZE, gray: bool = False,
+                        postprocess=None, threads: int | None = None, **options) -> inference.InferenceService:
+        """
+        모델을 한 번 로드하고 전용 스레드에서 최신 프레임으로 계속 추론 (사용자 루프는 get_inference()로 마지막 결과만 읽음)
+
+        Args:
+            model: 모델 파일 (.tflite → TFLite, .onnx/.pb 등 → cv2.dnn) 또는 image -> 결과 함수
+            size: 모델에 넣을 이미지 크기 (카메라 lores 스트림을 이 크기로 켜서 ISP가 축소)
+            gray: True면 흑백 입력 (lores의 Y 평면을 변환 없이 사용)
+            postprocess: (출력, FrameInfo) -> 결과값 (작업 스레드에서 실행, 예: 박스/클래스 추출)
+            threads: 모델 실행 스레드 수 (None이면 백엔드 기본값)
+            options: 모델 백엔드 옵션 (cv2.dnn: input_size, scale, mean, swap_rb / TFLite: mean, scale, swap_rb)
+
+        Returns:
+            InferenceService (latest(), wait_newer(version), stats())
+        """
+        self.stop_inference()
+        loaded = inference.load_model(model, threads=threads, **options)
+        self._enable_lores(size)
+        service = inference.InferenceService(loaded, self.get_frame_info, _now_ns, size=size, gray=gray,
+                                              postprocess=postprocess)
+        self._inference = service
+        self._inference_owner = threading.current_thread()
+        return service.start()
+
+    def stop_inference(self, owner: threading.Thread | None = None):
+        """추론 종료 (owner를 주면 그 스레드가 시작한 추론만: 다른 세션의 코드 실행은 유지)"""
+        if owner is not None and self._inference_owner is not owner:
+            return
+        service, self._inference = self._inference, None
+        self._inference_owner = None
+        if service is not None:
+            service.stop()
+
+    def get_inference(self) -> inference.InferenceResult | None:
+        """마지막 추론 결과 (대기 없음, 추론 서비스가 없거나 아직 결과가 없으면 None)"""
+        service = self._inference
+        return service.latest() if service is not None else None
+
+    def _enable_lores(self, size: tuple[int, int]):
+        """카메라 lores 스트림을 size로 설정 (main보다 크면 사용 안 함: main을 축소해서 사용)"""
+        with self._camera_lock:
+            main_w, main_h = self.config["main"]["size"]
+            lores = self.config.get("lores")
+            if size[0] > main_w or size[1] > main_h:
+                return
+            if lores and tuple(lores["size"]) == tuple(size):
+                return
+            self._reconfigure_camera({**self.config, "lores": {"size": tuple(size), "format": "YUV420"}})
+#endregion
+
+#region: LAN server
+    def start_lan_server(self, port: int | None = None, fps: float | None = None, encode=None,
+                         app_hooks=(), **options) -> lan_server.LanServer:
+        """
+        같은 네트워크에서 접속하는 로컬 HTTP 서버 시작 (/stream.mjpg, /snapshot.jpg, /stats)
+
+        Args:
+            port: 포트 (None이면 설정 저장소의 lan.port)
+            fps: 최대 인코딩 fps (None이면 lan.fps)
+            encode: encode(image, quality) -> bytes | None (None이면 OpenCV)
+            app_hooks: hook(app) 목록, 시작할 때 aiohttp 앱에 라우트 추가 (LAN 조종: LanControl.setup_app)
+            options: host, quality, max_clients, stall_timeout, token (기본 lan.token, lan.public이면 토큰 없이 공개)
+
+        Returns:
+            LanServer (stats()로 클라이언트별 fps/전송량)
+        """
+        self.stop_lan_server()
+        defaults = settings.store.get(LanSettings)
+        options.setdefault('host', defaults.host)
+        options.setdefault('max_clients', defaults.max_clients)
+        if 'token' not in options:
+            options['token'] = None if defaults.public else lan_server.ensure_token()
+        server = lan_server.LanServer(self.get_frame_info, encode, _now_ns,
+                                      port=defaults.port if port is None else port,
+                                      fps=fps or defaults.fps, **options)
+        for hook in app_hooks:
+            server.add_app_hook(hook)
+        return server.start()
+
+    def stop_lan_server(self):
+        server = lan_server.active_server
+        if server is not None:
+            server.stop()
+#endregion
+
+#region: Thermal governor
+    def start_thermal_governor(self, **options) -> thermal_governor.ThermalGovernor:
+        """
+        온도/CPU/스로틀 플래그를 보고 카메라 fps, JPEG 품질 상한, 텔레메트리 주기를 미리 낮추는 조절기 시작
+
+        Args:
+            options: thresholds (warm, hot, critical °C), interval (측정 주기 초), reader
+                     (기본값은 설정 저장소의 thermal.*)
+
+        Returns:
+            ThermalGovernor (policy로 현재 단계, stats()로 측정값과 최근 결정)
+        """
+        self.stop_thermal_governor()
+        defaults = settings.store.get(ThermalSettings)
+        options.setdefault('thresholds', (defaults.warm, defaults.hot, defaults.critical))
+        options.setdefault('interval', defaults.interval)
+        governor = thermal_governor.ThermalGovernor(**options)
+        governor.add_listener(self._apply_thermal_policy)
+        return governor.start()
+
+    def stop_thermal_governor(self):
+        """조절기 중지 (상한 해제)"""
+        governor = thermal_governor.active_governor
+        if governor is not None:
+            governor.stop()
+
+    def _apply_thermal_policy(self, policy: dict):
+        stream_control.ceiling.quality = policy['quality']
+        stream_control.ceiling.fps = policy['camera_fps']
+        with self._camera_lock:
+            self._fps_cap = policy['camera_fps']
+            if self.__dict__.get('camera') is not None:   # 카메라 초기화 전이면 camera_init에서 적용
+                self._apply_fps()
+
+    def _target_fps(self) -> int:
+        """set_fps로 요청한 fps와 온도 조절 상한 중 작은 값"""
+        return min(self.camera_fps, self._fps_cap) if self._fps_cap else self.camera_fps
+
+    def _apply_fps(self):
+        """실행 중 프레임 시간만 변경 (카메라 재시작 없음)"""
+        fps = self._target_fps()
+        if fps == self._applied_fps:
+            return
+        frame_duration = 1000000 // fps
+        with self._camera_lock:
+            self.camera.set_controls({"FrameDurationLimits": (frame_duration, frame_duration)})
+            self._applied_fps = fps
 #endregion
 
 #region: Cameras
     def get_frame(self):
-        return self.camera.capture_array("main").copy()
+        return self.get_frame_info().image
+
+    def get_frame_info(self) -> FrameInfo:
+        """프레임과 캡처 메타데이터(SensorTimestamp, FrameDuration, 프레임 번호)를 함께 반환"""
+        if session_recorder.active_player is not None:
+            return session_recorder.active_player.frame()
+        camera = self.camera  # 초기화 대기는 잠금 밖에서
+        with self._camera_lock:
+            request = camera.capture_request()
+            try:
+                image = request.make_array("main")
+                lores = request.make_array("lores") if self._inference is not None and self.config.get("lores") else None
+                metadata = request.get_metadata()
+                sequence = getattr(getattr(request, 'request', None), 'sequence', None)
+            finally:
+                request.release()
+
+        if sequence is None:
+            sequence = self._frame_sequence + 1
+        self._frame_sequence = sequence
+
+        frame = FrameInfo(
+            image,
+            timestamp_ns=metadata.get('SensorTimestamp') or _now_ns(),
+            frame_duration_us=metadata.get('FrameDuration'),
+            exposure_us=metadata.get('ExposureTime'),
+            sequence=sequence,
+            lores=lores
+        )
+        self.latency.mark_frame(frame)
+        startup.profile.mark('first_frame')
+        if session_recorder.active_recorder is not None:
+            session_recorder.active_recorder.frame(frame)
+        if self._inference is not None:
+            self._inference.offer(frame)
+        if lan_server.active_server is not None:
+            lan_server.active_server.offer(frame)
+        return frame
+
+    def get_latency_stats(self) -> dict:
+        """캡처 → 사용자 코드 → 모터 명령 지연 시간 통계 (ms)"""
+        return self.latency.stats()
 
     def mjpeg_gen(self):
         while True:
             # RGB 프레임 -> BGR로 변환(OpenCV는 BGR 기준)
-            arr = self.camera.capture_array("main").copy()
+            camera = self.camera
+            with self._camera_lock:
+                arr = camera.capture_array("main").copy()
 
-            ok, buf = cv2.imencode('.jpg', arr, [int(cv2.IMWRITE_JPEG_QUALITY), 70])
+            quality = settings.store.get(EncoderSettings).mjpeg_quality
+            ok, buf = cv2.imencode('.jpg', arr, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
             if not ok:
                 continue
-            jpg = buf.tobytes()
-
-            yield (b"--frame\r\n"
-                b"Content-Type: image/jpeg\r\n"
-                b"Content-Length: " + str(len(jpg)).encode() + b"\r\n\r\n" +
-                jpg + b"\r\n")
+            yield lan_server.mjpeg_part(buf.tobytes())
 
             # 과도한 CPU 점유 방지
             time.sleep(0.001)
@@ -375,31 +915,47 @@ class Findee:
             print("DEBUG: ERR: FPS는 60 이하여야 합니다.")
             return
 
-        frame_duration = 1000000 // fps
-        current_controls = self.camera.camera_controls
-        current_controls["FrameDurationLimits"] = (frame_duration, frame_duration)
-
-        self.camera.stop()
-        self.camera.set_controls(current_controls)
-        self.camera.start()
-
-        print(f"DEBUG: 카메라 FPS가 약 {fps}로 변경되었습니다.")
+        self.camera_fps = fps
+        applied = self._target_fps()
+        frame_duration = 1000000 // applied
+        camera = self.camera
+        with self._camera_lock:
+            current_controls = camera.camera_controls
+            current_controls["FrameDurationLimits"] = (frame_duration, frame_duration)
+
+            camera.stop()
+            camera.set_controls(current_controls)
+            camera.start()
+            self._applied_fps = applied
+
+        if applied != fps:
+            print(f"DEBUG: 카메라 FPS가 약 {applied}로 변경되었습니다 (요청 {fps}, 온도 조절 상한).")
+        else:
+            print(f"DEBUG: 카메라 FPS가 약 {fps}로 변경되었습니다.")
 
     @debug_decorator
     def set_resolution(self, resolution: tuple[int, int]):
-        if self.config["main"]["size"] == resolution:
-            return
-
-        new_config = self.config.copy()
-        new_config["main"]["size"] = resolution
+        with self._camera_lock:
+            if self.config["main"]["size"] == resolution:
+                return
 
-        self.camera.stop()
-        self.camera.configure(new_config)
-        self.camera.start()
-
-        self.config = new_config
+            self._reconfigure_camera({**self.config, "main": {**self.config["main"], "size": resolution}})
 
         print(f"DEBUG: 카메라 해상도가 {resolution}으로 변경되었습니다.")
+
+    def _reconfigure_camera(self, new_config: dict):
+        """새 설정으로 카메라 재시작 (configure는 설정의 controls로 되돌리므로 현재 fps/온도 조절 상한을 설정에 넣음)"""
+        fps = self._target_fps()
+        frame_duration = 1000000 // fps
+        new_config = {**new_config, "controls": {**new_config.get("controls", {}),
+                                                 "FrameDurationLimits": (frame_duration, frame_duration)}}
+        camera = self.camera
+        with self._camera_lock:
+            camera.stop()
+            camera.configure(new_config)
+            camera.start()
+            self.config = new_config
+            self._applied_fps = fps
 #endregion
 
 #region: Image Processing
@@ -480,18 +1036,61 @@ class Findee:
         else:
             return 0
 
+    def create_marker_tracker(self, dictionary: str = marker_tracker.DEFAULT_DICTIONARY,
+                              marker_length: float | None = None, intrinsics=None,
+                              search_interval: int = marker_tracker.SEARCH_INTERVAL,
+                              **options) -> marker_tracker.MarkerTracker:
+        """
+        ArUco/AprilTag 마커 추적기 (전체 화면은 search_interval 프레임마다, 그 사이는 예측 ROI만 검색)
+
+        Args:
+            dictionary: cv2.aruco 사전 이름 (예: 'DICT_4X4_50', 'DICT_APRILTAG_36h11')
+            marker_length: 마커 한 변 길이 (m), 내부 파라미터 파일과 함께 있으면 거리/방위각 계산
+            intrinsics: 카메라 내부 파라미터 파일 (None이면 설정 디렉터리의 camera_intrinsics.json/.yaml)
+            search_interval: 전체 화면 검색 주기 (프레임)
+            options: roi_margin, search_scale, refine
+
+        Returns:
+            MarkerTracker (update()로 프레임 처리, stats()로 처리 시간)
+        """
+        return marker_tracker.MarkerTracker(dictionary, marker_length=marker_length, intrinsics=intrinsics,
+                                            search_interval=search_interval, capture=self.get_frame_info, **options)
+
+    def create_blob_tracker(self, bounds, min_area: float = blob_tracker.MIN_AREA,
+                            **options) -> blob_tracker.BlobTracker:
+        """
+        색 덩어리 추적기 (칼만 필터로 예측한 위치 주변 창만 검색, 놓쳤을 때만 전체 화면 검색)
+
+        Args:
+            bounds: HSV 범위 [h_min, h_max, s_min, s_max, v_min, v_max] (mask_image와 같은 형식, get_slider 값)
+            min_area: 덩어리 최소 면적 (px)
+            options: window_scale, max_lost, process_noise, measurement_noise
+
+        Returns:
+            BlobTracker (update()로 프레임 처리 → Blob 위치/속도/크기, set_bounds()로 범위 변경)
+        """
+        return blob_tracker.BlobTracker(bounds, min_area=min_area, capture=self.get_frame_info, **options)
+
 #endregion
 
 #region: others
     @debug_decorator
     def cleanup(self):
+        control_loop.stop_all()
+        if session_recorder.active_recorder is not None: session_recorder.active_recorder.stop()
+        self.stop_inference()
+        self.stop_lan_server()
+        self.stop_thermal_governor()
+        if 'motion' in self.__dict__: self.motion.close()
+
         # GPIO Cleanup
         self.control_motors(0.0, 0.0)
         if hasattr(self, 'rightPWM'): self.rightPWM.stop()
         if hasattr(self, 'leftPWM'): self.leftPWM.stop()
-        GPIO.output((self.IN1, self.IN2, self.ENA, self.IN3, self.IN4,
-                    self.ENB, self.TRIG), GPIO.LOW)
-        GPIO.cleanup()
+        if hasattr(self, 'gpio'):
+            self.gpio.output((self.IN1, self.IN2, self.ENA, self.IN3, self.IN4,
+                              self.ENB, self.TRIG), LOW)
+            self.gpio.cleanup()
 
         # Camera Cleanup
         if hasattr(self, 'camera'):
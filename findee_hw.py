@@ -0,0 +1,524 @@
+from __future__ import annotations
+
+# Findee 하드웨어 백엔드 (GPIO, PWM, 카메라)
+# FINDEE_BACKEND 환경 변수로 선택
+#   rpi   : RPi.GPIO + Picamera2 (기본값, 라즈베리파이, 소프트웨어 PWM)
+#   lgpio : lgpio(gpiochip) + 커널 하드웨어 PWM(/sys/class/pwm) + Picamera2
+#           방향 핀은 한 그룹으로 묶어 시스템 콜 한 번에 씀, PWM 스레드 없음
+#           하드웨어 PWM은 /boot/firmware/config.txt에 dtoverlay=pwm-2chan,pin=12,func=4,pin2=13,func2=4 필요
+#           (없으면 lgpio 소프트웨어 PWM으로 대체)
+#   sim   : 시뮬레이션 (x86 리눅스/CI에서 벤치마크용)
+# 시뮬레이션 옵션
+#   FINDEE_SIM_FPS      : 합성 프레임 FPS 고정 (설정 시 카메라 FPS 설정 무시, 미설정 시 FrameDurationLimits를 따름)
+#   FINDEE_SIM_DISTANCE : 초음파 모델 거리 cm (기본 50.0, 음수면 에코 없음)
+# lgpio 옵션
+#   FINDEE_GPIOCHIP     : gpiochip 번호 (기본 0)
+#   FINDEE_PWMCHIP      : /sys/class/pwm 아래 pwmchip 번호 (미설정 시 자동 선택)
+
+import os
+import glob
+import time
+import threading
+from collections import deque
+
+import startup
+
+np = startup.LazyModule('numpy')  # 시뮬레이션 백엔드에서만 사용
+
+HIGH = 1
+LOW = 0
+
+BACKEND_ENV = 'FINDEE_BACKEND'
+DEFAULT_BACKEND = 'rpi'
+
+def backend_name(name: str | None = None) -> str:
+    return (name or os.environ.get(BACKEND_ENV) or DEFAULT_BACKEND).lower()
+
+def _as_tuple(value) -> tuple:
+    return tuple(value) if isinstance(value, (list, tuple)) else (value,)
+
+#region: GPIO
+class GPIOBackend:
+    """GPIO/PWM 백엔드 공통 인터페이스 (PWM 객체는 RPi.GPIO.PWM과 같은 start/ChangeDutyCycle/stop 제공)"""
+    name = 'base'
+
+    def setup_outputs(self, pins):
+        raise NotImplementedError
+
+    def setup_input(self, pin: int):
+        raise NotImplementedError
+
+    def output(self, pins, values):
+        raise NotImplementedError
+
+    def input(self, pin: int) -> int:
+        raise NotImplementedError
+
+    def PWM(self, pin: int, frequency: float):
+        raise NotImplementedError
+
+    def setup_group(self, pins):
+        """여러 출력 핀을 한 그룹으로 (output에 함께 넘기면 한 번에 씀, 지원하지 않는 백엔드는 무시)"""
+        pass
+
+    def attach_ultrasonic(self, trig: int, echo: int):
+        """초음파 센서 핀 등록 (시뮬레이션 에코 모델용, 실제 하드웨어에서는 무시)"""
+        pass
+
+    def cleanup(self):
+        pass
+
+class RPiGPIOBackend(GPIOBackend):
+    name = 'rpi'
+
+    def __init__(self):
+        import RPi.GPIO as GPIO
+        self._GPIO = GPIO
+        GPIO.setwarnings(False)
+        GPIO.setmode(GPIO.BCM)
+
+    def setup_outputs(self, pins):
+        self._GPIO.setup(_as_tuple(pins), self._GPIO.OUT, initial=self._GPIO.LOW)
+
+    def setup_input(self, pin: int):
+        self._GPIO.setup(pin, self._GPIO.IN, pull_up_down=self._GPIO.PUD_DOWN)
+
+    def output(self, pins, values):
+        self._GPIO.output(pins, values)
+
+    def input(self, pin: int) -> int:
+        return self._GPIO.input(pin)
+
+    def PWM(self, pin: int, frequency: float):
+        return self._GPIO.PWM(pin, frequency)
+
+    def cleanup(self):
+        self._GPIO.cleanup()
+
+#region: lgpio + 하드웨어 PWM
+# BCM 핀 -> PWM 채널 (라즈베리파이 3/4/Zero 2: PWM0 2채널, 5: RP1 4채널)
+HW_PWM_CHANNELS = {12: 0, 18: 0, 13: 1, 19: 1}
+HW_PWM_CHANNELS_RP1 = {12: 0, 13: 1, 18: 2, 19: 3}
+PWM_SYSFS = '/sys/class/pwm'
+
+def find_pwm_chip() -> tuple[str, dict] | None:
+    """(pwmchip 경로, 핀 -> 채널), 하드웨어 PWM이 없으면 None"""
+    chips = sorted(glob.glob(f'{PWM_SYSFS}/pwmchip*'))
+    if os.environ.get('FINDEE_PWMCHIP'):
+        chips = [f"{PWM_SYSFS}/pwmchip{os.environ['FINDEE_PWMCHIP']}"]
+    for chip in chips:
+        try:
+            with open(f'{chip}/npwm') as f:
+                npwm = int(f.read())
+        except (OSError, ValueError):
+            continue
+        if npwm >= 4:
+            return chip, HW_PWM_CHANNELS_RP1
+        if npwm >= 2:
+            return chip, HW_PWM_CHANNELS
+    return None
+
+class HardwarePWM:
+    """커널 하드웨어 PWM (RPi.GPIO.PWM과 같은 start/ChangeDutyCycle/ChangeFrequency/stop)
+    duty_cycle 파일은 열어 둔 fd에 pwrite (명령당 시스템 콜 한 번, 같은 값이면 생략)
+    """
+    def __init__(self, chip: str, channel: int, frequency: float):
+        self.path = f'{chip}/pwm{channel}'
+        if not os.path.isdir(self.path):
+            with open(f'{chip}/export', 'w') as f:
+                f.write(str(channel))
+            # udev가 권한을 바꿀 때까지 대기
+            deadline = time.monotonic() + 1.0
+            while not os.access(f'{self.path}/duty_cycle', os.W_OK) and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self._duty_fd = os.open(f'{self.path}/duty_cycle', os.O_WRONLY)
+        self._duty_ns: int | None = None
+        self.duty: float = 0.0
+        self.frequency: float = 0.0
+        self.ChangeFrequency(frequency)
+
+    def _write(self, name: str, value: int):
+        with open(f'{self.path}/{name}', 'w') as f:
+            f.write(str(value))
+
+    def _write_duty(self, duty_ns: int):
+        if duty_ns != self._duty_ns:
+            os.pwrite(self._duty_fd, str(duty_ns).encode(), 0)
+            self._duty_ns = duty_ns
+
+    def start(self, duty: float):
+        self.ChangeDutyCycle(duty)
+        self._write('enable', 1)
+
+    def ChangeDutyCycle(self, duty: float):
+        self.duty = float(duty)
+        self._write_duty(int(self._period_ns * max(0.0, min(100.0, self.duty)) / 100))
+
+    def ChangeFrequency(self, frequency: float):
+        # period보다 큰 duty는 거부되므로 duty를 먼저 0으로
+        self.frequency = float(frequency)
+        self._period_ns = int(1e9 / self.frequency)
+        self._write_duty(0)
+        self._write('period', self._period_ns)
+        self.ChangeDutyCycle(self.duty)
+
+    def stop(self):
+        self._write_duty(0)
+        self._write('enable', 0)
+
+    def close(self):
+        try:
+            self.stop()
+        finally:
+            os.close(self._duty_fd)
+
+class LGPIOSoftPWM:
+    """하드웨어 PWM 채널이 없는 핀: lgpio tx_pwm (lgpio 내부 스레드에서 생성)"""
+    def __init__(self, lgpio, handle: int, pin: int, frequency: float):
+        self._lg = lgpio
+        self._handle = handle
+        self.pin = pin
+        self.frequency: float = float(frequency)
+        self.duty: float = 0.0
+
+    def start(self, duty: float):
+        self.ChangeDutyCycle(duty)
+
+    def ChangeDutyCycle(self, duty: float):
+        duty = float(duty)
+        if duty != self.duty:
+            self.duty = duty
+            self._lg.tx_pwm(self._handle, self.pin, self.frequency, duty)
+
+    def ChangeFrequency(self, frequency: float):
+        self.frequency = float(frequency)
+        self._lg.tx_pwm(self._handle, self.pin, self.frequency, self.duty)
+
+    def stop(self):
+        self.duty = 0.0
+        self._lg.tx_pwm(self._handle, self.pin, self.frequency, 0)
+
+    def close(self):
+        self.stop()
+
+class LGPIOBackend(GPIOBackend):
+    name = 'lgpio'
+
+    def __init__(self, chip: int | None = None):
+        import lgpio
+        self._lg = lgpio
+        if chip is None:
+            chip = int(os.environ.get('FINDEE_GPIOCHIP', 0))
+        self._handle = lgpio.gpiochip_open(chip)
+        self._groups: dict[int, tuple[int, int]] = {}   # 출력 핀 -> (그룹 대표 핀, 비트 위치)
+        self._group_leaders: set[int] = set()           # setup_group으로 묶은 그룹의 대표 핀
+        self._pwms: dict[int, object] = {}
+        self._pwm_chip = find_pwm_chip()
+        # 하드웨어 PWM 핀은 PWM 기능으로 둠 (GPIO 출력으로 잡으면 핀 기능이 바뀜)
+        self._hw_pwm_pins = set(self._pwm_chip[1]) if self._pwm_chip else set()
+        if self._pwm_chip is None:
+            print("하드웨어 PWM 없음: lgpio 소프트웨어 PWM 사용 (config.txt에 dtoverlay=pwm-2chan 필요)")
+
+    def setup_outputs(self, pins):
+        for pin in _as_tuple(pins):
+            if pin in self._hw_pwm_pins or pin in self._groups:
+                continue
+            self._lg.gpio_claim_output(self._handle, pin, LOW)
+            self._groups[pin] = (pin, 0)
+
+    def setup_group(self, pins):
+        pins = _as_tuple(pins)
+        for pin in pins:
+            if self._groups.get(pin) == (pin, 0):
+                self._lg.gpio_free(self._handle, pin)
+        self._lg.group_claim_output(self._handle, list(pins), [LOW] * len(pins))
+        self._group_leaders.add(pins[0])
+        for bit, pin in enumerate(pins):
+            self._groups[pin] = (pins[0], bit)
+
+    def setup_input(self, pin: int):
+        self._lg.gpio_claim_input(self._handle, pin, self._lg.SET_PULL_DOWN)
+
+    def output(self, pins, values):
+        pins = _as_tuple(pins)
+        values = _as_tuple(values) if isinstance(values, (list, tuple)) else (values,) * len(pins)
+        writes: dict[int, list[int]] = {}   # 그룹 대표 핀 -> [bits, mask]
+        for pin, value in zip(pins, values):
+            group = self._groups.get(pin)
+            if group is None:
+                continue  # 하드웨어 PWM 핀 (duty로 제어)
+            leader, bit = group
+            write = writes.setdefault(leader, [0, 0])
+            if value:
+                write[0] |= 1 << bit
+            write[1] |= 1 << bit
+        for leader, (bits, mask) in writes.items():
+            self._lg.group_write(self._handle, leader, bits, mask)
+
+    def input(self, pin: int) -> int:
+        return self._lg.gpio_read(self._handle, pin)
+
+    def PWM(self, pin: int, frequency: float):
+        if pin in self._hw_pwm_pins:
+            chip, channels = self._pwm_chip
+            pwm = HardwarePWM(chip, channels[pin], frequency)
+        else:
+            if pin not in self._groups:
+                self.setup_outputs(pin)
+            pwm = LGPIOSoftPWM(self._lg, self._handle, pin, frequency)
+        self._pwms[pin] = pwm
+        return pwm
+
+    def cleanup(self):
+        for pwm in self._pwms.values():
+            try:
+                pwm.close()
+            except OSError:
+                pass
+        self._pwms.clear()
+        for pin, (leader, _) in self._groups.items():
+            if leader != pin:
+                continue
+            try:
+                if pin in self._group_leaders:
+                    self._lg.group_free(self._handle, pin)
+                else:
+                    self._lg.gpio_free(self._handle, pin)
+            except Exception:
+                pass
+        self._groups.clear()
+        self._group_leaders.clear()
+        self._lg.gpiochip_close(self._handle)
+#endregion
+
+class SimPWM:
+    """가상 PWM: duty 변경 이력을 기록"""
+    def __init__(self, pin: int, frequency: float, history: int = 1000):
+        self.pin = pin
+        self.frequency = frequency
+        self.duty: float = 0.0
+        self.running: bool = False
+        self.history: deque = deque(maxlen=history)  # (monotonic time, duty)
+
+    def start(self, duty: float):
+        self.running = True
+        self.ChangeDutyCycle(duty)
+
+    def ChangeDutyCycle(self, duty: float):
+        self.duty = float(duty)
+        self.history.append((time.monotonic(), self.duty))
+
+    def ChangeFrequency(self, frequency: float):
+        self.frequency = frequency
+
+    def stop(self):
+        self.running = False
+        self.duty = 0.0
+
+class SimGPIOBackend(GPIOBackend):
+    """가상 GPIO: 출력 레벨/PWM duty 기록, 초음파 에코 모델"""
+    name = 'sim'
+    ECHO_DELAY = 0.0005  # 트리거 후 에코 시작까지 (8펄스 버스트)
+
+    def __init__(self, distance_cm: float | None = None):
+        if distance_cm is None:
+            distance_cm = float(os.environ.get('FINDEE_SIM_DISTANCE', 50.0))
+        self.distance_cm: float = distance_cm
+        self.levels: dict[int, int] = {}
+        self.pwms: dict[int, SimPWM] = {}
+        self.output_calls: int = 0
+        self._trig: int | None = None
+        self._echo: int | None = None
+        self._trigger_time: float | None = None
+
+    def set_distance(self, distance_cm: float):
+        self.distance_cm = distance_cm
+
+    def setup_outputs(self, pins):
+        for pin in _as_tuple(pins):
+            self.levels[pin] = LOW
+
+    def setup_input(self, pin: int):
+        self.levels[pin] = LOW
+
+    def attach_ultrasonic(self, trig: int, echo: int):
+        self._trig, self._echo = trig, echo
+
+    def output(self, pins, values):
+        self.output_calls += 1
+        pins = _as_tuple(pins)
+        values = _as_tuple(values) if isinstance(values, (list, tuple)) else (values,) * len(pins)
+        for pin, value in zip(pins, values):
+            if pin == self._trig and self.levels.get(pin) == HIGH and value == LOW:
+                # 트리거 하강 에지 (get_distance는 time.time() 기준으로 측정)
+                self._trigger_time = time.time()
+            self.levels[pin] = HIGH if value else LOW
+
+    def input(self, pin: int) -> int:
+        if pin != self._echo or self._trigger_time is None or self.distance_cm < 0:
+            return self.levels.get(pin, LOW)
+        elapsed = time.time() - self._trigger_time
+        start = self.ECHO_DELAY
+        end = start + (self.distance_cm * 2) / 34300
+        if elapsed < start:
+            return LOW
+        if elapsed < end:
+            return HIGH
+        self._trigger_time = None
+        return LOW
+
+    def PWM(self, pin: int, frequency: float):
+        pwm = SimPWM(pin, frequency)
+        self.pwms[pin] = pwm
+        return pwm
+
+    def cleanup(self):
+        for pwm in self.pwms.values():
+            pwm.stop()
+        self.levels = {pin: LOW for pin in self.levels}
+
+def create_gpio(name: str | None = None) -> GPIOBackend:
+    name = backend_name(name)
+    if name == 'rpi':
+        return RPiGPIOBackend()
+    if name == 'lgpio':
+        return LGPIOBackend()
+    if name == 'sim':
+        return SimGPIOBackend()
+    raise ValueError(f"알 수 없는 하드웨어 백엔드: {name}")
+#endregion
+
+#region: Camera
+class _SimLibcameraRequest:
+    __slots__ = ('sequence',)
+
+    def __init__(self, sequence: int):
+        self.sequence = sequence
+
+class SimCompletedRequest:
+    """Picamera2 CompletedRequest 대체 (make_array/get_metadata/release)"""
+    def __init__(self, arrays: dict, metadata: dict, sequence: int):
+        self._arrays = arrays
+        self._metadata = metadata
+        self.request = _SimLibcameraRequest(sequence)
+
+    def make_array(self, name: str = "main"):
+        return self._arrays[name].copy()
+
+    def get_metadata(self) -> dict:
+        return dict(self._metadata)
+
+    def release(self):
+        self._arrays = {}
+
+class SimCamera:
+    """Picamera2 대체: 설정된 FPS로 결정적인 합성 프레임 생성
+    프레임 내용은 프레임 번호에만 의존 (그라디언트 배경 + 움직이는 막대 + 신호등 색 사각형)
+    """
+    def __init__(self, fps: float | None = None):
+        if fps is None and os.environ.get('FINDEE_SIM_FPS'):
+            fps = float(os.environ['FINDEE_SIM_FPS'])
+        self._fixed_fps: bool = fps is not None
+        self._frame_duration_us: int = int(1000000 // (fps or 30))
+        self._lock = threading.Lock()
+        self._sequence: int = 0
+        self._next_time: float = 0.0
+        self._started: bool = False
+        self._background: dict[tuple, np.ndarray] = {}
+        self.config: dict | None = None
+        self.camera_controls: dict = {"FrameDurationLimits": (self._frame_duration_us, self._frame_duration_us)}
+
+    def create_video_configuration(self, main=None, lores=None, controls=None, queue=True, buffer_count=4, **kwargs):
+        config = {"main": dict(main or {"size": (640, 480), "format": "RGB888"}),
+                  "lores": dict(lores) if lores else None,
+                  "controls": dict(controls or {}),
+                  "queue": queue, "buffer_count": buffer_count}
+        config.update(kwargs)
+        return config
+
+    def configure(self, config: dict):
+        self.config = config
+        limits = config.get("controls", {}).get("FrameDurationLimits")
+        if limits:
+            self.set_controls({"FrameDurationLimits": limits})
+
+    def set_controls(self, controls: dict):
+        limits = controls.get("FrameDurationLimits")
+        if limits:
+            self.camera_controls["FrameDurationLimits"] = tuple(limits)
+            if not self._fixed_fps:
+                self._frame_duration_us = int(limits[0])
+
+    def start(self):
+        self._started = True
+        self._next_time = time.monotonic()
+
+    def stop(self):
+        self._started = False
+
+    def close(self):
+        self._started = False
+        self._background.clear()
+
+    def _render(self, size: tuple[int, int], sequence: int) -> np.ndarray:
+        w, h = size
+        bg = self._background.get(size)
+        if bg is None:
+            xs = np.linspace(0, 255, w, dtype=np.float32)
+            ys = np.linspace(0, 255, h, dtype=np.float32)
+            bg = np.empty((h, w, 3), dtype=np.uint8)
+            bg[..., 0] = xs[None, :].astype(np.uint8)
+            bg[..., 1] = ys[:, None].astype(np.uint8)
+            bg[..., 2] = 96
+            self._background[size] = bg
+        frame = bg.copy()
+        bar = max(4, w // 40)
+        x = (sequence * bar) % max(1, w - bar)
+        frame[:, x:x + bar] = 255
+        # 신호등: 60프레임마다 빨강/초록 전환 (BGR)
+        s = max(8, min(w, h) // 8)
+        frame[h // 8:h // 8 + s, w // 8:w // 8 + s] = (0, 0, 255) if (sequence // 60) % 2 else (0, 255, 0)
+        return frame
+
+    def capture_request(self) -> SimCompletedRequest:
+        with self._lock:
+            # 프레임 주기에 맞춰 대기 (queue=False처럼 항상 다음 프레임)
+            period = self._frame_duration_us / 1e6
+            now = time.monotonic()
+            if self._next_time > now:
+                time.sleep(self._next_time - now)
+            else:
+                self._next_time = now
+            self._next_time += period
+            self._sequence += 1
+            sequence = self._sequence
+
+        main = self.config["main"] if self.config else {"size": (640, 480)}
+        arrays = {"main": self._render(tuple(main["size"]), sequence)}
+        lores = self.config.get("lores") if self.config else None
+        if lores:
+            arrays["lores"] = self._render(tuple(lores["size"]), sequence)
+        timestamp = time.clock_gettime_ns(time.CLOCK_BOOTTIME) if hasattr(time, 'CLOCK_BOOTTIME') else time.monotonic_ns()
+        metadata = {
+            "SensorTimestamp": timestamp,
+            "FrameDuration": self._frame_duration_us,
+            "ExposureTime": min(self._frame_duration_us, 20000)
+        }
+        return SimCompletedRequest(arrays, metadata, sequence)
+
+    def capture_array(self, name: str = "main"):
+        request = self.capture_request()
+        try:
+            return request.make_array(name)
+        finally:
+            request.release()
+
+def create_camera(name: str | None = None):
+    name = backend_name(name)
+    if name in ('rpi', 'lgpio'):
+        from picamera2 import Picamera2
+        return Picamera2()
+    if name == 'sim':
+        return SimCamera()
+    raise ValueError(f"알 수 없는 하드웨어 백엔드: {name}")
+#endregion
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+# emit_image(..., mode='delta') 인코더
+# - 변경 없음: 샘플 비교로 판단, 아무것도 보내지 않음
+# - 이진 마스크 (cv2.inRange 결과 등 0/255 단일 채널): 1비트 패킹 + zlib (JPEG보다 훨씬 작음)
+# - 일부 변경: 변경된 타일의 경계 영역만 JPEG로 전송 (브라우저가 이전 프레임 위에 덮어 그림)
+# - 변경 영역이 크거나 키프레임 주기가 되면 전체 JPEG
+#
+# 브라우저 프로토콜 (공통 헤더: [타입(1)][widget_id 길이(1)][widget_id(가변)])
+#   0x01 image : [JPEG]                                  전체 프레임 (키프레임)
+#   0x03 mask  : [width u16][height u16][zlib(packbits)]  1비트 마스크, MSB 우선, 1 = 255
+#   0x04 tiles : [x u16][y u16][JPEG]                     (x, y) 위치에 부분 이미지 덮어쓰기
+
+import time
+import zlib
+import struct
+
+import startup
+
+cv2 = startup.LazyModule('cv2')
+np = startup.LazyModule('numpy')
+
+UNCHANGED = 'unchanged'
+FULL = 'full'
+MASK = 'mask'
+TILES = 'tiles'
+
+def is_binary_mask(image) -> bool:
+    if image.ndim != 2 or image.dtype != np.uint8:
+        return False
+    # 샘플로 먼저 걸러내고 전체 확인
+    sample = image[::16, ::16]
+    if not ((sample == 0) | (sample == 255)).all():
+        return False
+    return bool(((image == 0) | (image == 255)).all())
+
+def pack_mask(image) -> bytes:
+    height, width = image.shape
+    packed = np.packbits(image > 127)
+    return struct.pack('>HH', width, height) + zlib.compress(packed.tobytes(), 1)
+
+def unpack_mask(payload: bytes):
+    """pack_mask 역변환 (테스트/리플레이용)"""
+    width, height = struct.unpack_from('>HH', payload)
+    bits = np.unpackbits(np.frombuffer(zlib.decompress(payload[4:]), dtype=np.uint8), count=width * height)
+    return (bits.reshape(height, width) * 255).astype(np.uint8)
+
+class DeltaEncoder:
+    """widget + 품질 단계별 상태 (동기화된 수신자가 가진 프레임을 reference로 유지)"""
+    def __init__(self, tile: int = 32, threshold: float = 6.0, max_dirty_ratio: float = 0.5,
+                 keyframe_interval: float = 2.0):
+        self.tile = tile
+        self.threshold = threshold              # 타일 평균 차이 (0~255)
+        self.max_dirty_ratio = max_dirty_ratio  # 이보다 넓게 바뀌면 전체 프레임
+        self.keyframe_interval = keyframe_interval
+        self.reference = None
+        self.mask_crc: int | None = None
+        self.seq: int = 0
+        self._last_keyframe: float = 0.0
+        self.counts: dict[str, int] = {UNCHANGED: 0, FULL: 0, MASK: 0, TILES: 0}
+
+    def _result(self, kind: str, payload: bytes | None, base: int | None):
+        self.counts[kind] += 1
+        return kind, payload, base
+
+    def encode(self, image, quality: int, encode_jpeg):
+        """
+        Returns:
+            (kind, payload, base_seq)
+            base_seq: tiles/unchanged는 수신자가 이 seq 상태여야 적용 가능, full/mask는 None (단독 프레임)
+        """
+        now = time.monotonic()
+        keyframe_due = now - self._last_keyframe >= self.keyframe_interval
+
+        if is_binary_mask(image):
+            packed = pack_mask(image)
+            crc = zlib.crc32(packed)
+            if crc == self.mask_crc and not keyframe_due:
+                return self._result(UNCHANGED, None, self.seq)
+            self.mask_crc = crc
+            self.reference = None
+            self.seq += 1
+            self._last_keyframe = now
+            return self._result(MASK, packed, None)
+
+        self.mask_crc = None
+        reference = self.reference
+        if reference is None or reference.shape != image.shape or keyframe_due:
+            return self._keyframe(image, quality, encode_jpeg, now)
+
+        height, width = image.shape[:2]
+        grid_w, grid_h = -(-width // self.tile), -(-height // self.tile)
+        grid = cv2.resize(cv2.absdiff(image, reference), (grid_w, grid_h), interpolation=cv2.INTER_AREA)
+        if grid.ndim == 3:
+            grid = grid.max(axis=2)
+        dirty = grid > self.threshold
+        if not dirty.any():
+            return self._result(UNCHANGED, None, self.seq)
+
+        ys, xs = np.nonzero(dirty)
+        x0, x1 = int(xs.min()) * self.tile, min(width, (int(xs.max()) + 1) * self.tile)
+        y0, y1 = int(ys.min()) * self.tile, min(height, (int(ys.max()) + 1) * self.tile)
+        if (x1 - x0) * (y1 - y0) > self.max_dirty_ratio * width * height:
+            return self._keyframe(image, quality, encode_jpeg, now)
+
+        region = image[y0:y1, x0:x1]
+        jpeg = encode_jpeg(region, quality)
+        if jpeg is None:
+            return self._result(UNCHANGED, None, self.seq)
+        base = self.seq
+        reference[y0:y1, x0:x1] = region
+        self.seq += 1
+        return self._result(TILES, struct.pack('>HH', x0, y0) + jpeg, base)
+
+    def _keyframe(self, image, quality: int, encode_jpeg, now: float):
+        jpeg = encode_jpeg(image, quality)
+        if jpeg is None:
+            return self._result(UNCHANGED, None, self.seq)
+        self.reference = image.copy()
+        self.seq += 1
+        self._last_keyframe = now
+        return self._result(FULL, jpeg, None)
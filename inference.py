@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+# 온디바이스 추론 서비스 (Findee.start_inference)
+# - 모델은 한 번만 로드하고 전용 작업 스레드에서 실행 (사용자 루프는 결과를 기다리지 않음)
+# - 입력: 가장 최근 프레임의 lores 스트림 (ISP가 축소, YUV420이면 흑백은 Y 평면을 변환 없이 사용)
+#   사용자 코드가 get_frame_info로 받은 프레임을 공유하고, 추론하는 동안 쌓인 오래된 프레임은 건너뜀
+#   사용자 코드가 캡처하지 않으면 (또는 공유 프레임이 MAX_AGE_MS보다 오래되면) 작업 스레드가 직접 캡처
+# - 결과: 버전이 붙은 슬롯 하나 (latest()는 대기 없이 마지막 결과, wait_newer()는 새 결과까지 대기)
+#   캡처 시각, 추론 시작/끝 시각, 단계별 시간 (전처리, 추론, 후처리), 캡처 → 결과 지연
+# 모델: cv2.dnn이 읽는 파일 (.onnx, .pb, .caffemodel 등), TFLite (.tflite, tflite_runtime/ai_edge_litert/tensorflow),
+#       또는 image -> 결과 함수
+
+import time
+import threading
+from collections import deque
+
+import startup
+import control_loop
+
+cv2 = startup.LazyModule('cv2')
+np = startup.LazyModule('numpy')
+
+DEFAULT_SIZE = (320, 240)     # lores 스트림 크기
+MAX_AGE_MS = 100.0            # 공유 프레임이 이보다 오래되면 직접 캡처
+IDLE_TIMEOUT = 0.1            # 사용자 코드가 캡처 중일 때 공유 프레임을 기다리는 최대 시간 (초)
+
+#region 모델
+class CallableModel:
+    """image -> 결과 함수"""
+    def __init__(self, func):
+        self.func = func
+        self.name = getattr(func, '__name__', 'callable')
+
+    def run(self, image):
+        return self.func(image)
+
+class DnnModel:
+    """OpenCV DNN (blobFromImage로 크기/정규화, 출력 레이어 전체 반환)"""
+    def __init__(self, path: str, config: str | None = None, input_size: tuple[int, int] = (300, 300),
+                 scale: float = 1 / 127.5, mean=(127.5, 127.5, 127.5), swap_rb: bool = True, threads: int | None = None):
+        if threads:
+            cv2.setNumThreads(threads)
+        self.net = cv2.dnn.readNet(path, config or '')
+        self.name = path.rsplit('/', 1)[-1]
+        self.input_size = tuple(input_size)
+        self.scale = scale
+        self.mean = mean
+        self.swap_rb = swap_rb
+        self._outputs = self.net.getUnconnectedOutLayersNames()
+
+    def run(self, image):
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        blob = cv2.dnn.blobFromImage(image, self.scale, self.input_size, self.mean, swapRB=self.swap_rb)
+        self.net.setInput(blob)
+        outputs = self.net.forward(self._outputs)
+        return outputs[0] if len(outputs) == 1 else outputs
+
+def _tflite_interpreter():
+    for module, attr in (('tflite_runtime.interpreter', 'Interpreter'), ('ai_edge_litert.interpreter', 'Interpreter'),
+                         ('tensorflow.lite', 'Interpreter')):
+        try:
+            return getattr(__import__(module, fromlist=[attr]), attr)
+        except ImportError:
+            continue
+    raise ImportError("TFLite 런타임이 없습니다 (pip install tflite-runtime)")
+
+class TFLiteModel:
+    """TFLite (입력 크기/형식은 모델에서 읽음, 양자화 모델은 uint8 그대로)"""
+    def __init__(self, path: str, threads: int | None = None, mean: float = 127.5, scale: float = 1 / 127.5,
+                 swap_rb: bool = True):
+        Interpreter = _tflite_interpreter()
+        self.interpreter = Interpreter(model_path=path, num_threads=threads)
+        self.interpreter.allocate_tensors()
+        self.name = path.rsplit('/', 1)[-1]
+        detail = self.interpreter.get_input_details()[0]
+        self._input = detail['index']
+        self._dtype = detail['dtype']
+        _, self.height, self.width, self.channels = detail['shape']
+        self._outputs = [output['index'] for output in self.interpreter.get_output_details()]
+        self.mean = mean
+        self.scale = scale
+        self.swap_rb = swap_rb
+
+    def run(self, image):
+        if image.shape[0] != self.height or image.shape[1] != self.width:
+            image = cv2.resize(image, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        if self.channels == 3 and image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+        elif self.channels == 3 and self.swap_rb:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        elif self.channels == 1 and image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if self._dtype == np.float32:
+            image = (image.astype(np.float32) - self.mean) * self.scale
+        tensor = image.reshape(1, self.height, self.width, self.channels).astype(self._dtype, copy=False)
+        self.interpreter.set_tensor(self._input, tensor)
+        self.interpreter.invoke()
+        outputs = [self.interpreter.get_tensor(index) for index in self._outputs]
+        return outputs[0] if len(outputs) == 1 else outputs
+
+def load_model(model, threads: int | None = None, **options):
+    """경로 확장자로 백엔드 선택 (.tflite → TFLite, 그 외 파일 → cv2.dnn), 함수면 그대로 사용"""
+    if callable(model):
+        return CallableModel(model)
+    if hasattr(model, 'run'):
+        return model
+    path = str(model)
+    if path.endswith('.tflite'):
+        return TFLiteModel(path, threads=threads, **options)
+    return DnnModel(path, threads=threads, **options)
+#endregion
+
+#region 결과
+class InferenceResult:
+    """추론 결과 하나 (슬롯에 통째로 교체되므로 읽는 쪽은 잠금 없이 일관된 값을 봄)"""
+    __slots__ = ('version', 'value', 'frame_sequence', 'frame_timestamp_ns', 'started_ns', 'finished_ns',
+                 'preprocess_ms', 'inference_ms', 'postprocess_ms')
+
+    def __init__(self, version: int, value, frame_sequence: int, frame_timestamp_ns: int, started_ns: int,
+                 finished_ns: int, preprocess_ms: float, inference_ms: float, postprocess_ms: float):
+        self.version = version                        # 1부터 증가
+        self.value = value                            # 모델 출력 (postprocess가 있으면 그 반환값)
+        self.frame_sequence = frame_sequence
+        self.frame_timestamp_ns = frame_timestamp_ns  # 입력 프레임 SensorTimestamp
+        self.started_ns = started_ns
+        self.finished_ns = finished_ns
+        self.preprocess_ms = preprocess_ms
+        self.inference_ms = inference_ms
+        self.postprocess_ms = postprocess_ms
+
+    @property
+    def latency_ms(self) -> float:
+        """캡처 → 결과"""
+        return (self.finished_ns - self.frame_timestamp_ns) / 1e6
+
+    def age_ms(self, now_ns: int) -> float:
+        """캡처 이후 경과 시간 (결과가 얼마나 오래된 장면인지)"""
+        return (now_ns - self.frame_timestamp_ns) / 1e6
+
+    def __repr__(self):
+        return (f"InferenceResult(v{self.version}, frame={self.frame_sequence}, "
+                f"inference={self.inference_ms:.1f}ms, latency={self.latency_ms:.1f}ms)")
+#endregion
+
+class InferenceService:
+    def __init__(self, model, capture, clock, size: tuple[int, int] = DEFAULT_SIZE, gray: bool = False,
+                 postprocess=None, max_age_ms: float = MAX_AGE_MS, window: int = 120):
+        """
+        Args:
+            model: load_model 결과 (run(image) 메서드)
+            capture: 직접 캡처할 때 호출 (Findee.get_frame_info)
+            clock: 프레임 SensorTimestamp와 같은 기준 시계 (ns)
+            size: 모델 입력으로 쓸 이미지 크기 (lores가 없으면 main을 이 크기로 축소)
+            gray: True면 흑백 입력 (YUV420 lores는 Y 평면 그대로)
+            postprocess: (출력, FrameInfo) -> 결과값 (작업 스레드에서 실행)
+        """
+        self.model = model
+        self._capture = capture
+        self._clock = clock
+        self.size = tuple(size)
+        self.gray = gray
+        self.postprocess = postprocess
+        self.max_age_ms = max_age_ms
+
+        self._offered = None                  # 공유받은 최신 프레임
+        self._last_offer_ns: int = 0
+        self._frame_ready = threading.Event()
+        self._slot: InferenceResult | None = None
+        self._result_ready = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._worker: int | None = None       # 작업 스레드 ident (직접 캡처한 프레임은 offer하지 않음)
+        self.error: str | None = None
+
+        self.offered: int = 0                 # 공유받은 프레임 수
+        self.skipped: int = 0                 # 추론하는 동안 더 새 프레임으로 교체된 수
+        self.captured: int = 0                # 작업 스레드가 직접 캡처한 수
+        self._times = {name: deque(maxlen=window) for name in ('preprocess', 'inference', 'postprocess', 'latency')}
+        self._finished_at: deque = deque(maxlen=window)
+
+    #region 시작/종료
+    def start(self) -> InferenceService:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='findee-inference', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        self._frame_ready.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+        with self._result_ready:
+            self._result_ready.notify_all()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    #endregion
+
+    #region 프레임 공유 (get_frame_info에서 호출)
+    def offer(self, frame):
+        if threading.get_ident() == self._worker:
+            return
+        if self._offered is not None:
+            self.skipped += 1
+        self._offered = frame
+        self._last_offer_ns = frame.timestamp_ns
+        self.offered += 1
+        self._frame_ready.set()
+
+    def _next_frame(self):
+        """공유받은 최신 프레임 (없거나 오래되면 직접 캡처)"""
+        if (self._clock() - self._last_offer_ns) / 1e6 < self.max_age_ms:
+            self._frame_ready.wait(IDLE_TIMEOUT)   # 사용자 코드가 캡처 중: 다음 프레임을 기다림
+        self._frame_ready.clear()
+        frame, self._offered = self._offered, None
+        if frame is None or (self._clock() - frame.timestamp_ns) / 1e6 > self.max_age_ms:
+            if self._stop.is_set():
+                return None
+            frame = self._capture()
+            self.captured += 1
+        return frame
+    #endregion
+
+    #region 작업 스레드
+    def _image(self, frame):
+        """모델 입력 이미지: lores (YUV420이면 변환) 또는 축소한 main"""
+        lores = getattr(frame, 'lores', None)
+        if lores is not None:
+            width, height = self.size
+            if lores.ndim == 2 and lores.shape[0] == height * 3 // 2:   # YUV420 (I420)
+                return lores[:height] if self.gray else cv2.cvtColor(lores, cv2.COLOR_YUV2BGR_I420)
+            image = lores
+        else:
+            image = frame.image
+            if image.shape[1] != self.size[0] or image.shape[0] != self.size[1]:
+                image = cv2.resize(image, self.size, interpolation=cv2.INTER_AREA)
+        if self.gray and image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return image
+
+    def _run(self):
+        self._worker = threading.get_ident()
+        version = 0
+        while not self._stop.is_set():
+            try:
+                frame = self._next_frame()
+            except Exception as e:
+                self.error = f"캡처 중단: {e}"   # 재생 끝 (ReplayFinished), 카메라 오류
+                break
+            if frame is None:
+                continue
+            started = self._clock()
+            t0 = time.perf_counter()
+            try:
+                image = self._image(frame)
+                t1 = time.perf_counter()
+                output = self.model.run(image)
+                t2 = time.perf_counter()
+                value = self.postprocess(output, frame) if self.postprocess else output
+            except Exception as e:
+                self.error = f"추론 오류: {e}"
+                print(f"추론 오류: {e}")
+                continue
+            t3 = time.perf_counter()
+            version += 1
+            result = InferenceResult(version, value, frame.sequence, frame.timestamp_ns, started, self._clock(),
+                                     (t1 - t0) * 1000, (t2 - t1) * 1000, (t3 - t2) * 1000)
+            with self._result_ready:
+                self._slot = result
+                self._result_ready.notify_all()
+            for name, ms in (('preprocess', result.preprocess_ms), ('inference', result.inference_ms),
+                             ('postprocess', result.postprocess_ms), ('latency', result.latency_ms)):
+                self._times[name].append(ms)
+            self._finished_at.append(time.monotonic())
+    #endregion
+
+    #region 결과 읽기
+    def latest(self) -> InferenceResult | None:
+        """마지막 결과 (대기 없음, 아직 없으면 None)"""
+        return self._slot
+
+    def wait_newer(self, version: int = 0, timeout: float | None = None) -> InferenceResult | None:
+        """version보다 새 결과까지 대기 (timeout 또는 서비스 종료 시 마지막 결과)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._result_ready:
+            while (self._slot is None or self._slot.version <= version) and self.running:
+                remaining = 0.05 if deadline is None else min(0.05, deadline - time.monotonic())
+                if remaining <= 0:
+                    break
+                self._result_ready.wait(remaining)   # 짧게 나눠 대기 (코드 중지가 바로 전달됨)
+            return self._slot
+
+    def stats(self) -> dict:
+        finished = list(self._finished_at)
+        rate = (len(finished) - 1) / (finished[-1] - finished[0]) if len(finished) > 1 and finished[-1] > finished[0] else None
+        result = self._slot
+        return {
+            'model': getattr(self.model, 'name', type(self.model).__name__),
+            'running': self.running,
+            'results': result.version if result else 0,
+            'fps': round(rate, 2) if rate else None,
+            'offered': self.offered,
+            'skipped': self.skipped,
+            'captured': self.captured,
+            'times_ms': {name: control_loop.summarize(list(samples)) for name, samples in self._times.items()},
+            'error': self.error
+        }
+    #endregion
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+# 같은 네트워크(LAN)에서 로봇을 직접 조종하는 Socket.IO 엔드포인트 (lan_server의 aiohttp 앱에 연결, 같은 포트)
+# 클라우드 서버와 같은 이벤트(execute_code, stop_execution, pid_update, slider_update, webrtc_offer, ...)를 받아
+# robot_client의 같은 핸들러로 전달하므로, 인터넷 연결 없이 교실 AP 안에서 왕복이 끝남
+# - 이벤트는 전용 스레드 하나에서 받은 순서대로 실행 (핸들러가 잠깐 막혀도 이벤트 루프는 계속 동작)
+# - 세션이 LAN으로 들어오면 그 세션의 응답(robot_stdout, webrtc_answer 등)도 LAN 클라이언트로 보냄 (emit/owns)
+# 보안 (execute_code는 로봇에서 임의의 Python을 실행하므로)
+# - token 필수: 연결할 때 auth={'token': ...}가 맞아야 함 (hmac.compare_digest)
+# - CORS는 같은 출처(로봇이 제공하는 LAN 페이지)와 origins로 지정한 출처만: 학생이 연 다른 웹 페이지는 연결 불가
+# - session_id는 연결마다 'lan-<sid>' (또는 'lan-<sid>:이름')만 허용: 다른 세션(클라우드/다른 LAN 연결)의 응답을 가로챌 수 없음
+# mDNS (zeroconf): _findee._tcp.local.로 로봇 이름/ID/포트를 알림, discover()로 찾기
+
+import hmac
+import time
+import socket
+import asyncio
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import startup
+import lan_server
+import control_loop
+
+socketio = startup.LazyModule('socketio')
+web = startup.LazyModule('aiohttp.web', install='aiohttp')
+zeroconf = startup.LazyModule('zeroconf', install='zeroconf')
+
+SERVICE_TYPE = '_findee._tcp.local.'
+
+class LanControl:
+    def __init__(self, handlers: dict, token: str, origins: list[str] | None = None, window: int = 120):
+        """
+        Args:
+            handlers: 이벤트 이름 -> handler(data) (robot_client의 Socket.IO 핸들러)
+            token: 연결 인증 토큰 (필수, 비어 있으면 ValueError)
+            origins: 같은 출처 외에 허용할 브라우저 출처 (예: ['http://192.168.0.10:8080'])
+        """
+        if not token:
+            raise ValueError('LAN 조종에는 토큰이 필요합니다 (lan.token)')
+        self._handlers = handlers
+        self._token = str(token).encode()
+        # None: 같은 출처만 (Origin 헤더가 없는 프로그램 클라이언트는 토큰으로만 확인)
+        self.sio = socketio.AsyncServer(async_mode='aiohttp', cors_allowed_origins=list(origins) if origins else None,
+                                        max_http_buffer_size=16 * 1024 * 1024)
+        self.sio.on('connect', self._on_connect)
+        self.sio.on('disconnect', self._on_disconnect)
+        self.sio.on('*', self._on_event)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='findee-lan-control')
+        self._owners: dict[str, str] = {}     # session_id -> sid
+        self._lock = threading.Lock()
+
+        self.clients: int = 0
+        self.rejected: int = 0                # 토큰이 틀린 연결 (/control/stats 요청 포함)
+        self.foreign_sessions: int = 0        # 다른 연결의 session_id를 쓴 이벤트 (무시)
+        self.received: Counter = Counter()    # 이벤트 -> 수
+        self.emitted: Counter = Counter()
+        self.unknown: Counter = Counter()     # 핸들러가 없는 이벤트
+        self._dispatch_ms: deque = deque(maxlen=window)   # 수신 → 핸들러 완료
+
+    def setup_app(self, app):
+        """LanServer 앱 훅 (같은 aiohttp 앱/포트에 /socket.io/, /control/stats 추가, 서버 이벤트 루프에서 호출)"""
+        self.sio.attach(app)
+        app.router.add_get('/control/stats', self._handle_stats)
+        self._loop = asyncio.get_running_loop()
+
+    async def _handle_stats(self, request):
+        if not lan_server.authorized(request, self._token.decode()):
+            self.rejected += 1
+            return web.Response(status=401, text='unauthorized', headers={'WWW-Authenticate': 'Bearer'})
+        return web.json_response(self.stats())
+
+    #region 수신
+    async def _on_connect(self, sid, environ, auth=None):
+        token = auth.get('token') if isinstance(auth, dict) else None
+        if not isinstance(token, str) or not hmac.compare_digest(token.encode(), self._token):
+            self.rejected += 1
+            return False
+        self.clients += 1
+
+    async def _on_disconnect(self, sid, *args):
+        self.clients = max(0, self.clients - 1)
+        with self._lock:
+            for session_id in [key for key, owner in self._owners.items() if owner == sid]:
+                del self._owners[session_id]
+
+    async def _on_event(self, event, sid, data=None):
+        handler = self._handlers.get(event)
+        if handler is None:
+            self.unknown[event] += 1
+            return
+        if not isinstance(data, dict):
+            data = {}
+        own = f'lan-{sid}'
+        session_id = data.get('session_id') or own
+        if session_id != own and not (isinstance(session_id, str) and session_id.startswith(own + ':')):
+            self.foreign_sessions += 1
+            return
+        data['session_id'] = session_id
+        with self._lock:
+            self._owners[session_id] = sid
+        self.received[event] += 1
+        t0 = time.perf_counter()
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, handler, data)
+        except Exception as e:
+            print(f"LAN 이벤트 처리 오류 ({event}): {e}")
+        self._dispatch_ms.append((time.perf_counter() - t0) * 1000)
+    #endregion
+
+    #region 송신 (아무 스레드에서나 호출)
+    def owns(self, session_id) -> bool:
+        return session_id in self._owners
+
+    def emit(self, event: str, data: dict) -> bool:
+        """세션의 LAN 클라이언트로 전송 (LAN 세션이 아니면 False)"""
+        sid = self._owners.get(data.get('session_id'))
+        loop = self._loop
+        if sid is None or loop is None or not loop.is_running():
+            return False
+        asyncio.run_coroutine_threadsafe(self.sio.emit(event, data, to=sid), loop)
+        self.emitted[event] += 1
+        return True
+    #endregion
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {
+            'clients': self.clients,
+            'sessions': len(self._owners),
+            'rejected': self.rejected,
+            'foreign_sessions': self.foreign_sessions,
+            'received': dict(self.received),
+            'emitted': dict(self.emitted),
+            'unknown': dict(self.unknown),
+            'dispatch_ms': control_loop.summarize(list(self._dispatch_ms))
+        }
+
+#region mDNS
+def local_address() -> str:
+    """기본 경로의 LAN IP (패킷은 보내지 않음)"""
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        probe.connect(('10.255.255.255', 1))
+        return probe.getsockname()[0]
+    except OSError:
+        return '127.0.0.1'
+    finally:
+        probe.close()
+
+class MdnsAdvertiser:
+    """_findee._tcp.local. 서비스 등록 (zeroconf가 없으면 경고만 출력)"""
+
+    def __init__(self, name: str, port: int, properties: dict | None = None):
+        self.name = name
+        self.port = port
+        self.properties = {key: str(value) for key, value in (properties or {}).items() if value is not None}
+        self._zeroconf = None
+        self._info = None
+
+    def start(self) -> MdnsAdvertiser:
+        # 등록은 이름 충돌 확인으로 수 초 걸리므로 백그라운드에서
+        threading.Thread(target=self._register, name='findee-mdns', daemon=True).start()
+        return self
+
+    def _register(self):
+        try:
+            address = local_address()
+            self._info = zeroconf.ServiceInfo(
+                SERVICE_TYPE, f"{self.name}.{SERVICE_TYPE}", addresses=[socket.inet_aton(address)], port=self.port,
+                properties=self.properties, server=f"{socket.gethostname()}.local."
+            )
+            self._zeroconf = zeroconf.Zeroconf()
+            self._zeroconf.register_service(self._info, allow_name_change=True)
+            print(f"mDNS: {self._info.name} → {address}:{self.port}")
+        except Exception as e:
+            print(f"mDNS 광고 실패 (LAN 주소로 직접 접속 가능): {e}")
+
+    def stop(self):
+        if self._zeroconf is not None:
+            try:
+                self._zeroconf.unregister_service(self._info)
+                self._zeroconf.close()
+            except Exception:
+                pass
+            self._zeroconf = None
+
+def discover(timeout: float = 3.0) -> list[dict]:
+    """LAN의 로봇 찾기: [{'name', 'address', 'port', 'properties'}]"""
+    found = {}
+
+    class Listener:
+        def add_service(self, zc, service_type, name):
+            info = zc.get_service_info(service_type, name, timeout=int(timeout * 1000))
+            if info is not None and info.addresses:
+                found[name] = {
+                    'name': name.removesuffix('.' + SERVICE_TYPE),
+                    'address': socket.inet_ntoa(info.addresses[0]),
+                    'port': info.port,
+                    'properties': {key.decode(): (value or b'').decode() for key, value in info.properties.items()}
+                }
+
+        def update_service(self, zc, service_type, name):
+            self.add_service(zc, service_type, name)
+
+        def remove_service(self, zc, service_type, name):
+            found.pop(name, None)
+
+    zc = zeroconf.Zeroconf()
+    try:
+        zeroconf.ServiceBrowser(zc, SERVICE_TYPE, Listener())
+        time.sleep(timeout)
+    finally:
+        zc.close()
+    return list(found.values())
+#endregion
@@ -0,0 +1,485 @@
+from __future__ import annotations
+
+# 같은 네트워크(LAN)에서 로봇 카메라를 보는 로컬 HTTP 서버 (aiohttp, 전용 스레드의 이벤트 루프)
+# 클라우드 서버 + WebRTC를 거치지 않으므로 지연이 작고, WebRTC가 막힌 네트워크에서도 동작
+# - GET /stream.mjpg    multipart MJPEG (?fps=N으로 클라이언트별 fps 제한)
+# - GET /snapshot.jpg   최신 프레임 한 장
+# - GET /stats          서버/클라이언트별 통계 (JSON)
+# 모든 경로는 lan.token 필요 (?token=... 또는 Authorization: Bearer ..., LAN 조종과 같은 토큰)
+# - lan.public을 켜면 토큰 없이 공개 (같은 네트워크의 누구나 카메라를 볼 수 있음)
+# 캡처와 인코딩은 공유: 프레임마다 한 번만 JPEG로 인코딩하고 모든 클라이언트가 같은 바이트를 받음
+# - 사용자 코드가 get_frame()으로 캡처 중이면 그 프레임을 사용 (offer), 아니면 캡처 스레드가 직접 캡처
+# - 보는 클라이언트가 없으면 캡처/인코딩도 하지 않음
+# 클라이언트별 전송은 각자의 코루틴에서 진행하므로 느린 클라이언트가 다른 클라이언트를 막지 않음
+# - 클라이언트마다 목표 fps 토큰으로 간격 조절, 쓰기가 밀려 있는 동안 지나간 프레임은 건너뜀 (dropped)
+#   항상 가장 최신 프레임을 보내므로 느린 클라이언트도 지연이 쌓이지 않음
+# - 커널 송신 버퍼를 SEND_BUFFER로 제한 (자동 조정되면 수 MB가 쌓여 멈춘 클라이언트를 알아채지 못함)
+# - 쓰기가 stall_timeout 동안 끝나지 않으면 연결을 끊음
+
+import time
+import hmac
+import socket
+import asyncio
+import secrets
+import threading
+import urllib.parse
+from collections import deque
+
+import startup
+import settings
+import control_loop
+import stream_control
+from settings import EncoderSettings, LanSettings
+
+web = startup.LazyModule('aiohttp.web', install='aiohttp')
+cv2 = startup.LazyModule('cv2')
+
+BOUNDARY = 'frame'
+SEND_BUFFER = 128 * 1024    # 클라이언트 소켓 커널 송신 버퍼 (bytes)
+STALL_TIMEOUT = 3.0         # 이 시간 동안 한 프레임도 보내지 못하면 연결 끊음 (초)
+IDLE_TIMEOUT = 2.0          # 클라이언트가 없으면 이 시간 후 캡처 스레드 종료 (초)
+MAX_OFFER_AGE_MS = 200      # 사용자 코드가 캡처한 프레임을 이 시간 안에만 사용
+
+# 현재 실행 중인 서버 (Findee.get_frame_info가 프레임을 공유)
+active_server = None
+
+def ensure_token() -> str:
+    """lan.token (없으면 만들어 저장, LAN 서버와 LAN 조종이 같은 토큰을 씀)"""
+    token = settings.store.get(LanSettings).token
+    if not token:
+        token = secrets.token_urlsafe(16)
+        settings.store.update(LanSettings, token=token)
+    return token
+
+def request_token(request) -> str | None:
+    """요청의 토큰 (?token=... 또는 Authorization: Bearer ...)"""
+    token = request.query.get('token')
+    if token is None:
+        scheme, _, value = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and value:
+            token = value.strip()
+    return token
+
+def authorized(request, token: str | None) -> bool:
+    """토큰이 없으면 (공개) 항상 True"""
+    if token is None:
+        return True
+    given = request_token(request)
+    return given is not None and hmac.compare_digest(given.encode(), token.encode())
+
+def mjpeg_part(jpeg: bytes) -> bytes:
+    """multipart MJPEG 한 파트 (Findee.mjpeg_gen과 같은 형식)"""
+    return (b"--" + BOUNDARY.encode() + b"\r\n"
+            b"Content-Type: image/jpeg\r\n"
+            b"Content-Length: " + str(len(jpeg)).encode() + b"\r\n\r\n" +
+            jpeg + b"\r\n")
+
+def _opencv_encode(image, quality: int) -> bytes | None:
+    ok, buffer = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return buffer.tobytes() if ok else None
+
+class EncodedFrame:
+    __slots__ = ('seq', 'jpeg', 'part', 'timestamp_ns', 'encoded_ns')
+
+    def __init__(self, seq: int, jpeg: bytes, timestamp_ns: int, encoded_ns: int):
+        self.seq = seq
+        self.jpeg = jpeg
+        self.part = mjpeg_part(jpeg)
+        self.timestamp_ns = timestamp_ns   # 캡처 시각
+        self.encoded_ns = encoded_ns
+
+class StreamClient:
+    """/stream.mjpg 연결 하나 (이벤트 루프에서만 사용)"""
+
+    def __init__(self, client_id: int, remote: str, fps: float, window: int = 120):
+        self.id = client_id
+        self.remote = remote
+        self.fps = fps
+        self.connected_at = time.monotonic()
+        self.last_seq: int = 0
+        self.sent: int = 0
+        self.sent_bytes: int = 0
+        self.dropped: int = 0               # 이전 쓰기가 끝나지 않아 건너뛴 프레임 (목표 fps 기준)
+        self.closed_reason: str | None = None
+        self._credit: float = 1.0           # 목표 fps 토큰 (media_hub.Subscriber와 같은 방식)
+        self._credit_at: float = self.connected_at
+        self._sent_at: deque = deque(maxlen=window)
+        self._write_ms: deque = deque(maxlen=window)
+        self._latency_ms: deque = deque(maxlen=window)
+
+    def due(self, now: float) -> bool:
+        """목표 fps에 맞으면 True (카메라 주기 지터로 fps가 반으로 잘리지 않도록 10% 여유)"""
+        self._credit = min(1.0, self._credit + (now - self._credit_at) * self.fps)
+        self._credit_at = now
+        return self._credit >= 0.9
+
+    def record(self, frame: EncodedFrame, started: float, now: float, now_ns: int):
+        self._credit -= 1.0
+        self.sent += 1
+        self.sent_bytes += len(frame.part)
+        self._sent_at.append(now)
+        self._write_ms.append((now - started) * 1000)
+        self._latency_ms.append((now_ns - frame.timestamp_ns) / 1e6)
+
+    def measured_fps(self) -> float | None:
+        sent = list(self._sent_at)
+        if len(sent) < 2 or sent[-1] == sent[0]:
+            return None
+        return round((len(sent) - 1) / (sent[-1] - sent[0]), 2)
+
+    def stats(self) -> dict:
+        return {
+            'id': self.id,
+            'remote': self.remote,
+            'target_fps': self.fps,
+            'fps': self.measured_fps(),
+            'sent': self.sent,
+            'sent_bytes': self.sent_bytes,
+            'dropped': self.dropped,
+            'connected_s': round(time.monotonic() - self.connected_at, 1),
+            'write_ms': control_loop.summarize(list(self._write_ms)),
+            'latency_ms': control_loop.summarize(list(self._latency_ms))   # 캡처 → 소켓 쓰기 완료
+        }
+
+class LanServer:
+    def __init__(self, capture, encode=None, clock=time.monotonic_ns, host: str = '0.0.0.0', port: int = 8080,
+                 fps: float = 15.0, quality: int | None = None, max_clients: int = 8,
+                 stall_timeout: float = STALL_TIMEOUT, token: str | None = None, window: int = 120):
+        """
+        Args:
+            capture: 프레임 캡처 함수 (Findee.get_frame_info), FrameInfo 또는 이미지 반환
+            encode: encode(image, quality) -> bytes | None (None이면 OpenCV)
+            clock: 시각 (ns), FrameInfo.timestamp_ns와 같은 기준
+            fps: 최대 인코딩 fps (클라이언트는 ?fps=로 더 낮게만 요청 가능)
+            quality: JPEG 품질 (None이면 설정 저장소의 encoder.mjpeg_quality)
+            max_clients: 동시 스트림 클라이언트 수 (넘으면 503)
+            token: 접속 토큰 (None이면 토큰 없이 공개, Findee.start_lan_server는 lan.public일 때만)
+        """
+        self._capture = capture
+        self._encode = encode or _opencv_encode
+        self._clock = clock
+        self.host = host
+        self.port = port
+        self.fps = fps
+        self.quality = quality
+        self.max_clients = max_clients
+        self.stall_timeout = stall_timeout
+        self.token = token or None
+        self.rejected: int = 0          # 토큰이 틀린 요청 (401)
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._runner = None
+        self._started = threading.Event()
+        self.error: str | None = None
+        self.app = None
+        self._app_hooks: list = []      # hook(app): 이벤트 루프에서 앱을 만든 직후 호출 (lan_control)
+
+        # 공유 캡처/인코딩 (캡처 스레드 ↔ 이벤트 루프)
+        self._producer: threading.Thread | None = None
+        self._producer_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._offered = None
+        self._last_offer_ns: int = 0
+        self._frame_ready = threading.Event()
+        self._latest: EncodedFrame | None = None
+        self._new_frame: asyncio.Event | None = None    # 이벤트 루프에서 생성, 새 프레임마다 교체
+        self._snapshot_waiters: int = 0
+        self._seq: int = 0
+
+        self._clients: dict[int, StreamClient] = {}
+        self._next_client_id: int = 1
+        self._closed_clients: deque = deque(maxlen=20)
+        self.captured: int = 0           # 캡처 스레드가 직접 캡처한 프레임
+        self.offered: int = 0            # 사용자 코드에서 공유받은 프레임
+        self.encodes: int = 0
+        self._encode_ms: deque = deque(maxlen=window)
+
+    #region 시작/종료
+    def start(self, timeout: float = 5.0) -> LanServer:
+        global active_server
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_loop, name='findee-lan', daemon=True)
+        self._thread.start()
+        if not self._started.wait(timeout) or self.error:
+            raise RuntimeError(f"LAN 서버를 시작하지 못했습니다: {self.error or '시간 초과'}")
+        active_server = self
+        return self
+
+    def stop(self, timeout: float = 3.0):
+        global active_server
+        if active_server is self:
+            active_server = None
+        self._stop.set()
+        self._frame_ready.set()
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run_loop(self):
+        self._loop = loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._serve())
+            self._started.set()
+            loop.run_forever()
+        except Exception as e:
+            self.error = str(e)
+            self._started.set()
+        finally:
+            loop.close()
+            self._loop = None
+
+    def add_app_hook(self, hook):
+        """start 전에 등록: hook(app)을 서버 이벤트 루프에서 앱을 만든 직후 호출 (라우트/Socket.IO 추가)"""
+        self._app_hooks.append(hook)
+
+    def build_app(self):
+        app = web.Application()
+        app.router.add_get('/', self._guarded(self._handle_index))
+        app.router.add_get('/stream.mjpg', self._guarded(self._handle_stream))
+        app.router.add_get('/snapshot.jpg', self._guarded(self._handle_snapshot))
+        app.router.add_get('/stats', self._guarded(self._handle_stats))
+        return app
+
+    def _guarded(self, handler):
+        """토큰이 맞는 요청만 handler로 (아니면 401)"""
+        async def guarded(request):
+            if not authorized(request, self.token):
+                self.rejected += 1
+                return web.Response(status=401, text='unauthorized', headers={'WWW-Authenticate': 'Bearer'})
+            return await handler(request)
+        return guarded
+
+    async def _serve(self):
+        self._new_frame = asyncio.Event()
+        self.app = self.build_app()
+        for hook in self._app_hooks:
+            hook(self.app)
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]   # 임시 포트 (벤치마크)
+        query = f"?token={urllib.parse.quote(self.token, safe='')}" if self.token else ''
+        print(f"LAN 서버: http://{self.host}:{self.port}/stream.mjpg{query}")
+
+    async def _shutdown(self):
+        self._wake_clients()
+        if self._runner is not None:
+            await self._runner.cleanup()
+        asyncio.get_running_loop().stop()
+    #endregion
+
+    #region 공유 캡처/인코딩 (캡처 스레드)
+    def offer(self, frame):
+        """사용자 코드가 캡처한 프레임 공유 (Findee.get_frame_info에서 호출)"""
+        if self._producer is None or threading.current_thread() is self._producer:
+            return
+        self._offered = frame
+        self._last_offer_ns = frame.timestamp_ns
+        self.offered += 1
+        self._frame_ready.set()
+
+    def _ensure_producer(self):
+        with self._producer_lock:
+            if self._producer is None and not self._stop.is_set():
+                self._producer = threading.Thread(target=self._produce, name='findee-lan-capture', daemon=True)
+                self._producer.start()
+
+    def _wanted(self) -> bool:
+        return bool(self._clients) or self._snapshot_waiters > 0
+
+    def _next_frame(self):
+        """공유받은 최신 프레임 (없거나 오래되면 직접 캡처)"""
+        if (self._clock() - self._last_offer_ns) / 1e6 < MAX_OFFER_AGE_MS:
+            self._frame_ready.wait(1.0 / self.fps + 0.1)   # 사용자 코드가 캡처 중: 다음 프레임을 기다림
+        self._frame_ready.clear()
+        frame, self._offered = self._offered, None
+        if frame is None or (self._clock() - frame.timestamp_ns) / 1e6 > MAX_OFFER_AGE_MS:
+            frame = self._capture()
+            self.captured += 1
+        return frame
+
+    def _produce(self):
+        period = 1.0 / self.fps
+        idle_since = None
+        next_at = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if not self._wanted():
+                    idle_since = idle_since or now
+                    if now - idle_since > IDLE_TIMEOUT:
+                        break
+                    time.sleep(0.05)
+                    continue
+                idle_since = None
+                if now < next_at:
+                    time.sleep(next_at - now)
+                next_at = max(next_at + period, time.monotonic() - period)
+                frame = self._next_frame()
+                image = getattr(frame, 'image', frame)
+                timestamp_ns = getattr(frame, 'timestamp_ns', None) or self._clock()
+                quality, _ = stream_control.ceiling.limit(self.quality or settings.store.get(EncoderSettings).mjpeg_quality)
+                t0 = time.perf_counter()
+                jpeg = self._encode(image, quality)
+                self._encode_ms.append((time.perf_counter() - t0) * 1000)
+                if jpeg is None:
+                    continue
+                self.encodes += 1
+                self._seq += 1
+                encoded = EncodedFrame(self._seq, jpeg, timestamp_ns, self._clock())
+                loop = self._loop
+                if loop is None:
+                    break
+                loop.call_soon_threadsafe(self._publish, encoded)
+        except Exception as e:
+            print(f"LAN 서버 캡처 오류: {e}")
+        finally:
+            with self._producer_lock:
+                self._producer = None
+            # 종료하는 사이 클라이언트가 들어왔으면 다시 시작
+            if self._wanted() and not self._stop.is_set() and self._loop is not None:
+                self._loop.call_soon_threadsafe(self._ensure_producer)
+
+    def _publish(self, frame: EncodedFrame):
+        """이벤트 루프: 새 프레임을 기다리는 모든 클라이언트 깨우기"""
+        self._latest = frame
+        self._wake_clients()
+
+    def _wake_clients(self):
+        event, self._new_frame = self._new_frame, asyncio.Event()
+        if event is not None:
+            event.set()
+
+    async def _wait_frame(self, after_seq: int, timeout: float) -> EncodedFrame | None:
+        """after_seq보다 새 프레임 (timeout 안에 없으면 None)"""
+        self._ensure_producer()
+        deadline = time.monotonic() + timeout
+        while not self._stop.is_set():
+            latest = self._latest
+            if latest is not None and latest.seq > after_seq:
+                return latest
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._new_frame.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+        return None
+    #endregion
+
+    #region HTTP 핸들러
+    async def _handle_index(self, request):
+        query = f"?token={urllib.parse.quote(self.token, safe='')}" if self.token else ''
+        return web.Response(text="<html><body style='margin:0;background:#000'>"
+                                 f"<img src='/stream.mjpg{query}' style='width:100%'></body></html>", content_type='text/html')
+
+    async def _handle_stream(self, request):
+        if len(self._clients) >= self.max_clients:
+            return web.Response(status=503, text='too many clients')
+        try:
+            fps = min(self.fps, float(request.query.get('fps', self.fps)))
+        except ValueError:
+            fps = self.fps
+        response = web.StreamResponse(headers={
+            'Content-Type': f'multipart/x-mixed-replace; boundary={BOUNDARY}',
+            'Cache-Control': 'no-cache, no-store',
+            'Connection': 'close'
+        })
+        await response.prepare(request)
+        client = StreamClient(self._next_client_id, request.remote or '', max(0.1, fps))
+        self._next_client_id += 1
+        self._clients[client.id] = client
+        transport = request.transport
+        sock = transport.get_extra_info('socket') if transport is not None else None
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        try:
+            while not self._stop.is_set():
+                frame = await self._wait_frame(client.last_seq, self.stall_timeout)
+                now = time.monotonic()
+                if frame is None:
+                    client.closed_reason = 'no frames' if not self._stop.is_set() else 'server stopped'
+                    break
+                client.last_seq = frame.seq
+                if not client.due(now):
+                    continue
+                if transport is None or transport.is_closing():
+                    client.closed_reason = 'closed'
+                    break
+                try:
+                    await asyncio.wait_for(response.write(frame.part), self.stall_timeout)
+                except asyncio.TimeoutError:
+                    client.closed_reason = 'slow'
+                    break
+                client.record(frame, now, time.monotonic(), self._clock())
+                # 쓰는 동안 지나간 프레임 (이 클라이언트 fps로 환산)
+                passed = self._latest.seq - frame.seq if self._latest is not None else 0
+                client.dropped += int(passed * min(1.0, client.fps / self.fps))
+        except ConnectionError:
+            client.closed_reason = client.closed_reason or 'closed'
+        except asyncio.CancelledError:
+            client.closed_reason = client.closed_reason or 'closed'
+            raise
+        finally:
+            self._clients.pop(client.id, None)
+            self._closed_clients.append(client.stats() | {'reason': client.closed_reason})
+            if client.closed_reason == 'slow' and transport is not None:
+                transport.abort()   # 버퍼에 쌓인 데이터를 기다리지 않고 끊음
+        return response
+
+    async def _handle_snapshot(self, request):
+        latest = self._latest
+        max_age_ns = 2e9 / self.fps
+        if latest is None or self._clock() - latest.timestamp_ns > max_age_ns:
+            self._snapshot_waiters += 1
+            try:
+                latest = await self._wait_frame(latest.seq if latest is not None else 0, self.stall_timeout)
+            finally:
+                self._snapshot_waiters -= 1
+        if latest is None:
+            return web.Response(status=503, text='no frame')
+        return web.Response(body=latest.jpeg, content_type='image/jpeg', headers={'Cache-Control': 'no-cache'})
+
+    async def _handle_stats(self, request):
+        return web.json_response(self.stats())
+    #endregion
+
+    def stats(self) -> dict:
+        return {
+            'url': f"http://{self.host}:{self.port}/stream.mjpg",
+            'fps': self.fps,
+            'capturing': self._producer is not None,
+            'encodes': self.encodes,
+            'captured': self.captured,
+            'offered': self.offered,
+            'public': self.token is None,
+            'rejected': self.rejected,
+            'encode_ms': control_loop.summarize(list(self._encode_ms)),
+            'clients': [client.stats() for client in list(self._clients.values())],
+            'closed_clients': list(self._closed_clients)
+        }
+
+if __name__ == "__main__":
+    import argparse
+    from findee import Findee
+
+    parser = argparse.ArgumentParser(description='LAN MJPEG 서버')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--fps', type=float, default=15.0)
+    args = parser.parse_args()
+    robot = Findee()
+    robot.wait_ready()
+    robot.start_lan_server(port=args.port, fps=args.fps)
+    try:
+        while True:
+            time.sleep(5)
+    except KeyboardInterrupt:
+        robot.cleanup()
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+# 마커(ArUco/AprilTag) 추적 (Findee.create_marker_tracker)
+# - 전체 화면 검색은 SEARCH_INTERVAL 프레임마다 (또는 추적 중인 마커를 놓쳤을 때)만 수행
+# - 그 사이 프레임은 이전 위치 + 속도로 예측한 작은 ROI에서만 검출 (겹치는 ROI는 합침)
+#   ROI에서는 마커 크기를 알고 있으므로 검출 파라미터를 맞춤: 임계값 창 1개 (기본 3개),
+#   최소 둘레 = 예상 둘레의 절반 (기본값 그대로면 작은 잡음 윤곽이 모두 후보가 되어 전체 검색보다 느려짐),
+#   큰 마커는 ROI_MARKER_PX로 축소
+# - 카메라 내부 파라미터 파일이 있으면 마커별 자세 (solvePnP IPPE_SQUARE): 거리, 좌우 방위각
+#   파일 해상도와 현재 프레임 해상도가 다르면 비율에 맞게 변환
+# - 통계: 프레임별 처리 시간 (전체 검색 / ROI / 자세), ROI 적중률, 처리한 픽셀 비율
+# 사전(dictionary): cv2.aruco.DICT_* 이름 (AprilTag는 'DICT_APRILTAG_36h11' 등)
+
+import json
+import math
+import time
+from collections import deque
+from pathlib import Path
+
+import startup
+import settings
+import control_loop
+
+cv2 = startup.LazyModule('cv2')
+np = startup.LazyModule('numpy')
+
+DEFAULT_DICTIONARY = 'DICT_4X4_50'
+SEARCH_INTERVAL = 10          # 전체 화면 검색 주기 (프레임)
+ROI_MARGIN = 0.6              # ROI 여유 (마커 크기 대비)
+MIN_MARGIN = 16               # ROI 여유 최소값 (px)
+MAX_MISSED = 2                # 이만큼 연속으로 못 찾으면 추적 해제
+ROI_MARKER_PX = 64            # ROI 안의 마커가 이보다 크면 이 크기로 축소해서 검출
+INTRINSICS_FILES = ('camera_intrinsics.json', 'camera_intrinsics.yaml')   # 설정 파일과 같은 디렉터리의 기본 파일
+
+#region 카메라 내부 파라미터
+class CameraIntrinsics:
+    def __init__(self, camera_matrix, dist_coeffs, image_size: tuple[int, int] | None = None):
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64).reshape(3, 3)
+        self.dist_coeffs = np.asarray(dist_coeffs if dist_coeffs is not None else [], dtype=np.float64).reshape(-1)
+        self.image_size = tuple(image_size) if image_size else None   # (w, h), 캘리브레이션 해상도
+        self._scaled: dict = {}
+
+    def for_size(self, size: tuple[int, int]):
+        """(camera_matrix, dist_coeffs) 현재 해상도 기준"""
+        if self.image_size is None or tuple(size) == self.image_size:
+            return self.camera_matrix, self.dist_coeffs
+        scaled = self._scaled.get(size)
+        if scaled is None:
+            sx, sy = size[0] / self.image_size[0], size[1] / self.image_size[1]
+            matrix = self.camera_matrix.copy()
+            matrix[0, 0] *= sx
+            matrix[0, 2] *= sx
+            matrix[1, 1] *= sy
+            matrix[1, 2] *= sy
+            scaled = self._scaled[size] = (matrix, self.dist_coeffs)
+        return scaled
+
+def load_intrinsics(path=None) -> CameraIntrinsics | None:
+    """
+    JSON {"camera_matrix": 3x3, "dist_coeffs": [...], "image_size": [w, h]}
+    또는 OpenCV FileStorage (.yaml/.yml/.xml: camera_matrix, distortion_coefficients, image_width, image_height)
+    path가 None이면 설정 디렉터리의 기본 파일 (없으면 None)
+    """
+    if path is None:
+        directory = settings.default_path().parent
+        path = next((directory / name for name in INTRINSICS_FILES if (directory / name).exists()), None)
+        if path is None:
+            return None
+    path = Path(path).expanduser()
+    if path.suffix == '.json':
+        data = json.loads(path.read_text())
+        return CameraIntrinsics(data['camera_matrix'], data.get('dist_coeffs'), data.get('image_size'))
+    storage = cv2.FileStorage(str(path), cv2.FILE_STORAGE_READ)
+    try:
+        matrix = storage.getNode('camera_matrix').mat()
+        dist = storage.getNode('distortion_coefficients').mat()
+        if dist is None:
+            dist = storage.getNode('dist_coeffs').mat()
+        width, height = storage.getNode('image_width').real(), storage.getNode('image_height').real()
+    finally:
+        storage.release()
+    if matrix is None:
+        raise ValueError(f"camera_matrix가 없습니다: {path}")
+    return CameraIntrinsics(matrix, dist, (int(width), int(height)) if width and height else None)
+#endregion
+
+class Marker:
+    """검출된 마커 하나"""
+    __slots__ = ('id', 'corners', 'center', 'size_px', 'source', 'rvec', 'tvec')
+
+    def __init__(self, marker_id: int, corners, source: str):
+        self.id = marker_id
+        self.corners = corners                     # (4, 2) float32, 좌상 → 우상 → 우하 → 좌하
+        self.center = tuple(float(v) for v in corners.mean(axis=0))
+        self.size_px = float(math.sqrt(abs(cv2.contourArea(corners))))
+        self.source = source                       # 'search' (전체 화면) 또는 'roi'
+        self.rvec = None                           # 자세 (내부 파라미터와 marker_length가 있을 때)
+        self.tvec = None                           # 카메라 기준 위치 (m, marker_length 단위)
+
+    @property
+    def distance(self) -> float | None:
+        return float(np.linalg.norm(self.tvec)) if self.tvec is not None else None
+
+    @property
+    def bearing_deg(self) -> float | None:
+        """카메라 정면 기준 좌우 각도 (오른쪽이 양수)"""
+        if self.tvec is None:
+            return None
+        return math.degrees(math.atan2(float(self.tvec[0]), float(self.tvec[2])))
+
+    def __repr__(self):
+        pose = f", distance={self.distance:.3f}, bearing={self.bearing_deg:.1f}" if self.tvec is not None else ""
+        return f"Marker(id={self.id}, center=({self.center[0]:.0f}, {self.center[1]:.0f}), {self.source}{pose})"
+
+class _Track:
+    __slots__ = ('corners', 'velocity', 'frame', 'missed')
+
+    def __init__(self, corners, frame: int):
+        self.corners = corners
+        self.velocity = (0.0, 0.0)   # 중심 이동 (px/프레임)
+        self.frame = frame           # 마지막으로 찾은 프레임 번호
+        self.missed = 0
+
+class MarkerTracker:
+    def __init__(self, dictionary: str = DEFAULT_DICTIONARY, marker_length: float | None = None, intrinsics=None,
+                 search_interval: int = SEARCH_INTERVAL, roi_margin: float = ROI_MARGIN, search_scale: float = 1.0,
+                 refine: bool = False, capture=None, window: int = 120):
+        """
+        Args:
+            dictionary: cv2.aruco 사전 이름 (예: 'DICT_4X4_50', 'DICT_APRILTAG_36h11')
+            marker_length: 마커 한 변 길이 (m), 자세 계산에 필요
+            intrinsics: 내부 파라미터 파일 경로, CameraIntrinsics, None이면 기본 파일 (없으면 자세 없음)
+            search_interval: 전체 화면 검색 주기 (프레임), 1이면 매 프레임 전체 검색
+            roi_margin: ROI 여유 (마커 크기 대비)
+            search_scale: 전체 검색 때 축소 비율 (0.5면 절반 해상도에서 검색, 작은 마커는 놓칠 수 있음)
+            refine: 코너 서브픽셀 보정 (자세 정확도 향상, 느려짐)
+            capture: update()에 이미지를 주지 않을 때 호출 (Findee.get_frame_info)
+        """
+        aruco = cv2.aruco
+        self.dictionary_name = dictionary
+        parameters = aruco.DetectorParameters()
+        if refine:
+            parameters.cornerRefinementMethod = aruco.CORNER_REFINE_SUBPIX
+        self._dictionary = aruco.getPredefinedDictionary(getattr(aruco, dictionary))
+        self._detector = aruco.ArucoDetector(self._dictionary, parameters)
+        self._roi_detector = aruco.ArucoDetector(self._dictionary, parameters)
+        self._refine = refine
+        self._cells = self._dictionary.markerSize + 2   # 테두리 포함 한 변의 칸 수
+        self.marker_length = marker_length
+        self.intrinsics = intrinsics if isinstance(intrinsics, CameraIntrinsics) else load_intrinsics(intrinsics)
+        self.search_interval = max(1, int(search_interval))
+        self.roi_margin = roi_margin
+        self.search_scale = search_scale
+        self._capture = capture
+
+        self._tracks: dict[int, _Track] = {}
+        self._frame: int = 0
+        self._force_search = True
+        if marker_length:
+            half = marker_length / 2
+            self._object_points = np.array([[-half, half, 0], [half, half, 0], [half, -half, 0], [-half, -half, 0]],
+                                           dtype=np.float32)
+
+        self.frames: int = 0
+        self.searches: int = 0
+        self.roi_searches: int = 0
+        self.roi_hits: int = 0
+        self._times = {name: deque(maxlen=window) for name in ('total', 'search', 'roi', 'pose')}
+        self._pixels: deque = deque(maxlen=window)   # 처리한 픽셀 / 전체 픽셀
+
+    def update(self, image=None) -> list[Marker]:
+        """프레임 하나 처리 (image: numpy 배열, FrameInfo, None이면 capture로 캡처)"""
+        if image is None:
+            image = self._capture()
+        image = getattr(image, 'image', image)
+        t0 = time.perf_counter()
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        height, width = gray.shape
+        self._frame += 1
+        self.frames += 1
+
+        search = self._force_search or not self._tracks or self._frame % self.search_interval == 0
+        if search:
+            markers = self._search(gray)
+            pixels = 1.0
+        else:
+            markers, pixels = self._search_rois(gray, width, height)
+        self._update_tracks(markers)
+        t1 = time.perf_counter()
+        self._times['search' if search else 'roi'].append((t1 - t0) * 1000)
+        self._pixels.append(pixels)
+
+        if self.intrinsics is not None and self.marker_length and markers:
+            self._estimate_pose(markers, (width, height))
+            self._times['pose'].append((time.perf_counter() - t1) * 1000)
+        self._times['total'].append((time.perf_counter() - t0) * 1000)
+        return markers
+
+    #region 검출
+    def _detect(self, gray, offset=(0, 0), scale: float = 1.0, source: str = 'search', detector=None) -> list[Marker]:
+        corners, ids, _ = (detector or self._detector).detectMarkers(gray)
+        if ids is None:
+            return []
+        markers = []
+        for marker_corners, marker_id in zip(corners, ids.reshape(-1)):
+            points = marker_corners.reshape(4, 2)
+            if scale != 1.0:
+                points = points / scale
+            if offset != (0, 0):
+                points = points + np.array(offset, dtype=np.float32)
+            markers.append(Marker(int(marker_id), points.astype(np.float32), source))
+        return markers
+
+    def _search(self, gray) -> list[Marker]:
+        self.searches += 1
+        self._force_search = False
+        if self.search_scale != 1.0:
+            small = cv2.resize(gray, None, fx=self.search_scale, fy=self.search_scale, interpolation=cv2.INTER_AREA)
+            return self._detect(small, scale=self.search_scale)
+        return self._detect(gray)
+
+    def _predicted_rois(self, width: int, height: int) -> list[list]:
+        """[x0, y0, x1, y1, 예상 마커 크기(px)]"""
+        rois = []
+        for track in self._tracks.values():
+            gap = self._frame - track.frame
+            dx, dy = track.velocity[0] * gap, track.velocity[1] * gap
+            xs, ys = track.corners[:, 0] + dx, track.corners[:, 1] + dy
+            size = max(xs.max() - xs.min(), ys.max() - ys.min())
+            margin = max(MIN_MARGIN, self.roi_margin * size) + max(abs(dx), abs(dy))
+            roi = [max(0, int(xs.min() - margin)), max(0, int(ys.min() - margin)),
+                   min(width, int(xs.max() + margin) + 1), min(height, int(ys.max() + margin) + 1)]
+            if roi[2] - roi[0] > 8 and roi[3] - roi[1] > 8:
+                rois.append(roi + [float(size)])
+        # 겹치는 ROI 합치기 (같은 영역을 두 번 검출하지 않도록)
+        merged = True
+        while merged and len(rois) > 1:
+            merged = False
+            for i in range(len(rois)):
+                for j in range(i + 1, len(rois)):
+                    a, b = rois[i], rois[j]
+                    if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                        rois[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]), min(a[4], b[4])]
+                        del rois[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        return rois
+
+    def _search_rois(self, gray, width: int, height: int) -> tuple[list[Marker], float]:
+        markers, area = [], 0
+        for x0, y0, x1, y1, size in self._predicted_rois(width, height):
+            self.roi_searches += 1
+            crop = gray[y0:y1, x0:x1]
+            scale = min(1.0, ROI_MARKER_PX / size) if size > 0 else 1.0
+            if scale < 1.0:
+                crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            self._roi_detector.setDetectorParameters(self._roi_parameters(size * scale, max(crop.shape)))
+            found = self._detect(crop, offset=(x0, y0), scale=scale, source='roi', detector=self._roi_detector)
+            self.roi_hits += bool(found)
+            markers.extend(found)
+            area += (x1 - x0) * (y1 - y0)
+        return markers, area / (width * height)
+
+    def _roi_parameters(self, size: float, extent: int):
+        """예상 마커 크기(size px)에 맞춘 ROI 검출 파라미터 (extent: ROI 긴 변)"""
+        aruco = cv2.aruco
+        parameters = aruco.DetectorParameters()
+        window = max(3, int(size / self._cells) | 1)   # 칸 하나 크기 정도의 홀수 임계값 창
+        parameters.adaptiveThreshWinSizeMin = parameters.adaptiveThreshWinSizeMax = window
+        parameters.minMarkerPerimeterRate = min(4.0, 0.5 * 4 * size / extent)
+        if self._refine:
+            parameters.cornerRefinementMethod = aruco.CORNER_REFINE_SUBPIX
+        return parameters
+
+    def _update_tracks(self, markers: list[Marker]):
+        seen = set()
+        for marker in markers:
+            seen.add(marker.id)
+            track = self._tracks.get(marker.id)
+            if track is None:
+                self._tracks[marker.id] = _Track(marker.corners, self._frame)
+                continue
+            gap = max(1, self._frame - track.frame)
+            previous = track.corners.mean(axis=0)
+            track.velocity = ((marker.center[0] - previous[0]) / gap, (marker.center[1] - previous[1]) / gap)
+            track.corners = marker.corners
+            track.frame = self._frame
+            track.missed = 0
+        for marker_id in list(self._tracks):
+            if marker_id not in seen:
+                track = self._tracks[marker_id]
+                track.missed += 1
+                if track.missed > MAX_MISSED:
+                    del self._tracks[marker_id]
+                elif track.missed == 1:
+                    self._force_search = True   # 처음 놓친 프레임 다음은 전체 검색 (예측을 벗어나게 빨리 움직인 경우)
+    #endregion
+
+    def _estimate_pose(self, markers: list[Marker], size: tuple[int, int]):
+        matrix, dist = self.intrinsics.for_size(size)
+        for marker in markers:
+            ok, rvec, tvec = cv2.solvePnP(self._object_points, marker.corners, matrix, dist, flags=cv2.SOLVEPNP_IPPE_SQUARE)
+            if ok:
+                marker.rvec, marker.tvec = rvec.reshape(3), tvec.reshape(3)
+
+    def reset(self):
+        self._tracks.clear()
+        self._force_search = True
+
+    @property
+    def tracked_ids(self) -> list[int]:
+        return sorted(self._tracks)
+
+    def stats(self) -> dict:
+        pixels = list(self._pixels)
+        return {
+            'dictionary': self.dictionary_name,
+            'frames': self.frames,
+            'searches': self.searches,
+            'roi_searches': self.roi_searches,
+            'roi_hit_rate': round(self.roi_hits / self.roi_searches, 3) if self.roi_searches else None,
+            'tracked': self.tracked_ids,
+            'pixel_fraction': round(sum(pixels) / len(pixels), 3) if pixels else None,
+            'pose': self.intrinsics is not None and bool(self.marker_length),
+            'times_ms': {name: control_loop.summarize(list(samples)) for name, samples in self._times.items()}
+        }
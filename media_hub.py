@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+# 이미지 발행/구독 허브
+# 프레임 하나를 widget_id로 발행하면 품질 단계별로 한 번만 인코딩하고
+# 같은 바이트를 구독 중인 모든 데이터 채널로 전달 (구독자별 백프레셔)
+# - 구독자에 아직 전송되지 않은 프레임이 있거나 bufferedAmount가 한도를 넘으면 그 구독자는 이번 프레임을 건너뜀
+# - 받을 구독자가 없으면 인코딩도 하지 않음
+# - mode='delta'는 frame_delta.DeltaEncoder로 변경분만 전송 (동기화가 깨진 구독자에게는 키프레임)
+# - 구독자에 controller(stream_control.AdaptiveStreamController)가 있으면 품질/축소 배율/fps를 자동 조정
+
+import time
+import threading
+
+import startup
+import frame_delta
+
+cv2 = startup.LazyModule('cv2')
+
+ALL_WIDGETS = '*'
+
+# 바이너리 프로토콜: [타입(1)][widget_id 길이(1)][widget_id(가변)][데이터(가변)]
+PACKET_IMAGE = 0x01
+PACKET_TEXT = 0x02
+PACKET_MASK = 0x03
+PACKET_TILES = 0x04
+
+DELTA_PACKET_TYPES = {
+    frame_delta.FULL: PACKET_IMAGE,
+    frame_delta.MASK: PACKET_MASK,
+    frame_delta.TILES: PACKET_TILES
+}
+
+def build_packet(packet_type: int, widget_id: str, payload: bytes) -> bytes:
+    widget_id_bytes = widget_id.encode('utf-8')
+    return b''.join((bytes((packet_type, len(widget_id_bytes))), widget_id_bytes, payload))
+
+class Subscriber:
+    """구독자 (데이터 채널 하나), send는 WebRTC 이벤트 루프에서 호출됨
+    controller가 없으면 고정 품질, 원본 해상도, fps 제한 없음
+    """
+    def __init__(self, key: str, send, buffered_amount=None, quality: int = 60,
+                 max_buffered: int = 256 * 1024, controller=None):
+        self.key: str = key
+        self._send = send
+        self._buffered_amount = buffered_amount
+        self._quality: int = quality
+        self.max_buffered: int = max_buffered
+        self.controller = controller
+        self._scheduled_at: float = 0.0
+        self._credit: float = 1.0       # 목표 fps 토큰 (프레임 하나 = 1.0)
+        self._credit_at: float = 0.0
+        self.closed: bool = False
+        self.pending: int = 0       # 전달 예약 후 아직 전송되지 않은 프레임 수
+        self.pending_bytes: int = 0 # 그 프레임의 패킷 크기 (세션 메모리 추정)
+        self.sent: int = 0
+        self.sent_bytes: int = 0
+        self.dropped: int = 0
+        self.synced: dict[str, int] = {}  # widget_id -> 수신한 delta seq
+
+    @property
+    def quality(self) -> int:
+        return self.controller.quality if self.controller else self._quality
+
+    @property
+    def scale(self) -> float:
+        return self.controller.scale if self.controller else 1.0
+
+    @property
+    def tier(self) -> tuple[int, float]:
+        """같은 tier (품질, 축소 배율)의 구독자는 같은 인코딩 결과를 공유"""
+        return self.quality, self.scale
+
+    def buffered(self) -> int:
+        return self._buffered_amount() if self._buffered_amount else 0
+
+    def ready(self, now: float | None = None) -> bool:
+        if self.closed or self.pending:
+            return False
+        buffered = self.buffered()
+        controller = self.controller
+        if controller is None:
+            return buffered <= self.max_buffered
+        now = time.monotonic() if now is None else now
+        controller.update(buffered, self.sent, self.sent_bytes, self.dropped, now)
+        # 목표 fps보다 빠른 발행은 건너뜀 (drop으로 세지 않음)
+        # 토큰 방식: 카메라 주기 지터(32~34ms)로 30fps 소스가 15fps로 잘리지 않도록 10% 여유
+        self._credit = min(1.0, self._credit + (now - self._credit_at) * controller.fps)
+        self._credit_at = now
+        if self._credit < 0.9:
+            return False
+        return buffered <= self.max_buffered
+
+    def mark_scheduled(self, size: int = 0):
+        self.pending += 1
+        self.pending_bytes += size
+        self._scheduled_at = time.monotonic()
+        self._credit -= 1.0
+
+    def deliver(self, packet: bytes):
+        self.pending = 0
+        self.pending_bytes = 0
+        if self.closed:
+            return
+        if self.controller is not None:
+            self.controller.record_send_latency(time.monotonic() - self._scheduled_at)
+        try:
+            self._send(packet)
+            self.sent += 1
+            self.sent_bytes += len(packet)
+        except Exception:
+            self.dropped += 1
+            self.synced.clear()  # 다음 delta 발행 때 키프레임
+
+    def stats(self) -> dict:
+        stats = {'quality': self.quality, 'sent': self.sent, 'sent_bytes': self.sent_bytes,
+                 'dropped': self.dropped, 'buffered': self.buffered()}
+        if self.controller is not None:
+            stats['stream'] = self.controller.stats()
+        return stats
+
+class MediaHub:
+    def __init__(self, loop, encode):
+        """
+        Args:
+            loop: 전송을 실행할 이벤트 루프 (call_soon_threadsafe 사용)
+            encode: encode(image, quality) -> bytes | None
+        """
+        self._loop = loop
+        self._encode = encode
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, dict[str, Subscriber]] = {}  # widget_id -> {key: Subscriber}
+        self._delta: dict[tuple, frame_delta.DeltaEncoder] = {}   # (widget_id, tier) -> 인코더 상태
+        self.published: int = 0
+        self.encodes: int = 0
+        self.skipped: int = 0   # 받을 구독자가 없어 인코딩하지 않은 프레임
+
+    def subscribe(self, widget_id: str, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.setdefault(widget_id, {})[subscriber.key] = subscriber
+
+    def unsubscribe(self, widget_id: str, key: str):
+        with self._lock:
+            subscribers = self._subscribers.get(widget_id)
+            if subscribers is not None:
+                subscribers.pop(key, None)
+                if not subscribers:
+                    del self._subscribers[widget_id]
+
+    def remove(self, key: str):
+        """구독자의 모든 구독 해제"""
+        with self._lock:
+            for widget_id in list(self._subscribers):
+                self._subscribers[widget_id].pop(key, None)
+                if not self._subscribers[widget_id]:
+                    del self._subscribers[widget_id]
+
+    def subscribers(self, widget_id: str) -> list[Subscriber]:
+        with self._lock:
+            found = {}
+            for wid in (widget_id, ALL_WIDGETS):
+                subscribers = self._subscribers.get(wid)
+                if not subscribers:
+                    continue
+                for key, subscriber in list(subscribers.items()):
+                    if subscriber.closed:
+                        del subscribers[key]  # 닫힌 구독자 정리
+                    else:
+                        found[key] = subscriber
+            return list(found.values())
+
+    def publish(self, widget_id: str, image, owner: Subscriber | None = None, mode: str = 'jpeg') -> int:
+        """프레임 발행 (owner는 자동으로 해당 widget을 구독), 전달 예약된 구독자 수 반환
+        Args:
+            mode: 'jpeg' (매번 전체 JPEG) 또는 'delta' (변경 없음 생략, 마스크 1비트, 부분 타일)
+        """
+        self.published += 1
+        if owner is not None and not owner.closed:
+            self.subscribe(widget_id, owner)
+
+        tiers: dict = {}
+        now = time.monotonic()
+        for subscriber in self.subscribers(widget_id):
+            if subscriber.ready(now):
+                tiers.setdefault(subscriber.tier, []).append(subscriber)
+            elif subscriber.pending or subscriber.buffered() > subscriber.max_buffered:
+                subscriber.dropped += 1
+        if not tiers:
+            self.skipped += 1
+            return 0
+
+        delivered = 0
+        for tier, subscribers in tiers.items():
+            quality, scale = tier
+            scaled = self.scale_image(image, scale)
+            if mode == 'delta':
+                delivered += self._publish_delta(widget_id, scaled, tier, subscribers)
+                continue
+            packet = self.encode_tier(widget_id, scaled, quality)
+            if packet is None:
+                continue
+            for subscriber in subscribers:
+                self._schedule(subscriber, packet)
+                delivered += 1
+        return delivered
+
+    def _schedule(self, subscriber: Subscriber, packet: bytes):
+        subscriber.mark_scheduled(len(packet))
+        self._loop.call_soon_threadsafe(subscriber.deliver, packet)
+
+    def _encode_counted(self, image, quality: int) -> bytes | None:
+        self.encodes += 1
+        return self._encode(image, quality)
+
+    @staticmethod
+    def scale_image(image, scale: float):
+        if scale >= 1.0:
+            return image
+        height, width = image.shape[:2]
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        if frame_delta.is_binary_mask(image):
+            return cv2.resize(image, size, interpolation=cv2.INTER_NEAREST)  # 마스크는 0/255 유지
+        # INTER_AREA는 정수배 축소에서만 빠름 (0.75 등은 INTER_LINEAR보다 수 배 느림)
+        integer_ratio = abs(1.0 / scale - round(1.0 / scale)) < 1e-6
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA if integer_ratio else cv2.INTER_LINEAR)
+
+    def encode_tier(self, widget_id: str, image, quality: int) -> bytes | None:
+        payload = self._encode_counted(image, quality)
+        if payload is None:
+            return None
+        return build_packet(PACKET_IMAGE, widget_id, payload)
+
+    def _publish_delta(self, widget_id: str, image, tier, subscribers: list[Subscriber]) -> int:
+        encoder = self._delta.get((widget_id, tier))
+        if encoder is None:
+            encoder = self._delta[(widget_id, tier)] = frame_delta.DeltaEncoder()
+        quality = tier[0]
+        kind, payload, base = encoder.encode(image, quality, self._encode_counted)
+        packet = build_packet(DELTA_PACKET_TYPES[kind], widget_id, payload) if payload is not None else None
+        keyframe = None
+
+        delivered = 0
+        for subscriber in subscribers:
+            if base is None or subscriber.synced.get(widget_id) == base:
+                # 단독 프레임(full/mask) 또는 이전 상태를 가진 구독자
+                if packet is None:
+                    continue  # 변경 없음
+                send = packet
+            else:
+                # 동기화가 깨진 구독자 (새 구독, 이전 프레임 누락): 현재 프레임 전체 전송
+                if keyframe is None:
+                    if frame_delta.is_binary_mask(image):
+                        keyframe = build_packet(PACKET_MASK, widget_id, frame_delta.pack_mask(image))
+                    else:
+                        jpeg = self._encode_counted(image, quality)
+                        keyframe = build_packet(PACKET_IMAGE, widget_id, jpeg) if jpeg is not None else None
+                if keyframe is None:
+                    continue
+                send = keyframe
+            subscriber.synced[widget_id] = encoder.seq
+            self._schedule(subscriber, send)
+            delivered += 1
+        return delivered
+
+    def stats(self) -> dict:
+        with self._lock:
+            widgets = {widget_id: len(subscribers) for widget_id, subscribers in self._subscribers.items()}
+        delta = {f"{widget_id}@{tier}": dict(encoder.counts) for (widget_id, tier), encoder in list(self._delta.items())}
+        return {'published': self.published, 'encodes': self.encodes, 'skipped': self.skipped,
+                'widgets': widgets, 'delta': delta}
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+# 시간 지정 동작 스케줄러 (Findee.move_forward(duration=...), move_sequence 등)
+# - 동작 = (left, right, duration) 단계 목록. 전용 타이머 스레드가 monotonic 절대 시각으로 다음 단계/정지를 적용
+#   (단계 시각은 시작 + 누적 duration, 늦게 깨어나도 전체 시간이 밀리지 않음)
+# - 첫 단계는 호출한 스레드에서 바로 적용 (스레드 전환 대기 없음)
+# - 제출하면 MotionHandle 반환: wait()/await로 완료 대기, cancel()로 취소
+#   새 동작은 기본적으로 진행 중인 동작을 대체(superseded)하고, queue=True면 뒤에 이어서 실행
+# - emergency_stop: 모든 동작을 취소하고 호출한 스레드에서 즉시 정지 (타이머를 기다리지 않음)
+#   진행 중인 모터 쓰기가 있으면 그것만 끝나고 적용 (출발 펄스 최대 20ms)
+# - 호출한 스레드는 기다리는 동안 WAIT_SLICE 단위로 깨어나므로 코드 중지(SystemExit)가 바로 전달됨
+
+import time
+import threading
+from collections import deque
+
+import control_loop
+
+WAIT_SLICE = 0.05     # 완료 대기 단위 (초), 이 간격으로 중지 요청 확인
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+SUPERSEDED = 'superseded'
+STOPPED = 'stopped'      # emergency_stop
+
+class MotionHandle:
+    """제출한 동작 하나 (wait/cancel, status로 결과 확인)"""
+    def __init__(self, scheduler: MotionScheduler, steps: tuple):
+        self._scheduler = scheduler
+        self.steps = steps                      # ((left, right, duration), ...)
+        self.status: str = PENDING
+        self.step: int = 0                      # 현재 단계
+        self.started_at: float | None = None    # monotonic
+        self.finished_at: float | None = None
+        self._finished = threading.Event()
+
+    @property
+    def duration(self) -> float:
+        return sum(step[2] for step in self.steps)
+
+    @property
+    def done(self) -> bool:
+        """끝났는지 (완료, 취소, 대체, 비상 정지 모두 포함)"""
+        return self._finished.is_set()
+
+    @property
+    def completed(self) -> bool:
+        """마지막 단계까지 정상 완료했는지"""
+        return self.status == DONE
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """끝날 때까지 대기 (timeout 초과면 False), WAIT_SLICE마다 깨어나 중지 요청을 받을 수 있음"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._finished.is_set():
+            remaining = WAIT_SLICE if deadline is None else min(WAIT_SLICE, deadline - time.monotonic())
+            if remaining <= 0:
+                return False
+            self._finished.wait(remaining)
+        return True
+
+    def cancel(self) -> bool:
+        """취소 (진행 중이면 정지, 이미 끝났으면 False)"""
+        return self._scheduler.cancel(self)
+
+    def __await__(self):
+        import asyncio
+        return asyncio.get_running_loop().run_in_executor(None, self.wait).__await__()
+
+    def _finish(self, status: str, now: float):
+        self.status = status
+        self.finished_at = now
+        self._finished.set()
+
+    def __repr__(self):
+        return f"MotionHandle(status={self.status}, step={self.step}/{len(self.steps)}, duration={self.duration:.2f}s)"
+
+class MotionScheduler:
+    def __init__(self, apply, window: int = 200):
+        """apply(left, right): 모터 출력 (Findee.control_motors)"""
+        self._apply = apply
+        self._cond = threading.Condition(threading.RLock())
+        self._queue: deque[MotionHandle] = deque()   # 0번이 진행 중인 동작
+        self._deadline: float | None = None          # 현재 단계가 끝나는 시각
+        self._thread: threading.Thread | None = None
+        self._closed: bool = False
+        self.lateness_ms: deque = deque(maxlen=window)   # 단계 전환 지연 (예정 시각 대비)
+        self.transitions: int = 0
+        self.emergency_stops: int = 0
+
+    #region 제출/취소
+    def submit(self, steps, queue: bool = False) -> MotionHandle:
+        """
+        동작 제출
+        Args:
+            steps: ((left, right, duration), ...) (duration 초, 0 이상)
+            queue: True면 진행 중인 동작 뒤에 이어서, False면 대체
+        """
+        steps = tuple((float(left), float(right), float(duration)) for left, right, duration in steps)
+        if not steps:
+            raise ValueError("steps must not be empty")
+        if any(duration < 0.0 for _, _, duration in steps):
+            raise ValueError("Duration must be greater or equal to 0.0")
+        handle = MotionHandle(self, steps)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("motion scheduler is closed")
+            if not queue:
+                self._finish_all(SUPERSEDED)
+            self._queue.append(handle)
+            if len(self._queue) == 1:
+                self._start(handle, time.monotonic())
+            self._ensure_thread()
+            self._cond.notify()
+        return handle
+
+    def set(self, left: float, right: float):
+        """시간 제한 없는 출력 (진행 중/대기 중인 동작은 대체)"""
+        with self._cond:
+            self._finish_all(SUPERSEDED)
+            self._apply(left, right)
+
+    def cancel(self, handle: MotionHandle) -> bool:
+        with self._cond:
+            if handle not in self._queue:
+                return False
+            now = time.monotonic()
+            if handle is self._queue[0]:
+                self._queue.popleft()
+                handle._finish(CANCELLED, now)
+                self._next(now)
+            else:
+                self._queue.remove(handle)
+                handle._finish(CANCELLED, now)
+            self._cond.notify()
+            return True
+
+    def emergency_stop(self) -> int:
+        """모든 동작 취소 후 즉시 정지 (취소한 동작 수)"""
+        with self._cond:
+            count = len(self._queue)
+            self._finish_all(STOPPED)
+            self.emergency_stops += 1
+            self._safe_apply(0.0, 0.0)
+            self._cond.notify()
+            return count
+
+    @property
+    def active(self) -> MotionHandle | None:
+        with self._cond:
+            return self._queue[0] if self._queue else None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._finish_all(CANCELLED)
+            self._cond.notify()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(1.0)
+    #endregion
+
+    #region 타이머 스레드
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='findee-motion', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        with self._cond:
+            while not self._closed:
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                self._advance(time.monotonic())
+
+    def _advance(self, now: float):
+        """현재 단계 종료: 다음 단계, 다음 동작 또는 정지"""
+        handle = self._queue[0]
+        deadline = self._deadline
+        self.lateness_ms.append((now - deadline) * 1000)
+        self.transitions += 1
+        handle.step += 1
+        if handle.step < len(handle.steps):
+            self._safe_apply(*handle.steps[handle.step][:2])
+            self._deadline = deadline + handle.steps[handle.step][2]
+            return
+        self._queue.popleft()
+        handle._finish(DONE, now)
+        self._next(deadline)
+
+    def _next(self, start: float):
+        """대기 중인 다음 동작 시작 (없으면 정지)"""
+        if self._queue:
+            self._start(self._queue[0], start)
+        else:
+            self._deadline = None
+            self._safe_apply(0.0, 0.0)
+
+    def _start(self, handle: MotionHandle, start: float):
+        handle.status = RUNNING
+        handle.started_at = start
+        self._safe_apply(*handle.steps[0][:2])
+        self._deadline = start + handle.steps[0][2]
+
+    def _safe_apply(self, left: float, right: float):
+        try:
+            self._apply(left, right)
+        except Exception as e:
+            print(f"모터 제어 오류: {e}")
+
+    def _finish_all(self, status: str):
+        now = time.monotonic()
+        while self._queue:
+            self._queue.popleft()._finish(status, now)
+        self._deadline = None
+    #endregion
+
+    def stats(self) -> dict:
+        with self._cond:
+            active = self._queue[0] if self._queue else None
+            return {
+                'active': repr(active) if active else None,
+                'queued': max(0, len(self._queue) - 1),
+                'transitions': self.transitions,
+                'lateness_ms': control_loop.summarize(list(self.lateness_ms)),
+                'emergency_stops': self.emergency_stops
+            }
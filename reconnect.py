@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+# 서버 재연결 관리
+# 스레드 하나가 연결 상태를 관리하고, 실패하면 지터가 적용된 지수 백오프로 재시도
+# 상태: disconnected → connecting → connected / backoff → connecting ... (stop 시 stopped)
+
+import time
+import random
+import threading
+from collections import deque
+
+DISCONNECTED = 'disconnected'
+CONNECTING = 'connecting'
+CONNECTED = 'connected'
+BACKOFF = 'backoff'
+STOPPED = 'stopped'
+
+class ReconnectSupervisor:
+    def __init__(self, connect, is_connected, base_delay: float = 1.0, max_delay: float = 60.0,
+                 factor: float = 2.0, jitter: float = 0.5, name: str = 'server'):
+        """
+        Args:
+            connect: 연결 함수 (실패 시 예외 발생)
+            is_connected: 현재 연결 여부 반환 함수
+            base_delay: 첫 재시도 대기 (초)
+            max_delay: 최대 재시도 대기 (초)
+            factor: 실패할 때마다 곱하는 배수
+            jitter: 대기 시간 중 무작위로 줄이는 비율 (0~1, 동시 재접속 분산)
+        """
+        self._connect = connect
+        self._is_connected = is_connected
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+        self.name = name
+
+        self.state: str = DISCONNECTED
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        # 통계
+        self.attempts: int = 0
+        self.failures: int = 0
+        self.connects: int = 0
+        self.disconnects: int = 0
+        self.connect_latencies: deque = deque(maxlen=50)  # 연결 시도 1회 소요 시간 (초)
+        self.outages: deque = deque(maxlen=50)            # 연결 끊김 → 재연결까지 (초)
+        self._disconnected_at: float | None = None
+        self.last_error: str | None = None
+
+    def _set_state(self, state: str):
+        with self._lock:
+            self.state = state
+
+    def start(self):
+        """감시 스레드 시작 (즉시 첫 연결 시도)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._disconnected_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name=f'reconnect-{self.name}', daemon=True)
+        self._thread.start()
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        self._set_state(STOPPED)
+
+    def notify_disconnected(self):
+        """연결 끊김 알림 (disconnect 이벤트에서 호출, 여러 번 호출해도 재연결 루프는 하나)"""
+        if self._stopped.is_set():
+            return
+        with self._lock:
+            if self.state == CONNECTED:
+                self.disconnects += 1
+                self._disconnected_at = time.monotonic()
+                self.state = DISCONNECTED
+        self._wakeup.set()
+
+    def next_delay(self, failures: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (self.factor ** max(0, failures - 1)))
+        return delay * (1.0 - self.jitter * random.random())
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            consecutive = 0
+            while not self._stopped.is_set() and not self._is_connected():
+                self._set_state(CONNECTING)
+                self.attempts += 1
+                t0 = time.monotonic()
+                try:
+                    self._connect()
+                except Exception as e:
+                    self.failures += 1
+                    consecutive += 1
+                    self.last_error = str(e)
+                    delay = self.next_delay(consecutive)
+                    print(f"서버 연결 실패 ({consecutive}회): {e} - {delay:.1f}초 후 재시도")
+                    self._set_state(BACKOFF)
+                    self._stopped.wait(delay)
+                    continue
+
+                now = time.monotonic()
+                self.connect_latencies.append(now - t0)
+                if self._disconnected_at is not None:
+                    self.outages.append(now - self._disconnected_at)
+                    self._disconnected_at = None
+                self.connects += 1
+            if self._is_connected():
+                self._set_state(CONNECTED)
+
+    def stats(self) -> dict:
+        latencies = sorted(self.connect_latencies)
+        return {
+            'state': self.state,
+            'attempts': self.attempts,
+            'failures': self.failures,
+            'connects': self.connects,
+            'disconnects': self.disconnects,
+            'last_connect_ms': round(self.connect_latencies[-1] * 1000, 1) if self.connect_latencies else None,
+            'median_connect_ms': round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+            'last_outage_s': round(self.outages[-1], 2) if self.outages else None,
+            'last_error': self.last_error
+        }
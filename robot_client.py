@@ -1,4 +1,5 @@
 from __future__ import annotations
+import startup
 import subprocess
 import threading
 from traceback import format_exc
@@ -11,38 +12,53 @@ import ctypes
 from pathlib import Path
 import sys
 import json
+import struct
+import robot_config
 from robot_config import ROBOT_ID, ROBOT_NAME, SERVER_URL, ROBOT_VERSION
 from findee import Findee
-try:
-    import psutil
-except ImportError:
-    subprocess.run(['sudo', 'pip', 'install', 'psutil', '--break-system-packages'], capture_output=True, text=True)
-    import psutil
-try:
-    from aiortc import RTCPeerConnection, RTCSessionDescription, RTCIceCandidate, RTCDataChannel, RTCConfiguration
-except ImportError:
-    subprocess.run(['sudo', 'pip', 'install', 'aiortc', '--break-system-packages'], capture_output=True, text=True)
-    from aiortc import RTCPeerConnection, RTCSessionDescription, RTCIceCandidate, RTCDataChannel, RTCConfiguration
-try:
-    from packaging.version import Version
-except ImportError:
-    subprocess.run(['sudo', 'pip', 'install', 'packaging', '--break-system-packages'], capture_output=True, text=True)
-    from packaging.version import Version
-
-
-import cv2
-
-# 서버 연결 객체
-sio = socketio.Client()
-current_version = Version(ROBOT_VERSION)
-
-#region 스레드 관리
-class ThreadManager:
-    def __init__(self, thread: threading.Thread):
-        self.thread: threading.Thread = thread
-        self.stop_flag: bool = False
-
-session_threads: dict[str, ThreadManager] = {}
+from webrtc_sdp import parse_candidate, extract_candidates
+import webrtc_compat
+from session import Session, SessionRegistry, CHANNEL_CLASSES
+from reconnect import ReconnectSupervisor
+from media_hub import MediaHub, Subscriber, build_packet, PACKET_IMAGE, PACKET_TEXT
+from stream_control import AdaptiveStreamController
+import control_loop
+import code_profiler
+import session_recorder
+import lan_server
+import lan_control
+import thermal_governor
+import settings
+from settings import EncoderSettings, NetworkIdentity, LanSettings, ThermalSettings
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from aiortc import RTCDataChannel
+
+# 무거운 모듈은 서버 등록 후 백그라운드에서 로드 (없으면 그때 pip 설치, 기동을 막지 않음)
+aiortc = startup.LazyModule('aiortc', install='aiortc')
+psutil = startup.LazyModule('psutil', install='psutil')
+cv2 = startup.LazyModule('cv2')
+simplejpeg = startup.LazyModule('simplejpeg')
+PRELOAD_DELAY = 10.0  # 서버 등록이 이보다 늦어지면 등록을 기다리지 않고 로드 시작 (초)
+robot_is_registered = threading.Event()
+
+# 서버 연결 객체 (재연결은 ReconnectSupervisor가 담당)
+sio = socketio.Client(reconnection=False)
+server_url: str = SERVER_URL
+reconnector = ReconnectSupervisor(lambda: sio.connect(server_url), lambda: sio.connected)
+# LAN 조종 (lan.control 설정이 켜져 있으면 warm_up에서 시작)
+lan: lan_control.LanControl | None = None
+mdns: lan_control.MdnsAdvertiser | None = None
+
+def emit(event: str, data: dict):
+    """세션으로 보내는 이벤트: LAN으로 들어온 세션이면 LAN 클라이언트로, 아니면 클라우드 서버로"""
+    if lan is not None and lan.emit(event, data):
+        return
+    sio.emit(event, data)
+
+#region 세션 관리
+# 세션별 피어 연결, 데이터 채널, 코드 실행 스레드, 명령 상태, 태스크를 하나의 Session 객체로 관리
+sessions = SessionRegistry()
 #endregion
 
 #region ctypes 최적화
@@ -77,21 +93,11 @@ ERR__WRTC_CANDIDATE_HANDLE = 0x0010
 #region WebRTC 초기화
 webrtc_task_queue = Queue()
 
-class WebRTC_Manager:
-    def __init__(self, connection: RTCPeerConnection):
-        self.connection: RTCPeerConnection = connection
-        self.data_channel: RTCDataChannel | None = None
-        self.candidate_queue: list = []  # ICE candidate 큐 (setRemoteDescription 전에 도착한 candidate 저장)
-        self.remote_description_set: bool = False  # Remote description 설정 완료 플래그
-
 webrtc_loop = asyncio.new_event_loop()
-webrtc_sessions: dict[str, WebRTC_Manager] = {}
 
 # 위젯 데이터 저장소
 PID_Wdata: dict[str, dict] = {}  # {"위젯이름": {"p": 1.0, "i": 0.5, "d": 0.2}}
 Slider_Wdata: dict[str, list] = {}  # {"위젯이름": [10, 20, 30]}
-# 모바일 명령 저장 (세션별 최신 명령만)
-Last_Command: dict[str, tuple] = {}  # {"session_id": (x, y)} - signed int8 각각
 #endregion
 
 #region WebRTC 워커 및 초기화
@@ -137,6 +143,64 @@ def start_webrtc_loop():
     webrtc_loop.run_until_complete(webrtc_worker())
 #endregion
 
+#region WebRTC 데이터 채널 수신
+def handle_datachannel_message(session: Session, message):
+    """데이터 채널 수신 메시지 처리 (2바이트 명령 또는 위젯 JSON)"""
+    try:
+        session.record_received(len(message))
+
+        # 바이너리 데이터인 경우 (2바이트 명령: X, Y, 4바이트면 뒤에 uint16 순번)
+        if isinstance(message, bytes) and len(message) >= 2:
+            # signed int8로 파싱 (X, Y) - 세션별 최신 명령만 유지 (순서 없는 cmd 채널에서 늦게 온 명령은 버림)
+            if len(message) >= 4:
+                x, y, seq = struct.unpack_from('<bbH', message)
+                session.set_command((x, y), seq)
+            else:
+                session.set_command(struct.unpack_from('bb', message))
+            return
+
+        # JSON 문자열로 전송된 위젯 데이터 파싱
+        data = json.loads(message)
+        widget_type = data.get('type')
+        widget_id = data.get('widget_id')
+
+        if widget_type == "stream_config":
+            # 영상 자동 조정 범위 변경 (min/max_quality, min/max_scale, min/max_fps)
+            if session.subscriber is not None and session.subscriber.controller is not None:
+                session.subscriber.controller.configure(data.get('bounds', {}))
+            return
+
+        if widget_type == "profiling":
+            # 이 세션의 코드 실행마다 프로파일 ({'type': 'profiling', 'enabled': true})
+            session.profiling = bool(data.get('enabled'))
+            return
+
+        if not widget_id:
+            return
+
+        if widget_type == "pid_update":
+            PID_Wdata[widget_id] = {
+                "p": float(data.get('p', 0.0)),
+                "i": float(data.get('i', 0.0)),
+                "d": float(data.get('d', 0.0))
+            }
+        elif widget_type == "slider_update":
+            values = data.get('values', [])
+            if isinstance(values, list):
+                Slider_Wdata[widget_id] = values
+        elif widget_type == "subscribe":
+            # 다른 세션이 발행하는 이미지 위젯 구독 ('*'이면 전체)
+            if session.subscriber is not None:
+                media_hub.subscribe(widget_id, session.subscriber)
+        elif widget_type == "unsubscribe":
+            media_hub.unsubscribe(widget_id, session.session_id)
+    except json.JSONDecodeError:
+        # JSON이 아닌 경우 무시 (이미지/텍스트 데이터일 수 있음)
+        pass
+    except Exception as e:
+        print(f"위젯 데이터 수신 오류: {e}")
+#endregion
+
 #region WebRTC 시그널링 (연결 설정)
 @sio.event
 def webrtc_offer(data):
@@ -147,79 +211,69 @@ def webrtc_offer(data):
 
 async def handle_webrtc_offer(session_id, offer_dict):
     try:
-        # 기존 연결이 있으면 정리
-        old_session = webrtc_sessions.get(session_id)
-        if old_session:
-            await old_session.connection.close()
-            del webrtc_sessions[session_id]
+        # 기존 연결이 있으면 정리 (코드 실행 상태는 유지)
+        session = sessions.get_or_create(session_id)
+        if session.connection is not None:
+            await session.close_peer()
+
+        # aiortc가 아직 로드되지 않았으면 이벤트 루프를 막지 않도록 별도 스레드에서 로드
+        if not startup.loaded(aiortc):
+            await asyncio.to_thread(startup.load, aiortc)
+        webrtc_compat.apply()  # 부분 신뢰성 채널(cmd/img)의 SCTP flight size 보정
 
         # 새로운 피어 연결 생성
-        configuration = RTCConfiguration(iceServers=[])
-        pc = RTCPeerConnection(configuration=configuration)
-        webrtc_sessions[session_id] = WebRTC_Manager(pc)
+        configuration = aiortc.RTCConfiguration(iceServers=[])
+        pc = aiortc.RTCPeerConnection(configuration=configuration)
+        session.connection = pc
+        session.touch()
 
-        # 데이터 채널 이벤트 처리
+        # 데이터 채널 이벤트 처리 (cmd/img/cfg label이면 트래픽 종류별 채널, 아니면 단일 채널)
         @pc.on("datachannel")
         def on_datachannel(channel: RTCDataChannel):
-            webrtc_sessions[session_id].data_channel = channel
-
-            # 시스템 정보 전송 루프 시작
-            async def system_info_loop():
-                while session_id in webrtc_sessions:
-                    session = webrtc_sessions.get(session_id)
-                    if session and session.data_channel and session.data_channel.readyState == 'open':
-                        try:
-                            webrtc_loop.call_soon_threadsafe(
-                                webrtc_task_queue.put_nowait,
-                                ('send_system_info', {'session_id': session_id})
-                            )
-                        except Exception:
-                            pass
-                    await asyncio.sleep(1.0)  # 1초마다 전송
-
-            asyncio.create_task(system_info_loop())
+            traffic = session.attach_channel(channel)
 
             @channel.on("message")
             def on_message(message):
-                try:
-                    # 바이너리 데이터인 경우 (2바이트 명령: X, Y)
-                    if isinstance(message, bytes) and len(message) >= 2:
-                        # signed int8로 파싱 (X, Y)
-                        import struct
-                        x_value, y_value = struct.unpack('bb', message[:2])
-                        Last_Command[session_id] = (x_value, y_value)
-                        return
-
-                    # JSON 문자열로 전송된 위젯 데이터 파싱
-                    data = json.loads(message)
-                    widget_type = data.get('type')
-                    widget_id = data.get('widget_id')
-
-                    if not widget_id:
-                        return
-
-                    if widget_type == "pid_update":
-                        PID_Wdata[widget_id] = {
-                            "p": float(data.get('p', 0.0)),
-                            "i": float(data.get('i', 0.0)),
-                            "d": float(data.get('d', 0.0))
-                        }
-                    elif widget_type == "slider_update":
-                        values = data.get('values', [])
-                        if isinstance(values, list):
-                            Slider_Wdata[widget_id] = values
-                except json.JSONDecodeError:
-                    # JSON이 아닌 경우 무시 (이미지/텍스트 데이터일 수 있음)
-                    pass
-                except Exception as e:
-                    print(f"위젯 데이터 수신 오류: {e}")
+                handle_datachannel_message(session, message)
+
+            @channel.on("open")
+            def on_open():
+                session.flush_cfg()  # reliable 채널이 열리기 전에 보관한 cfg 메시지
+
+            if traffic is not None and session.subscriber is not None:
+                return  # 같은 연결의 두 번째 이후 채널: 구독자/시스템 정보 루프는 이미 시작됨
+
+            # 이미지 허브 구독자 (emit_image로 발행한 위젯은 자동 구독, 링크/CPU 상태에 따라 품질 자동 조정)
+            def send_packet(packet: bytes):
+                target = session.channel_for('img')
+                if target is None or target.readyState != 'open':
+                    raise ConnectionError(getattr(target, 'readyState', 'closed'))
+                target.send(packet)
+                session.record_sent(len(packet))
+            if session.subscriber is not None:
+                session.subscriber.closed = True
+            controller = AdaptiveStreamController(start_quality=settings.store.get(EncoderSettings).quality)
+            session.subscriber = Subscriber(session_id, send_packet,
+                                            lambda: getattr(session.channel_for('img'), 'bufferedAmount', 0),
+                                            controller=controller)
+
+            # 시스템 정보 전송 루프 시작 (세션 종료 시 취소)
+            async def system_info_loop():
+                while session.connection is pc:
+                    if session.channel_open:
+                        await send_system_info_via_webrtc(session_id)
+                    # 기본 1초마다, 온도 조절 단계가 높으면 더 드물게
+                    governor = thermal_governor.active_governor
+                    await asyncio.sleep(governor.telemetry_interval if governor is not None else 1.0)
+
+            session.add_task(asyncio.create_task(system_info_loop()))
 
         # ICE candidate 이벤트 처리
         @pc.on("icecandidate")
         def on_ice_candidate(candidate):
             if candidate:
                 candidate_str = candidate.candidate
-                sio.emit('webrtc_ice_candidate', {
+                emit('webrtc_ice_candidate', {
                     'candidate': {
                         'candidate': candidate_str,
                         'sdpMLineIndex': candidate.sdpMLineIndex,
@@ -228,31 +282,32 @@ async def handle_webrtc_offer(session_id, offer_dict):
                     'session_id': session_id
                 })
             else:
-                sio.emit('webrtc_ice_candidate', {
+                emit('webrtc_ice_candidate', {
                     'candidate': None,
                     'session_id': session_id
                 })
 
         # 연결 상태 변경 모니터링
         @pc.on("connectionstatechange")
-        def on_connection_state_change():
+        async def on_connection_state_change():
             if pc.connectionState == "failed" or pc.connectionState == "closed":
-                # 연결 실패 시 정리
-                if session_id in webrtc_sessions:
-                    del webrtc_sessions[session_id]
+                # 연결 실패 시 정리 (새 offer로 교체된 연결이면 무시)
+                if session.connection is pc:
+                    await session.close_peer()
+                    sessions.release_if_idle(session)
 
         # ICE 수집 상태 변경 모니터링
         @pc.on("icegatheringstatechange")
         def on_ice_gathering_state_change():
             if pc.iceGatheringState == "complete" and pc.localDescription:
-                extract_and_send_candidates_from_sdp(pc.localDescription.sdp, session_id)
+                extract_and_send_candidates_from_sdp(pc.localDescription.sdp, session_id,
+                                                     batch=bool(offer_dict.get('ice_batch')))
 
         # Offer 설정
-        offer = RTCSessionDescription(sdp=offer_dict['sdp'], type=offer_dict['type'])
+        offer = aiortc.RTCSessionDescription(sdp=offer_dict['sdp'], type=offer_dict['type'])
         await pc.setRemoteDescription(offer)
 
         # Remote description 설정 완료 플래그 설정
-        session = webrtc_sessions[session_id]
         session.remote_description_set = True
 
         # 큐에 저장된 ICE candidate 처리
@@ -277,7 +332,9 @@ async def handle_webrtc_offer(session_id, offer_dict):
         await pc.setLocalDescription(answer)
 
         # Answer 전송
-        sio.emit('webrtc_answer', {'answer': {'type': pc.localDescription.type, 'sdp': pc.localDescription.sdp}, 'session_id': session_id})
+        # channels: 트래픽 종류별 채널 label (브라우저가 이 label로 채널을 열면 종류별로 전송)
+        emit('webrtc_answer', {'answer': {'type': pc.localDescription.type, 'sdp': pc.localDescription.sdp},
+                               'session_id': session_id, 'channels': list(CHANNEL_CLASSES)})
     except Exception:
         print(ERR__WRTC_OFFER)
 
@@ -290,7 +347,7 @@ def webrtc_ice_candidate(data):
 
 async def handle_webrtc_ice_candidate(session_id, candidate_dict):
     try:
-        session = webrtc_sessions.get(session_id)
+        session = sessions.get(session_id)
         if not session:
             return
 
@@ -321,137 +378,113 @@ async def handle_webrtc_ice_candidate(session_id, candidate_dict):
 #endregion
 
 #region WebRTC ICE Candidate 처리
-def extract_and_send_candidates_from_sdp(sdp: str, session_id: str):
+# 기본: candidate마다 webrtc_ice_candidate 전송 후 None (수집 완료)
+# True 또는 offer에 'ice_batch': true: SDP의 candidate를 한 번에 전송 (webrtc_ice_candidates, 이 이벤트를 처리하는 브라우저만)
+ICE_CANDIDATE_BATCH = False
+
+def extract_and_send_candidates_from_sdp(sdp: str, session_id: str, batch: bool = False):
     """SDP에서 ICE candidate를 추출하여 브라우저로 전송 (aiortc는 Trickle ICE 미지원)"""
     try:
-        # SDP에서 candidate 라인 찾기 (a=candidate: 제거하면서 바로 추출)
-        candidate_lines = [line[2:] for line in sdp.split('\n') if line.startswith('a=candidate:')]
+        candidates = extract_candidates(sdp)
 
-        if not candidate_lines:
+        if batch or ICE_CANDIDATE_BATCH:
+            # candidate 목록 + 수집 완료 신호를 하나의 메시지로 전송
+            emit('webrtc_ice_candidates', {'candidates': candidates, 'complete': True, 'session_id': session_id})
             return
 
-        # 각 candidate 전송 (파싱 없이 그대로 전송)
-        for candidate_str in candidate_lines:
-            try:
-                # 최소 길이 검증만 (파싱 불필요 - 브라우저에서 파싱함)
-                if len(candidate_str) < 20:
-                    continue
-
-                sio.emit('webrtc_ice_candidate', {
-                    'candidate': {'candidate': candidate_str, 'sdpMLineIndex': 0, 'sdpMid': '0'},
-                    'session_id': session_id
-                })
-            except Exception:
-                pass  # 개별 candidate 실패는 무시
+        for candidate in candidates:
+            emit('webrtc_ice_candidate', {'candidate': candidate, 'session_id': session_id})
 
         # candidate 수집 완료 신호 전송
-        sio.emit('webrtc_ice_candidate', {'candidate': None, 'session_id': session_id})
+        emit('webrtc_ice_candidate', {'candidate': None, 'session_id': session_id})
     except Exception:
         print(ERR__WRTC_CANDIDATE_EXTRACT)
 
 def create_ice_candidate(candidate_str, sdp_mid=None, sdp_m_line_index=None):
     """SDP candidate 문자열을 파싱하여 RTCIceCandidate 객체 생성"""
-    try:
-        if not candidate_str or not isinstance(candidate_str, str):
-            return None
-
-        # candidate: 접두사 제거
-        if candidate_str.startswith('candidate:'): candidate_str = candidate_str[10:]
-        parts = candidate_str.strip().split()
-        if len(parts) < 8:
-            return None
-
-        foundation = parts[0]
-        component = int(parts[1])
-        protocol = parts[2].upper()
-        priority = int(parts[3])
-        ip = parts[4]
-        port = int(parts[5])
-
-        # 한 번의 루프로 typ, raddr, rport 찾기
-        typ = 'host'  # 기본값
-        related_address = None
-        related_port = None
-
-        for i, part in enumerate(parts):
-            if part == 'typ' and i + 1 < len(parts):
-                typ = parts[i + 1]
-            elif part == 'raddr' and i + 1 < len(parts):
-                related_address = parts[i + 1]
-            elif part == 'rport' and i + 1 < len(parts):
-                related_port = int(parts[i + 1])
-
-        return RTCIceCandidate(
-            foundation=foundation,
-            component=component,
-            protocol=protocol,
-            priority=priority,
-            ip=ip,
-            port=port,
-            type=typ,
-            relatedAddress=related_address,
-            relatedPort=related_port,
-            sdpMid=sdp_mid,
-            sdpMLineIndex=sdp_m_line_index
-        )
-    except Exception:
+    candidate = parse_candidate(candidate_str)
+    if candidate is None:
         return None
+
+    return aiortc.RTCIceCandidate(
+        foundation=candidate['foundation'],
+        component=candidate['component'],
+        protocol=candidate['protocol'].upper(),
+        priority=candidate['priority'],
+        ip=candidate['ip'],
+        port=candidate['port'],
+        type=candidate['type'],
+        relatedAddress=candidate['relatedAddress'],
+        relatedPort=candidate['relatedPort'],
+        sdpMid=sdp_mid,
+        sdpMLineIndex=sdp_m_line_index,
+        tcpType=candidate['tcpType']
+    )
 #endregion
 
 #region WebRTC 데이터 전송
+# 바이너리 프로토콜: [타입(1)][widget_id 길이(1)][widget_id(가변)][데이터(가변)] (media_hub.build_packet)
+# 0x01 image, 0x02 text, 0x03 mask, 0x04 tiles (delta 모드, frame_delta 참고)
+
+def encode_image(image, quality: int = 60) -> bytes | None:
+    """이미지를 JPEG 바이트로 인코딩 (실패 시 None), 인코더는 설정 저장소의 encoder.backend"""
+    if settings.store.get(EncoderSettings).backend == 'simplejpeg' and startup.loaded(simplejpeg):
+        try:
+            if image.ndim == 2:
+                return simplejpeg.encode_jpeg(image[:, :, None], quality, colorspace='GRAY')
+            return simplejpeg.encode_jpeg(image, quality, colorspace='BGR')
+        except (ValueError, TypeError):
+            pass  # 지원하지 않는 형식 (비연속 배열 등)은 OpenCV로
+    ok, buffer = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return buffer.tobytes() if ok else None
+
+# 이미지 허브: 위젯별로 한 번 인코딩한 이미지를 구독 중인 모든 세션에 전달
+media_hub = MediaHub(webrtc_loop, encode_image)
+# 세션 기록도 같은 인코더 사용
+session_recorder.default_encode = encode_image
+
 # WebRTC 데이터 채널을 통해 데이터 전송 (비동기, 바이너리 프로토콜)
 async def send_image_via_webrtc(session_id, image_bytes, widget_id):
     try:
-        session = webrtc_sessions.get(session_id)
-        if not session:
-            return
-
-        data_channel = session.data_channel
-        if not data_channel or data_channel.readyState != 'open':
+        session = sessions.get(session_id)
+        if not session or not session.media_open:
             return
 
-        # 바이너리 프로토콜: [타입(1)][widget_id 길이(1)][widget_id(가변)][이미지 데이터(가변)]
-        # 타입: 0x01 = image
-        widget_id_bytes = widget_id.encode('utf-8')
-        widget_id_len = len(widget_id_bytes)
-
-        header = bytes([0x01, widget_id_len]) + widget_id_bytes
-        data_channel.send(header + image_bytes)
+        packet = build_packet(PACKET_IMAGE, widget_id, image_bytes)
+        session.channel_for('img').send(packet)
+        session.record_sent(len(packet))
     except Exception:
         pass
 
 async def send_text_via_webrtc_async(session_id, text, widget_id):
     try:
-        session = webrtc_sessions.get(session_id)
-        if not session:
+        session = sessions.get(session_id)
+        if not session or not session.accepts_cfg:
             return
 
-        data_channel = session.data_channel
-        if not data_channel or data_channel.readyState != 'open':
-            return
+        packet = build_packet(PACKET_TEXT, widget_id, text.encode('utf-8'))
+        session.send_cfg(packet)  # reliable 채널이 아직 없으면 열릴 때까지 보관
 
-        # 바이너리 프로토콜: [타입(1)][widget_id 길이(1)][widget_id(가변)][텍스트 데이터(가변)]
-        # 타입: 0x02 = text
-        widget_id_bytes = widget_id.encode('utf-8')
-        widget_id_len = len(widget_id_bytes)
-        text_bytes = text.encode('utf-8')
-
-        header = bytes([0x02, widget_id_len]) + widget_id_bytes
-        data_channel.send(header + text_bytes)
+    except Exception:
+        pass
 
+def send_json_via_webrtc(session_id, message: str):
+    """JSON 문자열 전송 (WebRTC 루프에서 호출)"""
+    session = sessions.get(session_id)
+    if not session or not session.accepts_cfg:
+        return
+    try:
+        session.send_cfg(message)
     except Exception:
         pass
 
 async def send_system_info_via_webrtc(session_id):
     """시스템 정보를 WebRTC DataChannel로 전송"""
     try:
-        session = webrtc_sessions.get(session_id)
-        if not session:
-            return
-
+        session = sessions.get(session_id)
+        if not session or not session.channel_open:
+            return  # 주기적으로 다시 보내므로 보관하지 않음
         data_channel = session.data_channel
-        if not data_channel or data_channel.readyState != 'open':
-            return
 
         # 시스템 정보 수집
         cpu_percent = psutil.cpu_percent(interval=0.1)
@@ -460,14 +493,9 @@ async def send_system_info_via_webrtc(session_id):
         ram_used = memory.used / (1024**3)  # GB
         ram_total = memory.total / (1024**3)  # GB
 
-        # 온도 정보 (라즈베리파이)
-        temp = None
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp_raw = int(f.read().strip())
-                temp = temp_raw / 1000.0  # 섭씨
-        except:
-            pass
+        # 온도 정보 (라즈베리파이, 온도 조절기가 실행 중이면 마지막 측정값)
+        governor = thermal_governor.active_governor
+        temp = governor.reading['temp'] if governor is not None else thermal_governor.ThermalReader().temperature()
 
         # JSON 형식으로 전송
         system_info = {
@@ -476,7 +504,12 @@ async def send_system_info_via_webrtc(session_id):
             'ram_percent': round(ram_percent, 1),
             'ram_used': round(ram_used, 2),
             'ram_total': round(ram_total, 2),
-            'temp': round(temp, 1) if temp else None
+            'temp': round(temp, 1) if temp else None,
+            'session': session.stats(),
+            'active_sessions': len(sessions),
+            'signaling': reconnector.stats(),
+            'startup': startup.profile.stats(),
+            'thermal': governor.stats() if governor is not None else None
         }
 
         data_channel.send(json.dumps(system_info))
@@ -487,6 +520,7 @@ async def send_system_info_via_webrtc(session_id):
 #region SocketIO 이벤트 핸들러 (서버 연결)
 @sio.event
 def connect():
+    startup.profile.mark('connected')
     print("<서버에 로봇 등록 요청>")
     print(f"ID              : {ROBOT_ID}")
     print(f"Name            : {ROBOT_NAME}")
@@ -499,16 +533,14 @@ def connect():
 @sio.event
 def robot_registered(data):
     print(f"로봇 등록 성공: {data.get('message')}") if data.get('success') else print(f"로봇 등록 실패: {data.get('error')}")
+    if data.get('success') and startup.profile.mark('registered'):
+        print(startup.profile.report())
+    robot_is_registered.set()
 
 @sio.event
-def disconnect():
-    def reconnect_loop():
-        while not sio.connected:
-            try:
-                threading.Timer(5.0, lambda: sio.connect(SERVER_URL)).start()
-            except Exception:
-                pass
-    threading.Thread(target=reconnect_loop, daemon=True).start()
+def disconnect(*args):
+    # WebRTC 세션은 시그널링 서버와 무관하게 유지, 재연결 루프는 하나만 동작
+    reconnector.notify_disconnected()
 #endregion
 
 #region 위젯 데이터 접근 함수
@@ -526,30 +558,23 @@ def get_slider(widget_id: str) -> list:
 def get_command(session_id: str = None) -> tuple:
     """모바일 명령 가져오기 (2바이트: X, Y) - 최신 명령만 반환
     Args:
-        session_id: 세션 ID (None이면 첫 번째 세션 사용)
+        session_id: 세션 ID (None이면 가장 최근에 명령을 보낸 연결된 세션 사용)
     Returns:
         tuple: (x, y) - signed int8 각각, 범위 -128~127
                중립은 (0, 0), 명령이 없으면 (0, 0) 반환
     """
-    # session_id가 없으면 첫 번째 세션 사용
-    if session_id is None:
-        if Last_Command:
-            session_id = list(Last_Command.keys())[0]
-        else:
-            return (0, 0)
-    
-    # 최신 명령 반환 (없으면 (0, 0))
-    return Last_Command.get(session_id, (0, 0))
+    return sessions.latest_command(session_id)
 #endregion
 
 #region 코드 실행
-def exec_code(code, session_id):
-    if session_id in session_threads:
-        session_threads[session_id].stop_flag = False
+def exec_code(code, session_id, profile: bool = False):
+    session = sessions.get_or_create(session_id)
+    cpu_start = time.thread_time()
+    profiler = code_profiler.CodeProfiler() if profile or session.profiling else None
 
     def check_stop_flag(func):
         def wrapper(*args, **kwargs):
-            if session_id in session_threads and session_threads[session_id].stop_flag:
+            if session.stop_flag:
                 return
             return func(*args, **kwargs)
         return wrapper
@@ -557,38 +582,29 @@ def exec_code(code, session_id):
     @check_stop_flag
     def realtime_print(*args, **kwargs):
         output = ' '.join(str(arg) for arg in args)
-        if output: sio.emit('robot_stdout', {'session_id': session_id, 'output': output})
+        if output: emit('robot_stdout', {'session_id': session_id, 'output': output})
 
     try:
         #TODO 프레임 스킵
         @check_stop_flag
-        def emit_image(image, widget_id):
+        def emit_image(image, widget_id, mode='jpeg'):
             if not hasattr(image, 'shape'):
                 print(ERR__IMG_NOT_NUMPY)
                 raise Exception("ERR__IMG_NOT_NUMPY")
 
-            ok, buffer = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), 60])
-            if not ok: return
-            image_bytes = buffer.tobytes()
-
-            session = webrtc_sessions.get(session_id)
-            data_channel = session.data_channel if session else None
-            if data_channel and data_channel.readyState == 'open':
-                try:
-                    webrtc_loop.call_soon_threadsafe(
-                        webrtc_task_queue.put_nowait,
-                        ('send_image', {'session_id': session_id, 'image_bytes': image_bytes, 'widget_id': widget_id})
-                    )
-                    return
-                except Exception:
-                    print(ERR__WRTC_IMAGE_IO)
-                    sio.emit('robot_emit_image', {'session_id': session_id, 'image_data': image_bytes, 'widget_id': widget_id})
+            # 허브에 한 번 발행 → 구독 중인 모든 세션에 같은 인코딩 결과 전달 (구독자가 없으면 인코딩 생략)
+            try:
+                owner = session.subscriber if session.media_open else None
+                media_hub.publish(widget_id, image, owner, mode)
+            except Exception:
+                print(ERR__WRTC_IMAGE_IO)
+                image_bytes = encode_image(image, settings.store.get(EncoderSettings).quality)
+                if image_bytes is not None:
+                    emit('robot_emit_image', {'session_id': session_id, 'image_data': image_bytes, 'widget_id': widget_id})
 
         @check_stop_flag
         def emit_text(text, widget_id):
-            session = webrtc_sessions.get(session_id)
-            data_channel = session.data_channel if session else None
-            if data_channel and data_channel.readyState == 'open':
+            if session.accepts_cfg:
                 try:
                     webrtc_loop.call_soon_threadsafe(
                         webrtc_task_queue.put_nowait,
@@ -597,7 +613,19 @@ def exec_code(code, session_id):
                     return
                 except Exception:
                     print(ERR__WRTC_TEXT_IO)
-                    sio.emit('robot_emit_text', {'session_id': session_id, 'text': text, 'widget_id': widget_id})
+                    emit('robot_emit_text', {'session_id': session_id, 'text': text, 'widget_id': widget_id})
+
+        if profiler is not None:
+            emit_image = code_profiler.timed(code_profiler.ENCODE, 'emit_image', emit_image)
+
+        def session_command():
+            # 기록 재생 중이면 기록된 명령, 기록 중이면 명령도 기록
+            if session_recorder.active_player is not None:
+                return session_recorder.active_player.command()
+            command = get_command(session_id)
+            if session_recorder.active_recorder is not None:
+                session_recorder.active_recorder.command(command)
+            return command
 
         exec_namespace = {
             'Findee': Findee,
@@ -606,19 +634,69 @@ def exec_code(code, session_id):
             'print': realtime_print,
             'get_pid': get_pid,
             'get_slider': get_slider,
-            'get_command': lambda: get_command(session_id)
+            'get_command': session_command
         }
+        # Findee().control_loop()의 기본 조종 명령 (이 스레드에서 만든 루프)
+        control_loop.local.command = exec_namespace['get_command']
         compiled_code = compile(code, '<string>', 'exec')
+        if profiler is not None:
+            profiler.start(Findee())
         exec(compiled_code, exec_namespace)
     except Exception:
         for line in format_exc().splitlines():
-            sio.emit('robot_stderr', {'session_id': session_id, 'output': line})
+            emit('robot_stderr', {'session_id': session_id, 'output': line})
     finally:
-        # 세션별 정리
-        if session_id in session_threads:
-            del session_threads[session_id]
-        sio.emit('robot_finished', {'session_id': session_id})
+        if profiler is not None:
+            send_profile(session, profiler)
+        # 세션별 정리 (새 실행으로 교체된 경우 새 스레드 상태는 유지)
+        session.exec_cpu_time += time.thread_time() - cpu_start
+        if session.thread is threading.current_thread():
+            session.thread = None
+            sessions.release_if_idle(session)
+        emit('robot_finished', {'session_id': session_id})
+        control_loop.stop_all(owner=threading.current_thread())  # 이 실행에서 start()로 띄운 루프 스레드
         Findee().stop()
+        Findee().stop_inference(owner=threading.current_thread())
+        finish_recording(session_id)
+
+def finish_recording(session_id):
+    """이 실행 스레드에서 시작한 기록/재생 종료 (기록은 남은 버퍼를 쓰고 경로 안내, 다른 세션의 기록은 유지)"""
+    try:
+        player = session_recorder.active_player
+        if player is not None and player.owner is threading.current_thread():
+            player.close()
+        recorder = session_recorder.active_recorder
+        if recorder is not None and recorder.owner is threading.current_thread():
+            stats = recorder.stop()
+            emit('robot_stdout', {'session_id': session_id,
+                                  'output': f"[기록] {stats['path']} {stats['counts']} 버림 {stats['dropped']}"})
+    except Exception as e:
+        print(f"기록 종료 오류: {e}")
+
+def send_profile(session: Session, profiler: code_profiler.CodeProfiler):
+    """프로파일 결과: 요약은 robot_stdout, 전체(함수별 비율, 접힌 스택)는 데이터 채널 JSON"""
+    try:
+        profiler.stop()
+        for line in profiler.summary_lines():
+            emit('robot_stdout', {'session_id': session.session_id, 'output': line})
+        if session.accepts_cfg:
+            message = json.dumps(profiler.message())
+            webrtc_loop.call_soon_threadsafe(send_json_via_webrtc, session.session_id, message)
+    except Exception as e:
+        print(f"프로파일 전송 오류: {e}")
+
+def stop_session_thread(session: Session, timeout: float) -> bool:
+    """실행 중인 코드 스레드 중지 (실행 중이 아니었으면 False)"""
+    thread = session.thread
+    session.stop_flag = True
+    if thread is None or not thread.is_alive():
+        return False
+    # 모터는 스레드 종료를 기다리지 않고 바로 정지 (시간 지정 동작, 제어 루프 포함)
+    if Findee._instance is not None:
+        Findee._instance.emergency_stop()
+    _raise_exception_in_thread(thread, SystemExit)
+    thread.join(timeout=timeout)
+    return True
 
 @sio.event
 def execute_code(data):
@@ -627,41 +705,37 @@ def execute_code(data):
         session_id = data.get('session_id', '')
 
         # 기존 실행 중인 스레드가 있으면 먼저 정리
-        if session_id in session_threads:
-            old_manager = session_threads[session_id]
-            if old_manager.thread.is_alive():
-                old_manager.stop_flag = True
-                _raise_exception_in_thread(old_manager.thread, SystemExit)
-                old_manager.thread.join(timeout=0.5)
+        session = sessions.get_or_create(session_id)
+        stop_session_thread(session, timeout=0.5)
 
         # 새 스레드 시작
-        thread = threading.Thread(target=exec_code, args=(code, session_id), daemon=True)
-        session_threads[session_id] = ThreadManager(thread)
+        thread = threading.Thread(target=exec_code, args=(code, session_id, bool(data.get('profile'))), daemon=True)
+        session.thread = thread
+        session.stop_flag = False
+        session.exec_count += 1
+        session.touch()
         thread.start()
     except Exception as e:
-        sio.emit('robot_stderr', {'session_id': session_id, 'output': f'코드 실행 중 오류: {str(e)}'})
+        emit('robot_stderr', {'session_id': session_id, 'output': f'코드 실행 중 오류: {str(e)}'})
 
 @sio.event
 def stop_execution(data):
     try:
         session_id = data.get('session_id', '')
 
-        if session_id not in session_threads:
-            sio.emit('robot_stderr', {'session_id': session_id, 'output': '실행 중인 코드가 없습니다.'})
+        session = sessions.get(session_id)
+        if session is None or session.thread is None:
+            emit('robot_stderr', {'session_id': session_id, 'output': '실행 중인 코드가 없습니다.'})
             return
 
-        manager = session_threads[session_id]
-        manager.stop_flag = True
-
-        if manager.thread.is_alive():
-            _raise_exception_in_thread(manager.thread, SystemExit)
-            manager.thread.join(timeout=1.0)
+        stop_session_thread(session, timeout=1.0)
 
         # 세션별 정리
-        if session_id in session_threads:
-            del session_threads[session_id]
+        if not session.executing:
+            session.thread = None
+            sessions.release_if_idle(session)
     except Exception as e:
-        sio.emit('robot_stderr', {'session_id': session_id, 'output': f'코드 중지 중 오류: {str(e)}'})
+        emit('robot_stderr', {'session_id': session_id, 'output': f'코드 중지 중 오류: {str(e)}'})
 
 @sio.event
 def pid_update(data):
@@ -687,6 +761,16 @@ def slider_update(data):
             Slider_Wdata[widget_id] = values
     except Exception as e:
         print(f"Slider 업데이트 수신 오류: {e}")
+
+@sio.event
+def latency_probe(data):
+    """지연 측정: 받은 값을 그대로 돌려줌 (클라이언트가 클라우드/LAN 경로 왕복 시간 비교)"""
+    emit('latency_echo', {**data, 'robot_ns': time.monotonic_ns()})
+
+# LAN 조종으로 받을 이벤트 (클라우드와 같은 핸들러, client_update/client_reset은 제외)
+LAN_EVENTS = {handler.__name__: handler for handler in (
+    execute_code, stop_execution, pid_update, slider_update, webrtc_offer, webrtc_ice_candidate, latency_probe
+)}
 #endregion
 
 #region 로봇 업데이트/초기화
@@ -699,11 +783,9 @@ def force_git_pull(ScriptDir):
 def client_update(data):
     try:
         ScriptDir = Path(__file__).parent.absolute() # 현재 파일의 디렉토리
-        RobotID, RobotName = ROBOT_ID, ROBOT_NAME # 현재 로봇 설정 저장
+        # 로봇 설정은 저장소에 원자적으로 기록 (git pull로 robot_config.py가 초기화되어도 유지)
+        settings.store.update(NetworkIdentity, robot_id=ROBOT_ID, robot_name=ROBOT_NAME)
         force_git_pull(ScriptDir) # 강제 Git pull
-        # 로봇 설정 복원
-        subprocess.run(f"sed -i 's/ROBOT_ID = .*/ROBOT_ID = \"{RobotID}\"/' {ScriptDir}/robot_config.py", shell=True, check=True)
-        subprocess.run(f"sed -i 's/ROBOT_NAME = .*/ROBOT_NAME = \"{RobotName}\"/' {ScriptDir}/robot_config.py", shell=True, check=True)
         # 서비스 재시작
         subprocess.run(['sudo', 'systemctl', 'restart', 'robot_client.service'], capture_output=True, text=True, timeout=10)
     except subprocess.TimeoutExpired:
@@ -720,28 +802,98 @@ def client_reset(data):
 #endregion
 
 #region Signal handler
+async def close_session(session: Session):
+    """세션 종료: 코드 실행 중지 + WebRTC 정리 + 레지스트리 제거 (여러 번 호출해도 안전)"""
+    if session.thread is not None:
+        stop_session_thread(session, timeout=0.5)
+        session.thread = None
+    await session.close_peer()
+    sessions.discard(session)
+
 def signal_handler(signum, frame):
-    if webrtc_sessions:
+    if len(sessions):
         try:
             async def cleanup_async():
-                tasks = [session.connection.close() for session in webrtc_sessions.values()]
-                await asyncio.gather(*tasks, return_exceptions=True)
-                webrtc_sessions.clear()
+                await asyncio.gather(*(close_session(session) for session in sessions.values()), return_exceptions=True)
             if webrtc_loop and webrtc_loop.is_running():
-                webrtc_loop.run_until_complete(cleanup_async())
+                asyncio.run_coroutine_threadsafe(cleanup_async(), webrtc_loop).result(timeout=5)
             else:
                 asyncio.run(cleanup_async())
         except Exception:
             pass
+    reconnector.stop()
+    if mdns is not None:
+        mdns.stop()
     sio.disconnect()
     sys.exit(0)
 #endregion
 
-if __name__ == "__main__":
+#region 설정 변경
+def on_settings_changed(name, value):
+    # simplejpeg로 바꾸면 인코딩 경로에서 import하지 않도록 미리 로드 (로드 전에는 OpenCV 사용)
+    if name == EncoderSettings.NAME and value is not None and value.backend == 'simplejpeg' and not startup.loaded(simplejpeg):
+        threading.Thread(target=startup.preload, args=(simplejpeg,), daemon=True).start()
+
+settings.store.add_listener(on_settings_changed)
+#endregion
+
+#region 기동 (서버 등록 우선)
+def warm_up():
+    """서버 등록 후 (늦어지면 PRELOAD_DELAY 후) 무거운 모듈 로드와 하드웨어 초기화"""
+    robot_is_registered.wait(timeout=PRELOAD_DELAY)
+    modules = [aiortc, cv2, psutil]
+    if settings.store.get(EncoderSettings).backend == 'simplejpeg':
+        modules.append(simplejpeg)
+    startup.preload(*modules)
+    startup.profile.mark('modules_loaded')
+    settings.store.watch()  # 설정 파일 변경 감지 (다른 프로세스에서 보정/설정 변경)
+    try:
+        findee = Findee()  # GPIO/카메라 초기화 시작 (백그라운드 병렬)
+        if findee.wait_ready(timeout=30):
+            findee.get_frame_info()  # 첫 프레임까지 카메라 파이프라인 준비
+            if settings.store.get(ThermalSettings).enabled:
+                findee.start_thermal_governor()
+            if settings.store.get(LanSettings).enabled:
+                start_lan(findee)
+    except Exception as e:
+        print(f"하드웨어 초기화 오류: {e}")
+    print(startup.profile.report())
+#endregion
+
+def start_lan(findee: Findee):
+    """LAN 영상 서버 (+ LAN 조종, mDNS 광고)"""
+    global lan, mdns
+    config = settings.store.get(LanSettings)
+    hooks = []
+    if config.control:
+        # 토큰 없이는 같은 네트워크의 누구나 코드를 실행할 수 있음: 처음 켤 때 만들어 저장 (영상 서버와 같은 토큰)
+        token = lan_server.ensure_token()
+        origins = [origin.strip() for origin in (config.origins or '').split(',') if origin.strip()]
+        lan = lan_control.LanControl(LAN_EVENTS, token=token, origins=origins)
+        hooks.append(lan.setup_app)
+        print(f"LAN 조종 토큰: {token}")
+    server = findee.start_lan_server(encode=encode_image, app_hooks=hooks)  # 전송과 같은 인코더
+    if config.mdns:
+        mdns = lan_control.MdnsAdvertiser(ROBOT_NAME or ROBOT_ID or 'findee', server.port, {
+            'id': ROBOT_ID, 'version': ROBOT_VERSION, 'control': int(config.control), 'stream': '/stream.mjpg'
+        }).start()
+
+def main(url: str | None = None):
+    global server_url, ROBOT_ID, ROBOT_NAME
+    # 로봇 식별 정보는 설정 저장소가 우선 (robot_config.py 기본값은 import 시점의 값)
+    ROBOT_ID, ROBOT_NAME, stored_url = robot_config.load_identity()
+    server_url = url or stored_url
+    print(f"설정 파일: {settings.store.path}")
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
+    reconnector.start()  # 서버 연결/등록을 가장 먼저
     webrtc_thread = threading.Thread(target=start_webrtc_loop, daemon=True)
     webrtc_thread.start()
-    sio.connect(SERVER_URL)
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
     while True:
         time.sleep(5)
+
+startup.profile.mark('imports')
+
+if __name__ == "__main__":
+    main()
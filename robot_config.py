@@ -1,4 +1,12 @@
+import settings
+
 ROBOT_VERSION = "1.4.17"
 SERVER_URL = "https://pathfinder-kit.duckdns.org"
 ROBOT_ID = None
-ROBOT_NAME = None
\ No newline at end of file
+ROBOT_NAME = None
+
+def load_identity() -> tuple:
+    """(robot_id, robot_name, server_url): 설정 저장소가 우선 (git pull로 이 파일이 초기화되어도 유지)
+    저장소에 ID가 없고 이 파일에 있으면 저장소로 옮기므로 import가 아니라 프로그램 시작 시 호출
+    """
+    return settings.network_identity(ROBOT_ID, ROBOT_NAME, SERVER_URL)
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+# 세션 수명 관리
+# 세션 하나가 피어 연결, 데이터 채널, 코드 실행 스레드, 명령 상태, asyncio 태스크, 버퍼를 모두 소유
+# - 피어 정리(close_peer)와 레지스트리 제거(SessionRegistry.discard)는 여러 번 호출해도 안전 (idempotent)
+# - WebRTC 연결과 코드 실행이 모두 끝나면 레지스트리에서 제거 (SessionRegistry.release_if_idle)
+# - stats()['memory']: 세션이 붙잡고 있는 버퍼 추정 (대기 중인 candidate, 데이터 채널 송신 버퍼, 전송 대기 중인 이미지/cfg 메시지)
+
+import time
+import asyncio
+import threading
+from collections import deque
+
+# 데이터 채널 트래픽 종류 (브라우저가 채널 label로 지정, 모두 열면 종류별로 따로 전송)
+# - cmd: 조이스틱 명령 (unordered, maxRetransmits=0: 늦은 명령을 재전송하느라 다음 명령이 막히지 않음)
+# - img: 이미지 패킷 (unordered, maxRetransmits=0: 잃어버린 프레임은 다음 프레임으로 대체)
+# - cfg: 위젯 설정/텍스트/system_info (reliable, ordered)
+# 다른 label의 채널 하나만 열면 (이전 브라우저) 모든 트래픽을 그 채널로
+# 기본 채널(data_channel)은 reliable 채널만 (cfg 또는 단일 채널): img/cmd가 먼저 열려도 cfg 트래픽은 손실 채널로 보내지 않고
+# reliable 채널이 열릴 때까지 보관 (send_cfg)
+CHANNEL_CLASSES = ('cmd', 'img', 'cfg')
+MAX_PENDING_CFG = 256  # reliable 채널이 열리기 전에 보관하는 cfg 메시지 수 (넘으면 오래된 것부터 버림)
+SEQ_MODULO = 1 << 16   # 명령 순번 (uint16, 순서 없는 채널에서 늦게 도착한 명령 버림)
+
+class Session:
+    def __init__(self, session_id: str):
+        self.session_id: str = session_id
+        self.created_at: float = time.monotonic()
+        self.last_active: float = self.created_at
+        self.closed: bool = False
+
+        # WebRTC
+        self.connection = None                    # RTCPeerConnection
+        self.data_channel = None                  # RTCDataChannel (기본 채널: cfg 또는 단일 채널, 항상 reliable)
+        self.channels: dict = {}                  # 트래픽 종류 -> RTCDataChannel (종류별 채널을 연 브라우저)
+        self.pending_cfg: deque = deque(maxlen=MAX_PENDING_CFG)   # 기본 채널이 열리기 전의 cfg 메시지
+        self.candidate_queue: list = []           # setRemoteDescription 전에 도착한 ICE candidate
+        self.remote_description_set: bool = False
+        self.tasks: set[asyncio.Task] = set()     # 세션 소유 태스크 (system_info_loop 등)
+        self.subscriber = None                    # media_hub.Subscriber (이미지 구독)
+
+        # 코드 실행
+        self.thread: threading.Thread | None = None
+        self.stop_flag: bool = False
+        self.exec_cpu_time: float = 0.0           # 종료된 실행 스레드의 누적 CPU 시간 (초)
+        self.exec_count: int = 0
+        self.profiling: bool = False              # 실행마다 프로파일 (code_profiler)
+
+        # 모바일 명령 (signed int8 X, Y)
+        self.last_command: tuple | None = None
+        self.last_command_time: float = 0.0
+        self.last_command_seq: int | None = None
+        self.stale_commands: int = 0              # 순번이 지난 명령 (버림)
+
+        # 트래픽 통계
+        self.bytes_sent: int = 0
+        self.messages_sent: int = 0
+        self.bytes_received: int = 0
+        self.messages_received: int = 0
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    @property
+    def channel_open(self) -> bool:
+        """기본(reliable) 채널이 열림"""
+        return self.data_channel is not None and self.data_channel.readyState == 'open'
+
+    @property
+    def accepts_cfg(self) -> bool:
+        """cfg 트래픽을 보내거나 보관할 수 있음 (기본 채널이 열렸거나 종류별 채널 일부가 먼저 열림)"""
+        return self.channel_open or bool(self.channels)
+
+    @property
+    def media_open(self) -> bool:
+        channel = self.channel_for('img')
+        return channel is not None and channel.readyState == 'open'
+
+    def attach_channel(self, channel) -> str | None:
+        """브라우저가 연 채널 등록 (트래픽 종류, 단일 채널이면 None)"""
+        label = getattr(channel, 'label', None)
+        if label not in CHANNEL_CLASSES:
+            self.channels.clear()
+            self.data_channel = channel
+            self.flush_cfg()
+            return None
+        self.channels[label] = channel
+        if label == 'cfg':
+            # 기본 채널은 reliable인 cfg만 (img/cmd는 partially reliable이므로 기본 채널로 쓰지 않음)
+            self.data_channel = channel
+            self.flush_cfg()
+        return label
+
+    def channel_for(self, traffic: str):
+        """트래픽 종류의 채널 (종류별 채널이 없거나 닫혔으면 기본 채널, cfg는 항상 기본 채널)"""
+        channel = self.channels.get(traffic)
+        if channel is not None and channel.readyState == 'open':
+            return channel
+        return self.data_channel
+
+    def send_cfg(self, message) -> bool:
+        """cfg 트래픽 전송 (기본 채널이 아직 열리지 않았으면 보관했다가 열릴 때 순서대로, 보냈으면 True)"""
+        if not self.channel_open:
+            self.pending_cfg.append(message)
+            return False
+        self.flush_cfg()
+        self.data_channel.send(message)
+        self.record_sent(len(message))
+        return True
+
+    def flush_cfg(self):
+        """보관한 cfg 메시지 전송 (기본 채널이 열렸을 때, 채널 open 이벤트에서도 호출)"""
+        while self.pending_cfg and self.channel_open:
+            message = self.pending_cfg.popleft()
+            self.data_channel.send(message)
+            self.record_sent(len(message))
+
+    @property
+    def executing(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def add_task(self, task: asyncio.Task) -> asyncio.Task:
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def set_command(self, command: tuple, seq: int | None = None) -> bool:
+        """최신 명령 갱신 (seq가 마지막 순번보다 앞서면 늦게 도착한 명령이므로 버리고 False)"""
+        if seq is not None:
+            last = self.last_command_seq
+            if last is not None and 0 < (last - seq) % SEQ_MODULO < SEQ_MODULO // 2:
+                self.stale_commands += 1
+                return False
+            self.last_command_seq = seq
+        self.last_command = command
+        self.last_command_time = time.monotonic()
+        return True
+
+    def record_sent(self, size: int):
+        self.bytes_sent += size
+        self.messages_sent += 1
+
+    def record_received(self, size: int):
+        self.bytes_received += size
+        self.messages_received += 1
+        self.last_active = time.monotonic()
+
+    async def close_peer(self):
+        """WebRTC 자원 정리 (태스크 취소, 피어 연결 종료, candidate 버퍼 비우기)"""
+        for task in list(self.tasks):
+            if task is not asyncio.current_task():
+                task.cancel()
+        self.tasks.clear()
+        if self.subscriber is not None:
+            self.subscriber.closed = True  # 허브가 다음 발행 때 정리
+            self.subscriber = None
+        connection, self.connection = self.connection, None
+        self.data_channel = None
+        self.channels = {}
+        self.pending_cfg.clear()
+        self.last_command_seq = None
+        self.candidate_queue = []
+        self.remote_description_set = False
+        self.last_command = None
+        if connection is not None:
+            try:
+                await connection.close()
+            except Exception:
+                pass
+
+    def thread_cpu_time(self) -> float:
+        """실행 중인 스레드 CPU 시간 + 누적값 (초)"""
+        total = self.exec_cpu_time
+        thread = self.thread
+        if thread is not None and thread.is_alive() and hasattr(time, 'pthread_getcpuclockid'):
+            try:
+                total += time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+            except (OSError, TypeError):
+                pass
+        return total
+
+    def memory(self) -> dict:
+        """세션이 붙잡고 있는 버퍼 추정 (bytes, 파이썬 객체 오버헤드 제외)"""
+        candidates = sum(len(str(candidate.get('candidate', ''))) for candidate in self.candidate_queue
+                         if isinstance(candidate, dict))
+        channels = {id(channel): channel for channel in (self.data_channel, *self.channels.values()) if channel is not None}
+        buffered = sum(getattr(channel, 'bufferedAmount', 0) for channel in channels.values())
+        media = self.subscriber.pending_bytes if self.subscriber is not None else 0
+        cfg = sum(len(message) for message in self.pending_cfg)
+        return {
+            'queued_candidates_bytes': candidates,
+            'channel_buffered_bytes': buffered,
+            'pending_media_bytes': media,
+            'pending_cfg_bytes': cfg,
+            'total_bytes': candidates + buffered + media + cfg
+        }
+
+    def stats(self) -> dict:
+        channel = self.data_channel
+        return {
+            'session_id': self.session_id,
+            'age_s': round(time.monotonic() - self.created_at, 1),
+            'idle_s': round(time.monotonic() - self.last_active, 1),
+            'connection_state': getattr(self.connection, 'connectionState', None),
+            'channel_state': getattr(channel, 'readyState', None),
+            'executing': self.executing,
+            'exec_count': self.exec_count,
+            'profiling': self.profiling,
+            'exec_cpu_s': round(self.thread_cpu_time(), 3),
+            'tasks': len(self.tasks),
+            'buffered_bytes': getattr(channel, 'bufferedAmount', 0) if channel else 0,
+            'channels': {label: {
+                'state': channel.readyState,
+                'ordered': getattr(channel, 'ordered', None),
+                'max_retransmits': getattr(channel, 'maxRetransmits', None),
+                'buffered_bytes': channel.bufferedAmount
+            } for label, channel in self.channels.items()},
+            'stale_commands': self.stale_commands,
+            'queued_candidates': len(self.candidate_queue),
+            'media': self.subscriber.stats() if self.subscriber else None,
+            'memory': self.memory(),
+            'bytes_sent': self.bytes_sent,
+            'messages_sent': self.messages_sent,
+            'bytes_received': self.bytes_received,
+            'messages_received': self.messages_received
+        }
+
+class SessionRegistry:
+    """session_id → Session (sio 스레드, WebRTC 루프, 실행 스레드에서 함께 접근)"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: dict[str, Session] = {}
+        self.created: int = 0
+        self.removed: int = 0
+
+    def __contains__(self, session_id) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Session | None:
+        return self._sessions.get(session_id)
+
+    def get_or_create(self, session_id: str) -> Session:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id)
+                self._sessions[session_id] = session
+                self.created += 1
+            return session
+
+    def values(self) -> list[Session]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def discard(self, session: Session):
+        """세션을 레지스트리에서 제거 (같은 ID로 새 세션이 생겼으면 유지)"""
+        with self._lock:
+            if self._sessions.get(session.session_id) is session:
+                del self._sessions[session.session_id]
+                self.removed += 1
+        session.closed = True
+
+    def release_if_idle(self, session: Session):
+        """WebRTC 연결과 코드 실행이 모두 없으면 제거"""
+        if session.connection is None and not session.executing:
+            self.discard(session)
+
+    def latest_command(self, session_id: str | None = None) -> tuple:
+        """세션의 최신 명령 (session_id가 없으면 가장 최근에 명령을 받은 열린 세션)"""
+        if session_id is not None:
+            session = self._sessions.get(session_id)
+            return session.last_command if session and session.last_command else (0, 0)
+        latest = None
+        for session in self.values():
+            if session.last_command and session.channel_open:
+                if latest is None or session.last_command_time > latest.last_command_time:
+                    latest = session
+        return latest.last_command if latest else (0, 0)
+
+    def stats(self) -> dict:
+        sessions = self.values()
+        return {
+            'active': len(sessions),
+            'created': self.created,
+            'removed': self.removed,
+            'sessions': [session.stats() for session in sessions]
+        }
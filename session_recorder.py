@@ -0,0 +1,481 @@
+from __future__ import annotations
+
+# 세션 기록 / 재생 (Findee.start_recording, Findee.replay)
+# 기록 대상: 카메라 프레임 (JPEG 또는 원본), get_command 입력, get_distance 값, control_motors 출력
+#
+# 저장 형식 (기록마다 디렉터리 하나)
+# - data.bin : MAGIC + 레코드 내용을 이어 붙인 추가 전용 로그 (mmap, GROW_SIZE 단위로 파일을 늘림)
+# - index.bin: MAGIC + 고정 크기 항목 (종류, 길이, 시각 ns, data.bin 오프셋), 종류 0은 빈 자리 (비정상 종료 시 끝 표시)
+# - meta.json: 시작 시각, 프레임 형식, 종류별 개수, 버린 레코드 수
+#
+# 기록: 호출한 스레드는 값(프레임은 복사본)을 버퍼에 넣기만 하고, 쓰기 스레드가 JPEG 인코딩과 mmap 쓰기를 함
+#   버퍼는 MAX_BUFFER_BYTES로 제한: 넘으면 새 레코드를 버림 (제어 루프를 멈추지 않음, dropped에 기록)
+#   디스크(SD 카드) 반영은 쓰기 스레드가 FLUSH_INTERVAL마다 msync
+# 재생: 기록을 mmap으로 읽어 Findee API(get_frame_info, get_distance, get_command, control_motors)에 그대로 공급
+#   speed=None: 가상 시계로 대기 없이 최대 속도 (time.sleep도 가상 시계만 진행, 재생을 시작한 스레드만)
+#   speed=1.0: 기록 당시 속도, 2.0: 두 배속
+#   센서 호출은 아직 받지 않은 가장 최근 값을 반환, 없으면 다음 값 시각까지 시계를 진행 (기록 때와 같은 순서)
+#   control_motors는 모터를 움직이지 않고 출력만 모음 (기록된 출력과 비교 가능)
+
+import os
+import json
+import time
+import mmap
+import struct
+import bisect
+import threading
+from collections import deque, Counter
+from pathlib import Path
+
+import startup
+import sleep_hooks
+
+cv2 = startup.LazyModule('cv2')
+np = startup.LazyModule('numpy')
+
+MAGIC = b'FNDREC01'
+GROW_SIZE = 16 * 1024 * 1024      # data.bin 확장 단위
+INDEX_GROW = 64 * 1024            # index.bin 확장 단위
+MAX_BUFFER_BYTES = 24 * 1024 * 1024
+FLUSH_INTERVAL = 1.0
+RECORD_QUALITY = 85               # 기록용 JPEG 품질 (영상 처리 재현용으로 전송보다 높게)
+
+FRAME_RAW = 1
+FRAME_JPEG = 2
+DISTANCE = 3
+COMMAND = 4
+MOTORS = 5
+
+KIND_NAMES = {FRAME_RAW: 'frame', FRAME_JPEG: 'frame', DISTANCE: 'distance', COMMAND: 'command', MOTORS: 'motors'}
+
+INDEX_ENTRY = struct.Struct('<BxxxIqQ')        # 종류, 길이, 시각(ns, 기록 시작 기준), 오프셋
+FRAME_HEADER = struct.Struct('<qiiIHHBx')      # SensorTimestamp, FrameDuration, ExposureTime, 번호, 높이, 너비, 채널
+PAIR = struct.Struct('<dd')
+VALUE = struct.Struct('<d')
+
+# 현재 기록/재생 (Findee와 robot_client가 확인, 없으면 None)
+active_recorder: Recorder | None = None
+active_player: Player | None = None
+
+# 프레임 JPEG 인코더 encode(image, quality) -> bytes | None (robot_client가 전송과 같은 인코더로 설정)
+default_encode = None
+
+class ReplayFinished(Exception):
+    """재생할 프레임/거리 값이 더 없음"""
+
+def default_path() -> Path:
+    base = os.environ.get('FINDEE_RECORDINGS') or Path.home() / 'findee_recordings'
+    return Path(base) / time.strftime('%Y%m%d-%H%M%S')
+
+def _opencv_encode(image, quality: int) -> bytes | None:
+    ok, buffer = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return buffer.tobytes() if ok else None
+
+#region mmap 추가 전용 파일
+class MmapAppender:
+    def __init__(self, path: Path, grow: int):
+        self.grow = grow
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        self.size = 0
+        self.offset = 0
+        self._map: mmap.mmap | None = None
+        self._reserve(grow)
+        self.append(MAGIC)
+
+    def _reserve(self, needed: int):
+        size = self.size + max(self.grow, needed)
+        if self._map is not None:
+            self._map.close()
+        os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self.size = size
+
+    def append(self, *parts) -> int:
+        """parts를 이어서 기록하고 시작 오프셋 반환"""
+        length = sum(len(part) for part in parts)
+        if self.offset + length > self.size:
+            self._reserve(self.offset + length - self.size)
+        start = position = self.offset
+        for part in parts:
+            self._map[position:position + len(part)] = part
+            position += len(part)
+        self.offset = position
+        return start
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        """사용한 크기로 자르고 디스크에 반영"""
+        self._map.flush()
+        self._map.close()
+        os.ftruncate(self._fd, self.offset)
+        os.fsync(self._fd)
+        os.close(self._fd)
+#endregion
+
+#region 기록
+class Recorder:
+    def __init__(self, path: str | Path | None = None, frames: str = 'jpeg', quality: int = RECORD_QUALITY,
+                 max_fps: float | None = None, encode=None, max_buffer: int = MAX_BUFFER_BYTES, clock=time.monotonic_ns):
+        """
+        Args:
+            path: 기록 디렉터리 (None이면 ~/findee_recordings/<시각>, FINDEE_RECORDINGS로 변경)
+            frames: 'jpeg' (쓰기 스레드에서 인코딩), 'raw' (원본 그대로, SD 카드 대역폭 주의), 'none'
+                    재생에서 같은 프레임을 재현하려면 'raw' ('jpeg'는 손실 압축)
+            max_fps: 프레임 기록 최대 fps (None이면 모든 프레임)
+            encode: JPEG 인코더 (None이면 default_encode, 없으면 OpenCV)
+            clock: 시각 (ns), 프레임 SensorTimestamp와 같은 기준이면 지연 분석 가능
+        """
+        if frames not in ('jpeg', 'raw', 'none'):
+            raise ValueError(f"frames must be 'jpeg', 'raw' or 'none': {frames}")
+        self.path = Path(path) if path else default_path()
+        self.frames = frames
+        self.quality = quality
+        self.frame_interval_ns = int(1e9 / max_fps) if max_fps else 0
+        self._encode = encode or default_encode or _opencv_encode
+        self.max_buffer = max_buffer
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self._pending: deque = deque()
+        self._pending_bytes: int = 0
+        self._closing = False
+        self._thread: threading.Thread | None = None
+        self.owner: threading.Thread | None = None   # start()를 호출한 스레드 (코드 실행이 끝나면 그 실행의 기록만 종료)
+        self._data: MmapAppender | None = None
+        self._index: MmapAppender | None = None
+        self._last_frame_ns: int = 0
+        self.started_ns: int = 0
+        self.started_at: float = 0.0
+
+        self.counts: Counter = Counter()      # 종류 -> 기록한 수
+        self.dropped: Counter = Counter()     # 종류 -> 버퍼가 가득 차서 버린 수
+        self.max_pending_bytes: int = 0
+        self.write_times_ms: deque = deque(maxlen=256)
+
+    #region 시작/종료
+    def start(self) -> Recorder:
+        global active_recorder
+        if active_recorder is not None:
+            raise RuntimeError(f"이미 기록 중입니다: {active_recorder.path}")
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._data = MmapAppender(self.path / 'data.bin', GROW_SIZE)
+        self._index = MmapAppender(self.path / 'index.bin', INDEX_GROW)
+        self.started_ns = self._clock()
+        self.started_at = time.time()
+        self._write_meta()
+        self._thread = threading.Thread(target=self._run, name='findee-recorder', daemon=True)
+        self._thread.start()
+        self.owner = threading.current_thread()
+        active_recorder = self
+        return self
+
+    def stop(self) -> dict:
+        """남은 버퍼를 모두 쓰고 파일을 닫음 (기록 통계 반환)"""
+        global active_recorder
+        if active_recorder is self:
+            active_recorder = None
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self._data.close()
+            self._index.close()
+            self._write_meta()
+        return self.stats()
+
+    def __enter__(self):
+        return self if active_recorder is self else self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _write_meta(self):
+        meta = {'format': MAGIC.decode(), 'started_at': self.started_at, 'frames': self.frames,
+                'quality': self.quality, 'counts': {KIND_NAMES[kind]: n for kind, n in self.counts.items()},
+                'dropped': {KIND_NAMES[kind]: n for kind, n in self.dropped.items()}}
+        (self.path / 'meta.json').write_text(json.dumps(meta, indent=2))
+    #endregion
+
+    #region 기록 (호출한 스레드: 버퍼에 넣기만)
+    def frame(self, info):
+        if self.frames == 'none':
+            return
+        now = self._clock()
+        if self.frame_interval_ns and now - self._last_frame_ns < self.frame_interval_ns:
+            return
+        self._last_frame_ns = now
+        image = info.image
+        kind = FRAME_JPEG if self.frames == 'jpeg' else FRAME_RAW
+        # 사용자 코드가 그림을 그려도 원래 프레임이 기록되도록 복사
+        self._put(kind, now, (info, image.copy()), image.nbytes)
+
+    def distance(self, value):
+        self._put(DISTANCE, self._clock(), VALUE.pack(-1.0 if value is None else float(value)), 8)
+
+    def command(self, value):
+        self._put(COMMAND, self._clock(), PAIR.pack(float(value[0]), float(value[1])), 16)
+
+    def motors(self, left: float, right: float):
+        self._put(MOTORS, self._clock(), PAIR.pack(float(left), float(right)), 16)
+
+    def _put(self, kind: int, now: int, payload, size: int):
+        with self._cond:
+            if self._closing:
+                return
+            if self._pending_bytes + size > self.max_buffer:
+                self.dropped[kind] += 1
+                return
+            self._pending.append((kind, now - self.started_ns, payload, size))
+            self._pending_bytes += size
+            if self._pending_bytes > self.max_pending_bytes:
+                self.max_pending_bytes = self._pending_bytes
+            if len(self._pending) == 1:
+                self._cond.notify()
+    #endregion
+
+    #region 쓰기 스레드
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait(FLUSH_INTERVAL)
+                    if time.monotonic() - last_flush >= FLUSH_INTERVAL:
+                        break
+                batch, self._pending = self._pending, deque()
+                closing = self._closing
+            for kind, t_ns, payload, size in batch:
+                t0 = time.perf_counter()
+                try:
+                    self._write(kind, t_ns, payload)
+                except Exception as e:
+                    print(f"기록 쓰기 오류: {e}")
+                self.write_times_ms.append((time.perf_counter() - t0) * 1000)
+                with self._cond:
+                    self._pending_bytes -= size
+            if time.monotonic() - last_flush >= FLUSH_INTERVAL:
+                self._data.flush()
+                self._index.flush()
+                last_flush = time.monotonic()
+            if closing and not self._pending:
+                return
+
+    def _write(self, kind: int, t_ns: int, payload):
+        if kind in (FRAME_JPEG, FRAME_RAW):
+            info, image = payload
+            height, width = image.shape[:2]
+            channels = image.shape[2] if image.ndim == 3 else 1
+            header = FRAME_HEADER.pack(int(info.timestamp_ns), int(info.frame_duration_us or -1),
+                                       int(info.exposure_us or -1), int(info.sequence) & 0xFFFFFFFF,
+                                       height, width, channels)
+            body = self._encode(image, self.quality) if kind == FRAME_JPEG else memoryview(np.ascontiguousarray(image)).cast('B')
+            if body is None:
+                return
+            parts = (header, body)
+        else:
+            parts = (payload,)
+        length = sum(len(part) for part in parts)
+        offset = self._data.append(*parts)
+        self._index.append(INDEX_ENTRY.pack(kind, length, t_ns, offset))
+        self.counts[kind] += 1
+    #endregion
+
+    def stats(self) -> dict:
+        times = sorted(self.write_times_ms)
+        return {
+            'path': str(self.path),
+            'frames': self.frames,
+            'counts': {KIND_NAMES[kind]: n for kind, n in self.counts.items()},
+            'dropped': {KIND_NAMES[kind]: n for kind, n in self.dropped.items()},
+            'bytes': self._data.offset if self._data else 0,
+            'pending_bytes': self._pending_bytes,
+            'max_pending_bytes': self.max_pending_bytes,
+            'write_ms_p95': round(times[min(len(times) - 1, int(len(times) * 0.95))], 3) if times else None
+        }
+#endregion
+
+#region 재생
+def read_index(path: str | Path) -> list[tuple[int, int, int, int]]:
+    """[(종류, 길이, 시각 ns, 오프셋), ...] (비정상 종료로 남은 빈 항목 전까지)"""
+    raw = (Path(path) / 'index.bin').read_bytes()
+    if raw[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"기록 형식이 아닙니다: {path}")
+    body = raw[len(MAGIC):]
+    body = body[:len(body) - len(body) % INDEX_ENTRY.size]
+    entries = []
+    for entry in INDEX_ENTRY.iter_unpack(body):
+        if entry[0] == 0:
+            break
+        entries.append(entry)
+    return entries
+
+class _Stream:
+    """종류 하나의 시각 순 레코드와 재생 위치"""
+    def __init__(self, entries: list):
+        self.entries = entries
+        self.times = [entry[2] for entry in entries]
+        self.cursor = -1
+
+    def latest(self, now: int) -> int:
+        """시각 now까지의 마지막 레코드 (없으면 -1)"""
+        return bisect.bisect_right(self.times, now) - 1
+
+class Player:
+    def __init__(self, path: str | Path, speed: float | None = None):
+        """
+        Args:
+            path: 기록 디렉터리
+            speed: None이면 대기 없이 최대 속도 (가상 시계), 숫자면 기록 속도의 배수로 재생
+        """
+        self.path = Path(path)
+        self.speed = speed
+        entries = read_index(self.path)
+        self._file = open(self.path / 'data.bin', 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._frames = _Stream([e for e in entries if e[0] in (FRAME_JPEG, FRAME_RAW)])
+        self._distances = _Stream([e for e in entries if e[0] == DISTANCE])
+        self._commands = _Stream([e for e in entries if e[0] == COMMAND])
+        self.recorded_motors: list[tuple[int, float, float]] = [(e[2], *PAIR.unpack_from(self._map, e[3]))
+                                                                for e in entries if e[0] == MOTORS]
+        self.duration_ns: int = entries[-1][2] if entries else 0
+
+        self.now_ns: int = 0                  # 가상 시계 (기록 시작 기준)
+        self.motor_outputs: list[tuple[int, float, float]] = []   # 재생 중 control_motors 출력
+        self.served: Counter = Counter()
+        self.decode_s: float = 0.0
+        self._wall_start: float | None = None
+        self._thread: int | None = None
+        self.owner: threading.Thread | None = None   # attach()를 호출한 스레드
+
+    #region 시작/종료
+    def attach(self) -> Player:
+        """Findee API를 이 기록으로 대체 (speed=None이면 이 스레드의 time.sleep은 가상 시계만 진행)"""
+        global active_player
+        if active_player is not None:
+            raise RuntimeError("이미 재생 중입니다")
+        active_player = self
+        self._wall_start = time.perf_counter()
+        self._thread = threading.get_ident()
+        self.owner = threading.current_thread()
+        if self.speed is None:
+            sleep_hooks.add(self._virtual_sleep)
+        return self
+
+    def close(self):
+        global active_player
+        if active_player is self:
+            active_player = None
+        sleep_hooks.remove(self._virtual_sleep)
+        if not self._map.closed:
+            self._map.close()
+            self._file.close()
+
+    def __enter__(self):
+        return self if active_player is self else self.attach()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _virtual_sleep(self, seconds: float, sleep):
+        """time.sleep 훅 (sleep_hooks): 재생을 시작한 스레드는 가상 시계만 진행"""
+        if threading.get_ident() != self._thread:
+            return sleep(seconds)
+        self.now_ns += max(0, int(seconds * 1e9))
+    #endregion
+
+    #region 가상 시계
+    def _sync(self):
+        """배속 재생: 실제 경과 시간만큼 시계 진행"""
+        if self.speed is not None:
+            self.now_ns = max(self.now_ns, int((time.perf_counter() - self._wall_start) * self.speed * 1e9))
+
+    def _advance(self, t_ns: int):
+        if t_ns <= self.now_ns:
+            return
+        if self.speed is not None:
+            time.sleep((t_ns - self.now_ns) / self.speed / 1e9)
+        self.now_ns = t_ns
+
+    def _next(self, stream: _Stream) -> tuple | None:
+        """받지 않은 가장 최근 레코드, 없으면 다음 레코드 시각까지 진행"""
+        self._sync()
+        index = stream.latest(self.now_ns)
+        if index <= stream.cursor:
+            index = stream.cursor + 1
+            if index >= len(stream.entries):
+                return None
+            self._advance(stream.times[index])
+        stream.cursor = index
+        return stream.entries[index]
+    #endregion
+
+    #region Findee API
+    def frame(self):
+        from findee import FrameInfo
+        entry = self._next(self._frames)
+        if entry is None:
+            raise ReplayFinished(f"재생 끝 (프레임 {self.served['frame']}개)")
+        kind, length, t_ns, offset = entry
+        timestamp_ns, frame_duration, exposure, sequence, height, width, channels = FRAME_HEADER.unpack_from(self._map, offset)
+        start = offset + FRAME_HEADER.size
+        data = np.frombuffer(self._map, dtype=np.uint8, count=length - FRAME_HEADER.size, offset=start)
+        t0 = time.perf_counter()
+        if kind == FRAME_JPEG:
+            image = cv2.imdecode(data, cv2.IMREAD_GRAYSCALE if channels == 1 else cv2.IMREAD_COLOR)
+        else:
+            shape = (height, width) if channels == 1 else (height, width, channels)
+            image = data.reshape(shape).copy()   # mmap은 읽기 전용: 사용자 코드가 수정할 수 있도록 복사
+        self.decode_s += time.perf_counter() - t0
+        self.served['frame'] += 1
+        return FrameInfo(image, timestamp_ns=timestamp_ns, frame_duration_us=None if frame_duration < 0 else frame_duration,
+                         exposure_us=None if exposure < 0 else exposure, sequence=sequence)
+
+    def distance(self) -> float:
+        entry = self._next(self._distances)
+        if entry is None:
+            if not self._distances.entries:
+                return -1   # 거리를 기록하지 않음 (Trig Timeout과 같은 값)
+            raise ReplayFinished(f"재생 끝 (거리 {self.served['distance']}개)")
+        self.served['distance'] += 1
+        value = VALUE.unpack_from(self._map, entry[3])[0]
+        return value if value < 0 else round(value, 1)
+
+    def command(self) -> tuple:
+        """기록된 명령 중 현재 시각의 최신 값 (시계를 진행하지 않음)"""
+        self._sync()
+        index = self._commands.latest(self.now_ns)
+        self.served['command'] += 1
+        if index < 0:
+            return (0, 0)
+        x, y = PAIR.unpack_from(self._map, self._commands.entries[index][3])
+        return int(x), int(y)
+
+    def motors(self, left: float, right: float):
+        self.motor_outputs.append((self.now_ns, float(left), float(right)))
+    #endregion
+
+    def compare_motors(self) -> dict:
+        """재생 중 모터 출력과 기록된 출력 비교 (같은 순서의 명령끼리)"""
+        pairs = list(zip(self.recorded_motors, self.motor_outputs))
+        diffs = [max(abs(a[1] - b[1]), abs(a[2] - b[2])) for a, b in pairs]
+        return {'recorded': len(self.recorded_motors), 'replayed': len(self.motor_outputs),
+                'max_diff': round(max(diffs), 3) if diffs else None,
+                'mismatched': sum(1 for diff in diffs if diff > 1e-6)}
+
+    def stats(self) -> dict:
+        wall = time.perf_counter() - self._wall_start if self._wall_start else 0.0
+        return {
+            'path': str(self.path),
+            'recorded_s': round(self.duration_ns / 1e9, 3),
+            'virtual_s': round(self.now_ns / 1e9, 3),
+            'wall_s': round(wall, 3),
+            'speedup': round(self.now_ns / 1e9 / wall, 2) if wall > 0 else None,
+            'served': dict(self.served),
+            'decode_ms_per_frame': round(self.decode_s * 1000 / self.served['frame'], 3) if self.served['frame'] else None,
+            'motors': self.compare_motors()
+        }
+#endregion
@@ -0,0 +1,484 @@
+from __future__ import annotations
+
+# 로봇 설정 저장소 (코드 디렉터리 소유자의 ~/.config/findee/settings.json, FINDEE_SETTINGS 환경 변수로 경로 변경)
+# - $HOME을 쓰지 않음: root로 실행되는 app_wifi.py(systemd/sudo)와 pi 사용자로 실행되는 robot_client.py가 같은 파일을 씀
+#   root가 만든 디렉터리/파일은 코드 소유자에게 넘김 (pi 사용자 프로세스도 계속 쓸 수 있도록)
+# 섹션: calibration (모터 보정), camera (기본 해상도/fps), encoder (JPEG 인코더/품질), network (로봇 ID/이름/서버),
+#       lan (로컬 HTTP 서버)
+# - 저장: 같은 디렉토리의 임시 파일에 쓰고 fsync 후 os.replace
+#   (쓰는 도중 전원이 꺼져도 이전 파일 또는 새 파일 중 하나만 남음, 프로세스 간에는 flock으로 직렬화, fcntl이 없는 OS는 생략)
+# - 읽기: 메모리 캐시에서 바로 반환 (디스크 접근 없음)
+#   파일 변경은 refresh()/watch()가 stat(mtime, 크기, inode)으로 확인 후 다시 읽음
+# - 스키마 버전: 이전 버전은 읽을 때 변환, 알 수 없는 섹션/키는 저장할 때 보존
+# - 기존 motor_calibration.json은 calibration 섹션이 없을 때 한 번 가져옴
+
+import os
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+SCHEMA_VERSION = 1
+CODE_DIR = Path(__file__).resolve().parent
+
+def _owner_home() -> Path:
+    """코드 디렉터리 소유자의 홈 (pwd가 없는 OS는 현재 사용자 홈)"""
+    try:
+        import pwd
+        return Path(pwd.getpwuid(CODE_DIR.stat().st_uid).pw_dir)
+    except (ImportError, KeyError, OSError):
+        return Path.home()
+
+CONFIG_DIR = _owner_home() / '.config' / 'findee'
+LEGACY_CALIBRATION_FILE = CONFIG_DIR / 'motor_calibration.json'
+
+def default_path() -> Path:
+    return Path(os.environ.get('FINDEE_SETTINGS', CONFIG_DIR / 'settings.json'))
+
+def _give_to_owner(path: Path):
+    """root로 실행 중이면 코드 디렉터리 소유자로 변경 (실패는 무시)"""
+    if not hasattr(os, 'geteuid') or os.geteuid() != 0:
+        return
+    try:
+        owner = CODE_DIR.stat()
+        if owner.st_uid != 0:
+            os.chown(path, owner.st_uid, owner.st_gid)
+    except OSError:
+        pass
+
+def _make_dirs(directory: Path):
+    """mkdir -p (새로 만든 디렉터리는 _give_to_owner)"""
+    missing = []
+    while not directory.exists() and directory != directory.parent:
+        missing.append(directory)
+        directory = directory.parent
+    for created in reversed(missing):
+        created.mkdir(exist_ok=True)
+        _give_to_owner(created)
+
+#region 설정 섹션
+class Section:
+    """설정 섹션 (FIELDS: 이름 -> (타입, 기본값)), 값은 읽기 전용 스냅샷으로 사용 (변경은 replace)"""
+    NAME: str = ''
+    FIELDS: dict[str, tuple[type, object]] = {}
+
+    def __init__(self, **values):
+        for name, (kind, default) in self.FIELDS.items():
+            object.__setattr__(self, name, self._coerce(name, kind, values.get(name, default), default))
+
+    @staticmethod
+    def _coerce(name: str, kind: type, value, default):
+        if value is None:
+            return default
+        if isinstance(value, kind) and not (kind is int and isinstance(value, bool)):
+            return value
+        try:
+            if kind is bool and isinstance(value, str):
+                return value.lower() in ('1', 'true', 'yes', 'on')
+            return kind(value)
+        except (TypeError, ValueError):
+            print(f"설정 값 무시 ({name}={value!r}): {kind.__name__}가 아님")
+            return default
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__}는 읽기 전용입니다 (replace 사용)")
+
+    @classmethod
+    def from_dict(cls, data: dict | None):
+        data = data if isinstance(data, dict) else {}
+        return cls(**{name: value for name, value in data.items() if name in cls.FIELDS})
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def replace(self, **changes):
+        unknown = set(changes) - set(self.FIELDS)
+        if unknown:
+            raise KeyError(f"{type(self).__name__}에 없는 설정: {', '.join(sorted(unknown))}")
+        return type(self)(**{**self.to_dict(), **changes})
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.to_dict() == self.to_dict()
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+CURVE_SPEED_RANGE = (0.0, 100.0)
+CURVE_RATIO_RANGE = (0.2, 5.0)
+
+def _normalize_curve(name: str, points) -> tuple:
+    """[[속도, 비율], ...] -> 속도 순 ((속도, 비율), ...), 범위를 벗어난 점은 무시"""
+    curve = {}
+    for point in points or ():
+        try:
+            speed, ratio = (float(value) for value in point)
+        except (TypeError, ValueError):
+            print(f"설정 값 무시 ({name}: {point!r}): [속도, 비율]이 아님")
+            continue
+        if not (CURVE_SPEED_RANGE[0] <= speed <= CURVE_SPEED_RANGE[1] and CURVE_RATIO_RANGE[0] <= ratio <= CURVE_RATIO_RANGE[1]):
+            print(f"설정 값 무시 ({name}: {point!r}): 범위 밖")
+            continue
+        curve[speed] = ratio
+    return tuple(sorted(curve.items()))
+
+class MotorCalibration(Section):
+    """모터 보정
+    - dir/low_speed_ratio/high_speed_ratio: 수동 보정 (빠른 바퀴 0=왼쪽/1=오른쪽, 속도 30/100에서 빠른 바퀴에 곱할 비율)
+    - forward_curve/backward_curve: 자동 보정 (auto_calibration), 주행 방향별 ((속도, 오른쪽/왼쪽 출력 비율), ...)
+      곡선이 있으면 수동 보정 값보다 우선
+    """
+    NAME = 'calibration'
+    FIELDS = {
+        'dir': (int, 1),
+        'low_speed_ratio': (float, 1.0),
+        'high_speed_ratio': (float, 1.0),
+        'forward_curve': (tuple, ()),
+        'backward_curve': (tuple, ())
+    }
+    dir: int
+    low_speed_ratio: float
+    high_speed_ratio: float
+    forward_curve: tuple
+    backward_curve: tuple
+
+    def __init__(self, **values):
+        super().__init__(**values)
+        for name in ('forward_curve', 'backward_curve'):
+            object.__setattr__(self, name, _normalize_curve(name, getattr(self, name)))
+
+    def curve(self, backward: bool = False) -> tuple:
+        return self.backward_curve if backward else self.forward_curve
+
+class CameraSettings(Section):
+    """카메라 기본값 (camera_init에서 사용)"""
+    NAME = 'camera'
+    FIELDS = {
+        'width': (int, 640),
+        'height': (int, 480),
+        'fps': (int, 30)
+    }
+    width: int
+    height: int
+    fps: int
+
+class EncoderSettings(Section):
+    """JPEG 인코더 (backend: 'opencv' 또는 'simplejpeg'), 기본 품질"""
+    NAME = 'encoder'
+    FIELDS = {
+        'backend': (str, 'opencv'),
+        'quality': (int, 60),         # WebRTC 이미지 (자동 조정 시작 품질)
+        'mjpeg_quality': (int, 70)    # mjpeg_gen
+    }
+    backend: str
+    quality: int
+    mjpeg_quality: int
+
+class NetworkIdentity(Section):
+    """서버에 등록할 로봇 식별 정보 (None이면 robot_config.py 기본값)"""
+    NAME = 'network'
+    FIELDS = {
+        'robot_id': (str, None),
+        'robot_name': (str, None),
+        'server_url': (str, None)
+    }
+    robot_id: str | None
+    robot_name: str | None
+    server_url: str | None
+
+class LanSettings(Section):
+    """같은 네트워크에서 접속하는 로컬 HTTP 서버 (lan_server.py, JPEG 품질은 encoder.mjpeg_quality)와 LAN 조종 (lan_control.py)"""
+    NAME = 'lan'
+    FIELDS = {
+        'enabled': (bool, False),
+        'host': (str, '0.0.0.0'),
+        'port': (int, 8080),
+        'fps': (float, 15.0),
+        'max_clients': (int, 8),
+        'control': (bool, False),     # LAN 조종 (Socket.IO, 클라우드 서버와 같은 이벤트)
+        'token': (str, None),         # LAN 서버/조종 인증 토큰 (None이면 처음 켤 때 만들어 저장)
+        'origins': (str, None),       # 같은 출처 외에 LAN 조종을 허용할 브라우저 출처 (쉼표로 구분)
+        'mdns': (bool, True),         # _findee._tcp.local. 광고
+        'public': (bool, False)       # 영상/스냅샷/통계를 토큰 없이 공개 (LAN 조종은 항상 토큰 필요)
+    }
+    enabled: bool
+    host: str
+    port: int
+    fps: float
+    max_clients: int
+    control: bool
+    token: str | None
+    origins: str | None
+    mdns: bool
+    public: bool
+
+class ThermalSettings(Section):
+    """온도/부하 기반 성능 조절 (thermal_governor.py): 단계별 진입 온도 °C, 측정 주기 (초)"""
+    NAME = 'thermal'
+    FIELDS = {
+        'enabled': (bool, True),
+        'warm': (float, 70.0),
+        'hot': (float, 75.0),
+        'critical': (float, 80.0),
+        'interval': (float, 2.0)
+    }
+    enabled: bool
+    warm: float
+    hot: float
+    critical: float
+    interval: float
+
+SECTIONS: dict[str, type[Section]] = {
+    cls.NAME: cls for cls in (MotorCalibration, CameraSettings, EncoderSettings, NetworkIdentity, LanSettings,
+                              ThermalSettings)
+}
+#endregion
+
+#region 스키마 변환
+def _migrate(data: dict) -> dict:
+    """이전 스키마를 현재 버전으로 변환"""
+    version = data.get('schema', 0)
+    if version < 1:
+        # 0: 스키마 번호 없이 보정 값만 저장하던 형식 ({'dir', 'low_speed_ratio', 'high_speed_ratio'})
+        if 'dir' in data and MotorCalibration.NAME not in data:
+            data = {MotorCalibration.NAME: {key: data[key] for key in MotorCalibration.FIELDS if key in data}}
+        data['schema'] = 1
+    return data
+#endregion
+
+class SettingsStore:
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path) if path is not None else default_path()
+        self._lock = threading.RLock()
+        self._raw: dict = {}                          # 파일 내용 (알 수 없는 섹션 보존용)
+        self._sections: dict[str, Section] = {}       # 섹션 이름 -> 스냅샷 (교체만 함)
+        self._signature: tuple | None = None          # (mtime_ns, size, inode)
+        self._loaded = False
+        self._listeners: list = []
+        self._watcher: threading.Thread | None = None
+        self._lock_depth: int = 0                     # _file_lock 중첩 (self._lock을 잡은 스레드만 변경)
+        self.reads: int = 0
+        self.writes: int = 0
+        self.read_only: bool = False                  # 파일이 더 새로운 스키마면 쓰지 않음
+
+    #region 읽기
+    def get(self, section: type[Section]) -> Section:
+        """섹션 값 (메모리 캐시, 처음 한 번만 파일을 읽음)"""
+        value = self._sections.get(section.NAME)
+        if value is None:
+            if not self._loaded:
+                self.refresh(force=True)
+                value = self._sections.get(section.NAME)
+            if value is None:
+                value = section()
+        return value
+
+    def has(self, section: type[Section]) -> bool:
+        if not self._loaded:
+            self.refresh(force=True)
+        return section.NAME in self._sections
+
+    def _stat(self) -> tuple | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def refresh(self, force: bool = False) -> bool:
+        """파일이 바뀌었으면 다시 읽음 (바뀐 섹션이 있으면 True)"""
+        with self._lock:
+            signature = self._stat()
+            if not force and self._loaded and signature == self._signature:
+                return False
+            raw = self._read_file()
+            if raw is None:
+                if self._loaded and signature is not None:
+                    self._signature = signature  # 파일이 다시 바뀔 때까지 재시도하지 않음
+                    return False  # 읽기 실패 (손상 등): 마지막으로 읽은 값 유지
+                raw = {}
+            first_load = not self._loaded
+            self._loaded = True
+            self._signature = signature
+            changed = self._apply(raw)
+            if first_load and MotorCalibration.NAME not in raw:
+                self._import_legacy_calibration()
+            return changed
+
+    def _read_file(self) -> dict | None:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.reads += 1
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"설정 읽기 실패 ({self.path}): {e}")
+            return None
+        if not isinstance(data, dict):
+            print(f"설정 형식 오류 ({self.path})")
+            return None
+        version = data.get('schema', 0)
+        self.read_only = isinstance(version, int) and version > SCHEMA_VERSION
+        if self.read_only:
+            print(f"설정 스키마 {version}는 이 버전({SCHEMA_VERSION})보다 새롭습니다. 알고 있는 섹션만 읽고 저장하지 않습니다.")
+        return _migrate(data)
+
+    def _apply(self, raw: dict) -> bool:
+        sections = {name: cls.from_dict(raw[name]) for name, cls in SECTIONS.items() if isinstance(raw.get(name), dict)}
+        changed = [name for name in set(sections) | set(self._sections)
+                   if sections.get(name) != self._sections.get(name)]
+        self._raw = raw
+        self._sections = sections
+        for name in changed:
+            self._notify(name, sections.get(name))
+        return bool(changed)
+
+    def _import_legacy_calibration(self):
+        """기존 ~/.config/findee/motor_calibration.json을 calibration 섹션으로 가져옴"""
+        if self.path != default_path() or not LEGACY_CALIBRATION_FILE.exists():
+            return
+        try:
+            with open(LEGACY_CALIBRATION_FILE, 'r') as f:
+                legacy = json.load(f)
+            self.set(MotorCalibration.from_dict(legacy))
+            print(f"캘리브레이션 이전 완료: {LEGACY_CALIBRATION_FILE} → {self.path}")
+        except Exception as e:
+            print(f"캘리브레이션 이전 실패: {e}")
+    #endregion
+
+    #region 쓰기
+    def set(self, value: Section) -> bool:
+        return self.update(type(value), **value.to_dict())
+
+    def update(self, section: type[Section], **changes) -> bool:
+        """섹션 일부 변경 후 원자적으로 저장 (다른 프로세스의 변경을 먼저 반영), 저장 성공 여부 반환"""
+        with self._lock, self._file_lock():
+            self.refresh()
+            if self.read_only:
+                print(f"설정 저장 안 함: 파일 스키마가 더 새롭습니다 ({self.path})")
+                return False
+            value = self.get(section).replace(**changes)
+            raw = dict(self._raw)
+            raw['schema'] = SCHEMA_VERSION
+            # 이 버전이 모르는 키(다른 버전에서 추가한 필드)는 유지
+            current = raw.get(section.NAME)
+            raw[section.NAME] = {**(current if isinstance(current, dict) else {}), **value.to_dict()}
+            try:
+                self._write_atomic(json.dumps(raw, indent=2, ensure_ascii=False) + '\n')
+            except OSError as e:
+                print(f"설정 저장 실패 ({self.path}): {e}")
+                return False
+            self.writes += 1
+            self._signature = self._stat()
+            self._apply(raw)
+            return True
+
+    @contextmanager
+    def _file_lock(self):
+        """프로세스 간 쓰기 직렬화 (settings.json.lock에 flock, 같은 스레드에서 중첩 가능, fcntl이 없으면 생략)"""
+        if self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        fd = None
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None  # Windows 등: 프로세스 간 잠금 없이 원자적 교체만
+        if fcntl is not None:
+            try:
+                _make_dirs(self.path.parent)
+                fd = os.open(f"{self.path}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+                _give_to_owner(Path(f"{self.path}.lock"))
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except OSError:
+                pass  # 잠금 실패해도 원자적 교체는 유지
+        self._lock_depth = 1
+        try:
+            yield
+        finally:
+            self._lock_depth = 0
+            if fd is not None:
+                os.close(fd)  # 닫으면 flock 해제
+
+    def _write_atomic(self, text: str):
+        directory = self.path.parent
+        _make_dirs(directory)
+        fd, tmp = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            _give_to_owner(Path(tmp))
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        # 이름 변경 자체를 디스크에 기록
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+    #endregion
+
+    #region 변경 감지
+    def add_listener(self, callback):
+        """callback(section_name, value | None): 파일 변경 또는 저장으로 섹션이 바뀌면 호출"""
+        self._listeners.append(callback)
+
+    def _notify(self, name: str, value):
+        for callback in list(self._listeners):
+            try:
+                callback(name, value)
+            except Exception as e:
+                print(f"설정 변경 알림 오류: {e}")
+
+    def watch(self, interval: float = 2.0):
+        """백그라운드에서 주기적으로 파일 변경 확인 (한 번만 시작)"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"설정 변경 확인 오류: {e}")
+
+        self._watcher = threading.Thread(target=run, name='settings-watch', daemon=True)
+        self._watcher.start()
+    #endregion
+
+    def stats(self) -> dict:
+        return {'path': str(self.path), 'reads': self.reads, 'writes': self.writes,
+                'sections': sorted(self._sections), 'read_only': self.read_only}
+
+# 프로세스 전역 저장소
+store = SettingsStore()
+
+def network_identity(robot_id: str | None, robot_name: str | None, server_url: str) -> tuple:
+    """robot_config.py 기본값과 저장소를 합친 (robot_id, robot_name, server_url)
+    저장소에 ID가 없고 robot_config.py에 있으면 (sed로 기록하던 이전 방식) 저장소로 옮김
+    """
+    identity = store.get(NetworkIdentity)
+    if identity.robot_id is None and robot_id is not None:
+        store.update(NetworkIdentity, robot_id=robot_id, robot_name=robot_name)
+        identity = store.get(NetworkIdentity)
+    return (identity.robot_id if identity.robot_id is not None else robot_id,
+            identity.robot_name if identity.robot_name is not None else robot_name,
+            identity.server_url or server_url)
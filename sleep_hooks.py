@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+# time.sleep 가로채기 (code_profiler의 대기 시간 측정, session_recorder.Player의 가상 시계)
+# - time.sleep은 이 모듈만 바꿈: 첫 훅을 추가할 때 디스패처로, 마지막 훅을 제거할 때 원래 함수로
+#   훅끼리 서로의 값을 저장/복원하지 않으므로 추가/제거 순서와 관계없이 원래 time.sleep이 돌아옴
+# - 훅은 hook(seconds, sleep): sleep은 안쪽 훅 (가장 안쪽은 원래 time.sleep), 나중에 추가한 훅이 바깥쪽
+
+import time
+import threading
+
+_lock = threading.Lock()
+_hooks: list = []
+_real_sleep = None           # 첫 훅을 추가하기 전의 time.sleep
+_chain = None                # 디스패처가 부르는 합성 함수
+
+def _compose(sleep, hook):
+    return lambda seconds: hook(seconds, sleep)
+
+def _dispatch(seconds):
+    return _chain(seconds)
+
+def add(hook) -> None:
+    """time.sleep 훅 추가 (같은 훅을 두 번 추가하지 않음)"""
+    global _real_sleep
+    with _lock:
+        if hook in _hooks:
+            return
+        if not _hooks:
+            _real_sleep = time.sleep
+            time.sleep = _dispatch
+        _hooks.append(hook)
+        _rebuild()
+
+def remove(hook) -> None:
+    """훅 제거 (없으면 무시), 남은 훅이 없으면 원래 time.sleep 복원"""
+    global _chain
+    with _lock:
+        if hook not in _hooks:
+            return
+        _hooks.remove(hook)
+        if _hooks:
+            _rebuild()
+            return
+        if time.sleep is _dispatch:
+            time.sleep = _real_sleep
+        _chain = _real_sleep     # 이미 디스패처에 들어온 호출은 원래 함수로
+
+def _rebuild():
+    global _chain
+    chain = _real_sleep
+    for hook in _hooks:
+        chain = _compose(chain, hook)
+    _chain = chain
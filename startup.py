@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+# 서비스 기동 시간 단축 및 측정
+# - LazyModule: 첫 속성 접근 때 import (aiortc, cv2, numpy 등 무거운 모듈이 서버 등록을 늦추지 않도록)
+# - preload(): 서버 등록 후 백그라운드 스레드에서 미리 import (없으면 pip 설치 시도)
+# - StartupProfile: 프로세스 시작 기준 단계별 시각 (import 완료, 서버 연결, 등록, 하드웨어 준비, 첫 프레임)
+#   + 지연 import별 소요 시간
+
+import os
+import time
+import importlib
+import threading
+import subprocess
+
+def _process_start() -> float:
+    """프로세스 시작 시각 (time.monotonic 기준), 인터프리터 기동 시간 포함"""
+    try:
+        with open('/proc/self/stat') as f:
+            stat = f.read()
+        # comm 필드에 공백이 있을 수 있으므로 마지막 ')' 이후부터 파싱 (starttime은 22번째 필드)
+        start_ticks = int(stat[stat.rindex(')') + 2:].split()[19])
+        since_start = time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf('SC_CLK_TCK')
+        return time.monotonic() - max(0.0, since_start)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.monotonic()
+
+PROCESS_START: float = _process_start()
+
+#region 기동 단계 기록
+class StartupProfile:
+    def __init__(self, start: float = PROCESS_START):
+        self.start = start
+        self._lock = threading.Lock()
+        self.marks: dict[str, float] = {}     # 단계 -> 프로세스 시작 후 초
+        self.imports: dict[str, float] = {}   # 모듈 -> import 소요 초
+
+    def mark(self, name: str) -> bool:
+        """단계 기록 (처음 한 번만, 기록했으면 True)"""
+        if name in self.marks:
+            return False  # 매 프레임 호출되는 경로에서 잠금 생략
+        with self._lock:
+            if name in self.marks:
+                return False
+            self.marks[name] = time.monotonic() - self.start
+        return True
+
+    def record_import(self, name: str, seconds: float):
+        with self._lock:
+            self.imports[name] = seconds
+
+    def elapsed(self, name: str) -> float | None:
+        return self.marks.get(name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'marks_s': {name: round(seconds, 3) for name, seconds in self.marks.items()},
+                'imports_s': {name: round(seconds, 3) for name, seconds in self.imports.items()},
+                'uptime_s': round(time.monotonic() - self.start, 1)
+            }
+
+    def report(self) -> str:
+        marks = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in self.marks.items())
+        return f"기동 시간: {marks}"
+
+profile = StartupProfile()
+#endregion
+
+#region 지연 import
+def _install(package: str):
+    print(f"{package} 설치 중...")
+    subprocess.run(['sudo', 'pip', 'install', package, '--break-system-packages'], capture_output=True, text=True)
+
+class LazyModule:
+    """첫 속성 접근 때 모듈을 import하는 대리 객체 (이후 접근한 속성은 대리 객체에 캐시)"""
+    def __init__(self, name: str, install: str | None = None):
+        self.__dict__['_name'] = name
+        self.__dict__['_install'] = install   # 없을 때 pip로 설치할 패키지 이름
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def __getattr__(self, attr: str):
+        value = getattr(load(self), attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __setattr__(self, attr: str, value):
+        setattr(load(self), attr, value)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<LazyModule {self._name} ({state})>"
+
+def load(module):
+    """LazyModule이면 실제 모듈을 import해서 반환 (일반 모듈은 그대로)"""
+    if not isinstance(module, LazyModule):
+        return module
+    real = module.__dict__['_module']
+    if real is not None:
+        return real
+    with module.__dict__['_lock']:
+        real = module.__dict__['_module']
+        if real is None:
+            name, package = module.__dict__['_name'], module.__dict__['_install']
+            t0 = time.perf_counter()
+            try:
+                real = importlib.import_module(name)
+            except ImportError:
+                if package is None:
+                    raise
+                _install(package)
+                real = importlib.import_module(name)
+            profile.record_import(name, time.perf_counter() - t0)
+            module.__dict__['_module'] = real
+    return real
+
+def loaded(module) -> bool:
+    return not isinstance(module, LazyModule) or module.__dict__['_module'] is not None
+
+def preload(*modules) -> list[str]:
+    """모듈 미리 import (실패한 모듈 이름 반환, 실패해도 첫 사용 때 다시 시도)"""
+    failed = []
+    for module in modules:
+        try:
+            load(module)
+        except Exception as e:
+            name = module.__dict__['_name'] if isinstance(module, LazyModule) else repr(module)
+            print(f"모듈 로드 실패 ({name}): {e}")
+            failed.append(name)
+    return failed
+#endregion
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+# 세션별 영상 전송 자동 조정 (JPEG 품질, 축소 배율, 목표 fps)
+# 측정값 (1초 주기)
+# - 데이터 채널 bufferedAmount 배출 속도 (실제로 링크로 빠져나간 바이트/초)
+# - 대기열 지연 = bufferedAmount / 배출 속도, 발행 → 전송 지연 (이벤트 루프 대기)
+# - 로봇 CPU 사용률 (psutil, 없으면 무시)
+# 조정 규칙
+# - 혼잡 (대기열 지연/버퍼 과다, 전송 못 한 프레임 비율 높음): 한 단계 내림 (심하면 두 단계)
+#   쌓인 버퍼가 줄어드는 중이면 유지
+# - CPU 과부하: 품질이 아닌 해상도/fps가 낮아지는 단계까지 내림 (인코딩 비용은 픽셀 수와 fps에 비례)
+# - 여유가 연속 UPGRADE_AFTER 주기 유지되면 한 단계 올림 (빨리 내리고 천천히 올림)
+# 단계(ladder): 품질 → 해상도 → 품질 → fps 순으로 낮아짐
+
+import time
+from collections import deque
+
+import startup
+
+psutil = startup.LazyModule('psutil')
+
+# 기본 범위 (데이터 채널 {'type': 'stream_config', ...} 메시지로 세션별 변경 가능)
+DEFAULT_BOUNDS = {
+    'min_quality': 30, 'max_quality': 80,
+    'min_scale': 0.25, 'max_scale': 1.0,
+    'min_fps': 5, 'max_fps': 30
+}
+START_QUALITY = 60           # 시작 단계 (기존 고정 품질), 여유가 있으면 올라감
+QUALITY_STEP = 10
+SCALE_STEPS = (1.0, 0.75, 0.5, 0.35, 0.25)
+
+UPDATE_INTERVAL = 1.0        # 조정 주기 (초)
+UPGRADE_AFTER = 3            # 여유 상태가 이만큼 연속되면 한 단계 올림
+QUEUE_DELAY_HIGH = 0.15      # 대기열 지연이 이보다 크면 혼잡 (초)
+QUEUE_DELAY_LOW = 0.05       # 이보다 작아야 여유
+SEND_LATENCY_HIGH = 0.05     # 발행 → 전송 지연 (이벤트 루프가 밀림)
+DROP_RATIO_HIGH = 0.3        # 준비 안 됨으로 건너뛴 프레임 비율
+CPU_HIGH = 85.0
+CPU_LOW = 70.0
+
+def build_ladder(bounds: dict) -> list[tuple[int, float, int]]:
+    """(quality, scale, fps) 단계 목록, 0번이 최고 화질"""
+    min_q, max_q = int(bounds['min_quality']), int(bounds['max_quality'])
+    min_s, max_s = float(bounds['min_scale']), float(bounds['max_scale'])
+    min_fps, max_fps = int(bounds['min_fps']), int(bounds['max_fps'])
+    mid_q = max(min_q, (min_q + max_q) // 2)
+
+    # 1) 최대 해상도에서 품질을 중간까지
+    ladder = [(q, max_s, max_fps) for q in range(max_q, mid_q - 1, -QUALITY_STEP)]
+    quality = ladder[-1][0] if ladder else max_q
+    # 2) 중간 품질에서 해상도 단계
+    scale = max_s
+    for step in SCALE_STEPS:
+        if min_s <= step < max_s:
+            scale = step
+            ladder.append((quality, scale, max_fps))
+    # 3) 최소 해상도에서 남은 품질
+    for q in range(quality - QUALITY_STEP, min_q - 1, -QUALITY_STEP):
+        quality = q
+        ladder.append((quality, scale, max_fps))
+    # 4) fps (2/3씩)
+    fps = max_fps
+    while fps > min_fps:
+        fps = max(min_fps, int(fps * 2 / 3))
+        ladder.append((quality, scale, fps))
+    return ladder
+
+class CpuLoad:
+    """시스템 CPU 사용률 (cpu_times 차이로 계산, 다른 psutil.cpu_percent 호출과 독립)"""
+    def __init__(self, min_interval: float = 0.5):
+        self.min_interval = min_interval
+        self._last = None          # 첫 sample() 때 기준값 (psutil은 그때 로드)
+        self._last_at = 0.0
+        self.available: bool = True
+        self.percent: float | None = None
+
+    def sample(self) -> float | None:
+        if not self.available:
+            return None
+        now = time.monotonic()
+        if now - self._last_at < self.min_interval:
+            return self.percent
+        try:
+            times = psutil.cpu_times()
+        except ImportError:
+            self.available = False  # psutil 없음: CPU 조건 없이 링크 상태만으로 조정
+            return None
+        if self._last is None:
+            self._last, self._last_at = times, now
+            return None
+        total = sum(times) - sum(self._last)
+        idle = (times.idle + getattr(times, 'iowait', 0.0)) - (self._last.idle + getattr(self._last, 'iowait', 0.0))
+        if total > 0:
+            self.percent = max(0.0, min(100.0, 100.0 * (1.0 - idle / total)))
+        self._last, self._last_at = times, now
+        return self.percent
+
+# 모든 세션이 공유 (CPU는 로봇 전체 값)
+cpu_load = CpuLoad()
+
+class Ceiling:
+    """모든 세션에 공통인 품질/fps 상한 (thermal_governor가 설정, None이면 제한 없음)"""
+    def __init__(self):
+        self.quality: int | None = None
+        self.fps: int | None = None
+
+    def limit(self, quality: int, fps: int | None = None) -> tuple[int, int | None]:
+        if self.quality is not None:
+            quality = min(quality, self.quality)
+        if self.fps is not None and fps is not None:
+            fps = min(fps, self.fps)
+        return quality, fps
+
+ceiling = Ceiling()
+
+class AdaptiveStreamController:
+    def __init__(self, bounds: dict | None = None, cpu: CpuLoad | None = None,
+                 start_quality: int = START_QUALITY):
+        self.bounds = dict(DEFAULT_BOUNDS)
+        self.cpu = cpu or cpu_load
+        self.ladder: list[tuple[int, float, int]] = []
+        self.level: int = 0
+        self.configure(bounds or {})
+        self.level = next((i for i, (quality, _, _) in enumerate(self.ladder) if quality <= start_quality), 0)
+
+        self._calm: int = 0
+        self._last_update: float = time.monotonic()
+        self._last_buffered: int = 0
+        self._last_sent_bytes: int = 0
+        self._last_sent: int = 0
+        self._last_dropped: int = 0
+        self.send_latencies: deque = deque(maxlen=64)  # 발행 → 전송 (초)
+
+        # 최근 측정값 (telemetry)
+        self.drain_rate: float | None = None   # bytes/s
+        self.queue_delay: float | None = None  # 초
+        self.drop_ratio: float = 0.0
+        self.cpu_percent: float | None = None
+        self.reason: str = 'initial'
+        self.changes: int = 0
+
+    def configure(self, bounds: dict):
+        """범위 변경 (알 수 없는 키 무시, 현재 단계는 새 범위 안으로)"""
+        for key, value in bounds.items():
+            if key in DEFAULT_BOUNDS and isinstance(value, (int, float)):
+                self.bounds[key] = value
+        b = self.bounds
+        b['min_quality'], b['max_quality'] = sorted((max(1, min(100, int(b['min_quality']))), max(1, min(100, int(b['max_quality'])))))
+        b['min_scale'], b['max_scale'] = sorted((max(0.05, min(1.0, float(b['min_scale']))), max(0.05, min(1.0, float(b['max_scale'])))))
+        b['min_fps'], b['max_fps'] = sorted((max(1, int(b['min_fps'])), max(1, int(b['max_fps']))))
+        self.ladder = build_ladder(b)
+        self.level = min(self.level, len(self.ladder) - 1)
+
+    @property
+    def quality(self) -> int:
+        return ceiling.limit(self.ladder[self.level][0])[0]
+
+    @property
+    def scale(self) -> float:
+        return self.ladder[self.level][1]
+
+    @property
+    def fps(self) -> int:
+        return ceiling.limit(0, self.ladder[self.level][2])[1]
+
+    def record_send_latency(self, seconds: float):
+        self.send_latencies.append(seconds)
+
+    def update(self, buffered: int, sent: int, sent_bytes: int, dropped: int, now: float | None = None) -> bool:
+        """UPDATE_INTERVAL마다 측정 후 단계 조정 (조정 주기가 아니면 False)"""
+        now = time.monotonic() if now is None else now
+        dt = now - self._last_update
+        if dt < UPDATE_INTERVAL:
+            return False
+
+        # 배출 속도: 이번 주기에 보낸 바이트 중 버퍼에 남지 않은 양
+        drained = (sent_bytes - self._last_sent_bytes) - (buffered - self._last_buffered)
+        self.drain_rate = max(0.0, drained / dt)
+        if buffered <= 0:
+            self.queue_delay = 0.0
+        elif self.drain_rate > 0:
+            self.queue_delay = buffered / self.drain_rate
+        else:
+            self.queue_delay = float('inf')
+        frames = (sent - self._last_sent) + (dropped - self._last_dropped)
+        self.drop_ratio = (dropped - self._last_dropped) / frames if frames > 0 else 0.0
+        latencies = sorted(self.send_latencies)
+        send_latency = latencies[len(latencies) // 2] if latencies else 0.0
+        self.send_latencies.clear()
+        self.cpu_percent = self.cpu.sample() if self.cpu else None
+        # 이전 단계에서 쌓인 버퍼가 줄어드는 중이면 더 내리지 않음 (과도한 하향 방지)
+        draining = buffered < self._last_buffered * 0.7
+
+        self._last_update = now
+        self._last_buffered, self._last_sent_bytes = buffered, sent_bytes
+        self._last_sent, self._last_dropped = sent, dropped
+
+        level = self.level
+        cpu_high = self.cpu_percent is not None and self.cpu_percent > CPU_HIGH
+        if self.queue_delay > QUEUE_DELAY_HIGH and draining:
+            self._calm = 0
+            self.reason = 'draining'
+        elif self.queue_delay > 2 * QUEUE_DELAY_HIGH:
+            self._step_down(2, 'congested')
+        elif self.queue_delay > QUEUE_DELAY_HIGH or self.drop_ratio > DROP_RATIO_HIGH or send_latency > SEND_LATENCY_HIGH:
+            self._step_down(1, 'congested')
+        elif cpu_high:
+            self._step_down_cpu()
+        elif self.queue_delay < QUEUE_DELAY_LOW and (self.cpu_percent is None or self.cpu_percent < CPU_LOW):
+            self._calm += 1
+            if self._calm >= UPGRADE_AFTER and self.level > 0:
+                self.level -= 1
+                self.reason = 'headroom'
+                self._calm = 0
+        else:
+            self._calm = 0
+
+        if self.level != level:
+            self.changes += 1
+        return True
+
+    def _step_down(self, steps: int, reason: str):
+        self._calm = 0
+        self.level = min(len(self.ladder) - 1, self.level + steps)
+        self.reason = reason
+
+    def _step_down_cpu(self):
+        """해상도 또는 fps가 실제로 낮아지는 다음 단계로"""
+        self._calm = 0
+        quality, scale, fps = self.ladder[self.level]
+        for level in range(self.level + 1, len(self.ladder)):
+            if self.ladder[level][1] < scale or self.ladder[level][2] < fps:
+                self.level = level
+                break
+        self.reason = 'cpu'
+
+    def stats(self) -> dict:
+        return {
+            'quality': self.quality,
+            'scale': self.scale,
+            'fps': self.fps,
+            'level': self.level,
+            'levels': len(self.ladder),
+            'reason': self.reason,
+            'changes': self.changes,
+            'drain_kbps': round(self.drain_rate * 8 / 1000, 1) if self.drain_rate is not None else None,
+            'queue_ms': round(self.queue_delay * 1000, 1) if self.queue_delay not in (None, float('inf')) else None,
+            'drop_ratio': round(self.drop_ratio, 2),
+            'cpu_percent': round(self.cpu_percent, 1) if self.cpu_percent is not None else None,
+            'bounds': dict(self.bounds),
+            'ceiling': {'quality': ceiling.quality, 'fps': ceiling.fps}
+        }
@@ -0,0 +1,78 @@
+import pytest
+
+from auto_calibration import RatioSearch, interpolate_curve, wheel_outputs, RATIO_RANGE, PROBE_STEP
+
+CURVE = ((40.0, 0.9), (60.0, 0.8), (100.0, 0.6))
+
+@pytest.mark.parametrize('speed, expected', [
+    (0, 0.9),        # 범위 밖: 양 끝 값
+    (40, 0.9),
+    (50, 0.85),      # 구간 선형 보간
+    (60, 0.8),
+    (80, 0.7),
+    (100, 0.6),
+    (120, 0.6)
+])
+def test_interpolate_curve(speed, expected):
+    assert interpolate_curve(CURVE, speed) == pytest.approx(expected)
+
+def test_interpolate_single_point():
+    assert interpolate_curve(((50.0, 1.2),), 10) == 1.2
+    assert interpolate_curve(((50.0, 1.2),), 90) == 1.2
+
+def test_wheel_outputs_slows_faster_wheel():
+    assert wheel_outputs(100, 0.8) == (100, 80)
+    assert wheel_outputs(100, 1.25) == (80, 100)
+    assert wheel_outputs(50, 1.0) == (50, 50)
+
+def run(search: RatioSearch, drift_of) -> list[float]:
+    ratios = []
+    while not search.done:
+        ratios.append(search.ratio)
+        search.record(search.ratio, drift_of(search.ratio))
+    return ratios
+
+def test_secant_search_converges_on_linear_drift():
+    # 드리프트는 비율에 대해 선형 (양수면 오른쪽이 빠름: 비율을 줄여야 함)
+    target = 0.83
+    search = RatioSearch(1.0)
+    ratios = run(search, lambda ratio: 0.5 * (ratio - target))
+    assert ratios[1] == pytest.approx(1.0 - PROBE_STEP)      # 첫 탐색은 고정 간격, 드리프트 반대 방향
+    assert ratios[2] == pytest.approx(target)                 # 두 점으로 보간
+    assert search.result == pytest.approx(target)
+    assert len(search.trials) == 3
+
+def test_stops_when_within_tolerance():
+    search = RatioSearch(0.9, tolerance=0.01)
+    search.record(0.9, 0.005)
+    assert search.done
+    assert search.result == 0.9
+
+def test_missing_measurement_skips_speed():
+    search = RatioSearch(1.0)
+    search.record(1.0, None)
+    assert search.done
+    assert search.result is None
+
+def test_noisy_slope_falls_back_to_fixed_step():
+    # 비율을 줄였는데 드리프트가 커짐 (기울기 부호가 맞지 않음): 보간하지 않고 같은 방향으로 고정 간격
+    search = RatioSearch(1.0, max_trials=5)
+    search.record(1.0, 0.1)
+    assert search.ratio == pytest.approx(0.9)
+    search.record(0.9, 0.2)
+    assert search.ratio == pytest.approx(0.8)
+
+def test_result_is_best_trial_after_max_trials():
+    search = RatioSearch(1.0, max_trials=3)
+    drifts = iter([0.3, 0.05, -0.2])
+    run(search, lambda ratio: next(drifts))
+    assert len(search.trials) == 3
+    assert search.result == search.trials[1][0]
+
+def test_ratio_is_clamped_to_range():
+    search = RatioSearch(RATIO_RANGE[0] + 0.05)
+    search.record(search.ratio, 1.0)   # 더 줄여야 함
+    assert search.ratio == RATIO_RANGE[0]
+    search = RatioSearch(RATIO_RANGE[1] - 0.05)
+    search.record(search.ratio, -1.0)
+    assert search.ratio == RATIO_RANGE[1]
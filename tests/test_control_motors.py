@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+import findee
+from findee import Findee, LatencyTracker, MOTOR_KICK_ALWAYS, MOTOR_KICK_ON_CHANGE
+
+class PWM:
+    def __init__(self, log, name):
+        self.log, self.name = log, name
+
+    def ChangeDutyCycle(self, duty):
+        self.log.append((self.name, duty))
+
+class GPIO:
+    def __init__(self, log):
+        self.log = log
+
+    def output(self, pins, levels):
+        self.log.append(('pins', tuple(pins), tuple(levels)))
+
+class Rig:
+    """control_motors에 필요한 Findee 상태만 (하드웨어/스레드 없이)"""
+    def __init__(self, kick: str = MOTOR_KICK_ALWAYS):
+        self.IN1, self.IN2, self.ENA = 23, 24, 12
+        self.IN3, self.IN4, self.ENB = 22, 27, 13
+        self.latency = LatencyTracker()
+        self._motor_lock = threading.Lock()
+        self._motor_dirs = [0, 0]
+        self._motor_seq = 0
+        self.motor_kick = kick
+        self.log = []
+        self.rightPWM, self.leftPWM = PWM(self.log, 'R'), PWM(self.log, 'L')
+        self.gpio = GPIO(self.log)
+        self.constrain = Findee.constrain
+
+    def control_motors(self, left, right):
+        return Findee.control_motors(self, left, right)
+
+    def changePin(self, *pins):
+        return Findee.changePin(self, *pins)
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    monkeypatch.setattr(findee.time, 'sleep', calls.append)
+    return calls
+
+def test_default_kicks_every_nonzero_command(sleeps):
+    rig = Rig()
+    rig.control_motors(50, 50)
+    rig.control_motors(60, 60)   # 같은 방향이어도 기준 동작처럼 100%/20ms
+    assert sleeps == [0.02, 0.02]
+    assert rig.log[-4:] == [('R', 100.0), ('L', 100.0), ('R', 60), ('L', 60)]
+
+def test_on_change_kicks_only_on_start_and_reverse(sleeps):
+    rig = Rig(MOTOR_KICK_ON_CHANGE)
+    rig.control_motors(50, 50)
+    rig.control_motors(60, 60)
+    assert sleeps == [0.02]
+    assert rig.log[-2:] == [('R', 60), ('L', 60)]
+    rig.control_motors(60, -60)
+    assert sleeps == [0.02, 0.02]
+
+def test_stale_kick_does_not_overwrite_newer_command(monkeypatch):
+    rig = Rig()
+    # 20ms 대기 중에 다른 스레드(예: MotionScheduler)가 정지 명령을 적용
+    monkeypatch.setattr(findee.time, 'sleep', lambda _: Findee.control_motors(rig, 0, 0))
+    rig.control_motors(50, 50)
+    duties = [entry for entry in rig.log if entry[0] != 'pins']
+    assert duties[-2:] == [('R', 0.0), ('L', 0.0)]
+
+def test_change_pin_rewrites_direction_pins(sleeps):
+    rig = Rig(MOTOR_KICK_ON_CHANGE)
+    rig.control_motors(50, 50)
+    rig.changePin(5, 6, 7, 8, None, None)
+    rig.log.clear()
+    rig.control_motors(50, 50)
+    assert ('pins', (5, 6, 8, 7), (1, 0, 1, 0)) in rig.log
@@ -0,0 +1,47 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+pytest.importorskip('cv2')
+pytest.importorskip('numpy')
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 새 프로세스에서 Findee 싱글턴 생성 (sim 백엔드), 결과는 'STATE ' 뒤의 JSON
+SCRIPT = """
+import json, sys
+from findee import Findee
+robot = Findee()
+if sys.argv[1:]:
+    # 카메라 초기화와 겹치도록 바로 온도 조절 상한 적용
+    robot._apply_thermal_policy({'quality': 50, 'camera_fps': int(sys.argv[1]), 'telemetry_interval': 2.0})
+robot.wait_ready()
+print('STATE', json.dumps({'applied_fps': robot._applied_fps, 'camera_fps': robot.camera_fps,
+                  'frame_duration': robot.camera.camera_controls['FrameDurationLimits'][0]}))
+"""
+
+def start(tmp_path, *args) -> tuple[str, dict]:
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps({'schema': 1, 'camera': {'fps': 30}}))
+    env = {**os.environ, 'FINDEE_BACKEND': 'sim', 'FINDEE_SETTINGS': str(path)}
+    env.pop('FINDEE_SIM_FPS', None)
+    done = subprocess.run([sys.executable, '-c', SCRIPT, *args], cwd=REPO_ROOT, env=env,
+                          capture_output=True, text=True, timeout=60)
+    assert done.returncode == 0, done.stderr
+    state = next(line for line in done.stdout.splitlines() if line.startswith('STATE '))
+    return done.stdout, json.loads(state[len('STATE '):])
+
+def test_sim_startup_logs_no_errors(tmp_path):
+    output, state = start(tmp_path)
+    assert 'ERR:' not in output
+    assert state == {'applied_fps': 30, 'camera_fps': 30, 'frame_duration': 1000000 // 30}
+
+def test_thermal_cap_set_during_startup_is_applied(tmp_path):
+    output, state = start(tmp_path, '10')
+    assert 'ERR:' not in output
+    assert state['camera_fps'] == 30                  # 요청 값은 유지
+    assert state['applied_fps'] == 10
+    assert state['frame_duration'] == 1000000 // 10
@@ -0,0 +1,55 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+import lan_server
+from lan_server import LanServer
+
+def get(server, path, headers=None):
+    request = urllib.request.Request(f"http://127.0.0.1:{server.port}{path}", headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+@pytest.fixture
+def server():
+    server = LanServer(lambda: None, host='127.0.0.1', port=0, token='secret').start()
+    yield server
+    server.stop()
+
+@pytest.mark.parametrize('path', ['/', '/stream.mjpg', '/snapshot.jpg', '/stats'])
+def test_requires_token(server, path):
+    assert get(server, path)[0] == 401
+    assert get(server, path + '?token=wrong')[0] == 401
+    assert get(server, path, {'Authorization': 'Bearer wrong'})[0] == 401
+
+def test_accepts_query_or_bearer_token(server):
+    status, body = get(server, '/stats?token=secret')
+    assert status == 200
+    assert json.loads(body)['rejected'] == 0
+    assert get(server, '/stats', {'Authorization': 'Bearer secret'})[0] == 200
+    # 인덱스 페이지의 스트림 주소에도 토큰
+    assert b'/stream.mjpg?token=secret' in get(server, '/?token=secret')[1]
+
+def test_public_server_without_token():
+    server = LanServer(lambda: None, host='127.0.0.1', port=0).start()
+    try:
+        status, body = get(server, '/stats')
+        assert status == 200
+        assert json.loads(body)['public']
+    finally:
+        server.stop()
+
+def test_ensure_token_is_created_once(tmp_path, monkeypatch):
+    import settings
+    monkeypatch.setattr(settings, 'store', settings.SettingsStore(tmp_path / 'settings.json'))
+    token = lan_server.ensure_token()
+    assert token
+    assert lan_server.ensure_token() == token
+    assert settings.store.get(settings.LanSettings).token == token
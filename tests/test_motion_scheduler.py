@@ -0,0 +1,134 @@
+import time
+import threading
+
+import pytest
+
+import motion_scheduler
+from motion_scheduler import MotionScheduler, RUNNING, DONE, CANCELLED, SUPERSEDED, STOPPED
+
+class Motors:
+    """apply(left, right) 기록 (delay: 모터 쓰기 시간 흉내)"""
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls: list[tuple[float, float, float]] = []
+        self.lock = threading.Lock()
+
+    def __call__(self, left, right):
+        if self.delay:
+            time.sleep(self.delay)
+        with self.lock:
+            self.calls.append((time.monotonic(), left, right))
+
+    @property
+    def outputs(self) -> list[tuple[float, float]]:
+        with self.lock:
+            return [(left, right) for _, left, right in self.calls]
+
+@pytest.fixture
+def motors():
+    return Motors()
+
+@pytest.fixture
+def scheduler(motors):
+    scheduler = MotionScheduler(motors)
+    yield scheduler
+    scheduler.close()
+
+def test_first_step_applied_in_calling_thread(scheduler, motors):
+    handle = scheduler.submit([(50, 50, 1.0)])
+    assert motors.outputs == [(50.0, 50.0)]   # 타이머 스레드를 기다리지 않음
+    assert handle.status == RUNNING
+
+def test_sequence_runs_in_order_then_stops(scheduler, motors):
+    handle = scheduler.submit([(50, 50, 0.05), (-30, 30, 0.05)])
+    assert handle.wait(2.0)
+    assert handle.completed and handle.status == DONE
+    assert motors.outputs == [(50.0, 50.0), (-30.0, 30.0), (0.0, 0.0)]
+
+def test_new_motion_supersedes_active(scheduler, motors):
+    first = scheduler.submit([(50, 50, 5.0)])
+    second = scheduler.submit([(20, 20, 0.05)])
+    assert first.done and first.status == SUPERSEDED
+    assert second.wait(2.0) and second.completed
+    assert motors.outputs == [(50.0, 50.0), (20.0, 20.0), (0.0, 0.0)]
+
+def test_set_supersedes_timed_motion(scheduler, motors):
+    handle = scheduler.submit([(50, 50, 5.0)])
+    scheduler.set(10, 10)
+    assert handle.status == SUPERSEDED
+    assert scheduler.active is None
+    assert motors.outputs[-1] == (10.0, 10.0)
+
+def test_queued_motion_starts_at_previous_deadline(scheduler, motors):
+    first = scheduler.submit([(50, 50, 0.05)])
+    second = scheduler.submit([(20, 20, 0.05)], queue=True)
+    assert second.status == motion_scheduler.PENDING
+    assert second.wait(2.0)
+    assert first.completed and second.completed
+    # 다음 동작의 시작 시각은 이전 동작의 예정 종료 시각 (타이머가 늦게 깨어나도 밀리지 않음)
+    assert second.started_at == pytest.approx(first.started_at + first.duration)
+    assert motors.outputs == [(50.0, 50.0), (20.0, 20.0), (0.0, 0.0)]
+
+def test_cancel_active_stops_and_starts_next(scheduler, motors):
+    first = scheduler.submit([(50, 50, 5.0)])
+    second = scheduler.submit([(20, 20, 0.05)], queue=True)
+    assert first.cancel()
+    assert first.status == CANCELLED
+    assert second.status == RUNNING
+    assert second.wait(2.0)
+    assert motors.outputs == [(50.0, 50.0), (20.0, 20.0), (0.0, 0.0)]
+
+def test_cancel_queued_keeps_active(scheduler, motors):
+    first = scheduler.submit([(50, 50, 0.1)])
+    second = scheduler.submit([(20, 20, 0.1)], queue=True)
+    assert second.cancel()
+    assert second.status == CANCELLED
+    assert scheduler.active is first
+    assert first.wait(2.0) and first.completed
+    assert motors.outputs == [(50.0, 50.0), (0.0, 0.0)]
+
+def test_cancel_finished_returns_false(scheduler):
+    handle = scheduler.submit([(50, 50, 0.0)])
+    assert handle.wait(2.0)
+    assert not handle.cancel()
+    assert handle.status == DONE
+
+def test_emergency_stop_cancels_everything(scheduler, motors):
+    first = scheduler.submit([(50, 50, 5.0)])
+    second = scheduler.submit([(20, 20, 5.0)], queue=True)
+    assert scheduler.emergency_stop() == 2
+    assert first.status == STOPPED and second.status == STOPPED
+    assert motors.outputs[-1] == (0.0, 0.0)   # 호출한 스레드에서 바로 정지
+    assert scheduler.active is None
+    assert scheduler.stats()['emergency_stops'] == 1
+
+def test_steps_use_absolute_deadlines():
+    # 모터 쓰기마다 10ms: 상대 시각이면 단계마다 밀려서 전체가 길어짐
+    motors = Motors(delay=0.01)
+    scheduler = MotionScheduler(motors)
+    try:
+        steps = [(10 * i, 10 * i, 0.03) for i in range(1, 9)]
+        handle = scheduler.submit(steps)
+        assert handle.wait(5.0) and handle.completed
+        starts = [at for at, left, right in motors.calls]
+        for index in range(1, len(steps)):
+            # index번째 단계는 시작 + 누적 duration (+ 쓰기 시간)에 적용
+            expected = handle.started_at + 0.03 * index
+            assert starts[index] - expected < 0.01 + 0.02
+        assert handle.finished_at - handle.started_at < handle.duration + 0.03
+    finally:
+        scheduler.close()
+
+def test_invalid_steps(scheduler):
+    with pytest.raises(ValueError):
+        scheduler.submit([])
+    with pytest.raises(ValueError):
+        scheduler.submit([(50, 50, -1.0)])
+
+def test_closed_scheduler_rejects_and_cancels(motors):
+    scheduler = MotionScheduler(motors)
+    handle = scheduler.submit([(50, 50, 5.0)])
+    scheduler.close()
+    assert handle.status == CANCELLED
+    with pytest.raises(RuntimeError):
+        scheduler.submit([(50, 50, 1.0)])
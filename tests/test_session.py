@@ -0,0 +1,64 @@
+from session import Session, MAX_PENDING_CFG
+
+class Channel:
+    def __init__(self, label, state='open'):
+        self.label = label
+        self.readyState = state
+        self.bufferedAmount = 0
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+def test_lossy_channel_opened_first_is_not_default():
+    session = Session('s')
+    img, cmd = Channel('img'), Channel('cmd')
+    assert session.attach_channel(img) == 'img'
+    session.attach_channel(cmd)
+    assert session.data_channel is None
+    assert not session.channel_open
+    assert session.media_open
+    assert session.channel_for('img') is img
+    assert session.channel_for('cfg') is None
+
+def test_cfg_traffic_held_until_reliable_channel_opens():
+    session = Session('s')
+    img = Channel('img')
+    session.attach_channel(img)
+    assert session.accepts_cfg
+    assert not session.send_cfg(b'config')
+    assert not session.send_cfg(b'text')
+    assert img.sent == []
+
+    cfg = Channel('cfg')
+    session.attach_channel(cfg)
+    assert session.data_channel is cfg
+    assert cfg.sent == [b'config', b'text']    # 보관한 순서대로
+    assert session.send_cfg(b'after')
+    assert cfg.sent[-1] == b'after'
+    assert session.messages_sent == 3
+
+def test_cfg_flushed_on_open_event():
+    session = Session('s')
+    cfg = Channel('cfg', state='connecting')
+    session.attach_channel(cfg)
+    session.send_cfg(b'early')
+    assert cfg.sent == []
+    cfg.readyState = 'open'
+    session.flush_cfg()
+    assert cfg.sent == [b'early']
+
+def test_legacy_single_channel_carries_everything():
+    session = Session('s')
+    channel = Channel('data')
+    session.send_cfg(b'queued')
+    assert session.attach_channel(channel) is None
+    assert session.channel_for('img') is channel
+    assert channel.sent == [b'queued']
+
+def test_pending_cfg_is_bounded():
+    session = Session('s')
+    for i in range(MAX_PENDING_CFG + 10):
+        session.send_cfg(b'%d' % i)
+    assert len(session.pending_cfg) == MAX_PENDING_CFG
+    assert session.memory()['pending_cfg_bytes'] > 0
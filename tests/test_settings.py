@@ -0,0 +1,107 @@
+import os
+import json
+
+import pytest
+
+import settings
+from settings import SettingsStore, MotorCalibration, LanSettings, CameraSettings, SCHEMA_VERSION
+
+def write(path, data):
+    path.write_text(json.dumps(data))
+
+def read(path):
+    return json.loads(path.read_text())
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / 'settings.json'
+
+def test_missing_file_uses_defaults(path):
+    store = SettingsStore(path)
+    assert store.get(CameraSettings) == CameraSettings()
+    assert not path.exists()
+
+def test_migrates_schema_0_calibration(path):
+    # 스키마 번호 없이 보정 값만 저장하던 형식
+    write(path, {'dir': 0, 'low_speed_ratio': 0.9, 'high_speed_ratio': 0.7})
+    store = SettingsStore(path)
+    calibration = store.get(MotorCalibration)
+    assert (calibration.dir, calibration.low_speed_ratio, calibration.high_speed_ratio) == (0, 0.9, 0.7)
+
+    assert store.update(CameraSettings, fps=15)
+    data = read(path)
+    assert data['schema'] == SCHEMA_VERSION
+    assert data['calibration']['dir'] == 0
+    assert 'dir' not in data
+
+def test_update_preserves_unknown_sections_and_keys(path):
+    write(path, {'schema': 1, 'lan': {'port': 9000, 'future_key': 'keep'}, 'future_section': {'a': 1}})
+    store = SettingsStore(path)
+    assert store.update(LanSettings, fps=5.0)
+    data = read(path)
+    assert data['lan']['future_key'] == 'keep'
+    assert data['lan']['port'] == 9000 and data['lan']['fps'] == 5.0
+    assert data['future_section'] == {'a': 1}
+    assert store.get(LanSettings).fps == 5.0
+
+def test_newer_schema_is_read_only(path):
+    original = {'schema': SCHEMA_VERSION + 1, 'camera': {'width': 320, 'height': 240, 'fps': 20}}
+    write(path, original)
+    before = path.read_bytes()
+    store = SettingsStore(path)
+    assert store.get(CameraSettings).width == 320   # 알고 있는 섹션은 읽음
+    assert store.read_only
+    assert not store.update(CameraSettings, fps=10)
+    assert path.read_bytes() == before
+    assert store.get(CameraSettings).fps == 20
+
+def test_failed_write_keeps_old_file(path, monkeypatch):
+    write(path, {'schema': 1, 'camera': {'width': 640, 'height': 480, 'fps': 30}})
+    before = path.read_bytes()
+    store = SettingsStore(path)
+
+    def fail(src, dst):
+        raise OSError('disk full')
+    monkeypatch.setattr(settings.os, 'replace', fail)
+
+    assert not store.update(CameraSettings, fps=10)
+    assert path.read_bytes() == before
+    assert store.get(CameraSettings).fps == 30
+    leftovers = [name for name in os.listdir(path.parent) if name.endswith('.tmp')]
+    assert leftovers == []
+
+def test_invalid_values_fall_back_to_defaults(path):
+    write(path, {'schema': 1, 'camera': {'width': 'wide', 'fps': '15'}})
+    camera = SettingsStore(path).get(CameraSettings)
+    assert camera.width == CameraSettings().width
+    assert camera.fps == 15
+
+def test_reloads_when_file_changes(path):
+    write(path, {'schema': 1, 'camera': {'fps': 30}})
+    store = SettingsStore(path)
+    assert store.get(CameraSettings).fps == 30
+    changes = []
+    store.add_listener(lambda name, value: changes.append(name))
+    write(path, {'schema': 1, 'camera': {'fps': 12, 'width': 320}})   # 크기가 달라 stat 서명도 바뀜
+    assert store.refresh()
+    assert store.get(CameraSettings).fps == 12
+    assert changes == ['camera']
+
+def test_robot_config_import_does_not_write(path, monkeypatch):
+    import sys
+    import importlib
+    monkeypatch.setattr(settings, 'store', SettingsStore(path))
+    sys.modules.pop('robot_config', None)
+    robot_config = importlib.import_module('robot_config')
+    assert not path.exists()
+    # 이전 방식(robot_config.py에 기록된 ID)은 시작할 때 명시적으로 옮김
+    monkeypatch.setattr(robot_config, 'ROBOT_ID', 'pf-1234')
+    robot_id, _, _ = robot_config.load_identity()
+    assert robot_id == 'pf-1234'
+    assert read(path)['network']['robot_id'] == 'pf-1234'
+
+def test_default_config_dir_ignores_home(monkeypatch, tmp_path):
+    pwd = pytest.importorskip('pwd')
+    monkeypatch.setenv('HOME', str(tmp_path))
+    owner_home = pwd.getpwuid(settings.CODE_DIR.stat().st_uid).pw_dir
+    assert settings._owner_home() == settings.Path(owner_home)
@@ -0,0 +1,70 @@
+import time
+import threading
+
+import sleep_hooks
+import code_profiler
+from code_profiler import CodeProfiler
+
+def test_hooks_compose_and_restore_in_any_order():
+    real = time.sleep
+    calls = []
+    outer = lambda seconds, sleep: (calls.append(('outer', seconds)), sleep(seconds))
+    inner = lambda seconds, sleep: calls.append(('inner', seconds))   # 실제로 대기하지 않음
+    sleep_hooks.add(inner)
+    sleep_hooks.add(outer)
+    time.sleep(5)
+    assert calls == [('outer', 5), ('inner', 5)]
+    sleep_hooks.remove(inner)          # 먼저 추가한 훅을 먼저 제거
+    assert time.sleep is not real
+    sleep_hooks.remove(outer)
+    assert time.sleep is real
+
+def test_profiler_measures_sleep_and_restores_it():
+    real = time.sleep
+    profiler = CodeProfiler()
+    profiler.start()
+    try:
+        time.sleep(0.001)
+    finally:
+        profiler.stop()
+    assert time.sleep is real
+    assert profiler.calls['time.sleep'] == 1
+    assert profiler.category_time[code_profiler.SLEEP] > 0
+
+def test_profiler_ignores_other_threads():
+    profiler = CodeProfiler()
+    profiler.start()
+    try:
+        thread = threading.Thread(target=time.sleep, args=(0.001,))
+        thread.start()
+        thread.join()
+    finally:
+        profiler.stop()
+    assert profiler.calls['time.sleep'] == 0
+
+def recording(tmp_path):
+    import session_recorder
+    with session_recorder.Recorder(tmp_path / 'rec', frames='none') as recorder:
+        recorder.distance(12.5)
+    return tmp_path / 'rec'
+
+def test_player_and_profiler_restore_sleep_in_either_order(tmp_path):
+    from session_recorder import Player
+    path = recording(tmp_path)
+    real = time.sleep
+    for profiler_first in (True, False):
+        # exec_code: 프로파일 시작 -> 사용자 코드에서 replay() -> 종료 순서는 두 가지 모두 가능
+        profiler = CodeProfiler()
+        profiler.start()
+        player = Player(path).attach()
+        time.sleep(10)                       # 가상 시계만 진행
+        assert player.now_ns == 10 * 10**9
+        if profiler_first:
+            profiler.stop()
+            time.sleep(1)                    # 재생 중에는 가상 시계가 그대로 유지
+            assert player.now_ns == 11 * 10**9
+            player.close()
+        else:
+            player.close()
+            profiler.stop()
+        assert time.sleep is real
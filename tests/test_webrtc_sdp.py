@@ -0,0 +1,67 @@
+import pytest
+
+from webrtc_sdp import parse_candidate, extract_candidates
+
+HOST = 'candidate:842163049 1 udp 1677729535 192.168.0.10 50000 typ host generation 0'
+SRFLX = 'candidate:1 1 udp 1686052607 203.0.113.5 61000 typ srflx raddr 192.168.0.10 rport 50000'
+TCP = 'candidate:2 1 tcp 1518280447 192.168.0.10 9 typ host tcptype active'
+
+@pytest.mark.parametrize('prefix', ['', 'a='])
+def test_parse_host(prefix):
+    candidate = parse_candidate(prefix + HOST)
+    assert candidate == {
+        'foundation': '842163049', 'component': 1, 'protocol': 'udp', 'priority': 1677729535,
+        'ip': '192.168.0.10', 'port': 50000, 'type': 'host',
+        'relatedAddress': None, 'relatedPort': None, 'tcpType': None
+    }
+
+def test_parse_without_prefix():
+    assert parse_candidate(HOST[len('candidate:'):])['foundation'] == '842163049'
+
+def test_parse_related_address_and_tcp_type():
+    srflx = parse_candidate(SRFLX)
+    assert (srflx['type'], srflx['relatedAddress'], srflx['relatedPort']) == ('srflx', '192.168.0.10', 50000)
+    assert parse_candidate(TCP)['tcpType'] == 'active'
+
+@pytest.mark.parametrize('value', [
+    None, '', 42,
+    'candidate:1 1 udp 1 192.168.0.10 5000 host',        # typ 없음
+    'candidate:1 1 udp high 192.168.0.10 5000 typ host', # 숫자가 아님
+    'candidate:1 1 udp 1 192.168.0.10'
+])
+def test_parse_invalid(value):
+    assert parse_candidate(value) is None
+
+def sdp(*lines: str, newline: str = '\r\n') -> str:
+    return newline.join(lines) + newline
+
+SESSION = ('v=0', 'o=- 1 2 IN IP4 127.0.0.1', 's=-', 't=0 0', 'a=group:BUNDLE 0 1')
+
+@pytest.mark.parametrize('newline', ['\r\n', '\n'])
+def test_extract_line_endings(newline):
+    text = sdp(*SESSION, 'm=application 9 UDP/DTLS/SCTP webrtc-datachannel', 'a=mid:0', 'a=' + HOST, newline=newline)
+    assert extract_candidates(text) == [{'candidate': HOST, 'sdpMid': '0', 'sdpMLineIndex': 0}]
+
+def test_extract_multiple_m_lines():
+    text = sdp(*SESSION,
+               'm=video 9 UDP/TLS/RTP/SAVPF 96', 'a=mid:video', 'a=' + HOST,
+               'm=application 9 UDP/DTLS/SCTP webrtc-datachannel', 'a=' + SRFLX, 'a=' + TCP, 'a=mid:data')
+    assert extract_candidates(text) == [
+        {'candidate': HOST, 'sdpMid': 'video', 'sdpMLineIndex': 0},
+        # a=mid가 candidate 뒤에 와도 같은 m-line이면 그 mid
+        {'candidate': SRFLX, 'sdpMid': 'data', 'sdpMLineIndex': 1},
+        {'candidate': TCP, 'sdpMid': 'data', 'sdpMLineIndex': 1}
+    ]
+
+def test_extract_without_mid_uses_index():
+    text = sdp(*SESSION, 'm=audio 9 RTP/AVP 0', 'm=application 9 UDP/DTLS/SCTP webrtc-datachannel', 'a=' + HOST)
+    assert extract_candidates(text) == [{'candidate': HOST, 'sdpMid': '1', 'sdpMLineIndex': 1}]
+
+def test_extract_ignores_session_level_and_short_lines():
+    text = sdp(*SESSION, 'a=' + HOST, 'm=application 9 UDP/DTLS/SCTP webrtc-datachannel', 'a=mid:0',
+               'a=candidate:1 1', 'a=end-of-candidates')
+    assert extract_candidates(text) == []
+
+def test_extracted_candidates_parse():
+    text = sdp(*SESSION, 'm=application 9 UDP/DTLS/SCTP webrtc-datachannel', 'a=mid:0', 'a=' + HOST, 'a=' + SRFLX)
+    assert [parse_candidate(item['candidate'])['type'] for item in extract_candidates(text)] == ['host', 'srflx']
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+# 온도/부하 기반 성능 조절 (Pi Zero 2는 80°C 근처에서 펌웨어가 클럭을 크게 낮춰 모터 타이밍과 영상이 함께 흔들림)
+# 측정 (interval초마다)
+# - SoC 온도 (thermal_zone0)와 추세: 최근 TREND_WINDOW초 선형 회귀로 LOOKAHEAD초 뒤 예상 온도
+# - CPU 사용률 (stream_control.cpu_load, 다른 측정과 독립)
+# - 펌웨어 스로틀 플래그 (get_throttled: sysfs, 없으면 vcgencmd), CPU 클럭 비율 (cpufreq)
+# 단계: normal → warm → hot → critical, 단계마다 카메라 fps 상한, JPEG 품질 상한, 텔레메트리 주기 (POLICIES)
+# - 현재 또는 예상 온도가 단계 기준을 넘으면 바로 올림 (펌웨어 스로틀 전에 미리 부하를 줄임)
+# - 스로틀/온도 제한 플래그가 켜지면 critical, 저전압이면 최소 hot, CPU 과부하가 CPU_SUSTAIN회 이어지면 최소 warm
+# - 내릴 때는 기준보다 HYSTERESIS°C 낮은 상태가 COOL_AFTER초 유지되면 한 단계씩 (오르내림 반복 방지)
+# 단계가 바뀌면 리스너(policy dict)를 호출하고 결정을 로그로 출력, 최근 결정은 stats()['decisions']
+# 실행: python thermal_governor.py (측정값과 결정만 출력, 적용 없음)
+
+import time
+import shutil
+import threading
+import subprocess
+from collections import deque
+
+import stream_control
+
+THERMAL_ZONE = '/sys/class/thermal/thermal_zone0/temp'
+THROTTLED_PATH = '/sys/devices/platform/soc/soc:firmware/get_throttled'
+CPU_FREQ = '/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq'
+CPU_MAX_FREQ = '/sys/devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq'
+
+# get_throttled 비트 (현재 상태, 16비트 위는 부팅 후 발생 기록)
+UNDER_VOLTAGE = 1 << 0
+FREQ_CAPPED = 1 << 1
+THROTTLED = 1 << 2
+SOFT_TEMP_LIMIT = 1 << 3
+OCCURRED_SHIFT = 16
+
+# 단계별 정책: (이름, 카메라 fps 상한, JPEG 품질 상한, 텔레메트리 주기 초), None이면 제한 없음
+POLICIES = (
+    ('normal', None, None, 1.0),
+    ('warm', 20, 60, 2.0),
+    ('hot', 15, 45, 3.0),
+    ('critical', 10, 30, 5.0)
+)
+THRESHOLDS = (70.0, 75.0, 80.0)   # warm/hot/critical 진입 온도 (°C), 설정 저장소 thermal.*로 변경
+HYSTERESIS = 3.0                  # 내릴 때 기준보다 이만큼 낮아야 함 (°C)
+COOL_AFTER = 30.0                 # 내리기 전 유지 시간 (초)
+TREND_WINDOW = 30.0               # 온도 추세 계산 구간 (초)
+LOOKAHEAD = 60.0                  # 이만큼 뒤 예상 온도로 판단 (초)
+CPU_HIGH = 90.0
+CPU_SUSTAIN = 5                   # CPU_HIGH 이상이 이만큼 연속되면 최소 warm
+
+def _read_number(path: str) -> int | None:
+    try:
+        with open(path) as f:
+            return int(f.read().strip(), 0)
+    except (OSError, ValueError):
+        return None
+
+class ThermalReader:
+    """온도/스로틀 플래그/클럭 읽기 (라즈베리파이가 아니면 없는 값은 None)"""
+    def __init__(self, zone: str = THERMAL_ZONE, throttled: str = THROTTLED_PATH):
+        self.zone = zone
+        self.throttled_path = throttled
+        self._vcgencmd = shutil.which('vcgencmd')
+
+    def temperature(self) -> float | None:
+        raw = _read_number(self.zone)
+        return raw / 1000.0 if raw is not None else None
+
+    def throttled(self) -> int | None:
+        try:
+            with open(self.throttled_path) as f:
+                return int(f.read().strip(), 16)   # sysfs는 0x 없는 16진수
+        except (OSError, ValueError):
+            pass
+        if self._vcgencmd is None:
+            return None
+        try:
+            output = subprocess.run([self._vcgencmd, 'get_throttled'], capture_output=True, text=True, timeout=1).stdout
+            return int(output.strip().split('=')[-1], 16)   # "throttled=0x50000"
+        except (OSError, ValueError, subprocess.SubprocessError):
+            self._vcgencmd = None   # 실패하면 다시 시도하지 않음
+            return None
+
+    def freq_ratio(self) -> float | None:
+        current, maximum = _read_number(CPU_FREQ), _read_number(CPU_MAX_FREQ)
+        return round(current / maximum, 2) if current and maximum else None
+
+    def read(self) -> dict:
+        return {'temp': self.temperature(), 'throttled': self.throttled(), 'freq_ratio': self.freq_ratio()}
+
+def policy_for(level: int) -> dict:
+    name, camera_fps, quality, telemetry_interval = POLICIES[level]
+    return {'level': level, 'name': name, 'camera_fps': camera_fps, 'quality': quality,
+            'telemetry_interval': telemetry_interval}
+
+class ThermalGovernor:
+    def __init__(self, thresholds=THRESHOLDS, interval: float = 2.0, reader=None,
+                 cpu: stream_control.CpuLoad | None = None, clock=time.monotonic, history: int = 20):
+        """
+        Args:
+            thresholds: (warm, hot, critical) 진입 온도 °C
+            interval: 측정 주기 (초)
+            reader: read() -> {'temp', 'throttled', 'freq_ratio'} (기본 ThermalReader)
+            cpu: CPU 사용률 (기본 stream_control.cpu_load)
+        """
+        self.thresholds = tuple(float(value) for value in thresholds)
+        self.interval = interval
+        self.reader = reader or ThermalReader()
+        self.cpu = cpu or stream_control.cpu_load
+        self.clock = clock
+        self.level: int = 0
+        self.reason: str = 'initial'
+        self._listeners: list = []
+        self._temps: deque = deque()          # (시각, 온도), TREND_WINDOW초
+        self._cpu_high: int = 0
+        self._cool_since: float | None = None
+        self._since: float = clock()
+        self._time_in = [0.0] * len(POLICIES)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        # 최근 측정값
+        self.reading: dict = {'temp': None, 'throttled': None, 'freq_ratio': None}
+        self.predicted: float | None = None
+        self.slope: float | None = None       # °C/분
+        self.cpu_percent: float | None = None
+        self.updates: int = 0
+        self.decisions: deque = deque(maxlen=history)
+
+    @property
+    def policy(self) -> dict:
+        return policy_for(self.level)
+
+    @property
+    def telemetry_interval(self) -> float:
+        return POLICIES[self.level][3]
+
+    def add_listener(self, listener):
+        """listener(policy): 단계가 바뀔 때 측정 스레드에서 호출 (등록 즉시 현재 정책으로 한 번 호출)"""
+        self._listeners.append(listener)
+        listener(self.policy)
+
+    #region 측정/결정
+    def update(self) -> bool:
+        """한 번 측정하고 단계 결정 (바뀌었으면 True)"""
+        now = self.clock()
+        self.reading = self.reader.read()
+        self.cpu_percent = self.cpu.sample() if self.cpu is not None else None
+        self._cpu_high = self._cpu_high + 1 if self.cpu_percent is not None and self.cpu_percent >= CPU_HIGH else 0
+        self._track_temperature(now)
+        self.updates += 1
+
+        target, reason = self._target(0.0)
+        if target > self.level:
+            self._cool_since = None
+            return self._change(target, reason, now)
+        cool_target, _ = self._target(HYSTERESIS)
+        if cool_target >= self.level:
+            self._cool_since = None
+            return False
+        if self._cool_since is None:
+            self._cool_since = now
+        if now - self._cool_since < COOL_AFTER:
+            return False
+        self._cool_since = now   # 한 단계 내린 뒤 다시 COOL_AFTER 유지해야 다음 단계
+        return self._change(self.level - 1, 'cooled', now)
+
+    def _track_temperature(self, now: float):
+        temp = self.reading['temp']
+        if temp is None:
+            self.predicted = self.slope = None
+            return
+        self._temps.append((now, temp))
+        while self._temps and now - self._temps[0][0] > TREND_WINDOW:
+            self._temps.popleft()
+        self.predicted, self.slope = temp, None
+        if len(self._temps) < 3 or self._temps[-1][0] - self._temps[0][0] < TREND_WINDOW / 3:
+            return
+        # 최소제곱 기울기 (°C/초), 식는 중이면 예상 온도는 현재 온도
+        mean_t = sum(t for t, _ in self._temps) / len(self._temps)
+        mean_v = sum(v for _, v in self._temps) / len(self._temps)
+        variance = sum((t - mean_t) ** 2 for t, _ in self._temps)
+        if variance <= 0:
+            return
+        slope = sum((t - mean_t) * (v - mean_v) for t, v in self._temps) / variance
+        self.slope = round(slope * 60, 2)
+        self.predicted = temp + max(0.0, slope) * LOOKAHEAD
+
+    def _target(self, margin: float) -> tuple[int, str]:
+        """측정값에 맞는 단계와 이유 (margin만큼 기준을 낮춰서 판단: 내릴 때)"""
+        level, reason = 0, 'ok'
+        temp = self.reading['temp']
+        if temp is not None:
+            for index in range(len(self.thresholds), 0, -1):
+                threshold = self.thresholds[index - 1] - margin
+                if temp >= threshold:
+                    level, reason = index, f'temp {temp:.1f}°C'
+                    break
+                if self.predicted is not None and self.predicted >= threshold:
+                    level, reason = index, f'trend {temp:.1f}°C → {self.predicted:.1f}°C'
+                    break
+        flags = self.reading['throttled'] or 0
+        if flags & (THROTTLED | SOFT_TEMP_LIMIT | FREQ_CAPPED):
+            return len(POLICIES) - 1, f'firmware throttle 0x{flags:x}'
+        if flags & UNDER_VOLTAGE and level < 2:
+            level, reason = 2, 'under-voltage'
+        if self._cpu_high >= CPU_SUSTAIN and level < 1:
+            level, reason = 1, f'cpu {self.cpu_percent:.0f}%'
+        return level, reason
+
+    def _change(self, level: int, reason: str, now: float) -> bool:
+        self._time_in[self.level] += now - self._since
+        self._since = now
+        previous, self.level, self.reason = self.level, level, reason
+        policy = self.policy
+        decision = {'at': round(now, 1), 'from': POLICIES[previous][0], 'to': policy['name'], 'reason': reason,
+                    'temp': self.reading['temp'], 'cpu_percent': self.cpu_percent}
+        self.decisions.append(decision)
+        print(f"온도 조절: {decision['from']} → {decision['to']} ({reason}), "
+              f"카메라 {policy['camera_fps'] or '기본'}fps, 품질 상한 {policy['quality'] or '-'}, "
+              f"텔레메트리 {policy['telemetry_interval']}초")
+        for listener in self._listeners:
+            try:
+                listener(policy)
+            except Exception as e:
+                print(f"온도 조절 적용 오류: {e}")
+        return True
+    #endregion
+
+    #region 스레드
+    def start(self) -> ThermalGovernor:
+        global active_governor
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='findee-thermal', daemon=True)
+            self._thread.start()
+        active_governor = self
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.update()
+            except Exception as e:
+                print(f"온도 측정 오류: {e}")
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        """측정 중지 (단계를 normal로 되돌려 제한 해제)"""
+        global active_governor
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        if self.level != 0:
+            self._change(0, 'stopped', self.clock())
+        if active_governor is self:
+            active_governor = None
+    #endregion
+
+    def stats(self) -> dict:
+        now = self.clock()
+        time_in = list(self._time_in)
+        time_in[self.level] += now - self._since
+        flags = self.reading['throttled']
+        return {
+            **self.policy,
+            'reason': self.reason,
+            'temp': self.reading['temp'],
+            'predicted_temp': round(self.predicted, 1) if self.predicted is not None else None,
+            'slope_per_min': self.slope,
+            'cpu_percent': round(self.cpu_percent, 1) if self.cpu_percent is not None else None,
+            'throttled': f'0x{flags:x}' if flags is not None else None,
+            'throttled_since_boot': bool(flags >> OCCURRED_SHIFT) if flags is not None else None,
+            'freq_ratio': self.reading['freq_ratio'],
+            'thresholds': list(self.thresholds),
+            'time_in_s': {POLICIES[i][0]: round(value, 1) for i, value in enumerate(time_in)},
+            'updates': self.updates,
+            'decisions': list(self.decisions)
+        }
+
+# 실행 중인 조절기 (robot_client 텔레메트리 주기, system_info)
+active_governor: ThermalGovernor | None = None
+
+if __name__ == "__main__":
+    governor = ThermalGovernor()
+    try:
+        while True:
+            governor.update()
+            stats = governor.stats()
+            print(f"{stats['name']:<8} {stats['temp']}°C (예상 {stats['predicted_temp']}, {stats['slope_per_min']}°C/분) "
+                  f"CPU {stats['cpu_percent']}% 스로틀 {stats['throttled']} 클럭 {stats['freq_ratio']}")
+            time.sleep(governor.interval)
+    except KeyboardInterrupt:
+        pass
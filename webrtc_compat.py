@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+# aiortc SCTP 보완 (부분 신뢰성 데이터 채널: maxRetransmits / maxPacketLifeTime)
+# aiortc는 포기(abandon)한 메시지의 조각을 FORWARD TSN으로 넘길 때, 아직 전송 중으로 계산된 조각을 flight size에서 빼지 않음
+# → 손실이 있는 링크에서 flight size가 cwnd까지 쌓이고, T3 타임아웃(최소 1초)이 flight size를 0으로 만들 때까지 전송이 멈춤
+#   (img 채널 maxRetransmits=0, 2% 손실: 이미지 28 → 1 fps, 같은 연결의 cfg 채널 응답도 함께 멈춤)
+# 조각마다 전송 중 여부를 기록해서 넘길 때/확인될 때 정확히 한 번만 빼도록 바꿈
+# 또 FORWARD TSN을 한 번만 보내서, 그 패킷을 잃으면 수신 측 누적 TSN이 멈춘 채로 T3 만료까지 기다림
+# → 상대의 SACK 누적 TSN이 아직 넘긴 지점보다 뒤면 다시 보냄 (RFC 3758 3.5 C4)
+# apply()는 aiortc를 불러온 뒤 호출 (여러 번 호출해도 한 번만 적용)
+# 비공개 함수를 바꾸므로 확인한 버전(SUPPORTED_VERSION)에서만 적용, 다른 버전이면 건너뛰었다고 출력
+
+SUPPORTED_VERSION = '1.15.'
+_REQUIRED = ('_flight_size_increase', '_flight_size_decrease', '_update_advanced_peer_ack_point', '_t3_expired')
+_skipped: bool = False
+
+def apply() -> bool:
+    """적용했으면 (또는 이미 적용되어 있으면) True"""
+    global _skipped
+    import aiortc
+    from aiortc import rtcsctptransport
+    transport = rtcsctptransport.RTCSctpTransport
+    if getattr(transport, '_findee_flight_size_patch', False):
+        return True
+    version = getattr(aiortc, '__version__', '')
+    reason = None
+    if not version.startswith(SUPPORTED_VERSION):
+        reason = f"aiortc {version or '?'} (확인한 버전 {SUPPORTED_VERSION}x)"
+    elif not all(hasattr(transport, name) for name in _REQUIRED):
+        reason = f"aiortc {version} 내부 구조가 다름"
+    if reason is not None:
+        if not _skipped:
+            _skipped = True
+            print(f"SCTP 부분 신뢰성 보완을 적용하지 않음: {reason}")
+        return False
+    update_ack_point = transport._update_advanced_peer_ack_point
+    t3_expired = transport._t3_expired
+
+    def flight_size_increase(self, chunk):
+        self._flight_size += chunk._book_size
+        chunk._in_flight = True
+
+    def flight_size_decrease(self, chunk):
+        if getattr(chunk, '_in_flight', True):   # 적용 전에 보낸 조각은 기존 방식대로
+            self._flight_size = max(0, self._flight_size - chunk._book_size)
+        chunk._in_flight = False
+
+    def update_advanced_peer_ack_point(self):
+        # 앞쪽의 포기한 조각은 원래 함수가 큐에서 꺼냄: 그 전에 전송 중 계산에서 뺌
+        for chunk in self._sent_queue:
+            if not chunk._abandoned:
+                break
+            flight_size_decrease(self, chunk)
+        update_ack_point(self)
+        if self._forward_tsn_chunk is not None:
+            self._findee_forward_tsn = self._forward_tsn_chunk
+            return
+        previous = getattr(self, '_findee_forward_tsn', None)
+        if previous is not None and rtcsctptransport.uint32_gt(previous.cumulative_tsn, self._last_sacked_tsn):
+            self._forward_tsn_chunk = previous   # 상대가 아직 받지 못함: 다시 보냄
+
+    def t3_expired_(self):
+        # T3 만료는 flight size를 0으로 초기화 (재전송할 때 다시 더함)
+        for chunk in self._sent_queue:
+            chunk._in_flight = False
+        t3_expired(self)
+
+    transport._flight_size_increase = flight_size_increase
+    transport._flight_size_decrease = flight_size_decrease
+    transport._update_advanced_peer_ack_point = update_advanced_peer_ack_point
+    transport._t3_expired = t3_expired_
+    transport._findee_flight_size_patch = True
+    return True
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+# ICE candidate / SDP 파싱 (aiortc 의존성 없음)
+# candidate 형식 (RFC 8839):
+#   candidate:<foundation> <component> <transport> <priority> <address> <port> typ <type> [<key> <value>]...
+
+CANDIDATE_PREFIX = 'candidate:'
+SDP_CANDIDATE_PREFIX = 'a=candidate:'
+
+def parse_candidate(candidate_str: str) -> dict | None:
+    """candidate 문자열을 한 번에 파싱 (형식이 잘못되면 None)"""
+    if not candidate_str or not isinstance(candidate_str, str):
+        return None
+
+    # a=candidate: / candidate: 접두사 제거
+    if candidate_str.startswith('a='):
+        candidate_str = candidate_str[2:]
+    if candidate_str.startswith(CANDIDATE_PREFIX):
+        candidate_str = candidate_str[len(CANDIDATE_PREFIX):]
+
+    parts = candidate_str.split()
+    if len(parts) < 8 or parts[6] != 'typ':
+        return None
+
+    try:
+        candidate = {
+            'foundation': parts[0],
+            'component': int(parts[1]),
+            'protocol': parts[2],
+            'priority': int(parts[3]),
+            'ip': parts[4],
+            'port': int(parts[5]),
+            'type': parts[7],
+            'relatedAddress': None,
+            'relatedPort': None,
+            'tcpType': None
+        }
+        # 확장 속성은 key value 쌍 (8번째 이후)
+        for i in range(8, len(parts) - 1, 2):
+            key = parts[i]
+            if key == 'raddr':
+                candidate['relatedAddress'] = parts[i + 1]
+            elif key == 'rport':
+                candidate['relatedPort'] = int(parts[i + 1])
+            elif key == 'tcptype':
+                candidate['tcpType'] = parts[i + 1]
+    except ValueError:
+        return None
+    return candidate
+
+def extract_candidates(sdp: str, min_length: int = 20) -> list[dict]:
+    """SDP에서 candidate 라인을 추출 (m-line별 sdpMid/sdpMLineIndex 포함, \\r\\n/\\n 모두 처리)
+    Returns:
+        [{'candidate': 'candidate:...', 'sdpMid': '0', 'sdpMLineIndex': 0}, ...]
+    """
+    candidates: list[dict] = []
+    section: list[dict] = []  # 현재 m-line의 candidate (a=mid가 뒤에 올 수 있으므로 섹션 끝에서 mid 지정)
+    m_line_index = -1
+    mid = None
+
+    def flush():
+        section_mid = mid if mid is not None else str(m_line_index)
+        for item in section:
+            item['sdpMid'] = section_mid
+        candidates.extend(section)
+        section.clear()
+
+    for line in sdp.splitlines():
+        if line.startswith('m='):
+            if m_line_index >= 0:
+                flush()
+            m_line_index += 1
+            mid = None
+        elif m_line_index < 0:
+            continue  # 세션 레벨 속성
+        elif line.startswith(SDP_CANDIDATE_PREFIX):
+            candidate_str = line[2:].strip()
+            if len(candidate_str) >= min_length:
+                section.append({'candidate': candidate_str, 'sdpMid': None, 'sdpMLineIndex': m_line_index})
+        elif line.startswith('a=mid:'):
+            mid = line[6:].strip()
+
+    if m_line_index >= 0:
+        flush()
+    return candidates